@@ -10,6 +10,8 @@ import subprocess
 import importlib
 import traceback
 from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # --- 2. BIBLIOTEKI ZEWNĘTRZNE (DATA SCIENCE / OBLICZENIA) ---
 import numpy as np
@@ -29,7 +31,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import (
     Qt, QAbstractTableModel, QUrl, QSize, QThread, 
-    pyqtSignal, QTimer, QTime, pyqtSlot
+    pyqtSignal, QTimer, QTime, pyqtSlot, QObject
 )
 from PyQt6.QtGui import (
     QColor, QPalette, QDesktopServices, QAction, 
@@ -46,10 +48,14 @@ import routing
 from routing import router
 import config_solver
 import material_catalogue
+from run_config import RunConfig
 import engine_solver
 import fem_optimizer
+import telemetry
+import atomic_io
 import data_aggregator  # Krytyczny moduł - musi być tu
-from fem_optimizer_shell import FemOptimizerShell
+from fem_optimizer_shell import FemOptimizerShell, translate_candidate
+from mesh_pool import MeshWorkerPool
 from data_aggregator_shell import DataAggregatorShell
 
 # --- 6. IMPORTY OPCJONALNE (WIZUALIZACJA 3D / WYKRESY) ---
@@ -200,10 +206,40 @@ class FilterWidget(QWidget):
         layout.addWidget(self.btn_remove)
 
 class AdvancedPandasModel(QAbstractTableModel):
+    """
+    Model tabeli wyników na tablicach NumPy (jedna tablica na kolumnę).
+    - _view: pozycje widocznych wierszy (filtr + sortowanie), bez kopiowania danych,
+    - _filter_mask: wynik filtrów kolumnowych (łączony przyrostowo przy dokładaniu filtra),
+    - tekst komórek formatowany dopiero, gdy widok go rysuje (cache).
+    """
+    CACHE_MAX = 50000 # Limit sformatowanych komórek w pamięci
+
     def __init__(self, df=pd.DataFrame()):
         super().__init__()
-        self._df_original = df.copy()
-        self._df = df.copy()
+        df = df.copy()
+        if not df.empty:
+            if "PRZEKAZ" not in df.columns: df.insert(0, "PRZEKAZ", False)
+            if "WYKLUCZ" not in df.columns: df.insert(1, "WYKLUCZ", False)
+        self._columns = [str(c) for c in df.columns]
+        self._arrays = []
+        for c in df.columns:
+            s = df[c]
+            if c in ("PRZEKAZ", "WYKLUCZ"):
+                self._arrays.append(s.fillna(False).to_numpy(dtype=bool, copy=True))
+            elif pd.api.types.is_numeric_dtype(s):
+                self._arrays.append(s.to_numpy())
+            else:
+                self._arrays.append(s.to_numpy(dtype=object))
+        self._index = df.index.to_numpy() # Etykiety wierszy (nr wiersza w pliku wyników)
+        self._n = len(df)
+        self._numeric = {} # Kolumny w wersji liczbowej (filtry, leniwie)
+        
+        self._filters = [] # Filtry, z których policzono _filter_mask
+        self._filter_mask = np.ones(self._n, dtype=bool)
+        self._order = None # Permutacja sortowania (argsort) lub None
+        self._view = np.arange(self._n)
+        self._cache = {}
+        
         self.use_scientific = False
         self.show_excluded = True
         self.highlight_row = -1
@@ -216,21 +252,46 @@ class AdvancedPandasModel(QAbstractTableModel):
             "bg_highlight": QColor(70, 70, 120), 
             "text_normal": QColor(230, 230, 230)
         }
-        self._ensure_control_columns()
 
-    def _ensure_control_columns(self):
-        for df in [self._df, self._df_original]:
-            if not df.empty:
-                if "PRZEKAZ" not in df.columns: df.insert(0, "PRZEKAZ", False)
-                if "WYKLUCZ" not in df.columns: df.insert(1, "WYKLUCZ", False)
+    # --- DOSTĘP DO DANYCH ---
+    def _col(self, name):
+        return self._arrays[self._columns.index(name)]
+
+    def numeric_column(self, ci):
+        """Kolumna jako float64 (teksty -> NaN) - do filtrów."""
+        if ci not in self._numeric:
+            arr = self._arrays[ci]
+            if arr.dtype.kind in "biuf":
+                self._numeric[ci] = arr.astype(np.float64, copy=False)
+            else:
+                self._numeric[ci] = pd.to_numeric(pd.Series(arr), errors='coerce').to_numpy(dtype=np.float64)
+        return self._numeric[ci]
+
+    def frame(self, positions):
+        """DataFrame z wierszy o podanych pozycjach (indeks = etykiety z pliku)."""
+        positions = np.asarray(positions, dtype=np.int64)
+        return pd.DataFrame({c: a[positions] for c, a in zip(self._columns, self._arrays)},
+                            index=self._index[positions])
+
+    def row_series(self, row):
+        """Wiersz widoku jako pd.Series (panel detali)."""
+        return self.frame([self._view[row]]).iloc[0]
 
-    def rowCount(self, parent=None): return self._df.shape[0]
-    def columnCount(self, parent=None): return self._df.shape[1]
+    def checked_frame(self, col_name):
+        """Widoczne wiersze z zaznaczoną kolumną kontrolną (PRZEKAZ / WYKLUCZ)."""
+        if col_name not in self._columns: return self.frame([])
+        return self.frame(self._view[self._col(col_name)[self._view]])
+
+    def visible_count(self): return len(self._view)
+
+    # --- QAbstractTableModel ---
+    def rowCount(self, parent=None): return len(self._view)
+    def columnCount(self, parent=None): return len(self._columns)
     def headerData(self, section, orientation, role):
         if role == Qt.ItemDataRole.DisplayRole:
             if orientation == Qt.Orientation.Horizontal:
-                if section < len(self._df.columns):
-                    col_name = self._df.columns[section]
+                if section < len(self._columns):
+                    col_name = self._columns[section]
                     if col_name in HEADER_MAP:
                         nazwa, jednostka = HEADER_MAP[col_name]
                         return f"{nazwa}\n[{jednostka}]"
@@ -238,32 +299,40 @@ class AdvancedPandasModel(QAbstractTableModel):
             if orientation == Qt.Orientation.Vertical:
                 return str(section + 1)
         if role == Qt.ItemDataRole.ToolTipRole and orientation == Qt.Orientation.Horizontal:
-            if section < len(self._df.columns):
-                return str(self._df.columns[section])
+            if section < len(self._columns):
+                return str(self._columns[section])
         return None
-        
+
+    def _format(self, value):
+        if isinstance(value, (int, float)):
+            if self.use_scientific: return f"{value:.2e}"
+            else: return f"{int(value)}" if float(value).is_integer() else f"{value:.4f}"
+        return str(value)
+
     def data(self, index, role=Qt.ItemDataRole.DisplayRole):
         if not index.isValid(): return None
         row = index.row()
         col = index.column()
-        col_name = self._df.columns[col]
-        value = self._df.iloc[row, col]
+        col_name = self._columns[col]
+        pos = self._view[row]
 
         if col_name in ["PRZEKAZ", "WYKLUCZ"]:
             if role == Qt.ItemDataRole.CheckStateRole: 
-                return Qt.CheckState.Checked if value else Qt.CheckState.Unchecked
+                return Qt.CheckState.Checked if self._arrays[col][pos] else Qt.CheckState.Unchecked
             return None
 
         if role == Qt.ItemDataRole.DisplayRole:
-            if isinstance(value, (int, float)):
-                if self.use_scientific: return f"{value:.2e}"
-                else: return f"{int(value)}" if float(value).is_integer() else f"{value:.4f}"
-            return str(value)
+            key = (pos, col)
+            txt = self._cache.get(key)
+            if txt is None:
+                if len(self._cache) >= self.CACHE_MAX: self._cache.clear()
+                txt = self._cache[key] = self._format(self._arrays[col][pos])
+            return txt
 
         if role == Qt.ItemDataRole.BackgroundRole:
             if row == self.highlight_row or col == self.highlight_col: return self.colors["bg_highlight"]
-            if self._df.iloc[row]["WYKLUCZ"]: return self.colors["bg_excluded"]
-            if self._df.iloc[row]["PRZEKAZ"]: return self.colors["bg_passed"]
+            if self._col("WYKLUCZ")[pos]: return self.colors["bg_excluded"]
+            if self._col("PRZEKAZ")[pos]: return self.colors["bg_passed"]
             if self.colors["bg_2"] is not None and row % 2 == 1: return self.colors["bg_2"]
             return self.colors["bg_1"]
 
@@ -274,32 +343,37 @@ class AdvancedPandasModel(QAbstractTableModel):
     def setData(self, index, value, role):
         if not index.isValid(): return False
         if role == Qt.ItemDataRole.CheckStateRole:
-            col_name = self._df.columns[index.column()]
+            col_name = self._columns[index.column()]
             if col_name in ["PRZEKAZ", "WYKLUCZ"]:
-                new_val = (value == Qt.CheckState.Checked.value)
-                self._df.iloc[index.row(), index.column()] = new_val
-                real_idx = self._df.index[index.row()]
-                if real_idx in self._df_original.index:
-                    col_idx_orig = self._df_original.columns.get_loc(col_name)
-                    self._df_original.iloc[real_idx, col_idx_orig] = new_val
+                self._arrays[index.column()][self._view[index.row()]] = (value == Qt.CheckState.Checked.value)
                 self.dataChanged.emit(index, index, [role, Qt.ItemDataRole.BackgroundRole])
                 return True
         return False
 
     def flags(self, index):
-        col_name = self._df.columns[index.column()]
+        col_name = self._columns[index.column()]
         base = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsDragEnabled
         if col_name in ["PRZEKAZ", "WYKLUCZ"]: return base | Qt.ItemFlag.ItemIsUserCheckable
         return base
 
+    # --- WIDOK (FILTR + SORTOWANIE) ---
+    def _rebuild_view(self):
+        mask = self._filter_mask
+        if not self.show_excluded and "WYKLUCZ" in self._columns:
+            mask = mask & ~self._col("WYKLUCZ")
+        self._view = self._order[mask[self._order]] if self._order is not None else np.flatnonzero(mask)
+
     def sort(self, column, order):
-        colname = self._df.columns[column]
+        # Permutacja indeksów zamiast kopii ramki; stabilne, NaN na końcu (jak sort_values)
         self.layoutAboutToBeChanged.emit()
-        self._df.sort_values(by=colname, ascending=(order == Qt.SortOrder.AscendingOrder), inplace=True)
+        s = pd.Series(self._arrays[column])
+        self._order = s.sort_values(ascending=(order == Qt.SortOrder.AscendingOrder),
+                                    kind="stable", na_position="last").index.to_numpy()
+        self._rebuild_view()
         self.layoutChanged.emit()
 
     def set_scientific_notation(self, enable): 
-        self.use_scientific = enable; self.layoutChanged.emit()
+        self.use_scientific = enable; self._cache.clear(); self.layoutChanged.emit()
     
     def set_highlight(self, row, col): 
         self.highlight_row = row; self.highlight_col = col; self.layoutChanged.emit()
@@ -308,38 +382,70 @@ class AdvancedPandasModel(QAbstractTableModel):
         self.highlight_row = -1; self.highlight_col = col; self.layoutChanged.emit()
     
     def set_column_state(self, col_name, state):
-        if col_name not in self._df.columns: return
+        if col_name not in self._columns: return
         self.layoutAboutToBeChanged.emit()
-        self._df[col_name] = state
-        self._df_original.loc[self._df.index, col_name] = state
+        self._col(col_name)[self._view] = state
         self.layoutChanged.emit()
     
     def toggle_column_all(self, col_name):
-        if col_name not in self._df.columns: return
+        if col_name not in self._columns: return
         self.layoutAboutToBeChanged.emit()
-        current_val = self._df[col_name].iloc[0] if len(self._df) > 0 else False
-        new_val = not current_val
-        self._df[col_name] = new_val
-        self._df_original.loc[self._df.index, col_name] = new_val
+        arr = self._col(col_name)
+        current_val = bool(arr[self._view[0]]) if len(self._view) > 0 else False
+        arr[self._view] = not current_val
         self.layoutChanged.emit()
 
-    def apply_advanced_filter(self, filters_list, show_excluded):
+    def compute_filter_mask(self, filters_list, is_cancelled=lambda: False):
+        """
+        Maska filtrów kolumnowych (bezpieczne w wątku roboczym - tylko odczyt tablic).
+        Jeśli poprzednie filtry są początkiem nowej listy, liczone są tylko dołożone.
+        Zwraca None po anulowaniu.
+        """
+        filters_list = list(filters_list)
+        n_old = len(self._filters)
+        if filters_list[:n_old] == self._filters:
+            mask, todo = self._filter_mask.copy(), filters_list[n_old:]
+        else:
+            mask, todo = np.ones(self._n, dtype=bool), filters_list
+        for col, vmin, vmax in todo:
+            if is_cancelled(): return None
+            if col not in self._columns: continue
+            vals = self.numeric_column(self._columns.index(col))
+            with np.errstate(invalid='ignore'):
+                if vmin is not None: mask &= vals >= vmin
+                if vmax is not None: mask &= vals <= vmax
+        return None if is_cancelled() else mask
+
+    def set_filter_result(self, filters_list, mask, show_excluded):
         self.layoutAboutToBeChanged.emit()
-        df_temp = self._df_original.copy()
-        
-        if not show_excluded:
-            df_temp = df_temp[ (df_temp["WYKLUCZ"] == False) | (df_temp["WYKLUCZ"] == 0) ]
-        
-        for col, vmin, vmax in filters_list:
-            if col in df_temp.columns:
-                try:
-                    df_temp[col] = pd.to_numeric(df_temp[col], errors='coerce')
-                    if vmin is not None: df_temp = df_temp[df_temp[col] >= vmin]
-                    if vmax is not None: df_temp = df_temp[df_temp[col] <= vmax]
-                except: pass
-        self._df = df_temp
+        self._filters = list(filters_list)
+        self._filter_mask = mask
+        self.show_excluded = show_excluded
+        self._rebuild_view()
         self.layoutChanged.emit()
 
+    def apply_advanced_filter(self, filters_list, show_excluded):
+        """Filtr synchroniczny (małe tabele / wywołania spoza Tab3)."""
+        self.set_filter_result(filters_list, self.compute_filter_mask(filters_list), show_excluded)
+
+class FilterWorker(QThread):
+    """Liczenie maski filtrów poza wątkiem GUI (anulowanie: cancel())."""
+    result_ready = pyqtSignal(object, object, bool) # (filtry, maska, pokaż wykluczone)
+
+    def __init__(self, model, filters_list, show_excluded):
+        super().__init__()
+        self.model = model
+        self.filters_list = filters_list
+        self.show_excluded = show_excluded
+        self._cancelled = False
+
+    def cancel(self): self._cancelled = True
+
+    def run(self):
+        mask = self.model.compute_filter_mask(self.filters_list, lambda: self._cancelled)
+        if mask is not None and not self._cancelled:
+            self.result_ready.emit(self.filters_list, mask, self.show_excluded)
+
 class MaterialSelectorWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -480,6 +586,31 @@ class SingleProfileWidget(QGroupBox):
         except Exception as e:
             print(f"Błąd ładowania materiałów w widgecie: {e}")
 
+class ColumnSelectDialog(QDialog):
+    """Wybór kolumn tabeli Tab3 (wczytywane są tylko zaznaczone - plik kolumnowy)."""
+    def __init__(self, columns, selected, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Kolumny tabeli")
+        self.resize(320, 500)
+        layout = QVBoxLayout(self)
+        
+        self.list_widget = QListWidget()
+        for c in columns:
+            item = QListWidgetItem(c)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked if c in selected else Qt.CheckState.Unchecked)
+            self.list_widget.addItem(item)
+        layout.addWidget(self.list_widget)
+        
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def get_columns(self):
+        return [self.list_widget.item(i).text() for i in range(self.list_widget.count())
+                if self.list_widget.item(i).checkState() == Qt.CheckState.Checked]
+
 class MaterialInputDialog(QDialog):
     def __init__(self, material_name, parent=None):
         super().__init__(parent)
@@ -518,14 +649,85 @@ class MaterialInputDialog(QDialog):
 # SEKCJA 3: WORKERS I ZAKŁADKI (MODULARNE)
 # ==============================================================================
 
+class DetailLoader(QObject):
+    """
+    Ładowanie szczegółów wyników w tle (pula wątków) z wyprzedzeniem dla sąsiednich wierszy.
+    load_fn(klucz) -> dane gotowe do rysowania (bez widgetów Qt i renderowania).
+    Zmiana wyboru anuluje zaległe zadania; wynik dociera tylko dla bieżącego klucza.
+    """
+    ready = pyqtSignal(str, object)
+    failed = pyqtSignal(str, str)
+    _done = pyqtSignal(str, object) # Wewnętrzny: z wątku puli do wątku GUI
+
+    def __init__(self, load_fn, max_workers=2, cache_size=8, parent=None):
+        super().__init__(parent)
+        self.load_fn = load_fn
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="detail")
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.futures = {}
+        self.current = None
+        self._done.connect(self._on_done)
+
+    def request(self, key, neighbours=()):
+        self.current = key
+        wanted = {key, *neighbours}
+        for k, fut in list(self.futures.items()):
+            if k not in wanted and fut.cancel():
+                self.futures.pop(k, None)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.ready.emit(key, self.cache[key])
+        else:
+            self._submit(key)
+        for k in neighbours:
+            if k not in self.cache: self._submit(k)
+
+    def invalidate(self):
+        """Po odświeżeniu listy wyników (pliki mogły się zmienić)."""
+        self.cache.clear()
+
+    def _submit(self, key):
+        if key in self.futures: return
+        fut = self.pool.submit(self.load_fn, key)
+        self.futures[key] = fut
+        fut.add_done_callback(lambda f, k=key: self._done.emit(k, f))
+
+    def _on_done(self, key, fut):
+        if self.futures.get(key) is fut: del self.futures[key]
+        if fut.cancelled(): return
+        err = fut.exception()
+        if err is not None:
+            if key == self.current: self.failed.emit(key, str(err))
+            return
+        self.cache[key] = fut.result()
+        while len(self.cache) > self.cache_size: self.cache.popitem(last=False)
+        if key == self.current: self.ready.emit(key, self.cache[key])
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+# [NOWOŚĆ] Tryby profilowania (profiling.py) - etykieta w GUI -> wartość opcji
+PROFILE_MODES = [("Bez profilowania", ""), ("CPU (cProfile)", "cpu"), ("Pamięć (tracemalloc)", "mem"), ("CPU + pamięć", "cpu+mem")]
+
+def make_profile_combo(width=None):
+    combo = QComboBox()
+    for label, mode in PROFILE_MODES: combo.addItem(label, mode)
+    combo.setToolTip("Profilowanie przebiegu: pliki .pstats / migawki pamięci w 99_Temp projektu,\npodsumowanie najdroższych funkcji w logu.")
+    if width: combo.setFixedWidth(width)
+    return combo
+
 class OptimizationWorker(QThread):
     log_signal = pyqtSignal(str)
     finished_signal = pyqtSignal(bool, str)
     found_file_signal = pyqtSignal(str)
 
-    def __init__(self, router_instance=None):
+    def __init__(self, router_instance=None, config=None, wznow=False, profil=""):
         super().__init__()
         self.router = router_instance
+        self.config = config # RunConfig przebiegu (None = config_solver.py)
+        self.wznow = wznow # Kontynuacja z punktu kontrolnego
+        self.profil = profil # Tryb profilowania ("" = wyłączone)
 
     def run(self):
         original_stdout = sys.__stdout__
@@ -539,8 +741,6 @@ class OptimizationWorker(QThread):
         sys.stdout = StreamToSignal(self.log_signal)
         try:
             self.log_signal.emit(">>> Inicjalizacja wątku...\n")
-            import config_solver
-            importlib.reload(config_solver)
             
             if getattr(sys, 'frozen', False):
                 # Jeśli program to .exe, szukaj obok pliku .exe
@@ -576,7 +776,7 @@ class OptimizationWorker(QThread):
             
             self.log_signal.emit(">>> Start symulacji...\n")
             
-            sciezka_wynikowa = solver_module.glowna_petla_optymalizacyjna(router_instance=self.router)
+            sciezka_wynikowa = solver_module.glowna_petla_optymalizacyjna(router_instance=self.router, config=self.config, wznow=self.wznow, profil=self.profil)
             
             if sciezka_wynikowa: self.found_file_signal.emit(str(sciezka_wynikowa))
             self.finished_signal.emit(True, str(sciezka_wynikowa))
@@ -601,106 +801,134 @@ class FemWorker(QThread):
         super().__init__()
         self.candidates = candidates
         self.settings = settings
-        self.optimizer = fem_optimizer.FemOptimizer(router)
+        self.mesh_pool = None
+        n_mesh = int(settings.get("mesh_workers", 0))
+        if n_mesh > 0:
+            # Każdy proces dostaje część rdzeni siatkujących (suma nie przekracza ustawienia)
+            thr = max(1, int(settings.get("cores_mesh", 4)) // n_mesh)
+            self.mesh_pool = MeshWorkerPool(max_workers=n_mesh, threads_per_worker=thr)
+        self.optimizer = fem_optimizer.FemOptimizer(router, mesh_pool=self.mesh_pool)
         self.summary_data = []
         
     def request_stop(self):
-        """Ustawia flagę w optimizerze, aby przerwać pętlę."""
+        """Ustawia flagę w optimizerze, aby przerwać pętlę (i potok batcha)."""
         if hasattr(self, 'optimizer') and self.optimizer:
-            self.optimizer.stop_requested = True
+            self.optimizer.request_stop()
+
+    def _interaction_handler(self, eq, vm):
+        """Automatycznie przełącza na solver iteracyjny i wysyła powiadomienie do GUI."""
+        msg = f"Model ma ~{eq/1e6:.1f}M równań. Automatyczne przełączenie na solver iteracyjny dla stabilności."
+        self.log_signal.emit(f"  ! LIMIT: {msg}")
+        self.notification_signal.emit("Zmiana Solvera", msg)
+        return "ITERATIVE"
+
+    def _try_import_existing(self, i, cand):
+        """Jeśli wynik kandydata istnieje w 03_Final - importuje go i zwraca True."""
+        # Wspólna logika wznowienia z CLI (manifest / results.json) - FemOptimizer.import_existing
+        data_for_signal = self.optimizer.import_existing(cand, log=self.log_signal.emit)
+        if data_for_signal is None:
+            return False
+        self.log_signal.emit(f"\n--- Pomijanie: {data_for_signal['profile_name']} ({i+1}/{len(self.candidates)}) - wynik już istnieje. ---")
+        self.data_signal.emit(data_for_signal)
+        self.log_signal.emit(f"   [INFO] Zaimportowano istniejący wynik. Max VM: {data_for_signal['final_stress']:.2f} MPa")
+        return True
+
+    def _local_settings(self, cand):
+        """Ustawienia kandydata z korektą siatki do najcieńszej ścianki."""
+        return self.optimizer.settings_for_candidate(cand, self.settings, log=self.log_signal.emit)
+
+    def _record_result(self, cand, res):
+        """Sygnał do GUI + wiersz raportu zbiorczego. Zwraca True dla zbieżnego wyniku."""
+        prof_name = cand.get('Nazwa_Profilu', 'Unknown')
+        res['profile_name'] = prof_name
+        res['final_stress'] = res.get('final_stress', 0.0)
+        self.data_signal.emit(res)
+
+        status_text = "ZBIEŻNY" if res['converged'] else "NIEZBIEŻNY"
+        self.log_signal.emit(f"   [KONIEC PROFILU] Status: {status_text}, Final Stress: {res['final_stress']:.2f} MPa")
+        
+        # Zbieranie danych do raportu
+        row = {
+            "Profil": prof_name,
+            "Material": cand.get("Stop"),
+            "Iteracje": res.get('iterations', 0),
+            "Zbieznosc": "TAK" if res['converged'] else "NIE",
+            "Max_VM": res.get('final_stress', 0)
+        }
+        if res.get("failed"):
+            # Kandydat nieudany (timeout / RAM / błąd CCX) - szczegóły w failed.json
+            fail = res.get("failure", {})
+            row["Blad"] = f"[{fail.get('status', fail.get('stage', '?'))}] {fail.get('reason', '')}"
+            self.log_signal.emit(f"   [NIEUDANY] {res.get('id')}: {row['Blad']}")
+        for stage, dt in res.get("stage_times", {}).items():
+            row[f"T_{stage}_s"] = dt
+        # [NOWOŚĆ] Czasy etapów z telemetrii (geometry, mesh, ..., archive)
+        for stage, dt in res.get("telemetry", {}).items():
+            row[f"Tel_{stage}_s"] = dt
+        self.summary_data.append(row)
+        return bool(res['converged'])
 
     def run(self):
         self.log_signal.emit(">>> START PROCEDURY FEM BATCH...")
         success_count = 0
-        
-        def interaction_handler(eq, vm):
-            """Automatycznie przełącza na solver iteracyjny i wysyła powiadomienie do GUI."""
-            msg = f"Model ma ~{eq/1e6:.1f}M równań. Automatyczne przełączenie na solver iteracyjny dla stabilności."
-            self.log_signal.emit(f"  ! LIMIT: {msg}")
-            self.notification_signal.emit("Zmiana Solvera", msg)
-            return "ITERATIVE"
 
+        # Kandydaci już policzeni są importowani, reszta trafia do kolejki
+        todo = []
         for i, cand in enumerate(self.candidates):
-            prof_name = cand.get('Nazwa_Profilu', 'Unknown')
-            tp = float(cand.get("Input_Geo_tp", 10))
-            bp = float(cand.get("Input_Geo_bp", 0))
-            cid = f"{prof_name}_tp{int(tp)}_bp{int(bp)}"
+            if self._try_import_existing(i, cand):
+                success_count += 1
+            else:
+                todo.append(cand)
 
-            # --- [POPRAWKA] Sprawdzenie, czy wynik dla tego kandydata już istnieje ---
-            final_dest = self.optimizer.router.get_path("FINAL", "", subdir=cid)
-            result_file_path = os.path.join(final_dest, "results.json")
+        is_batch = int(self.settings.get("max_iterations", 3)) == 1
+        if is_batch and len(todo) > 1:
+            # [NOWOŚĆ] Batch potokowy: siatka kolejnego kandydata powstaje podczas pracy solvera
+            self.log_signal.emit(f">>> Tryb potokowy: {len(todo)} kandydatów (mesh -> solve -> parse -> archive)")
+            per_cand = [self._local_settings(c) for c in todo]
+            results = {}
 
-            if os.path.exists(result_file_path):
-                self.log_signal.emit(f"\n--- Pomijanie: {prof_name} ({i+1}/{len(self.candidates)}) - wynik już istnieje. ---")
-                try:
-                    with open(result_file_path, 'r') as f:
-                        existing_res = json.load(f)
-                    
-                    data_for_signal = {
-                        'id': cid,
-                        'profile_name': prof_name,
-                        'iterations': existing_res.get('iterations', 'N/A'),
-                        'converged': "IMPORTED",
-                        'final_stress': existing_res.get('MODEL_MAX_VM', 0.0),
-                        'mesh_path': existing_res.get('mesh_path', None)
-                    }
-                    self.data_signal.emit(data_for_signal)
-                    self.log_signal.emit(f"   [INFO] Zaimportowano istniejący wynik. Max VM: {data_for_signal['final_stress']:.2f} MPa")
-                    success_count += 1
-                    continue
-                except Exception as e:
-                    self.log_signal.emit(f"   [WARN] Znaleziono wynik, ale nie można go odczytać: {e}. Przeliczam ponownie.")
-            # --------------------------------------------------------------------
+            def on_result(idx, res):
+                results[idx] = res
+                if res.get("error"):
+                    self.log_signal.emit(f"   [BŁĄD] {res['id']}: {res['error']} (etap: {res.get('failed_stage')})")
 
-            self.processing_signal.emit(cid)
-            
-            self.log_signal.emit(f"\n--- Przetwarzanie: {prof_name} ({i+1}/{len(self.candidates)}) ---")
-            
             try:
-                thicknesses = []
-                if 'Input_UPE_twc' in cand: thicknesses.append(float(cand['Input_UPE_twc']))
-                if 'Input_UPE_tfc' in cand: thicknesses.append(float(cand['Input_UPE_tfc']))
-                if 'Input_Geo_tp' in cand: thicknesses.append(float(cand['Input_Geo_tp']))
-                
-                local_settings = self.settings.copy()
-                
-                if thicknesses:
-                    min_t = min(thicknesses)
-                    user_mesh = float(local_settings.get('mesh_start_size', 15.0))
-                    if user_mesh > min_t:
-                        self.log_signal.emit(f"   [AUTO-CHECK] Korekta siatki: {min_t} mm")
-                        local_settings['mesh_start_size'] = min_t
-
-                # Uruchomienie obliczeń (z callbackiem)
-                res = self.optimizer.run_single_candidate(
-                    cand, 
-                    local_settings, 
+                final_list, _ = self.optimizer.run_batch_pipelined(
+                    todo, self.settings,
                     signal_callback=self.log_signal.emit,
-                    interaction_callback=interaction_handler
+                    interaction_callback=self._interaction_handler,
+                    on_result=on_result,
+                    on_start=self.processing_signal.emit,
+                    candidate_settings=per_cand
                 )
-                
-                res['profile_name'] = prof_name
-                res['final_stress'] = res.get('final_stress', 0.0)
-                self.data_signal.emit(res)
-
-                status_text = "ZBIEŻNY" if res['converged'] else "NIEZBIEŻNY"
-                self.log_signal.emit(f"   [KONIEC PROFILU] Status: {status_text}, Final Stress: {res['final_stress']:.2f} MPa")
-                
-                if res['converged']: success_count += 1
-                
-                # Zbieranie danych do raportu
-                self.summary_data.append({
-                    "Profil": prof_name,
-                    "Material": cand.get("Stop"),
-                    "Iteracje": res.get('iterations', 0),
-                    "Zbieznosc": "TAK" if res['converged'] else "NIE",
-                    "Max_VM": res.get('final_stress', 0)
-                })
-
+                # Raport w kolejności wejściowej (deterministycznie)
+                for cand, res in zip(todo, final_list):
+                    if self._record_result(cand, res): success_count += 1
             except Exception as e:
                 self.log_signal.emit(f"CRITICAL ERROR: {str(e)}")
-                import traceback
                 self.log_signal.emit(traceback.format_exc())
+        else:
+            for i, cand in enumerate(todo):
+                if self.optimizer.stop_requested: break
+                prof_name = cand.get('Nazwa_Profilu', 'Unknown')
+                cid = self.optimizer.candidate_id(cand)
+                self.processing_signal.emit(cid)
+                
+                self.log_signal.emit(f"\n--- Przetwarzanie: {prof_name} ({i+1}/{len(todo)}) ---")
+                
+                try:
+                    # Uruchomienie obliczeń (z callbackiem)
+                    res = self.optimizer.run_single_candidate(
+                        cand, 
+                        self._local_settings(cand), 
+                        signal_callback=self.log_signal.emit,
+                        interaction_callback=self._interaction_handler
+                    )
+                    if self._record_result(cand, res): success_count += 1
+
+                except Exception as e:
+                    self.log_signal.emit(f"CRITICAL ERROR: {str(e)}")
+                    self.log_signal.emit(traceback.format_exc())
         
         # Zapis pliku zbiorczego
         if self.summary_data and len(self.candidates) > 1:
@@ -708,8 +936,11 @@ class FemWorker(QThread):
                 ts = datetime.now().strftime("%H%M%S")
                 path = router.get_path("FINAL", f"BATCH_REPORT_{ts}.csv")
                 import csv
-                keys = self.summary_data[0].keys()
-                with open(path, 'w', newline='') as f:
+                keys = []
+                for row in self.summary_data:
+                    for k in row:
+                        if k not in keys: keys.append(k)
+                with atomic_io.atomic_open(path, 'w', newline='') as f:
                     w = csv.DictWriter(f, fieldnames=keys, delimiter=';')
                     w.writeheader()
                     w.writerows(self.summary_data)
@@ -717,6 +948,16 @@ class FemWorker(QThread):
             except Exception as e:
                 self.log_signal.emit(f"Błąd zapisu raportu: {e}")
 
+        # [NOWOŚĆ] Podsumowanie telemetrii (gdzie batch spędził czas); pełny ślad w _telemetry.jsonl
+        events = self.optimizer.telemetry.zdarzenia
+        if events:
+            self.log_signal.emit(f"\n>>> TELEMETRIA ETAPÓW ({self.optimizer.telemetry.sciezka}):")
+            telemetry.log_podsumowanie(events, self.log_signal.emit)
+        self.optimizer.retention_report(self.log_signal.emit)
+
+        if self.mesh_pool:
+            self.mesh_pool.shutdown(wait=True)
+
         self.log_signal.emit(f"\n>>> ZAKOŃCZONO. Sukces: {success_count}/{len(self.candidates)}")
         self.finished_signal.emit(True)
 
@@ -815,7 +1056,12 @@ class Tab1_Dashboard(QWidget):
         g_files = QGroupBox("4. Pliki"); lf = QHBoxLayout()
         self.inp_NazwaBadania = QLineEdit(""); self.inp_NazwaBadania.setPlaceholderText("Nazwa folderu (opcjonalna)")
         self.chk_WspolnyKat = QCheckBox("Wspólny Katalog"); self.chk_PokazKroki = QCheckBox("Logowanie kroków")
-        lf.addWidget(QLabel("Nazwa:")); lf.addWidget(self.inp_NazwaBadania); lf.addWidget(self.chk_WspolnyKat); lf.addWidget(self.chk_PokazKroki)
+        self.chk_Kolumnowy = QCheckBox("Parquet/NPZ")
+        self.chk_Kolumnowy.setToolTip("Dodatkowy eksport kolumnowy (typowane kolumny) - szybkie wczytanie w zakładce wyboru.")
+        self.chk_Wznow = QCheckBox("Wznów przerwane")
+        self.chk_Wznow.setToolTip("Kontynuacja badania z punktu kontrolnego.\nWymaga tej samej nazwy badania i niezmienionych parametrów.")
+        self.combo_Profil = make_profile_combo()
+        lf.addWidget(QLabel("Nazwa:")); lf.addWidget(self.inp_NazwaBadania); lf.addWidget(self.chk_WspolnyKat); lf.addWidget(self.chk_PokazKroki); lf.addWidget(self.chk_Kolumnowy); lf.addWidget(self.chk_Wznow); lf.addWidget(self.combo_Profil)
         g_files.setLayout(lf); la.addWidget(g_files); la.addStretch(); self.stack.addWidget(page_auto)
         
         # MANUAL
@@ -885,30 +1131,38 @@ class Tab1_Dashboard(QWidget):
         self.profile_widgets.append(w)
         self.scroll_prof.verticalScrollBar().setValue(self.scroll_prof.verticalScrollBar().maximum())
 
-    def save_config(self):
+    @staticmethod
+    def _num(text):
+        """Liczba z pola tekstowego (int, jeśli całkowita - jak literał w config_solver.py)."""
+        text = text.strip()
+        try: return int(text)
+        except ValueError: return float(text)
+
+    def build_run_config(self):
+        """Konfiguracja przebiegu z pól zakładki (bez zapisu config_solver.py na dysk)."""
         mats = self.material_selector.get_selected_materials()
         if not mats and self.mode_group.checkedId() == 0: raise ValueError("Wybierz materiał!")
         
-        dyn_str = ""
+        dyn = {}
         for k, i in self.dynamic_inputs.items():
             typ = OPTIMIZER_REGISTRY[self.combo_algo.currentText()]["params"][k]["type"]
-            val = f'"{i.text()}"' if typ=="str" else i.text()
-            dyn_str += f"{k} = {val}\n"
-
-        content = f"""# AUTO-GENERATED CONFIG
-LOAD_PARAMS = {{ "Fx": {self.inp_Fx.text()}, "F_promien": {self.inp_Promien.text()}, "L": {self.inp_L.text()}, "w_Ty": {self.inp_Ty.text()}, "w_Tz": {self.inp_Tz.text()} }}
-LISTA_MATERIALOW = {mats if self.mode_group.checkedId()==0 else []}
-MIN_SZEROKOSC_OTWARCIA = {self.inp_MinOtw.text()}
-MAX_GRUBOSC_PLASKOWNIKA = {self.inp_MaxTp.text()}
-SAFETY_PARAMS = {{ "gamma_M0": {self.inp_GM0.text()}, "gamma_M1": {self.inp_GM1.text()}, "alfa_imp": {self.inp_Alfa.text()} }}
-NAZWA_BADANIA = "{self.inp_NazwaBadania.text()}"
-WSPOLNY_KATALOG = {self.chk_WspolnyKat.isChecked()}
-POKAZUJ_KROKI_POSREDNIE = {self.chk_PokazKroki.isChecked()}
-# DYNAMICZNE
-{dyn_str}
-"""
-        with open("config_solver.py", "w", encoding="utf-8") as f:
-            f.write(content)
+            dyn[k] = i.text() if typ == "str" else self._num(i.text())
+
+        return RunConfig.from_dict({
+            "LOAD_PARAMS": {"Fx": self._num(self.inp_Fx.text()), "F_promien": self._num(self.inp_Promien.text()),
+                            "L": self._num(self.inp_L.text()), "w_Ty": self._num(self.inp_Ty.text()),
+                            "w_Tz": self._num(self.inp_Tz.text())},
+            "LISTA_MATERIALOW": mats if self.mode_group.checkedId() == 0 else [],
+            "MIN_SZEROKOSC_OTWARCIA": self._num(self.inp_MinOtw.text()),
+            "MAX_GRUBOSC_PLASKOWNIKA": self._num(self.inp_MaxTp.text()),
+            "SAFETY_PARAMS": {"gamma_M0": self._num(self.inp_GM0.text()), "gamma_M1": self._num(self.inp_GM1.text()),
+                              "alfa_imp": self._num(self.inp_Alfa.text())},
+            "NAZWA_BADANIA": self.inp_NazwaBadania.text(),
+            "WSPOLNY_KATALOG": self.chk_WspolnyKat.isChecked(),
+            "POKAZUJ_KROKI_POSREDNIE": self.chk_PokazKroki.isChecked(),
+            "EKSPORT_KOLUMNOWY": self.chk_Kolumnowy.isChecked(),
+            **dyn
+        })
 
     def run_process_based_on_mode(self):
         mode = self.mode_group.checkedId()
@@ -918,9 +1172,13 @@ POKAZUJ_KROKI_POSREDNIE = {self.chk_PokazKroki.isChecked()}
                 name = self.inp_NazwaBadania.text() or f"Auto_{datetime.now().strftime('%H%M%S')}"
                 router.set_project(name)
                 self.console.append(f">>> Projekt: {name}")
-                self.save_config()
+                config = self.build_run_config()
                 
-                self.worker = OptimizationWorker(router)
+                wznow = self.chk_Wznow.isChecked()
+                if wznow and not self.inp_NazwaBadania.text():
+                    self.console.append("(!) Wznowienie wymaga nazwy badania - start od początku.")
+                    wznow = False
+                self.worker = OptimizationWorker(router, config=config, wznow=wznow, profil=self.combo_Profil.currentData())
                 self.worker.log_signal.connect(self.console.append)
                 self.worker.finished_signal.connect(self.on_finished)
                 self.worker.found_file_signal.connect(lambda p: setattr(self, 'last_res', p))
@@ -936,8 +1194,7 @@ POKAZUJ_KROKI_POSREDNIE = {self.chk_PokazKroki.isChecked()}
         if not self.profile_widgets: return
         
         try:
-            self.save_config()
-            import config_solver; importlib.reload(config_solver)
+            config = self.build_run_config()
             import engine_solver; importlib.reload(engine_solver)
             import material_catalogue
             
@@ -969,12 +1226,12 @@ POKAZUJ_KROKI_POSREDNIE = {self.chk_PokazKroki.isChecked()}
             pdb = material_catalogue.pobierz_ceownik(prof)
             if not pdb: self.console.append("Nieznany profil"); return
             
-            load = config_solver.LOAD_PARAMS.copy(); load.update(mdb[mat])
+            load = config.LOAD_PARAMS.copy(); load.update(mdb[mat])
             geo = {"bp": bp, "tp": tp}
             
-            res = engine_solver.analizuj_przekroj_pelna_dokladnosc(pdb, geo, load, config_solver.SAFETY_PARAMS)
+            res = engine_solver.analizuj_przekroj_pelna_dokladnosc(pdb, geo, load, config.SAFETY_PARAMS)
             masa = engine_solver.oblicz_mase_metra(pdb, geo, load)
-            dane = engine_solver.splaszcz_wyniki_do_wiersza(pdb, geo, load, config_solver.SAFETY_PARAMS, res)
+            dane = engine_solver.splaszcz_wyniki_do_wiersza(pdb, geo, load, config.SAFETY_PARAMS, res)
             
             dane.update({"Stop": mat, "Nazwa_Profilu": prof, "Input_Geo_b_otw": otw, 
                          "Input_Geo_tp": tp, "Input_Geo_bp": bp, "Res_Masa_kg_m": masa, 
@@ -982,7 +1239,7 @@ POKAZUJ_KROKI_POSREDNIE = {self.chk_PokazKroki.isChecked()}
             
             dane["Res_Force_Fy_Ed"] = load['Fx']*load['w_Ty']
             dane["Res_Force_Fz_Ed"] = load['Fx']*load['w_Tz']
-            dane["Calc_Nb_Rd"] = (dane.get("Res_Stab_Chi_N",0)*dane.get("Res_Geo_Acal",0)*load['Re'])/config_solver.SAFETY_PARAMS['gamma_M1']
+            dane["Calc_Nb_Rd"] = (dane.get("Res_Stab_Chi_N",0)*dane.get("Res_Geo_Acal",0)*load['Re'])/config.SAFETY_PARAMS['gamma_M1']
             dane["Status_Wymogow"] = "SPEŁNIA" if res['Wskazniki']['UR']<=1.0 and res['Wskazniki']['Klasa_Przekroju']<=3 else "NIE SPEŁNIA"
             
             keys = opty.sortuj_klucze_wg_priorytetu(list(dane.keys()))
@@ -999,7 +1256,7 @@ POKAZUJ_KROKI_POSREDNIE = {self.chk_PokazKroki.isChecked()}
             
             ts = datetime.now().strftime("%Y%m%d_%H%M%S")
             path = router.get_path("TEMP", f"Manual_{prof}_{mat}_{ts}")
-            opty.zapisz_wszystkie_formaty([dane], os.path.splitext(path)[0])
+            opty.zapisz_wszystkie_formaty([dane], os.path.splitext(path)[0], config=config)
             self.console.append(f"<br>Zapisano: {path}.csv")
             
         except Exception as e:
@@ -1039,20 +1296,35 @@ class Tab2_Knowledge(QWidget):
 class Tab3_Selector(QWidget):
     request_transfer = pyqtSignal(list)
     request_transfer_shell = pyqtSignal(list)
+    
+    # Domyślny widok przy pliku kolumnowym (pozostałe kolumny: przycisk "Kolumny", panel detali)
+    KOLUMNY_TABELI = [
+        "Status_Wymogow", "Stop", "Nazwa_Profilu", "Raport_Etap",
+        "Input_Geo_tp", "Input_Geo_bp", "Input_Geo_b_otw",
+        "Res_Masa_kg_m", "Res_UR", "Res_Max_VonMises", "Res_Klasa_Przekroju",
+        "Res_Disp_U_y_max", "Res_Disp_U_z_max", "Res_Disp_Phi_deg",
+        "Input_Load_Fx", "Calc_Fy", "Calc_Fz"
+    ]
+    
     def __init__(self):
         super().__init__()
+        self.store = None # Plik .parquet / .npz bieżących wyników (None = sam CSV)
+        self.kolumny_widoku = None # Wybór użytkownika (None = KOLUMNY_TABELI)
+        self.filter_worker = None
         self.init_ui()
 
     def init_ui(self):
         l = QVBoxLayout(self)
         tb = QHBoxLayout()
         b_load = QPushButton("📂 Wczytaj CSV"); b_load.clicked.connect(lambda: self.load_csv())
+        self.b_cols = QPushButton("☰ Kolumny"); self.b_cols.setEnabled(False); self.b_cols.clicked.connect(self.choose_columns)
+        self.b_cols.setToolTip("Dostępne dla wyników z plikiem kolumnowym (.parquet / .npz)")
         self.chk_sci = QCheckBox("E-notacja"); self.chk_sci.toggled.connect(self.tog_sci)
         b_col = QPushButton("🎨 Kolor"); b_col.clicked.connect(self.col)
         self.b_send_solid = QPushButton("PRZEKAŻ DO SOLID ➡️"); self.b_send_solid.setEnabled(False); self.b_send_solid.clicked.connect(self.send_solid); self.b_send_solid.setStyleSheet("background-color:#2da342;font-weight:bold;")
         self.b_send_shell = QPushButton("PRZEKAŻ DO SHELL ➡️"); self.b_send_shell.setEnabled(False); self.b_send_shell.clicked.connect(self.send_shell); self.b_send_shell.setStyleSheet("background-color:#3498db;font-weight:bold;")
 
-        tb.addWidget(b_load); tb.addWidget(self.chk_sci); tb.addWidget(b_col); tb.addStretch(); tb.addWidget(self.b_send_solid); tb.addWidget(self.b_send_shell); l.addLayout(tb)
+        tb.addWidget(b_load); tb.addWidget(self.b_cols); tb.addWidget(self.chk_sci); tb.addWidget(b_col); tb.addStretch(); tb.addWidget(self.b_send_solid); tb.addWidget(self.b_send_shell); l.addLayout(tb)
         
         spl = QSplitter(); l.addWidget(spl)
         
@@ -1078,10 +1350,21 @@ class Tab3_Selector(QWidget):
 
 
     def load_csv(self, path=None):
-        if not path: path, _ = QFileDialog.getOpenFileName(self, "CSV", "", "*.csv")
+        if not path: path, _ = QFileDialog.getOpenFileName(self, "Wyniki", "", "Wyniki (*.csv *.parquet *.npz)")
         if path:
             try:
-                df = pd.read_csv(path)
+                # [NOWOŚĆ] Plik kolumnowy obok CSV -> wczytujemy tylko kolumny widoku
+                import columnar_export
+                self.store = columnar_export.znajdz_plik_kolumnowy(path)
+                self.b_cols.setEnabled(self.store is not None)
+                if self.store:
+                    self.avail_all = columnar_export.lista_kolumn(self.store)
+                    wybrane = self.kolumny_widoku or self.KOLUMNY_TABELI
+                    df = columnar_export.wczytaj_kolumny(self.store, [c for c in wybrane if c in self.avail_all])
+                else:
+                    df = pd.read_csv(path)
+                    self.avail_all = list(df.columns)
+                self.last_path = path
                 cols = list(df.columns); m = ['Input_Load_Fx', 'Calc_Fy', 'Calc_Fz']
                 for c in m: 
                     if c in cols: cols.remove(c); cols.append(c)
@@ -1092,9 +1375,29 @@ class Tab3_Selector(QWidget):
                 self.b_send_shell.setEnabled(True)
             except Exception as e: QMessageBox.critical(self, "Err", str(e))
 
+    def choose_columns(self):
+        if not self.store: return
+        dlg = ColumnSelectDialog(self.avail_all, self.kolumny_widoku or self.KOLUMNY_TABELI, self)
+        if dlg.exec() == QDialog.DialogCode.Accepted:
+            self.kolumny_widoku = dlg.get_columns() or None
+            self.load_csv(self.last_path)
+
+    def full_rows(self, df_sel):
+        """Pełne wiersze (wszystkie kolumny) - przy pliku kolumnowym doczytywane po indeksie."""
+        if not self.store:
+            return df_sel.to_dict('records')
+        import columnar_export
+        rows = columnar_export.wczytaj_wiersze(self.store, list(df_sel.index))
+        for row, (_, vis) in zip(rows, df_sel.iterrows()):
+            for k in ("PRZEKAZ", "WYKLUCZ"):
+                if k in vis: row[k] = vis[k]
+        return rows
+
     def click(self, c, p):
         self.model.set_highlight(c.row(), c.column())
-        r = self.model._df.iloc[c.row()]
+        r = self.model.row_series(c.row())
+        if self.store:
+            r = pd.Series(self.full_rows(r.to_frame().T)[0])
         
         # Mapa opisów (dla czytelności w panelu bocznym)
         LMAP = {
@@ -1137,14 +1440,14 @@ class Tab3_Selector(QWidget):
 
     def send_solid(self):
         if not hasattr(self, 'model'): return
-        sel = self.model._df[self.model._df["PRZEKAZ"]==True].to_dict('records')
+        sel = self.full_rows(self.model.checked_frame("PRZEKAZ"))
         if not sel: QMessageBox.warning(self,"Info","Zaznacz profile (PRZEKAZ)."); return
         self.request_transfer.emit(sel)
         QMessageBox.information(self, "OK", f"Przekazano {len(sel)} profili do analizy SOLID.")
 
     def send_shell(self):
         if not hasattr(self, 'model'): return
-        sel = self.model._df[self.model._df["PRZEKAZ"]==True].to_dict('records')
+        sel = self.full_rows(self.model.checked_frame("PRZEKAZ"))
         if not sel: QMessageBox.warning(self,"Info","Zaznacz profile (PRZEKAZ)."); return
         # Nowy sygnał dla Shell
         if hasattr(self, 'request_transfer_shell'):
@@ -1168,7 +1471,18 @@ class Tab3_Selector(QWidget):
             if isinstance(w, FilterWidget):
                 try: fs.append((w.combo_col.currentText(), float(w.inp_min.text()) if w.inp_min.text() else None, float(w.inp_max.text()) if w.inp_max.text() else None))
                 except: pass
-        self.model.apply_advanced_filter(fs, self.chk_ex.isChecked())
+        # [NOWOŚĆ] Filtr w wątku roboczym - poprzednie liczenie jest anulowane
+        if self.filter_worker is not None and self.filter_worker.isRunning():
+            self.filter_worker.cancel()
+        worker = FilterWorker(self.model, fs, self.chk_ex.isChecked())
+        worker.result_ready.connect(lambda f, m, ex, w=worker: self.on_filter_ready(w, f, m, ex))
+        self.filter_worker = worker
+        worker.start()
+
+    def on_filter_ready(self, worker, filters_list, mask, show_excluded):
+        # Wynik spóźnionego (anulowanego) wątku lub dla starego modelu - pomijamy
+        if worker is not self.filter_worker or worker.model is not self.model: return
+        self.model.set_filter_result(filters_list, mask, show_excluded)
 
 class Tab4_Fem(QWidget):
     batch_finished = pyqtSignal() # Nowy sygnał
@@ -1250,6 +1564,13 @@ class Tab4_Fem(QWidget):
         self.sp_tol.setFixedWidth(field_width)
         self.sp_iter = QSpinBox(); self.sp_iter.setValue(3); self.sp_iter.setRange(1, 10)
         self.sp_iter.setFixedWidth(field_width)
+        # [NOWOŚĆ] Sterowanie zbieżnością: Richardson przewiduje kolejną siatkę
+        self.combo_conv = QComboBox(); self.combo_conv.addItems(["Richardson (predykcja)", "Klasyczna (stały wsp.)"])
+        self.combo_conv.setToolTip("Richardson: ekstrapolacja (h, VM), skok do siatki spełniającej tolerancję i wcześniejsze zatrzymanie.")
+        self.combo_conv.setFixedWidth(field_width)
+        self.chk_warm = QCheckBox("Warm-start siatki")
+        self.chk_warm.setChecked(True)
+        self.chk_warm.setToolTip("Start od rozmiaru siatki, przy którym zbiegały się podobne profile (tabela w projekcie).")
         self.sp_step = QDoubleSpinBox(); self.sp_step.setValue(50.0); self.sp_step.setRange(10.0, 500.0); self.sp_step.setSuffix(" mm")
         self.sp_step.setFixedWidth(field_width)
         
@@ -1258,6 +1579,10 @@ class Tab4_Fem(QWidget):
         f_par.addRow("Wsp. zagęszczania:", self.sp_fact)
         f_par.addRow("Tolerancja:", self.sp_tol)
         f_par.addRow("Max iteracji:", self.sp_iter)
+        f_par.addRow("Zbieżność:", self.combo_conv)
+        f_par.addRow("", self.chk_warm)
+        self.combo_profile = make_profile_combo(field_width)
+        f_par.addRow("Profilowanie:", self.combo_profile)
         f_par.addRow("Krok sondy (X):", self.sp_step)
         
         l_inp.addWidget(g_par)
@@ -1347,11 +1672,39 @@ class Tab4_Fem(QWidget):
         self.sp_eq_limit.setSingleStep(100000)
         self.sp_eq_limit.setToolTip("Limit równań, po którym nastąpi automatyczne przełączenie na solver iteracyjny.")
         self.sp_eq_limit.setFixedWidth(field_width)
+        # [NOWOŚĆ] Osobne procesy Gmsh (0 = siatkowanie w wątku GUI, jak dotychczas)
+        self.sp_mesh_workers = QSpinBox(); self.sp_mesh_workers.setRange(0, 32); self.sp_mesh_workers.setValue(0)
+        self.sp_mesh_workers.setToolTip("Liczba izolowanych procesów Gmsh (każdy z własną instancją).\n0 = siatkowanie w procesie aplikacji.")
+        self.sp_mesh_workers.setFixedWidth(field_width)
+        # [NOWOŚĆ] Nadzór solvera: zawieszony / rozbieżny CCX nie blokuje batcha
+        self.sp_solver_timeout = QSpinBox(); self.sp_solver_timeout.setRange(0, 10000); self.sp_solver_timeout.setValue(0)
+        self.sp_solver_timeout.setSuffix(" min"); self.sp_solver_timeout.setSpecialValueText("Brak")
+        self.sp_solver_timeout.setToolTip("Limit czasu pojedynczego przebiegu CCX. Po przekroczeniu kandydat trafia do listy nieudanych.")
+        self.sp_solver_timeout.setFixedWidth(field_width)
+        self.sp_solver_ram = QDoubleSpinBox(); self.sp_solver_ram.setRange(0.0, 4096.0); self.sp_solver_ram.setValue(0.0)
+        self.sp_solver_ram.setSuffix(" GB"); self.sp_solver_ram.setSpecialValueText("Brak"); self.sp_solver_ram.setSingleStep(1.0)
+        self.sp_solver_ram.setToolTip("Limit pamięci (RSS) procesu CCX - przerwanie zanim solver bezpośredni zacznie swapować.")
+        self.sp_solver_ram.setFixedWidth(field_width)
+        # [NOWOŚĆ] Retencja 02_MES_Roboczy: pełne tylko ostatnie iteracje, kompresja w tle
+        self.sp_keep_iter = QSpinBox(); self.sp_keep_iter.setRange(0, 20); self.sp_keep_iter.setValue(2)
+        self.sp_keep_iter.setSpecialValueText("Wszystkie")
+        self.sp_keep_iter.setToolTip("Liczba pełnych folderów iteracji na kandydata (iteracja finalna zawsze pełna).\n"
+                                     "Starsze: tylko results.json (skalary + sondy) i analytical.json.")
+        self.sp_keep_iter.setFixedWidth(field_width)
+        self.combo_compress = QComboBox(); self.combo_compress.addItems(["Brak", "Auto (zstd/gzip)", "gzip"])
+        self.combo_compress.setCurrentIndex(1)
+        self.combo_compress.setToolTip("Kompresja w tle dużych plików (.dat, .frd, .inp, ...) w zachowanych iteracjach.")
+        self.combo_compress.setFixedWidth(field_width)
 
         f_sys.addRow("Rząd:", self.combo_ord)
         f_sys.addRow("Rdzenie (M/S):", self.sp_cores_mesh)
         f_sys.addRow("Rdzenie (Solver):", self.sp_cores_ccx)
         f_sys.addRow("Limit równań:", self.sp_eq_limit)
+        f_sys.addRow("Procesy Gmsh:", self.sp_mesh_workers)
+        f_sys.addRow("Limit czasu CCX:", self.sp_solver_timeout)
+        f_sys.addRow("Limit RAM CCX:", self.sp_solver_ram)
+        f_sys.addRow("Pełne iteracje:", self.sp_keep_iter)
+        f_sys.addRow("Kompresja roboczych:", self.combo_compress)
 
         g_prob = QGroupBox("6. Punkty Pomiarowe (Sondy)")
         l_prob = QVBoxLayout(g_prob)
@@ -1648,14 +2001,25 @@ class Tab4_Fem(QWidget):
             "refinement_factor": self.sp_fact.value(),
             "tolerance": self.sp_tol.value()/100.0,
             "max_iterations": self.sp_iter.value(),
+            "convergence_mode": "richardson" if self.combo_conv.currentIndex() == 0 else "classic",
+            "warm_start": self.chk_warm.isChecked(),
             "mesh_order": 2 if self.combo_ord.currentIndex() == 1 else 1,
             "refinement_zones": zones, # zdefiniowane wcześniej w metodzie
             "custom_probes": probes,   # zdefiniowane wcześniej w metodzie
             "cores_mesh": self.sp_cores_mesh.value(),
             "cores_solver": self.sp_cores_ccx.value(),
             "eq_limit": self.sp_eq_limit.value(),
+            "mesh_workers": self.sp_mesh_workers.value(),
+            "solver_timeout_min": self.sp_solver_timeout.value(),
+            "solver_max_ram_gb": self.sp_solver_ram.value(),
+            "retention": {
+                "keep_last": self.sp_keep_iter.value(),
+                "slim": True,
+                "compress": ("", "auto", "gzip")[self.combo_compress.currentIndex()],
+            },
             "fem_loads": fem_loads,    # zdefiniowane wcześniej w metodzie
-            "step": self.sp_step.value()
+            "step": self.sp_step.value(),
+            "profile": self.combo_profile.currentData()
         }
 
     def validate_and_get_candidates(self):
@@ -1922,13 +2286,19 @@ class Tab4_Fem(QWidget):
         mesh_path = self.last_pilot_data.get('mesh_path')
         if not mesh_path or not os.path.exists(mesh_path): return
         
-        self.plotter.clear(); self.tree_vis.clear(); self.actors = {}
+        self.plotter.clear(); self.tree_vis.clear(); self.actors = {}; self.lazy_actors = {}
         try:
-            mesh = pv.read(mesh_path)
+            # [NOWOŚĆ] Powierzchnia zewnętrzna po decymacji (viz_lod); pełna siatka na żądanie
+            import viz_lod
+            lod = viz_lod.przygotuj_lod(mesh_path)
             # Zapisujemy długość belki z siatki jako fallback
-            self.beam_length_from_mesh = mesh.bounds[1]
-            act = self.plotter.add_mesh(mesh, show_edges=True, color="lightblue", edge_color="black", opacity=0.3)
-            self.add_tree_item("Siatka FEM", "mesh_main", act, True)
+            self.beam_length_from_mesh = lod["full"].bounds[1]
+            act = self.plotter.add_mesh(lod["lod"], show_edges=True, color="lightblue", edge_color="black", opacity=0.3)
+            self.add_tree_item(f"Siatka FEM (LOD {lod['n_lod']}/{lod['n_full']})", "mesh_main", act, True)
+            item_full = QTreeWidgetItem(self.tree_vis, ["Siatka FEM (pełna)"])
+            item_full.setCheckState(0, Qt.CheckState.Unchecked)
+            self.lazy_actors[id(item_full)] = lambda: self.plotter.add_mesh(
+                lod["full"], show_edges=True, color="lightblue", edge_color="black", opacity=0.3)
         except Exception as e: self.con.append(f"Błąd siatki: {e}")
 
         work_dir = os.path.dirname(mesh_path)
@@ -2021,31 +2391,30 @@ class Tab4_Fem(QWidget):
             except Exception as e: self.con.append(f"Błąd wizualizacji Yc/Ys: {e}")
 
         if os.path.exists(groups_path):
-            try:
-                with open(groups_path, 'r') as f: groups = json.load(f)
-                nodes_csv = groups_path.replace("_groups.json", "_nodes.csv")
-                if os.path.exists(nodes_csv):
-                    import pandas as pd
-                    df_nodes = pd.read_csv(nodes_csv)
-                    node_map = {row['NodeID']: [row['X'], row['Y'], row['Z']] for _, row in df_nodes.iterrows()}
-                    parent_gr = QTreeWidgetItem(self.tree_vis, ["Grupy Węzłów"])
-                    parent_gr.setCheckState(0, Qt.CheckState.Checked)
-                    self.tree_vis.expandItem(parent_gr)
-                    colors = {"SURF_SUPPORT": "orange", "SURF_LOAD": "magenta", "GRP_INTERFACE": "yellow"}
-                    for g_name, node_ids in groups.items():
-                        pts = []
-                        for nid in node_ids:
-                            if nid in node_map: pts.append(node_map[nid])
-                        if pts:
-                            pc = pv.PolyData(pts)
-                            act = self.plotter.add_mesh(pc, color=colors.get(g_name, "white"), point_size=6, render_points_as_spheres=True)
-                            item = QTreeWidgetItem(parent_gr, [g_name])
-                            item.setCheckState(0, Qt.CheckState.Checked)
-                            self.actors[id(item)] = act
-            except: pass
+            # [NOWOŚĆ] Grupy węzłów liczone w wątku (node_store + searchsorted), aktory po powrocie
+            if getattr(self, 'groups_worker', None) is not None and self.groups_worker.isRunning():
+                self.groups_worker.finished_signal.disconnect(); self.groups_worker.wait()
+            self.groups_worker = MeshGroupsWorker(groups_path)
+            self.groups_worker.finished_signal.connect(self.show_mesh_groups)
+            self.groups_worker.start()
             
         self.plotter.add_axes(); self.plotter.show_grid(); self.plotter.reset_camera()
 
+    def show_mesh_groups(self, group_points, error):
+        """Chmury punktów grup węzłów (wynik MeshGroupsWorker)."""
+        if error: self.con.append(f"Błąd grup węzłów: {error}")
+        if not group_points: return
+        parent_gr = QTreeWidgetItem(self.tree_vis, ["Grupy Węzłów"])
+        parent_gr.setCheckState(0, Qt.CheckState.Checked)
+        self.tree_vis.expandItem(parent_gr)
+        colors = {"SURF_SUPPORT": "orange", "SURF_LOAD": "magenta", "GRP_INTERFACE": "yellow"}
+        for g_name, pts in group_points.items():
+            act = self.plotter.add_mesh(pv.PolyData(pts), color=colors.get(g_name, "white"), point_size=6, render_points_as_spheres=True)
+            item = QTreeWidgetItem(parent_gr, [g_name])
+            item.setCheckState(0, Qt.CheckState.Checked)
+            self.actors[id(item)] = act
+        self.plotter.render()
+
     def add_tree_item(self, name, key, actor, checked=True):
         item = QTreeWidgetItem(self.tree_vis, [name])
         state = Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked
@@ -2053,6 +2422,9 @@ class Tab4_Fem(QWidget):
         self.actors[id(item)] = actor # Klucz 'key' nie był używany, id(item) jest lepsze
         
     def on_tree_item_changed(self, item, col):
+        # Aktor tworzony dopiero przy pierwszym zaznaczeniu (pełna rozdzielczość)
+        if id(item) in getattr(self, 'lazy_actors', {}) and item.checkState(0) == Qt.CheckState.Checked:
+            self.actors[id(item)] = self.lazy_actors.pop(id(item))()
         if id(item) in self.actors:
             actor = self.actors[id(item)]
             visible = (item.checkState(0) == Qt.CheckState.Checked)
@@ -2077,6 +2449,29 @@ class MplCanvas(FigureCanvasQTAgg):
             spine.set_edgecolor('white')
         super().__init__(self.fig)
 
+class MeshGroupsWorker(QThread):
+    """Współrzędne grup węzłów (<nazwa>_groups.json + _nodes.npy/.csv) poza wątkiem GUI."""
+    finished_signal = pyqtSignal(object, str) # ({grupa: ndarray (N,3)}, błąd)
+
+    def __init__(self, groups_path):
+        super().__init__()
+        self.groups_path = groups_path
+
+    def run(self):
+        try:
+            import node_store
+            with open(self.groups_path, 'r') as f: groups = json.load(f)
+            store = node_store.NodeStore.wczytaj(self.groups_path.replace("_groups.json", "_nodes.csv"))
+            if store is None:
+                self.finished_signal.emit({}, ""); return
+            out = {}
+            for g_name, node_ids in groups.items():
+                pts = store.punkty(node_ids)
+                if len(pts): out[g_name] = pts
+            self.finished_signal.emit(out, "")
+        except Exception as e:
+            self.finished_signal.emit({}, str(e))
+
 class GeometryPreviewWorker(QThread):
     finished_signal = pyqtSignal(str) # Zwraca ścieżkę do pliku .msh
     log_signal = pyqtSignal(str)
@@ -2111,24 +2506,32 @@ class ShellWorker(QThread):
 
     def request_stop(self):
         self.stop_requested = True
+        self.optimizer.request_stop()
 
     def run(self):
         self.log_signal.emit(">>> START PROCEDURY SHELL BATCH...")
         total = len(self.candidates)
-        for i, cand in enumerate(self.candidates):
-            if self.stop_requested:
-                self.log_signal.emit("...Przerwano na żądanie.")
-                break
-            
-            self.progress_signal.emit(i)
-            
-            try:
-                # run_batch z optimizer_shell oczekuje listy, więc opakowujemy pojedynczego kandydata
-                self.optimizer.run_batch([cand], self.loads, self.mesh)
-            except Exception as e:
-                self.log_signal.emit(f"BŁĄD podczas przetwarzania {cand.get('Name', 'N/A')}: {e}")
-                self.log_signal.emit(traceback.format_exc())
+        done = [0]
+
+        def on_result(idx, name):
+            done[0] += 1
+            self.progress_signal.emit(done[0])
 
+        # Logi optymalizatora trafiają do konsoli zakładki na czas pracy wątku
+        prev_logger = self.optimizer.logger
+        self.optimizer.logger = self.log_signal.emit
+        try:
+            # [NOWOŚĆ] Jedno wywołanie na cały batch: kalibracja raz, produkcja w potoku
+            self.progress_signal.emit(0)
+            self.optimizer.run_batch(self.candidates, self.loads, self.mesh, on_result=on_result)
+        except Exception as e:
+            self.log_signal.emit(f"BŁĄD podczas przetwarzania batcha: {e}")
+            self.log_signal.emit(traceback.format_exc())
+        finally:
+            self.optimizer.logger = prev_logger
+
+        if self.stop_requested:
+            self.log_signal.emit("...Przerwano na żądanie.")
         self.progress_signal.emit(total)
         self.log_signal.emit(">>> ZAKOŃCZONO BATCH SHELL.")
         self.finished_signal.emit(True)
@@ -2182,11 +2585,25 @@ class Tab6_Shell_Settings(QWidget):
         self.sp_conv_tol = QDoubleSpinBox(); self.sp_conv_tol.setRange(0.1, 10.0); self.sp_conv_tol.setValue(2.0); self.sp_conv_tol.setSuffix(" %")
         self.sp_ref_factor = QDoubleSpinBox(); self.sp_ref_factor.setRange(0.1, 0.95); self.sp_ref_factor.setValue(0.7); self.sp_ref_factor.setSingleStep(0.05)
         self.combo_order = QComboBox(); self.combo_order.addItems(["1 (Liniowe)", "2 (Kwadratowe)"]); self.combo_order.setCurrentIndex(1)
+        self.combo_conv = QComboBox(); self.combo_conv.addItems(["Richardson (predykcja)", "Klasyczna (stały wsp.)"])
+        self.chk_warm = QCheckBox("Warm-start siatki (tabela projektu)"); self.chk_warm.setChecked(True)
+        self.sp_solver_timeout = QSpinBox(); self.sp_solver_timeout.setRange(0, 10000); self.sp_solver_timeout.setSuffix(" min"); self.sp_solver_timeout.setSpecialValueText("Brak")
+        # [NOWOŚĆ] Przebiegi równoległe (osobne katalogi, Gmsh w puli procesów, rdzenie dzielone między CCX)
+        self.sp_parallel = QSpinBox(); self.sp_parallel.setRange(0, 64); self.sp_parallel.setSpecialValueText("Auto")
+        # [NOWOŚĆ] Kalibracja osobno dla każdej rodziny / klasy grubości (zamiast tylko pierwszego kandydata)
+        self.chk_per_family = QCheckBox("Kalibracja per rodzina i grubość"); self.chk_per_family.setChecked(True)
+        self.chk_per_family.setToolTip("Każda klasa (rodzina profilu + zakres grubości ścianki) kalibrowana osobno i równolegle;\n"
+                                       "wynik zapamiętany w projekcie i użyty ponownie przy kolejnych batchach (z warm-startem).")
         f_mesh.addRow("Startowy rozmiar siatki [mm]:", self.sp_mesh_size)
         f_mesh.addRow("Max iteracji:", self.sp_iter)
         f_mesh.addRow("Warunek zbieżności:", self.sp_conv_tol)
         f_mesh.addRow("Wsp. zagęszczenia:", self.sp_ref_factor)
+        f_mesh.addRow("Zbieżność:", self.combo_conv)
+        f_mesh.addRow("", self.chk_warm)
+        f_mesh.addRow("", self.chk_per_family)
         f_mesh.addRow("Rząd elementów:", self.combo_order)
+        f_mesh.addRow("Limit czasu CCX:", self.sp_solver_timeout)
+        f_mesh.addRow("Przebiegi równoległe:", self.sp_parallel)
         l_layout.addWidget(g_mesh)
 
         # 3. Sterowanie
@@ -2256,22 +2673,7 @@ class Tab6_Shell_Settings(QWidget):
                 self.inp_y_ref.setText(f"{cand.get('Res_Geo_Yc', 0.0):.4f}")
 
     def _translate_candidate(self, c):
-        e_mod = c.get("Input_Load_E")
-        g_mod = c.get("Input_Load_G")
-        nu = 0.3
-        if e_mod and g_mod and g_mod > 0:
-            nu = (e_mod / (2.0 * g_mod)) - 1.0
-        
-        translated = {
-            "Name": f"{c.get('Nazwa_Profilu', 'Unk')}_tp{int(c.get('Input_Geo_tp', 0))}",
-            "Geom_h_c": c.get("Input_UPE_hc"), "Geom_b_c": c.get("Input_UPE_bc"),
-            "Geom_t_w": c.get("Input_UPE_twc"), "Geom_t_f": c.get("Input_UPE_tfc"),
-            "Geom_r_c": c.get("Input_UPE_rc", 0.0), "Geom_t_p": c.get("Input_Geo_tp"),
-            "Geom_b_p": c.get("Input_Geo_bp"), "Input_Length": c.get("Input_Load_L"),
-            "Mat_Name": c.get("Stop"), "Mat_E": e_mod, "Mat_nu": nu,
-        }
-        translated.update(c) # Przekaż resztę danych dla pliku analitycznego
-        return translated
+        return translate_candidate(c)
 
     def run_analysis(self):
         if not self.candidates:
@@ -2289,7 +2691,12 @@ class Tab6_Shell_Settings(QWidget):
             "max_iter": self.sp_iter.value(),
             "conv_tol": self.sp_conv_tol.value() / 100.0, # % na ułamek
             "mesh_factor": self.sp_ref_factor.value(),
-            "order": self.combo_order.currentIndex() + 1
+            "convergence_mode": "richardson" if self.combo_conv.currentIndex() == 0 else "classic",
+            "warm_start": self.chk_warm.isChecked(),
+            "order": self.combo_order.currentIndex() + 1,
+            "solver_timeout_min": self.sp_solver_timeout.value(),
+            "parallel_runs": self.sp_parallel.value(),
+            "per_family": self.chk_per_family.isChecked()
         }
         
         translated_candidates = [self._translate_candidate(c) for c in self.candidates]
@@ -2349,6 +2756,10 @@ class Tab7_Shell_Results(QWidget):
         super().__init__(parent)
         self.router = router
         self.aggregator = aggregator_shell
+        # [NOWOŚĆ] JSON, serie wykresów i siatka ładowane w tle (+ sąsiednie pozycje listy)
+        self.loader = DetailLoader(self.load_payload)
+        self.loader.ready.connect(self.show_payload)
+        self.loader.failed.connect(lambda k, e: print(f"[TAB7] Błąd ładowania {k}: {e}"))
         self.init_ui()
 
     def init_ui(self):
@@ -2382,6 +2793,7 @@ class Tab7_Shell_Results(QWidget):
 
     def refresh_list(self):
         self.results_list.clear()
+        self.loader.invalidate()
         comparisons = self.aggregator.get_available_comparisons()
         for comp in comparisons:
             item = QListWidgetItem(comp['label'])
@@ -2390,16 +2802,34 @@ class Tab7_Shell_Results(QWidget):
 
     def on_result_selected(self, item):
         comp_id = item.data(Qt.ItemDataRole.UserRole)
-        data_package = self.aggregator.load_data(comp_id)
-        if not data_package: return
-        self.update_charts(data_package)
-        self.update_3d_view(comp_id)
+        row = self.results_list.row(item)
+        neighbours = [self.results_list.item(r).data(Qt.ItemDataRole.UserRole)
+                      for r in (row + 1, row - 1) if 0 <= r < self.results_list.count()]
+        self.loader.request(comp_id, neighbours)
 
-    def update_charts(self, data_package):
+    def load_payload(self, comp_id):
+        """Wątek puli: dane, serie wykresów i siatka (bez rysowania)."""
+        data_package = self.aggregator.load_data(comp_id)
+        if not data_package: return None
+        payload = {"data": data_package, "plots": self.aggregator.prepare_plots_data(data_package), "mesh": None, "mesh_error": ""}
+        if HAS_PYVISTA:
+            fem_dir = self.router.get_path("FINAL", "", subdir=comp_id)
+            msh_files = [f for f in os.listdir(fem_dir) if f.endswith(".msh")]
+            if msh_files:
+                try: payload["mesh"] = pv.read(os.path.join(fem_dir, msh_files[0]))
+                except Exception as e: payload["mesh_error"] = str(e)
+        return payload
+
+    def show_payload(self, comp_id, payload):
+        if not payload: return
+        self.update_charts(payload["data"], payload["plots"])
+        self.update_3d_view(comp_id, payload)
+
+    def update_charts(self, data_package, plots_data=None):
         for i in reversed(range(self.plot_layout.count())): 
             self.plot_layout.itemAt(i).widget().setParent(None)
             
-        plots_data = self.aggregator.prepare_plots_data(data_package)
+        if plots_data is None: plots_data = self.aggregator.prepare_plots_data(data_package)
         
         for key, p_info in plots_data.items():
             canvas = MplCanvas(self)
@@ -2421,19 +2851,15 @@ class Tab7_Shell_Results(QWidget):
             if "Ugięcie" in p_info["title"]: ax.invert_yaxis()
             self.plot_layout.addWidget(canvas)
 
-    def update_3d_view(self, comp_id):
+    def update_3d_view(self, comp_id, payload=None):
         if not HAS_PYVISTA: return
+        if payload is None: payload = self.load_payload(comp_id) or {}
         self.plotter.clear()
         
-        fem_dir = self.router.get_path("FINAL", "", subdir=comp_id)
-        msh_files = [f for f in os.listdir(fem_dir) if f.endswith(".msh")]
-        if msh_files:
-            try:
-                path_msh = os.path.join(fem_dir, msh_files[0])
-                mesh = pv.read(path_msh)
-                self.plotter.add_mesh(mesh, style='surface', show_edges=True, edge_color='black', color='lightblue')
-            except Exception as e:
-                self.plotter.add_text(f"Błąd ładowania siatki:\n{e}", color='red')
+        if payload.get("mesh") is not None:
+            self.plotter.add_mesh(payload["mesh"], style='surface', show_edges=True, edge_color='black', color='lightblue')
+        elif payload.get("mesh_error"):
+            self.plotter.add_text(f"Błąd ładowania siatki:\n{payload['mesh_error']}", color='red')
         else:
             self.plotter.add_text("Nie znaleziono pliku .msh", color='red')
 
@@ -2449,6 +2875,10 @@ class Tab5_Comparison(QWidget):
         self.router = router
         self.aggregator = aggregator
         self.current_data = None
+        # [NOWOŚĆ] Dane, wykresy i powierzchnia LOD ładowane w tle (+ sąsiednie wiersze)
+        self.loader = DetailLoader(self.load_payload)
+        self.loader.ready.connect(self.show_details)
+        self.loader.failed.connect(lambda k, e: self.info_box.setHtml(f"<b style='color:red'>Błąd ładowania {k}: {e}</b>"))
         self.highlight_color = QColor(60, 60, 100)
         self.last_highlighted_row = -1
         self.init_ui()
@@ -2529,7 +2959,14 @@ class Tab5_Comparison(QWidget):
         r_layout = QVBoxLayout(right_panel)
         r_layout.setContentsMargins(0,0,0,0)
         
-        r_layout.addWidget(QLabel("<b>Heatmapa Naprężeń (Von Mises)</b>"))
+        h_3d = QHBoxLayout()
+        h_3d.addWidget(QLabel("<b>Heatmapa Naprężeń (Von Mises)</b>")); h_3d.addStretch()
+        self.chk_full_res = QCheckBox("Pełna rozdzielczość")
+        self.chk_full_res.setToolTip("Domyślnie: powierzchnia po decymacji (płynna interakcja).")
+        self.chk_full_res.toggled.connect(self.draw_lod_surface)
+        h_3d.addWidget(self.chk_full_res)
+        r_layout.addLayout(h_3d)
+        self.lod = None
         
         if HAS_PYVISTA:
             self.plotter = QtInteractor(right_panel)
@@ -2547,6 +2984,7 @@ class Tab5_Comparison(QWidget):
         """Skanuje dysk i wypełnia górną tabelę."""
         self.sim_table.setRowCount(0)
         self.last_highlighted_row = -1
+        self.loader.invalidate()
         if not self.aggregator: return
 
         pairs = self.aggregator.get_available_comparisons()
@@ -2610,12 +3048,35 @@ class Tab5_Comparison(QWidget):
     def on_sim_selected(self, item):
         row = item.row()
         sim_id = self.sim_table.item(row, 0).data(Qt.ItemDataRole.UserRole)
-        self.load_details(sim_id)
-
-    def load_details(self, sim_id):
-        """Ładuje szczegóły wybranej symulacji (wykresy, info, 3d)."""
+        self.load_details(sim_id, row)
+
+    def load_details(self, sim_id, row=None):
+        """Zleca załadowanie szczegółów (w tle); sąsiednie wiersze ładowane z wyprzedzeniem."""
+        neighbours = []
+        if row is not None:
+            for r in (row + 1, row - 1):
+                item = self.sim_table.item(r, 0) if 0 <= r < self.sim_table.rowCount() else None
+                if item and item.data(Qt.ItemDataRole.UserRole): neighbours.append(item.data(Qt.ItemDataRole.UserRole))
+        self.loader.request(sim_id, neighbours)
+
+    def load_payload(self, sim_id):
+        """Wątek puli: JSON, serie wykresów i powierzchnia LOD (bez rysowania)."""
         data = self.aggregator.load_comparison_data(sim_id)
-        if not data: return
+        if not data: return None
+        payload = {"data": data, "plots": self.aggregator.prepare_plots_data(data), "lod": None}
+        if HAS_PYVISTA:
+            msh_path, res_path = self.aggregator.get_mesh_data_path(data)
+            if msh_path and os.path.exists(msh_path):
+                try:
+                    import viz_lod
+                    payload["lod"] = viz_lod.przygotuj_lod(msh_path, data["fem"].get("FULL_NODAL_RESULTS", {}), res_path)
+                except Exception as e: payload["lod_error"] = str(e)
+        return payload
+
+    def show_details(self, sim_id, payload):
+        """Szczegóły wybranej symulacji (info, wykresy, 3d) z gotowych danych."""
+        if not payload: return
+        data = payload["data"]
         
         fem = data["fem"]
         ana = data["ana"]
@@ -2660,10 +3121,10 @@ class Tab5_Comparison(QWidget):
         self.info_box.setHtml(html)
 
         # 2. WYKRESY 2D (Dynamiczne z Aggregatora)
-        self.update_charts(data)
+        self.update_charts(data, payload["plots"])
 
         # 3. HEATMAPA 3D
-        self.update_3d_view(data)
+        self.update_3d_view(data, payload)
 
     def highlight_profile(self, profile_id: str):
         """Znajduje wiersz i go podświetla, resetując poprzedni."""
@@ -2693,12 +3154,12 @@ class Tab5_Comparison(QWidget):
                 self.last_highlighted_row = i
                 break
 
-    def update_charts(self, data):
+    def update_charts(self, data, plots_data=None):
         """Rysuje wykresy przygotowane przez aggregator."""
         self.chart_tabs.clear()
         
         # Aggregator zwraca gotowe słowniki z seriami danych
-        plots_data = self.aggregator.prepare_plots_data(data)
+        if plots_data is None: plots_data = self.aggregator.prepare_plots_data(data)
         
         import matplotlib.pyplot as plt
         
@@ -2746,24 +3207,46 @@ class Tab5_Comparison(QWidget):
             # Dodanie do zakładki
             self.chart_tabs.addTab(canvas, p_info["title"])
 
-    def update_3d_view(self, data):
-        """Rysuje chmurę punktów (Heatmapę) na podstawie FULL_NODAL_RESULTS."""
+    def draw_lod_surface(self, *args):
+        """Powierzchnia z VM: wersja po decymacji lub pełna (checkbox)."""
+        if not HAS_PYVISTA or self.lod is None: return
+        import viz_lod
+        full = self.chk_full_res.isChecked()
+        surf = self.lod["full"] if full else self.lod["lod"]
+        if viz_lod.POLE_VM in surf.point_data:
+            self.plotter.add_mesh(surf, scalars=viz_lod.POLE_VM, cmap="jet", nan_color="gray",
+                                  show_edges=full, show_scalar_bar=True, name="fem_surface")
+        else:
+            self.plotter.add_mesh(surf, color="lightblue", show_edges=full, name="fem_surface")
+        self.plotter.add_text(f"Model: {surf.n_cells} / {self.lod['n_full']} trójkątów powierzchni",
+                              font_size=8, name="lod_info")
+        self.plotter.render()
+
+    def update_3d_view(self, data, payload=None):
+        """Rysuje heatmapę VM (FULL_NODAL_RESULTS) na powierzchni siatki (LOD)."""
         if not HAS_PYVISTA: return
         
         self.plotter.clear()
         
-        # 1. Rysowanie siatki (Wireframe) jako tła
-        msh_path, _ = self.aggregator.get_mesh_data_path(data)
-        if msh_path and os.path.exists(msh_path):
-            try:
-                mesh = pv.read(msh_path)
-                self.plotter.add_mesh(mesh, style='wireframe', color='white', opacity=0.1, label="Mesh")
-            except: pass
-
-        # 2. Rysowanie HEATMAPY (Kluczowy element!)
+        # [NOWOŚĆ] Heatmapa na powierzchni zewnętrznej (LOD) zamiast chmury wszystkich węzłów
+        msh_path, res_path = self.aggregator.get_mesh_data_path(data)
         res_map = data["fem"].get("FULL_NODAL_RESULTS", {})
+        self.lod = None
+        if payload is not None and (payload.get("lod") is not None or payload.get("lod_error")):
+            self.lod = payload.get("lod")
+            if payload.get("lod_error"): self.plotter.add_text(f"Błąd LOD: {payload['lod_error']}", color='red', font_size=8)
+        elif msh_path and os.path.exists(msh_path):
+            try:
+                import viz_lod
+                self.lod = viz_lod.przygotuj_lod(msh_path, res_map, res_path)
+            except Exception as e:
+                self.plotter.add_text(f"Błąd LOD: {e}", color='red', font_size=8)
         
-        if res_map:
+        if self.lod is not None:
+            self.draw_lod_surface()
+            if not res_map:
+                self.plotter.add_text("Brak wyników węzłowych w pliku .json", color='red')
+        elif res_map:
             vals = list(res_map.values()) # [[x,y,z,vm...], ...]
             
             try:
@@ -2782,7 +3265,6 @@ class Tab5_Comparison(QWidget):
                     scalars="Stress VM [MPa]", 
                     cmap="jet", 
                     point_size=4, 
-                    render_points_as_spheres=True,
                     show_scalar_bar=True
                 )
                 self.plotter.add_text(f"Model: {len(points)} węzłów", font_size=8)
@@ -2918,6 +3400,8 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """Przechwytuje zdarzenie zamknięcia okna, aby bezpiecznie zamknąć zasoby."""
         print("Zamykanie aplikacji, czyszczenie zasobów PyVista...")
+        for tab in (getattr(self, 'tab5', None), getattr(self, 'tab7', None)):
+            if tab is not None and hasattr(tab, 'loader'): tab.loader.shutdown()
         # Zamknięcie plotterów PyVista, aby uniknąć błędów vtkWin32OpenGLRenderWin
         if hasattr(self, 'tab4') and hasattr(self.tab4, 'plotter') and self.tab4.plotter:
             self.tab4.plotter.close()
@@ -2960,6 +3444,10 @@ def handle_exception(exc_type, exc_value, exc_traceback):
 sys.excepthook = handle_exception
 
 if __name__ == "__main__":
+    # Wymagane dla procesów roboczych (spawn) w wersji .exe
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
     
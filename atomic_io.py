@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import tempfile
+import datetime
+from contextlib import contextmanager
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError: # Windows
+    import msvcrt
+    HAS_FCNTL = False
+
+# ==============================================================================
+#  ATOMIC IO v1.0
+# ==============================================================================
+# Zapis plików wyników odporny na przerwanie (awaria, kill, brak prądu).
+# Odpowiada za:
+# 1. Zapis przez plik tymczasowy w tym samym folderze + fsync + os.replace -
+#    pod docelową nazwą jest zawsze stara albo kompletna nowa treść.
+# 2. JSON wyników (results.json, analytical.json, failed.json) i eksporty.
+# 3. Blokada plikowa między procesami (GUI + CLI, równoległe zadania CLI)
+#    dla plików współdzielonych w projekcie (read-modify-write).
+# 4. Manifest folderu wyniku (manifest.json: pliki i rozmiary) zapisywany na
+#    końcu - jego obecność i zgodność = wynik kompletny (szybkie wznowienie
+#    batcha bez parsowania dużych plików).
+#
+# os.replace podmienia też plik dowiązany twardo (03_Final) - nowa treść nie
+# zmienia zarchiwizowanej kopii.
+# ==============================================================================
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+def fsync_dir(folder):
+    """Utrwalenie wpisu katalogu po rename (POSIX; na Windows bez efektu)."""
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return
+    try: os.fsync(fd)
+    except OSError: pass
+    finally: os.close(fd)
+
+@contextmanager
+def atomic_open(path, mode='w', encoding=None, newline=None, fsync=True):
+    """
+    open() zapisujący do pliku tymczasowego (.<nazwa>.xxxx.tmp obok celu).
+    Po poprawnym wyjściu z bloku: flush + fsync + os.replace. Wyjątek = cel nietknięty.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=folder)
+    try:
+        if 'b' in mode:
+            f = os.fdopen(fd, mode)
+        else:
+            f = os.fdopen(fd, mode, encoding=encoding, newline=newline)
+        with f:
+            yield f
+            f.flush()
+            if fsync: os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+    if fsync: fsync_dir(folder)
+
+def write_json(path, obj, indent=4, fsync=True, **kwargs):
+    """json.dump przez atomic_open."""
+    with atomic_open(path, 'w', encoding=kwargs.pop("encoding", None), fsync=fsync) as f:
+        json.dump(obj, f, indent=indent, **kwargs)
+
+@contextmanager
+def file_lock(path, timeout_s=30.0):
+    """
+    Wyłączna blokada <path>.lock (fcntl / msvcrt) na czas bloku - między procesami.
+    Po timeout_s: TimeoutError (blokada wisząca po awarii znika z procesem).
+    """
+    f = open(path + ".lock", 'a+')
+    try:
+        t_end = time.monotonic() + timeout_s
+        while True:
+            try:
+                if HAS_FCNTL:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time.monotonic() > t_end:
+                    raise TimeoutError(f"Blokada {path}.lock zajęta dłużej niż {timeout_s:.0f} s")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if HAS_FCNTL:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    finally:
+        f.close()
+
+# ==============================================================================
+# MANIFEST FOLDERU WYNIKU
+# ==============================================================================
+
+def write_manifest(folder, extra=None):
+    """Manifest wszystkich plików folderu (nazwa -> rozmiar). Zapisywany jako ostatni."""
+    files = {}
+    for fn in sorted(os.listdir(folder)):
+        path = os.path.join(folder, fn)
+        if fn == MANIFEST_NAME or fn.startswith(".") or not os.path.isfile(path):
+            continue
+        files[fn] = os.path.getsize(path)
+    manifest = {"version": MANIFEST_VERSION, "complete": True, "files": files,
+                "written": datetime.datetime.now().isoformat(timespec="seconds")}
+    if extra:
+        manifest.update(extra)
+    write_json(os.path.join(folder, MANIFEST_NAME), manifest, indent=2)
+    return manifest
+
+def check_manifest(folder, required=("results.json", "analytical.json")):
+    """
+    Kompletność folderu wyniku: manifest istnieje, wymienia wymagane pliki,
+    a każdy plik z manifestu istnieje i ma zapisany rozmiar.
+    Zwraca (True, "") lub (False, powód). Brak manifestu: (None, powód) -
+    folder sprzed manifestów, o dalszym losie decyduje wywołujący.
+    """
+    path = os.path.join(folder, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None, "brak manifestu"
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except Exception as e:
+        return False, f"uszkodzony manifest ({e})"
+    files = manifest.get("files", {})
+    if not manifest.get("complete"):
+        return False, "manifest niekompletny"
+    for fn in required:
+        if fn not in files:
+            return False, f"brak {fn} w manifeście"
+    for fn, size in files.items():
+        try:
+            if os.path.getsize(os.path.join(folder, fn)) != size:
+                return False, f"{fn}: inny rozmiar niż w manifeście"
+        except OSError:
+            return False, f"brak pliku {fn}"
+    return True, ""
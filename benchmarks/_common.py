@@ -0,0 +1,147 @@
+import os
+import sys
+import json
+import time
+import platform
+import datetime
+import subprocess
+import tracemalloc
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError: # Windows
+    HAS_RESOURCE = False
+
+# ==============================================================================
+#  BENCHMARK: WSPÓLNE NARZĘDZIA
+# ==============================================================================
+# Odpowiada za:
+# 1. Pomiar czasu (mediana z N powtórzeń) i szczytowej pamięci (tracemalloc,
+#    osobny przebieg - śledzenie alokacji spowalnia kod i zafałszowałoby czas;
+#    szczytowe RSS procesu - pomiar w świeżym procesie potomnym).
+# 2. Historię pomiarów (JSON: lista przebiegów z wersją kodu i platformą).
+# 3. Bazę odniesienia (baseline) i porównanie - wykrywanie regresji.
+#
+# Metryki: *_s (czas) i *_mb (pamięć) porównywane z tolerancją względną,
+# metryki zliczające (np. wywołania solvera) - każda zmiana jest zgłaszana.
+# ==============================================================================
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WYNIKI_DIR = os.path.join(ROOT_DIR, "benchmarks", "wyniki")
+
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+def median(vals):
+    vals = sorted(vals)
+    return vals[len(vals) // 2]
+
+def zmierz_czas(fn, repeat=3):
+    """Mediana czasu wywołania fn() [s] oraz wynik ostatniego wywołania."""
+    czasy = []
+    wynik = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        wynik = fn()
+        czasy.append(time.perf_counter() - t0)
+    return median(czasy), wynik
+
+def zmierz_pamiec(fn):
+    """Szczytowa pamięć alokowana przez Pythona w trakcie fn() [MB]."""
+    tracemalloc.start()
+    try:
+        fn()
+        _, szczyt = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return szczyt / (1024 * 1024)
+
+def szczyt_rss_mb():
+    """Szczytowe RSS bieżącego procesu [MB] (None bez modułu resource)."""
+    if not HAS_RESOURCE:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024 # macOS: bajty, Linux: KB
+
+def wersja_kodu():
+    """Skrót commita (lub None poza repozytorium git)."""
+    try:
+        res = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=ROOT_DIR, timeout=10)
+        return res.stdout.strip() or None
+    except Exception:
+        return None
+
+def opis_przebiegu(nazwa, wyniki):
+    return {
+        "benchmark": nazwa,
+        "czas": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "git": wersja_kodu(),
+        "python": platform.python_version(),
+        "platforma": platform.platform(),
+        "wyniki": wyniki,
+    }
+
+# ==============================================================================
+# HISTORIA I BASELINE
+# ==============================================================================
+
+def _sciezka(nazwa, rodzaj):
+    return os.path.join(WYNIKI_DIR, f"{nazwa}_{rodzaj}.json")
+
+def _wczytaj(sciezka, domyslnie):
+    if not os.path.exists(sciezka):
+        return domyslnie
+    with open(sciezka, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _zapisz(sciezka, dane):
+    os.makedirs(os.path.dirname(sciezka), exist_ok=True)
+    tmp = sciezka + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(dane, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, sciezka)
+
+def dopisz_historie(przebieg, sciezka=None):
+    sciezka = sciezka or _sciezka(przebieg["benchmark"], "historia")
+    historia = _wczytaj(sciezka, [])
+    historia.append(przebieg)
+    _zapisz(sciezka, historia)
+    return sciezka
+
+def zapisz_baseline(przebieg, sciezka=None):
+    sciezka = sciezka or _sciezka(przebieg["benchmark"], "baseline")
+    _zapisz(sciezka, przebieg)
+    return sciezka
+
+def wczytaj_baseline(nazwa, sciezka=None):
+    return _wczytaj(sciezka or _sciezka(nazwa, "baseline"), None)
+
+def porownaj(wyniki, baseline, tolerancja=0.15):
+    """
+    Lista regresji [(przypadek, metryka, baseline, teraz, opis)].
+    *_s, *_mb: gorzej o więcej niż 'tolerancja' (względnie); pozostałe liczby: każda zmiana.
+    """
+    regresje = []
+    for przypadek, metryki_bazowe in baseline.get("wyniki", {}).items():
+        teraz = wyniki.get(przypadek)
+        if teraz is None:
+            continue
+        for metryka, wartosc_bazowa in metryki_bazowe.items():
+            wartosc = teraz.get(metryka)
+            if not isinstance(wartosc_bazowa, (int, float)) or not isinstance(wartosc, (int, float)):
+                continue
+            if metryka.endswith("_s") or metryka.endswith("_mb"):
+                if wartosc_bazowa > 0 and wartosc > wartosc_bazowa * (1.0 + tolerancja):
+                    regresje.append((przypadek, metryka, wartosc_bazowa, wartosc, f"+{(wartosc / wartosc_bazowa - 1) * 100:.0f}%"))
+            elif wartosc != wartosc_bazowa:
+                regresje.append((przypadek, metryka, wartosc_bazowa, wartosc, "zmiana"))
+    return regresje
+
+def wypisz_porownanie(regresje, baseline):
+    print(f"\nPorównanie z baseline ({baseline.get('czas')}, git {baseline.get('git')}):")
+    if not regresje:
+        print("  [OK] Brak regresji.")
+        return
+    for przypadek, metryka, stare, nowe, opis in regresje:
+        print(f"  [REGRESJA] {przypadek}.{metryka}: {stare:.6g} -> {nowe:.6g} ({opis})")
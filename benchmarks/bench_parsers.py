@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+import _common
+import synthetic_dat
+
+# ==============================================================================
+#  BENCHMARK: PARSERY WYNIKÓW .DAT (CalculiX)
+# ==============================================================================
+# Mierzy na syntetycznych plikach (synthetic_dat.py), bez uruchamiania CCX:
+# 1. FemEngine.parse_dat_results (bryła: U, S + uśrednianie węzłowe, RF, wyboczenie).
+# 2. FemEngine._get_reactions_robust (reakcje i momenty podpory).
+# 3. FemEngineShell.parse_dat_results (powłoka).
+#
+# Każdy parser mierzony jest w osobnym, świeżym procesie: przepustowość [MB/s]
+# (mediana z N powtórzeń) oraz szczytowe RSS (całość i przyrost ponad stan
+# po przygotowaniu danych wejściowych - mapy węzłów, połączeń elementów).
+# Historia / baseline / --compare jak w bench_solver.py.
+#
+# Użycie:  python benchmarks/bench_parsers.py [--sizes 10000,100000] [--repeat 3] [--compare]
+# ==============================================================================
+
+NAZWA = "bench_parsers"
+PARSERY = ("solid_parse_dat", "solid_reactions", "shell_parse_dat")
+ELEMENTY_NA_WEZEL = 0.6 # Proporcja jak w siatkach C3D10 z Gmsh (liczba elementów / węzłów)
+
+# ==============================================================================
+# PROCES POTOMNY (jeden parser, jeden plik)
+# ==============================================================================
+
+def _polaczenia(n_wezlow, n_elementow, na_element=4):
+    """Deterministyczne połączenia węzeł -> elementy (ścieżka uśredniania naprężeń)."""
+    node_to_elements = {}
+    for e in range(1, n_elementow + 1):
+        for j in range(na_element):
+            nid = (e * 7 + j * 13) % n_wezlow + 1
+            node_to_elements.setdefault(nid, []).append(e)
+    return node_to_elements
+
+def _przygotuj(parser, meta):
+    """Silnik gotowy do parsowania (stan jak po prepare_calculix_deck)."""
+    sciezka = meta["sciezka"]
+    csv_path = os.path.splitext(sciezka)[0] + "_nodes.csv"
+    if parser.startswith("solid"):
+        from engine_fem import FemEngine, NodeMapper
+        eng = FemEngine()
+        eng.mapper = NodeMapper(csv_path)
+        eng.node_to_elements = _polaczenia(meta["wezly"], meta["elementy"])
+        eng.load_nodes = list(range(1, min(meta["wezly"], 200) + 1))
+        eng.interface_nodes = list(range(1, meta["wezly"] + 1, 50))
+        if parser == "solid_reactions":
+            return lambda: eng._get_reactions_robust(sciezka)
+        return lambda: eng.parse_dat_results(sciezka)
+    from engine_fem_shell import FemEngineShell
+    eng = FemEngineShell()
+    eng._load_metadata(os.path.splitext(sciezka)[0])
+    eng.ref_node_structure = meta["wezly"] // 2
+    return lambda: eng.parse_dat_results(sciezka, save_field=False)
+
+def _worker(parser, sciezka_meta, repeat):
+    with open(sciezka_meta, 'r') as f:
+        meta = json.load(f)
+    fn = _przygotuj(parser, meta)
+    rss_start = _common.szczyt_rss_mb()
+    czas, _ = _common.zmierz_czas(fn, repeat)
+    rss = _common.szczyt_rss_mb()
+    print(json.dumps({"czas_s": czas, "rss_mb": rss, "rss_przyrost_mb": None if rss is None else rss - rss_start}))
+
+# ==============================================================================
+# PRZEBIEG GŁÓWNY
+# ==============================================================================
+
+def _uruchom_worker(parser, sciezka_meta, repeat):
+    res = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", parser, sciezka_meta, "--repeat", str(repeat)],
+                         capture_output=True, text=True, cwd=_common.ROOT_DIR)
+    if res.returncode != 0:
+        raise RuntimeError(res.stderr.strip())
+    return json.loads(res.stdout.strip().splitlines()[-1])
+
+def run(rozmiary=(10000, 100000), repeat=3, parsery=PARSERY, katalog=None):
+    wyniki = {}
+    with tempfile.TemporaryDirectory(prefix="bench_parsers_") as tmp:
+        katalog = katalog or tmp
+        os.makedirs(katalog, exist_ok=True)
+        for n in rozmiary:
+            sciezka = os.path.join(katalog, f"synth_{n}.dat")
+            meta = synthetic_dat.generuj_dat(sciezka, n_wezlow=n, n_elementow=int(n * ELEMENTY_NA_WEZEL))
+            synthetic_dat.zapisz_wezly_csv(os.path.splitext(sciezka)[0] + "_nodes.csv", n)
+            sciezka_meta = sciezka + ".meta.json"
+            with open(sciezka_meta, 'w') as f:
+                json.dump(meta, f)
+            for parser in parsery:
+                r = _uruchom_worker(parser, sciezka_meta, repeat)
+                wyniki[f"{parser}_{n}"] = {
+                    "rozmiar_mb": meta["rozmiar_mb"],
+                    "czas_s": r["czas_s"],
+                    "przepustowosc_mbs": meta["rozmiar_mb"] / r["czas_s"] if r["czas_s"] > 0 else 0.0,
+                    "rss_mb": r["rss_mb"],
+                    "rss_przyrost_mb": r["rss_przyrost_mb"],
+                }
+    return wyniki
+
+def wypisz(wyniki):
+    for przypadek, m in wyniki.items():
+        rss = "n/d" if m["rss_mb"] is None else f"{m['rss_mb']:7.1f} MB (+{m['rss_przyrost_mb']:.1f})"
+        print(f"{przypadek:<24} {m['rozmiar_mb']:7.1f} MB  {m['czas_s']:8.3f} s  {m['przepustowosc_mbs']:7.1f} MB/s   RSS: {rss}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark parserów .dat (FemEngine / FemEngineShell).")
+    ap.add_argument("--sizes", default="10000,100000", help="Liczby węzłów po przecinku")
+    ap.add_argument("--parsers", default=",".join(PARSERY), help="Parsery po przecinku: " + ",".join(PARSERY))
+    ap.add_argument("--repeat", type=int, default=3, help="Liczba powtórzeń (mediana)")
+    ap.add_argument("--keep", help="Katalog na wygenerowane pliki (domyślnie tymczasowy, usuwany)")
+    ap.add_argument("--compare", action="store_true", help="Porównaj z baseline (kod wyjścia 1 przy regresji)")
+    ap.add_argument("--save-baseline", action="store_true", help="Zapisz ten przebieg jako baseline")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="Dopuszczalny wzrost czasu/pamięci (względny)")
+    ap.add_argument("--no-history", action="store_true", help="Nie dopisuj do historii")
+    ap.add_argument("--worker", nargs=2, metavar=("PARSER", "META"), help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.worker:
+        _worker(args.worker[0], args.worker[1], args.repeat)
+        return 0
+
+    rozmiary = [int(n) for n in args.sizes.split(",")]
+    parsery = [p.strip() for p in args.parsers.split(",")]
+    wyniki = run(rozmiary, args.repeat, parsery, args.keep)
+    wypisz(wyniki)
+
+    przebieg = _common.opis_przebiegu(NAZWA, wyniki)
+    if not args.no_history:
+        print(f"\nHistoria: {_common.dopisz_historie(przebieg)}")
+    if args.save_baseline:
+        print(f"Baseline: {_common.zapisz_baseline(przebieg)}")
+
+    if args.compare:
+        baseline = _common.wczytaj_baseline(NAZWA)
+        if baseline is None:
+            print("\n(!) Brak baseline - uruchom z --save-baseline.")
+            return 0
+        regresje = _common.porownaj(wyniki, baseline, args.tolerance)
+        _common.wypisz_porownanie(regresje, baseline)
+        return 1 if regresje else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import sys
+import io
+import argparse
+import tempfile
+import contextlib
+
+import _common
+from _common import zmierz_czas, zmierz_pamiec
+
+import engine_solver
+import material_catalogue
+import routing
+from run_config import RunConfig
+from solvers_opt import solver_1_standard
+
+# ==============================================================================
+#  BENCHMARK: SOLVER ANALITYCZNY I PĘTLA OPTYMALIZACYJNA
+# ==============================================================================
+# Mierzy:
+# 1. Czas jednego wywołania analizuj_przekroj_pelna_dokladnosc dla każdego
+#    profilu katalogu (UPE / UPN z S355, ALU z AW-6060 T6) - średnio na rodzinę.
+# 2. Pełny przebieg glowna_petla_optymalizacyjna na stałych konfiguracjach
+#    (1 materiał, 5 stali, aluminium): czas, liczba wywołań solvera, liczba
+#    wierszy wyniku, szczytowa pamięć.
+#
+# Wyniki dopisywane są do benchmarks/wyniki/bench_solver_historia.json.
+# --save-baseline zapisuje bazę odniesienia, --compare zgłasza regresje
+# (kod wyjścia 1).
+#
+# Użycie:  python benchmarks/bench_solver.py [--repeat 3] [--cases analiza,petla_1] [--compare]
+# ==============================================================================
+
+NAZWA = "bench_solver"
+
+MATERIAL_STAL = "S355"
+MATERIAL_ALU = "AW-6060 T6"
+
+# Stałe konfiguracje przebiegów end-to-end (reszta parametrów = domyślne RunConfig)
+KONFIGURACJE_PETLI = {
+    "petla_1_material": ("S355",),
+    "petla_5_materialow": ("S235", "S275", "S355", "S420", "S460"),
+    "petla_alu": ("AW-6060 T6",),
+}
+
+class LicznikWywolan:
+    """Podmienia engine_solver.analizuj_przekroj_pelna_dokladnosc na czas pomiaru i zlicza wywołania."""
+    def __init__(self):
+        self.liczba = 0
+        self._oryginal = None
+
+    def __enter__(self):
+        self._oryginal = engine_solver.analizuj_przekroj_pelna_dokladnosc
+        oryginal = self._oryginal
+        def licz(*args, **kwargs):
+            self.liczba += 1
+            return oryginal(*args, **kwargs)
+        engine_solver.analizuj_przekroj_pelna_dokladnosc = licz
+        return self
+
+    def __exit__(self, *exc):
+        engine_solver.analizuj_przekroj_pelna_dokladnosc = self._oryginal
+        return False
+
+# ==============================================================================
+# PRZYPADKI
+# ==============================================================================
+
+def _dane_wywolania(prof):
+    mat_db = material_catalogue.baza_materialow()
+    load = dict(RunConfig().LOAD_PARAMS)
+    load.update(mat_db[MATERIAL_ALU if prof["Typ"] == "ALU" else MATERIAL_STAL])
+    geo = {"bp": RunConfig().MIN_SZEROKOSC_OTWARCIA + 2 * prof["hc"], "tp": 10.0}
+    return geo, load
+
+def bench_analiza(repeat=3, n_wywolan=50):
+    """Czas pojedynczego wywołania solvera dla każdego profilu katalogu (średnio na rodzinę)."""
+    safety = dict(RunConfig().SAFETY_PARAMS)
+    rodziny = {}
+    for nazwa, prof in material_catalogue.baza_upe().items():
+        geo, load = _dane_wywolania(prof)
+        engine_solver.analizuj_przekroj_pelna_dokladnosc(prof, geo, load, safety) # Rozgrzewka
+        def seria():
+            for _ in range(n_wywolan):
+                engine_solver.analizuj_przekroj_pelna_dokladnosc(prof, geo, load, safety)
+        czas, _ = zmierz_czas(seria, repeat)
+        rodziny.setdefault(prof["Typ"], []).append(czas / n_wywolan)
+
+    wyniki = {}
+    for typ, czasy in sorted(rodziny.items()):
+        wyniki[f"analiza_{typ}"] = {
+            "profile": len(czasy),
+            "wywolanie_s": sum(czasy) / len(czasy),
+            "najwolniejszy_s": max(czasy),
+        }
+    return wyniki
+
+def _przebieg_petli(materialy, katalog):
+    """Jeden przebieg optymalizatora w katalogu tymczasowym; zwraca (wywołania solvera, wiersze)."""
+    router = routing.ProjectRouting(base_output_dir=katalog)
+    with contextlib.redirect_stdout(io.StringIO()):
+        router.set_project("bench")
+        cfg = RunConfig(LISTA_MATERIALOW=materialy, NAZWA_BADANIA="bench")
+        with LicznikWywolan() as licznik:
+            sciezka_csv = solver_1_standard.glowna_petla_optymalizacyjna(router_instance=router, config=cfg)
+    with open(sciezka_csv, 'r', encoding='utf-8') as f:
+        wiersze = max(0, sum(1 for _ in f) - 1)
+    return licznik.liczba, wiersze
+
+def bench_petla(nazwa, materialy, repeat=3):
+    with tempfile.TemporaryDirectory(prefix="bench_solver_") as katalog:
+        czas, (wywolania, wiersze) = zmierz_czas(lambda: _przebieg_petli(materialy, katalog), repeat)
+        pamiec = zmierz_pamiec(lambda: _przebieg_petli(materialy, katalog))
+    return {nazwa: {
+        "czas_s": czas,
+        "wywolania_solvera": wywolania,
+        "wiersze": wiersze,
+        "na_wywolanie_s": czas / wywolania if wywolania else 0.0,
+        "pamiec_szczyt_mb": pamiec,
+    }}
+
+def run(repeat=3, przypadki=None):
+    wyniki = {}
+    if przypadki is None or "analiza" in przypadki:
+        wyniki.update(bench_analiza(repeat))
+    for nazwa, materialy in KONFIGURACJE_PETLI.items():
+        if przypadki is None or nazwa in przypadki:
+            wyniki.update(bench_petla(nazwa, materialy, repeat))
+    return wyniki
+
+def wypisz(wyniki):
+    for przypadek, m in wyniki.items():
+        if przypadek.startswith("analiza_"):
+            print(f"{przypadek:<22} {m['profile']:3d} profili   wywołanie {m['wywolanie_s']*1e3:8.3f} ms   (max {m['najwolniejszy_s']*1e3:.3f} ms)")
+        else:
+            print(f"{przypadek:<22} {m['czas_s']:8.2f} s   solver: {m['wywolania_solvera']:6d} wyw.   "
+                  f"wiersze: {m['wiersze']:5d}   pamięć: {m['pamiec_szczyt_mb']:7.1f} MB")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark solvera analitycznego i pętli optymalizacyjnej.")
+    ap.add_argument("--repeat", type=int, default=3, help="Liczba powtórzeń (mediana)")
+    ap.add_argument("--cases", help="Przypadki po przecinku: analiza," + ",".join(KONFIGURACJE_PETLI))
+    ap.add_argument("--compare", action="store_true", help="Porównaj z baseline (kod wyjścia 1 przy regresji)")
+    ap.add_argument("--save-baseline", action="store_true", help="Zapisz ten przebieg jako baseline")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="Dopuszczalny wzrost czasu/pamięci (względny)")
+    ap.add_argument("--no-history", action="store_true", help="Nie dopisuj do historii")
+    args = ap.parse_args(argv)
+
+    przypadki = [p.strip() for p in args.cases.split(",")] if args.cases else None
+    wyniki = run(repeat=args.repeat, przypadki=przypadki)
+    wypisz(wyniki)
+
+    przebieg = _common.opis_przebiegu(NAZWA, wyniki)
+    if not args.no_history:
+        print(f"\nHistoria: {_common.dopisz_historie(przebieg)}")
+    if args.save_baseline:
+        print(f"Baseline: {_common.zapisz_baseline(przebieg)}")
+
+    if args.compare:
+        baseline = _common.wczytaj_baseline(NAZWA)
+        if baseline is None:
+            print("\n(!) Brak baseline - uruchom z --save-baseline.")
+            return 0
+        regresje = _common.porownaj(wyniki, baseline, args.tolerance)
+        _common.wypisz_porownanie(regresje, baseline)
+        return 1 if regresje else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
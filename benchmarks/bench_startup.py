@@ -0,0 +1,115 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+# ==============================================================================
+#  BENCHMARK: START I PIERWSZE WYWOŁANIE
+# ==============================================================================
+# Mierzy w ŚWIEŻYCH procesach (bez cache modułów w pamięci):
+# 1. Czas importu engine_solver (i czy sympy NIE został załadowany).
+# 2. Opóźnienie pierwszego wywołania analizuj_przekroj_pelna_dokladnosc
+#    oraz średni czas kolejnych wywołań.
+# 3. Koszt trybu weryfikacji symbolicznej (import sympy + przebieg referencyjny).
+# 4. Czas importu cli (start trybu bez GUI).
+#
+# Użycie:  python benchmarks/bench_startup.py [--repeat 5] [--json wynik.json]
+# ==============================================================================
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Kod wykonywany w procesie potomnym - wypisuje jeden wiersz JSON
+_PROBE = r'''
+import sys, time, json
+sys.path.insert(0, ROOT)
+t0 = time.perf_counter()
+import engine_solver
+t_import = time.perf_counter() - t0
+sympy_loaded = "sympy" in sys.modules
+
+import material_catalogue as mc
+prof = mc.pobierz_ceownik("UPE200")
+load = {"Fx": 24000.0, "F_promien": 450.0, "L": 1800, "w_Ty": 0.2, "w_Tz": 0.2}
+load.update(mc.baza_materialow()["S355"])
+safety = {"gamma_M0": 2.0, "gamma_M1": 2.0, "alfa_imp": 0.49}
+geo = {"bp": 470.0, "tp": 10.0}
+
+t0 = time.perf_counter()
+engine_solver.analizuj_przekroj_pelna_dokladnosc(prof, geo, load, safety)
+t_first = time.perf_counter() - t0
+
+N = 200
+t0 = time.perf_counter()
+for _ in range(N):
+    engine_solver.analizuj_przekroj_pelna_dokladnosc(prof, geo, load, safety)
+t_call = (time.perf_counter() - t0) / N
+
+out = {"import_s": t_import, "sympy_at_import": sympy_loaded, "first_call_s": t_first, "call_s": t_call}
+if VERIFY:
+    t0 = time.perf_counter()
+    res = engine_solver.analizuj_przekroj_pelna_dokladnosc(prof, geo, load, safety, weryfikacja_symboliczna=True)
+    out["verify_call_s"] = time.perf_counter() - t0
+    out["verify_max_rel_diff"] = res["Weryfikacja"]["Max_Rel_Diff"]
+print(json.dumps(out))
+'''
+
+_PROBE_CLI = r'''
+import sys, time, json
+sys.path.insert(0, ROOT)
+t0 = time.perf_counter()
+import cli
+out = {"cli_import_s": time.perf_counter() - t0,
+       "heavy_loaded": sorted(m for m in ("sympy", "numpy", "pandas", "gmsh", "PyQt6", "pyvista", "matplotlib") if m in sys.modules)}
+print(json.dumps(out))
+'''
+
+def _run_probe(code, **consts):
+    head = "".join(f"{k} = {v!r}\n" for k, v in consts.items())
+    res = subprocess.run([sys.executable, "-c", head + code], capture_output=True, text=True, cwd=ROOT_DIR)
+    if res.returncode != 0:
+        raise RuntimeError(res.stderr.strip())
+    return json.loads(res.stdout.strip().splitlines()[-1])
+
+def _median(vals):
+    vals = sorted(vals)
+    return vals[len(vals) // 2]
+
+def run(repeat=5, verify=True):
+    runs = [_run_probe(_PROBE, ROOT=ROOT_DIR, VERIFY=False) for _ in range(repeat)]
+    result = {
+        "import_s": _median([r["import_s"] for r in runs]),
+        "first_call_s": _median([r["first_call_s"] for r in runs]),
+        "call_s": _median([r["call_s"] for r in runs]),
+        "sympy_at_import": any(r["sympy_at_import"] for r in runs),
+    }
+    if verify:
+        v = _run_probe(_PROBE, ROOT=ROOT_DIR, VERIFY=True)
+        result["verify_call_s"] = v["verify_call_s"]
+        result["verify_max_rel_diff"] = v["verify_max_rel_diff"]
+    cli_runs = [_run_probe(_PROBE_CLI, ROOT=ROOT_DIR) for _ in range(repeat)]
+    result["cli_import_s"] = _median([r["cli_import_s"] for r in cli_runs])
+    result["cli_heavy_loaded"] = cli_runs[0]["heavy_loaded"]
+    return result
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark startu engine_solver / cli.")
+    ap.add_argument("--repeat", type=int, default=5, help="Liczba świeżych procesów (mediana)")
+    ap.add_argument("--no-verify", action="store_true", help="Pomiń pomiar trybu weryfikacji symbolicznej")
+    ap.add_argument("--json", help="Zapis wyników do pliku JSON")
+    args = ap.parse_args(argv)
+
+    r = run(repeat=args.repeat, verify=not args.no_verify)
+    print(f"Import engine_solver:        {r['import_s']*1000:8.1f} ms  (sympy przy imporcie: {'TAK' if r['sympy_at_import'] else 'NIE'})")
+    print(f"Pierwsze wywołanie:          {r['first_call_s']*1000:8.2f} ms")
+    print(f"Kolejne wywołanie (średnio): {r['call_s']*1000:8.3f} ms")
+    if "verify_call_s" in r:
+        print(f"Weryfikacja symboliczna:     {r['verify_call_s']*1000:8.1f} ms  (max rel. różnica {r['verify_max_rel_diff']:.2e})")
+    print(f"Import cli:                  {r['cli_import_s']*1000:8.1f} ms  (ciężkie moduły: {', '.join(r['cli_heavy_loaded']) or 'brak'})")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(r, f, indent=4)
+    return 1 if r["sympy_at_import"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
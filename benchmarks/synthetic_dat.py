@@ -0,0 +1,128 @@
+import os
+import re
+import sys
+import argparse
+
+import numpy as np
+
+# ==============================================================================
+#  SYNTETYCZNE PLIKI .DAT (CalculiX)
+# ==============================================================================
+# Generator plików wyników w układzie zapisywanym przez CCX (*NODE PRINT /
+# *EL PRINT) - do pomiaru parserów bez uruchamiania solvera.
+# Odpowiada za:
+# 1. Bloki: przemieszczenia (U), naprężenia elementowe (S, elem + punkt
+#    całkowania + 6 składowych), reakcje podpory (RF, NSET_SURF_SUPPORT)
+#    i mnożniki wyboczenia (krok BUCKLE).
+# 2. Format liczb CCX (%13.6E) wraz z osobliwością trzycyfrowego wykładnika
+#    bez litery E (np. 1.234567-105) dla części wartości.
+# 3. Plik węzłów <nazwa>_nodes.csv (NodeMapper / FemEngineShell) zgodny z .dat.
+#
+# Znaczniki kroków ("step 1 static", "step 2 buckle", "end step") to linie
+# rozpoznawane przez parsery FemEngine / FemEngineShell.
+# Dane są deterministyczne (seed) - pomiary między wersjami są porównywalne.
+#
+# Użycie:  python benchmarks/synthetic_dat.py wynik.dat --nodes 200000 --elements 120000
+# ==============================================================================
+
+PACZKA = 50000 # Wiersze formatowane naraz
+_WYKLADNIK_3 = re.compile(r"(\S+)E([+-]\d{3})")
+
+def _formatuj(ids, wartosci, ip=None):
+    """Wiersze tekstu jak w .dat CCX (ID, [punkt całkowania], wartości %13.6E)."""
+    n_kol = wartosci.shape[1]
+    if ip is None:
+        fmt = "%10d" + " %13.6E" * n_kol
+        wiersze = [fmt % (i, *w) for i, w in zip(ids.tolist(), wartosci.tolist())]
+    else:
+        fmt = "%10d%4d" + " %13.6E" * n_kol
+        wiersze = [fmt % (i, p, *w) for i, p, w in zip(ids.tolist(), ip.tolist(), wartosci.tolist())]
+    tekst = "\n".join(wiersze) + "\n"
+    # CCX: trzycyfrowy wykładnik zapisywany bez litery E (1.234567E-105 -> 1.234567-105)
+    # (szerokość pola zachowana - dodatkowa spacja przed liczbą)
+    return _WYKLADNIK_3.sub(r" \1\2", tekst)
+
+def _wartosci(rng, n, n_kol, skala, udzial_quirk):
+    w = rng.normal(0.0, skala, size=(n, n_kol))
+    if udzial_quirk > 0:
+        maska = rng.random((n, n_kol)) < udzial_quirk
+        w[maska] = rng.uniform(1.0, 9.9, size=maska.sum()) * 10.0 ** rng.integers(-110, -100, size=maska.sum())
+    return w
+
+def _blok(f, naglowek, ids, rng, n_kol, skala, udzial_quirk, ip=None):
+    f.write(f"\n {naglowek}\n\n")
+    for start in range(0, len(ids), PACZKA):
+        kon = min(start + PACZKA, len(ids))
+        w = _wartosci(rng, kon - start, n_kol, skala, udzial_quirk)
+        f.write(_formatuj(ids[start:kon], w, None if ip is None else ip[start:kon]))
+
+def zapisz_wezly_csv(sciezka_csv, n_wezlow, seed=0, dlugosc=1800.0):
+    """Węzły 1..n (współrzędne w prostopadłościanie L x 200 x 100) - format engine_geometry."""
+    rng = np.random.default_rng(seed)
+    xyz = np.column_stack([rng.uniform(0, dlugosc, n_wezlow), rng.uniform(-100, 100, n_wezlow), rng.uniform(-50, 50, n_wezlow)])
+    ids = np.arange(1, n_wezlow + 1)
+    with open(sciezka_csv, 'w', newline='') as f:
+        f.write("NodeID,X,Y,Z\n")
+        for start in range(0, n_wezlow, PACZKA):
+            kon = min(start + PACZKA, n_wezlow)
+            f.write("\n".join("%d,%.6f,%.6f,%.6f" % (i, *p) for i, p in zip(ids[start:kon].tolist(), xyz[start:kon].tolist())) + "\n")
+    return sciezka_csv
+
+def generuj_dat(sciezka, n_wezlow=10000, n_elementow=6000, ip_na_element=4, n_podpora=None,
+                n_modow=5, udzial_quirk=0.01, seed=0):
+    """
+    Zapisuje syntetyczny plik .dat. Zwraca metadane (liczności, węzły podpory, rozmiar).
+    n_podpora: liczba węzłów podpory (domyślnie ~2% węzłów).
+    """
+    rng = np.random.default_rng(seed)
+    wezly = np.arange(1, n_wezlow + 1)
+    elementy = np.repeat(np.arange(1, n_elementow + 1), ip_na_element)
+    ip = np.tile(np.arange(1, ip_na_element + 1), n_elementow)
+    if n_podpora is None:
+        n_podpora = max(1, n_wezlow // 50)
+    podpora = np.sort(rng.choice(wezly, size=min(n_podpora, n_wezlow), replace=False))
+
+    with open(sciezka, 'w') as f:
+        f.write("\n step 1 static\n")
+        _blok(f, "displacements (vx,vy,vz) for set NALL and time  0.1000000E+01", wezly, rng, 3, 0.5, udzial_quirk)
+        _blok(f, "stresses (elem, integ.pnt.,sxx,syy,szz,sxy,sxz,syz) for set EALL and time  0.1000000E+01",
+              elementy, rng, 6, 80.0, udzial_quirk, ip)
+        _blok(f, "forces (rf) applied to nodes of set NSET_SURF_SUPPORT and time  0.1000000E+01", podpora, rng, 3, 50.0, udzial_quirk)
+        f.write("\n total force (fx,fy,fz) for set NSET_SURF_SUPPORT and time  0.1000000E+01\n\n")
+        f.write("        0.000000E+00  0.000000E+00 -2.400000E+04\n")
+        f.write("\n end step\n")
+
+        f.write("\n step 2 buckle\n\n")
+        f.write("     B U C K L I N G   F A C T O R   O U T P U T\n\n")
+        f.write(" MODE NO       BUCKLING FACTOR\n\n")
+        for m, wsp in enumerate(np.sort(rng.uniform(1.5, 30.0, n_modow)), start=1):
+            f.write(f"      {m}   buckling factor {wsp:.7E}\n")
+        f.write("\n end step\n")
+
+    return {
+        "sciezka": sciezka,
+        "wezly": n_wezlow,
+        "elementy": n_elementow,
+        "wiersze_naprezen": len(elementy),
+        "podpora": podpora.tolist(),
+        "mody": n_modow,
+        "rozmiar_mb": os.path.getsize(sciezka) / (1024 * 1024),
+    }
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generator syntetycznych plików .dat CalculiX.")
+    ap.add_argument("sciezka", help="Plik wyjściowy .dat (obok powstaje <nazwa>_nodes.csv)")
+    ap.add_argument("--nodes", type=int, default=10000)
+    ap.add_argument("--elements", type=int, default=6000)
+    ap.add_argument("--ip", type=int, default=4, help="Punkty całkowania na element")
+    ap.add_argument("--quirk", type=float, default=0.01, help="Udział liczb z wykładnikiem bez E")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    meta = generuj_dat(args.sciezka, args.nodes, args.elements, args.ip, udzial_quirk=args.quirk, seed=args.seed)
+    zapisz_wezly_csv(os.path.splitext(args.sciezka)[0] + "_nodes.csv", args.nodes, args.seed)
+    print(f"[OK] {args.sciezka}: {meta['rozmiar_mb']:.1f} MB ({meta['wezly']} węzłów, {meta['wiersze_naprezen']} wierszy naprężeń)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,389 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import datetime
+import importlib
+
+# ==============================================================================
+#  HEADLESS CLI / API v1.0
+# ==============================================================================
+# Uruchamianie obliczeń bez GUI (węzły obliczeniowe, skrypty, CI).
+# Odpowiada za:
+# 1. Wczytanie pliku zadania (JSON lub TOML).
+# 2. Etapy: analityka (solver_1_standard), FEM bryłowy (batch), FEM Shell (batch).
+# 3. Leniwe importy - ten moduł ładuje tylko bibliotekę standardową i routing;
+#    sympy/numpy (analityka), gmsh (FEM) są importowane dopiero przez etap,
+#    który ich potrzebuje. PyQt6 / PyVista / matplotlib / pandas nie są ładowane wcale.
+#
+# Użycie:
+#   python cli.py zadanie.toml
+#   python cli.py zadanie.json --stages analytical,fem --project Badanie_01
+#
+# API:
+#   import cli
+#   summary = cli.run_job(cli.load_job("zadanie.toml"))
+#
+# Przykład pliku zadania (TOML):
+#   project = "Badanie_01"
+#   stages = ["analytical", "fem"]
+#
+#   [analytical]              # nadpisania RunConfig / config_solver.py (nazwy WIELKIMI literami)
+#   resume = true             # wznowienie z punktu kontrolnego (ten sam project + NAZWA_BADANIA)
+#   profile = "cpu"           # profilowanie: "cpu", "mem" lub "cpu+mem" (pliki w 99_Temp)
+#   LISTA_MATERIALOW = ["S355"]
+#   LOAD_PARAMS = { Fx = 24000.0, F_promien = 450.0, L = 300, w_Ty = 0.2, w_Tz = 0.2 }
+#
+#   [fem]
+#   candidates = "analytical" # lub ścieżka do CSV/JSON z wierszami wyników
+#   limit = 5                 # N najlżejszych (sort_by = "Res_Masa_kg_m")
+#   resume = false            # domyślnie true: kompletne wyniki z 03_Final są importowane, nie liczone
+#   [fem.settings]            # klucze jak w zakładce FEM (Tab4.get_settings)
+#   max_iterations = 1
+#   mesh_workers = 2
+#   profile = "cpu+mem"       # jak w [analytical]
+#   retention = { keep_last = 2, slim = true, compress = "auto" } # 02_MES_Roboczy
+#
+#   [shell]
+#   candidates = "analytical"
+#   loads = { Fx = 24000.0 }
+#   mesh = { mesh_start = 20.0, max_iter = 5, parallel_runs = 8 } # parallel_runs: 0 = połowa rdzeni
+#   # mesh.per_family = false: jedna kalibracja (pierwszy kandydat) dla całego batcha Shell
+# ==============================================================================
+
+STAGES = ("analytical", "fem", "shell")
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SOLVERS_DIR = os.path.join(ROOT_DIR, "solvers_opt")
+
+class JobError(Exception):
+    """Błąd pliku zadania (brak pliku, zły format, nieznane klucze)."""
+    pass
+
+def _log_default(msg):
+    print(msg, flush=True)
+
+# ==============================================================================
+# PLIK ZADANIA
+# ==============================================================================
+
+def load_job(path):
+    """Wczytuje plik zadania (.json / .toml) i zwraca słownik."""
+    if not os.path.exists(path):
+        raise JobError(f"Brak pliku zadania: {path}")
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext == ".toml":
+            try:
+                import tomllib  # Python 3.11+
+            except ImportError:
+                try:
+                    import tomli as tomllib
+                except ImportError:
+                    raise JobError("Pliki TOML wymagają Pythona 3.11+ lub pakietu 'tomli'.")
+            with open(path, 'rb') as f:
+                job = tomllib.load(f)
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                job = json.load(f)
+    except JobError:
+        raise
+    except Exception as e:
+        raise JobError(f"Nie można odczytać pliku zadania {path}: {e}")
+
+    if not isinstance(job, dict):
+        raise JobError("Plik zadania musi zawierać obiekt (słownik) na najwyższym poziomie.")
+    job.setdefault("_base_dir", os.path.dirname(os.path.abspath(path)))
+    return job
+
+def job_stages(job, override=None):
+    """Lista etapów do wykonania (kolejność stała: analityka -> fem -> shell)."""
+    if override:
+        wanted = [s.strip() for s in override.split(",") if s.strip()]
+    elif "stages" in job:
+        wanted = list(job["stages"])
+    else:
+        wanted = [s for s in STAGES if s in job]
+    unknown = [s for s in wanted if s not in STAGES]
+    if unknown:
+        raise JobError(f"Nieznane etapy: {', '.join(unknown)} (dostępne: {', '.join(STAGES)})")
+    return [s for s in STAGES if s in wanted]
+
+# ==============================================================================
+# KANDYDACI
+# ==============================================================================
+
+def _coerce(value):
+    """Wartość z CSV -> float, jeśli to liczba (jak w tabeli Selektora)."""
+    if not isinstance(value, str): return value
+    try: return float(value)
+    except ValueError: return value
+
+def read_rows(path):
+    """Wiersze wyników analitycznych z CSV lub JSON (lista słowników)."""
+    if path.lower().endswith(".json"):
+        with open(path, 'r', encoding='utf-8') as f:
+            rows = json.load(f)
+        return [dict(r) for r in rows]
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return [{k: _coerce(v) for k, v in row.items()} for row in csv.DictReader(f)]
+
+def select_candidates(rows, section, log=_log_default):
+    """
+    Wybór kandydatów z wierszy analityki wg sekcji zadania:
+    profiles (lista nazw), only_ok (Status_Wymogow == SPEŁNIA), sort_by, limit.
+    """
+    out = list(rows)
+    profiles = section.get("profiles")
+    if profiles:
+        out = [r for r in out if r.get("Nazwa_Profilu") in profiles]
+    if section.get("only_ok", True):
+        out = [r for r in out if r.get("Status_Wymogow", "SPEŁNIA") == "SPEŁNIA"]
+    sort_by = section.get("sort_by", "Res_Masa_kg_m")
+    if sort_by:
+        out.sort(key=lambda r: r.get(sort_by) if isinstance(r.get(sort_by), (int, float)) else float("inf"))
+    limit = int(section.get("limit", 0) or 0)
+    if limit > 0:
+        out = out[:limit]
+
+    # Brakujące E/G uzupełniane z bazy materiałów (GUI pyta w oknie dialogowym)
+    import material_catalogue
+    mat_db = material_catalogue.baza_materialow()
+    valid = []
+    for c in out:
+        try:
+            ok = float(c.get("Input_Load_E")) > 0 and float(c.get("Input_Load_G")) > 0
+        except (TypeError, ValueError):
+            ok = False
+        if not ok:
+            mat = mat_db.get(c.get("Stop"))
+            if not mat:
+                log(f"[CLI] (!) Pominięto {c.get('Nazwa_Profilu')}: brak E/G i materiału '{c.get('Stop')}' w bazie.")
+                continue
+            c["Input_Load_E"], c["Input_Load_G"] = mat["E"], mat["G"]
+        valid.append(c)
+    return valid
+
+def _resolve_candidates(section, state, base_dir, log):
+    src = section.get("candidates", "analytical")
+    if src == "analytical":
+        src = state.get("analytical_csv")
+        if not src:
+            raise JobError("Etap wymaga wyników analityki, a etap 'analytical' nie został wykonany "
+                           "(podaj 'candidates' jako ścieżkę do pliku CSV/JSON).")
+    elif not os.path.isabs(src):
+        src = os.path.join(base_dir, src)
+    if not os.path.exists(src):
+        raise JobError(f"Brak pliku kandydatów: {src}")
+    cands = select_candidates(read_rows(src), section, log)
+    log(f"[CLI] Kandydaci: {len(cands)} (źródło: {src})")
+    return cands
+
+# ==============================================================================
+# ETAPY
+# ==============================================================================
+
+def run_analytical(section, router_instance, log=_log_default):
+    """Optymalizacja analityczna (solver_1_standard). Zwraca ścieżkę CSV wyników."""
+    from run_config import RunConfig
+
+    # Wartości domyślne z config_solver.py, nadpisania z zadania (plik na dysku bez zmian)
+    base = RunConfig.from_module()
+    overrides = {k: v for k, v in section.items() if k.isupper()}
+    unknown = [k for k in overrides if k not in base.to_dict()]
+    if unknown:
+        raise JobError(f"[analytical] Nieznane parametry konfiguracji: {', '.join(unknown)}")
+    config = base.with_overrides(**overrides)
+
+    if SOLVERS_DIR not in sys.path:
+        sys.path.append(SOLVERS_DIR)
+    solver_module = importlib.import_module(section.get("solver", "solver_1_standard"))
+    kwargs = {"wznow": True} if section.get("resume") else {}
+    if section.get("profile"):
+        kwargs["profil"] = section["profile"]
+    return solver_module.glowna_petla_optymalizacyjna(router_instance=router_instance, config=config, **kwargs)
+
+def run_fem(section, candidates, router_instance, log=_log_default):
+    """
+    Batch FEM bryłowy. Zwraca listę wyników (kolejność jak kandydaci).
+    Kandydaci z kompletnym wynikiem w 03_Final (manifest) są importowani (converged = "IMPORTED").
+    """
+    import fem_optimizer
+
+    settings = dict(section.get("settings", {}))
+    mesh_pool = None
+    n_mesh = int(settings.get("mesh_workers", 0))
+    if n_mesh > 0:
+        from mesh_pool import MeshWorkerPool
+        thr = max(1, int(settings.get("cores_mesh", 4)) // n_mesh)
+        mesh_pool = MeshWorkerPool(max_workers=n_mesh, threads_per_worker=thr, logger_callback=log)
+
+    optimizer = fem_optimizer.FemOptimizer(router_instance, mesh_pool=mesh_pool)
+    on_limit = section.get("on_eq_limit", "ITERATIVE")  # Zachowanie jak w GUI: przełączenie na iteracyjny
+    # Wznowienie jak w GUI: wynik kompletny wg manifestu nie jest liczony ponownie
+    # (_prepare_work_dir / archive_directory podmieniłyby gotowy folder w 03_Final)
+    imported = {}
+    if section.get("resume", True):
+        for i, cand in enumerate(candidates):
+            res = optimizer.import_existing(cand, log=log)
+            if res is not None:
+                log(f"--- Pomijanie: {res['profile_name']} ({i+1}/{len(candidates)}) - wynik już istnieje. ---")
+                imported[i] = res
+    todo = [(i, c) for i, c in enumerate(candidates) if i not in imported]
+    computed = {}
+    try:
+        if int(settings.get("max_iterations", 3)) == 1 and len(todo) > 1:
+            per_cand = [optimizer.settings_for_candidate(c, settings, log) for _, c in todo]
+            batch, _ = optimizer.run_batch_pipelined(
+                [c for _, c in todo], settings, signal_callback=log,
+                interaction_callback=lambda eq, vm: on_limit,
+                candidate_settings=per_cand
+            )
+            computed = {i: res for (i, _), res in zip(todo, batch)}
+        else:
+            for i, cand in todo:
+                if optimizer.stop_requested: break
+                log(f"\n--- Przetwarzanie: {cand.get('Nazwa_Profilu', 'Unknown')} ({i+1}/{len(candidates)}) ---")
+                try:
+                    res = optimizer.run_single_candidate(
+                        cand, optimizer.settings_for_candidate(cand, settings, log),
+                        signal_callback=log, interaction_callback=lambda eq, vm: on_limit
+                    )
+                except KeyboardInterrupt:
+                    optimizer.request_stop()
+                    raise
+                except Exception as e:
+                    res = {"id": optimizer.candidate_id(cand), "error": str(e), "converged": False}
+                    log(f"CRITICAL ERROR: {e}")
+                computed[i] = res
+    finally:
+        if mesh_pool:
+            mesh_pool.shutdown(wait=True)
+    if imported:
+        log(f">>> Zaimportowano {len(imported)} istniejących wyników z 03_Final.")
+    results = [imported.get(i, computed.get(i)) for i in range(len(candidates))]
+    results = [r for r in results if r is not None]
+    if optimizer.telemetry.zdarzenia:
+        import telemetry
+        log(f"\n>>> TELEMETRIA ETAPÓW ({optimizer.telemetry.sciezka}):")
+        telemetry.log_podsumowanie(optimizer.telemetry.zdarzenia, log)
+    optimizer.retention_report(log)
+    return results
+
+def run_shell(section, candidates, router_instance, log=_log_default):
+    """Batch FEM Shell. Zwraca słownik {nazwa: wynik}."""
+    from fem_optimizer_shell import FemOptimizerShell, translate_candidate
+
+    mesh = dict(section.get("mesh", {}))
+    mesh_pool = None
+    n_mesh = int(section.get("mesh_workers", 0))
+    if n_mesh > 0:
+        from mesh_pool import MeshWorkerPool
+        mesh_pool = MeshWorkerPool(max_workers=n_mesh, logger_callback=log)
+    try:
+        optimizer = FemOptimizerShell(router_instance, logger_callback=log, mesh_pool=mesh_pool)
+        return optimizer.run_batch([translate_candidate(c) for c in candidates],
+                                   dict(section.get("loads", {})), mesh)
+    finally:
+        if mesh_pool:
+            mesh_pool.shutdown(wait=True)
+
+# ==============================================================================
+# ZADANIE
+# ==============================================================================
+
+def run_job(job, stages=None, project=None, log=_log_default):
+    """
+    Wykonuje zadanie (słownik z load_job). Zwraca podsumowanie:
+    {project, stages: {nazwa: {status, time_s, ...}}, ok}
+    """
+    from routing import router
+    import atomic_io
+
+    base_dir = job.get("_base_dir", os.getcwd())
+    if job.get("output_dir"):
+        out = job["output_dir"]
+        router.base_output_dir = out if os.path.isabs(out) else os.path.join(base_dir, out)
+    router.set_project(project or job.get("project"))
+
+    summary = {"project": router.project_path, "stages": {}, "ok": True}
+    state = {}
+    if job.get("analytical_csv"):
+        state["analytical_csv"] = os.path.join(base_dir, job["analytical_csv"])
+
+    for stage in job_stages(job, stages):
+        section = job.get(stage, {})
+        t0 = time.perf_counter()
+        log(f"\n[CLI] === ETAP: {stage} ===")
+        info = {"status": "OK"}
+        try:
+            if stage == "analytical":
+                state["analytical_csv"] = run_analytical(section, router, log)
+                info["output"] = state["analytical_csv"]
+            elif stage == "fem":
+                res = run_fem(section, _resolve_candidates(section, state, base_dir, log), router, log)
+                info["candidates"] = len(res)
+                info["failed"] = sum(1 for r in res if r.get("error") or r.get("failed"))
+                info["results"] = [{k: r.get(k) for k in ("id", "converged", "final_stress", "final_mesh_size", "error")}
+                                   for r in res]
+            elif stage == "shell":
+                res = run_shell(section, _resolve_candidates(section, state, base_dir, log), router, log)
+                info["candidates"] = len(res)
+                info["results"] = {name: r.get("MODEL_MAX_VM") for name, r in res.items()}
+        except JobError:
+            raise
+        except KeyboardInterrupt:
+            info["status"] = "STOPPED"
+            summary["ok"] = False
+            summary["stages"][stage] = info
+            break
+        except Exception as e:
+            import traceback
+            log(traceback.format_exc())
+            info["status"] = "ERROR"
+            info["error"] = str(e)
+            summary["ok"] = False
+        info["time_s"] = round(time.perf_counter() - t0, 2)
+        summary["stages"][stage] = info
+        log(f"[CLI] Etap {stage}: {info['status']} ({info['time_s']} s)")
+        if info["status"] != "OK" and not job.get("continue_on_error", False):
+            break
+
+    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    try:
+        atomic_io.write_json(router.get_path("FINAL", f"CLI_SUMMARY_{ts}.json"), summary,
+                             encoding='utf-8', ensure_ascii=False, default=str)
+    except Exception as e:
+        log(f"[CLI] Nie zapisano podsumowania: {e}")
+    return summary
+
+def main(argv=None):
+    t_start = time.perf_counter()
+    ap = argparse.ArgumentParser(prog="cli.py", description="Optymalizacja słupa bez GUI (analityka / FEM / Shell).")
+    ap.add_argument("job", help="Plik zadania (.json lub .toml)")
+    ap.add_argument("--stages", help=f"Etapy do wykonania, np. analytical,fem (domyślnie z pliku; dostępne: {','.join(STAGES)})")
+    ap.add_argument("--project", help="Nazwa projektu (nadpisuje 'project' z pliku)")
+    ap.add_argument("--resume", action="store_true", help="Wznów przerwaną analitykę z punktu kontrolnego")
+    ap.add_argument("--profile", choices=("cpu", "mem", "cpu+mem"), help="Profilowanie etapów analytical / fem (pliki w 99_Temp)")
+    args = ap.parse_args(argv)
+
+    try:
+        job = load_job(args.job)
+        wanted = job_stages(job, args.stages)
+        # Flagi tylko dla wybranych etapów - dopisana sekcja zmieniłaby domyślną listę etapów
+        if args.resume and "analytical" in wanted:
+            job.setdefault("analytical", {})["resume"] = True
+        if args.profile:
+            if "analytical" in wanted: job.setdefault("analytical", {})["profile"] = args.profile
+            if "fem" in wanted: job.setdefault("fem", {}).setdefault("settings", {})["profile"] = args.profile
+        _log_default(f"[CLI] Start: {time.perf_counter() - t_start:.3f} s od uruchomienia (bez GUI)")
+        summary = run_job(job, stages=args.stages, project=args.project)
+    except JobError as e:
+        print(f"[CLI] BŁĄD ZADANIA: {e}", file=sys.stderr)
+        return 2
+    return 0 if summary["ok"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
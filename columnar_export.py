@@ -0,0 +1,246 @@
+import os
+import sys
+import json
+
+import numpy as np
+
+import atomic_io
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# ==============================================================================
+#  COLUMNAR EXPORT v1.0
+# ==============================================================================
+# Kolumnowy zapis i odczyt wyników optymalizatora (200+ kolumn na wiersz).
+# Odpowiada za:
+# 1. Eksport strumienia .jsonl do Parquet (pyarrow) lub - bez pyarrow - do NPZ
+#    (numpy). Kolumny są typowane (float64 / int64 / bool), teksty kodowane
+#    słownikowo (Stop, Nazwa_Profilu, Status_Wymogow... - kilka wartości na
+#    tysiące wierszy).
+# 2. Odczyt WYBRANYCH kolumn (Tab3_Selector pokazuje tylko część) -
+#    Parquet przez memory_map, NPZ leniwie (każda kolumna to osobny plik w archiwum).
+# 3. Odczyt pełnych wierszy po indeksach (panel detali, przekazanie do FEM) -
+#    Parquet czyta tylko grupy wierszy zawierające dane indeksy.
+#
+# Eksport działa w dwóch przejściach po .jsonl (typy kolumn, potem dane),
+# więc w pamięci nie ma listy słowników z całym badaniem.
+# Feather pominięty: wymaga tego samego pyarrow co Parquet.
+# ==============================================================================
+
+ROZMIAR_GRUPY = 10000 # Wiersze w grupie Parquet (odczyt pojedynczych wierszy)
+
+# Typy kolumn
+T_BOOL, T_INT, T_FLOAT, T_STR = "bool", "int", "float", "str"
+
+def rozszerzenie_kolumnowe():
+    return ".parquet" if HAS_PYARROW else ".npz"
+
+def znajdz_plik_kolumnowy(sciezka):
+    """Plik kolumnowy obok CSV/JSONL tego samego badania (lub sama ścieżka, jeśli już nim jest)."""
+    baza, ext = os.path.splitext(sciezka)
+    if ext.lower() in (".parquet", ".npz"):
+        return sciezka if os.path.exists(sciezka) else None
+    for kandydat in (f"{baza}.parquet", f"{baza}.npz"):
+        if os.path.exists(kandydat):
+            if kandydat.endswith(".parquet") and not HAS_PYARROW: continue
+            return kandydat
+    return None
+
+# ==============================================================================
+# EKSPORT
+# ==============================================================================
+
+def _iter_jsonl(sciezka_jsonl):
+    with open(sciezka_jsonl, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def _typ_wartosci(v):
+    if isinstance(v, bool): return T_BOOL
+    if isinstance(v, int): return T_INT
+    if isinstance(v, float): return T_FLOAT
+    return T_STR
+
+def _polacz_typy(a, b):
+    if a is None: return b
+    if a == b: return a
+    if T_STR in (a, b): return T_STR
+    return T_FLOAT # Liczby mieszane (bool/int/float) -> float
+
+def ustal_typy(sciezka_jsonl, kolumny):
+    """Przejście 1: typ każdej kolumny i liczba wierszy."""
+    typy = {k: None for k in kolumny}
+    braki = set()
+    n = 0
+    for wiersz in _iter_jsonl(sciezka_jsonl):
+        n += 1
+        for k in kolumny:
+            v = wiersz.get(k)
+            if v is None:
+                braki.add(k)
+                continue
+            typy[k] = _polacz_typy(typy[k], _typ_wartosci(v))
+    for k in kolumny:
+        if typy[k] is None:
+            typy[k] = T_FLOAT # Kolumna pusta
+        elif k in braki and typy[k] in (T_INT, T_BOOL):
+            typy[k] = T_FLOAT # Brak wartości -> NaN
+    return typy, n
+
+def _wartosc(v, typ):
+    if v is None:
+        return None if typ == T_STR else np.nan
+    if typ == T_STR:
+        return v if isinstance(v, str) else str(v)
+    return v
+
+def _eksport_parquet(sciezka_jsonl, sciezka_out, kolumny, typy):
+    mapa_typow = {T_BOOL: pa.bool_(), T_INT: pa.int64(), T_FLOAT: pa.float64(), T_STR: pa.string()}
+    schemat = pa.schema([(k, mapa_typow[typy[k]]) for k in kolumny])
+    tekstowe = [k for k in kolumny if typy[k] == T_STR]
+
+    def paczka(bufor):
+        return pa.record_batch([pa.array(bufor[k], type=schemat.field(k).type) for k in kolumny], schema=schemat)
+
+    with atomic_io.atomic_open(sciezka_out, 'wb') as f_out, \
+         pq.ParquetWriter(f_out, schemat, compression="zstd", use_dictionary=tekstowe) as writer:
+        bufor = {k: [] for k in kolumny}
+        n = 0
+        for wiersz in _iter_jsonl(sciezka_jsonl):
+            for k in kolumny:
+                bufor[k].append(_wartosc(wiersz.get(k), typy[k]))
+            n += 1
+            if n % ROZMIAR_GRUPY == 0:
+                writer.write_batch(paczka(bufor), row_group_size=ROZMIAR_GRUPY)
+                bufor = {k: [] for k in kolumny}
+        if n % ROZMIAR_GRUPY:
+            writer.write_batch(paczka(bufor), row_group_size=ROZMIAR_GRUPY)
+
+def _eksport_npz(sciezka_jsonl, sciezka_out, kolumny, typy, n):
+    mapa_dtype = {T_BOOL: np.bool_, T_INT: np.int64, T_FLOAT: np.float64, T_STR: np.int32}
+    dane = {k: np.zeros(n, dtype=mapa_dtype[typy[k]]) for k in kolumny}
+    slowniki = {k: {} for k in kolumny if typy[k] == T_STR}
+
+    for i, wiersz in enumerate(_iter_jsonl(sciezka_jsonl)):
+        for k in kolumny:
+            v = _wartosc(wiersz.get(k), typy[k])
+            if typy[k] == T_STR:
+                # Kod słownikowy (-1 = brak wartości)
+                dane[k][i] = -1 if v is None else slowniki[k].setdefault(v, len(slowniki[k]))
+            else:
+                dane[k][i] = v
+
+    # Nazwy kolumn mogą zawierać dowolne znaki - w archiwum kolumny numerowane
+    archiwum = {
+        "__kolumny__": np.array(kolumny, dtype=str),
+        "__typy__": np.array([typy[k] for k in kolumny], dtype=str),
+    }
+    for i, k in enumerate(kolumny):
+        archiwum[f"c{i}"] = dane[k]
+        if typy[k] == T_STR:
+            archiwum[f"c{i}_slownik"] = np.array(list(slowniki[k].keys()), dtype=str)
+    with atomic_io.atomic_open(sciezka_out, 'wb') as f_out:
+        np.savez(f_out, **archiwum) # Bez kompresji - szybki odczyt pojedynczych kolumn
+
+def eksportuj_kolumnowo(sciezka_baza, kolumny=None):
+    """
+    Eksport wyników badania (sciezka_baza + .jsonl) do .parquet lub .npz.
+    kolumny: kolejność kolumn (domyślnie nagłówek CSV). Zwraca ścieżkę lub None.
+    """
+    sciezka_jsonl = f"{sciezka_baza}.jsonl"
+    if not os.path.exists(sciezka_jsonl):
+        print(f"[KOLUMNY] (!) Brak pliku {sciezka_jsonl}")
+        return None
+    if kolumny is None:
+        sciezka_csv = f"{sciezka_baza}.csv"
+        with open(sciezka_csv, 'r', encoding='utf-8') as f:
+            kolumny = f.readline().rstrip("\r\n").split(",")
+    kolumny = list(kolumny)
+
+    typy, n = ustal_typy(sciezka_jsonl, kolumny)
+    if n == 0:
+        return None
+    sciezka_out = f"{sciezka_baza}{rozszerzenie_kolumnowe()}"
+    if HAS_PYARROW:
+        _eksport_parquet(sciezka_jsonl, sciezka_out, kolumny, typy)
+    else:
+        _eksport_npz(sciezka_jsonl, sciezka_out, kolumny, typy, n)
+    return sciezka_out
+
+# ==============================================================================
+# ODCZYT
+# ==============================================================================
+
+def lista_kolumn(sciezka):
+    """Nazwy kolumn (bez czytania danych)."""
+    if sciezka.endswith(".parquet"):
+        return list(pq.read_schema(sciezka).names)
+    with np.load(sciezka, allow_pickle=False) as npz:
+        return [str(k) for k in npz["__kolumny__"]]
+
+def _npz_do_pandas(npz, kolumny, indeksy=None):
+    import pandas as pd
+    wszystkie = [str(k) for k in npz["__kolumny__"]]
+    typy = [str(t) for t in npz["__typy__"]]
+    out = {}
+    for k in kolumny:
+        if k not in wszystkie: continue
+        i = wszystkie.index(k)
+        dane = npz[f"c{i}"]
+        if indeksy is not None:
+            dane = dane[indeksy]
+        if typy[i] == T_STR:
+            out[k] = pd.Categorical.from_codes(dane, categories=npz[f"c{i}_slownik"])
+        else:
+            out[k] = dane
+    return pd.DataFrame(out, index=indeksy)
+
+def wczytaj_kolumny(sciezka, kolumny=None):
+    """DataFrame tylko z wybranymi kolumnami (None = wszystkie). Teksty jako Categorical."""
+    if sciezka.endswith(".parquet"):
+        schemat = pq.read_schema(sciezka)
+        if kolumny is not None:
+            kolumny = [k for k in kolumny if k in schemat.names]
+        tekstowe = [f.name for f in schemat if pa.types.is_string(f.type) and (kolumny is None or f.name in kolumny)]
+        tabela = pq.read_table(sciezka, columns=kolumny, memory_map=True, read_dictionary=tekstowe)
+        return tabela.to_pandas()
+    with np.load(sciezka, allow_pickle=False) as npz:
+        if kolumny is None:
+            kolumny = [str(k) for k in npz["__kolumny__"]]
+        return _npz_do_pandas(npz, kolumny)
+
+def wczytaj_wiersze(sciezka, indeksy):
+    """Pełne wiersze (wszystkie kolumny) o podanych indeksach - lista słowników."""
+    indeksy = [int(i) for i in indeksy]
+    if not indeksy:
+        return []
+    if sciezka.endswith(".parquet"):
+        plik = pq.ParquetFile(sciezka, memory_map=True)
+        granice = np.cumsum([0] + [plik.metadata.row_group(g).num_rows for g in range(plik.num_row_groups)])
+        grupy = sorted({int(np.searchsorted(granice, i, side="right") - 1) for i in indeksy})
+        tabela = plik.read_row_groups(grupy)
+        # Indeks wiersza w odczytanym fragmencie
+        przesuniecia = {g: int(sum(granice[h + 1] - granice[h] for h in grupy if h < g)) for g in grupy}
+        lokalne = []
+        for i in indeksy:
+            g = int(np.searchsorted(granice, i, side="right") - 1)
+            lokalne.append(przesuniecia[g] + i - int(granice[g]))
+        return tabela.take(lokalne).to_pylist()
+    with np.load(sciezka, allow_pickle=False) as npz:
+        df = _npz_do_pandas(npz, [str(k) for k in npz["__kolumny__"]], np.array(indeksy))
+    return df.to_dict('records')
+
+if __name__ == "__main__":
+    # Eksport istniejącego badania: python columnar_export.py <ścieżka bez rozszerzenia | .csv | .jsonl>
+    if len(sys.argv) < 2:
+        print("Użycie: python columnar_export.py <wyniki.csv>")
+        sys.exit(2)
+    baza = os.path.splitext(sys.argv[1])[0] if sys.argv[1].endswith((".csv", ".jsonl")) else sys.argv[1]
+    wynik = eksportuj_kolumnowo(baza)
+    print(f"[OK] Zapisano: {wynik}" if wynik else "(!) Brak danych do eksportu.")
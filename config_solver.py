@@ -7,6 +7,7 @@ SAFETY_PARAMS = { "gamma_M0": 2.0, "gamma_M1": 2.0, "alfa_imp": 0.49 }
 NAZWA_BADANIA = ""
 WSPOLNY_KATALOG = False
 POKAZUJ_KROKI_POSREDNIE = False
+EKSPORT_KOLUMNOWY = False
 # DYNAMICZNE
 START_SEARCH_OFFSET = 2
 MAX_N_WZROSTOW_WAGI = 2
@@ -22,7 +22,7 @@ class DataAggregator:
         pairs = []
         for folder_name in os.listdir(fem_dir):
             sub_path = os.path.join(fem_dir, folder_name)
-            if not os.path.isdir(sub_path): continue
+            if not os.path.isdir(sub_path) or folder_name.startswith("."): continue # .staging archiwizacji
             
             path_fem = os.path.join(sub_path, "results.json")
             path_ana = os.path.join(sub_path, "analytical.json")
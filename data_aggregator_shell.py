@@ -8,7 +8,8 @@ class DataAggregatorShell:
     Zadanie:
     1. Sparować wyniki (folder).
     2. Narysować krzywą analityczną (wykres ciągły).
-    3. Nanieść punkt FEM (tylko koniec belki - RefNode).
+    3. Nanieść wyniki FEM wzdłuż X (SENSOR_LINE) - dla starszych wyników
+       tylko punkt końca belki (RefNode).
     """
     def __init__(self, router_instance):
         self.router = router_instance
@@ -21,7 +22,7 @@ class DataAggregatorShell:
         pairs = []
         for folder_name in os.listdir(base_dir):
             sub_path = os.path.join(base_dir, folder_name)
-            if not os.path.isdir(sub_path): continue
+            if not os.path.isdir(sub_path) or folder_name.startswith("."): continue # .staging archiwizacji
             
             # Szukamy pliku wyników (solver zazwyczaj zapisuje results.json)
             # Musimy rozróżnić, czy to wynik Shell czy Solid.
@@ -66,6 +67,11 @@ class DataAggregatorShell:
             return {"fem": res_fem, "ana": res_ana}
         except: return None
 
+    @staticmethod
+    def _abs_or_nan(v):
+        """Wartość z SENSOR_LINE (None = stacja bez danych) -> liczba do wykresu."""
+        return abs(float(v)) if v is not None else math.nan
+
     def prepare_plots_data(self, data_package):
         """Generuje dane do wykresów GUI."""
         if not data_package: return {}
@@ -96,12 +102,32 @@ class DataAggregatorShell:
             x_ana.append(x)
             y_ana.append(val)
             
-        # Dane FEM: Tylko punkt końcowy (Ref Node)
-        fem_disp = res_fem.get("DISPLACEMENTS_REF", {})
-        fem_uy = abs(float(fem_disp.get("Uy", 0.0)))
+        # Dane FEM: linia sensorów (średnie ugięcie przekroju w stacjach X)
+        line = res_fem.get("SENSOR_LINE") or {}
+        x_fem = line.get("X", [])
+        
+        if x_fem:
+            fem_series = {
+                "name": "FEM Shell (Linia sensorów)",
+                "x": x_fem,
+                "y": [self._abs_or_nan(v) for v in line.get("Uy", [])],
+                "color": "red",
+                "style": "-"
+            }
+        else:
+            # Starsze wyniki: tylko punkt końcowy (Ref Node)
+            fem_disp = res_fem.get("DISPLACEMENTS_REF", {})
+            fem_series = {
+                "name": "FEM Shell (Koniec belki)", 
+                "x": [L],       # Tylko jeden punkt X=L
+                "y": [abs(float(fem_disp.get("Uy", 0.0)))],
+                "color": "red", 
+                "style": "o",   # Marker punktowy
+                "size": 8       # Większy punkt dla widoczności
+            }
         
         plots["Deflection_Shell"] = {
-            "title": "Porównanie Ugięcia: Teoria (Linia) vs FEM (Punkt)",
+            "title": "Porównanie Ugięcia: Teoria (Linia) vs FEM",
             "xlabel": "Długość belki [mm]",
             "ylabel": "Ugięcie [mm]",
             "series": [
@@ -112,20 +138,12 @@ class DataAggregatorShell:
                     "color": "blue", 
                     "style": "--"
                 },
-                {
-                    "name": "FEM Shell (Koniec belki)", 
-                    "x": [L],       # Tylko jeden punkt X=L
-                    "y": [fem_uy],  # Ugięcie FEM w tym punkcie
-                    "color": "red", 
-                    "style": "o",   # Marker punktowy
-                    "size": 8       # Większy punkt dla widoczności
-                }
+                fem_series
             ]
         }
 
         # --- WYKRES 2: NAPRĘŻENIA ZREDUKOWANE ---
-        # Ponieważ nie mamy mapy FEM, pokażemy to jako słupki (Bar Chart) 
-        # lub po prostu linie stałe na wykresie.
+        # Maksima całego modelu jako słupki (Bar Chart); wzdłuż X - osobny wykres niżej.
         
         vm_fem = float(res_fem.get("MODEL_MAX_VM", 0.0))
         vm_ana = float(res_ana.get("Res_Max_VonMises", 0.0))
@@ -146,6 +164,33 @@ class DataAggregatorShell:
             ]
         }
         
+        # --- WYKRES 3: NAPRĘŻENIA WZDŁUŻ X (włókna górne / dolne) ---
+        # Tylko FEM: analityka daje maksimum przekroju (Fx + obciążenie przez ramię),
+        # nie rozkład wzdłuż X - porównanie maksimów na wykresie 2.
+        if x_fem and any(v is not None for v in line.get("VM_TOP", []) + line.get("VM_BOTTOM", [])):
+            series = [
+                {
+                    "name": "FEM Shell (Włókna górne)",
+                    "x": x_fem,
+                    "y": [self._abs_or_nan(v) for v in line.get("VM_TOP", [])],
+                    "color": "orange",
+                    "style": "-"
+                },
+                {
+                    "name": "FEM Shell (Włókna dolne)",
+                    "x": x_fem,
+                    "y": [self._abs_or_nan(v) for v in line.get("VM_BOTTOM", [])],
+                    "color": "purple",
+                    "style": "-"
+                }
+            ]
+            plots["Stress_Line_Shell"] = {
+                "title": "Naprężenia Zredukowane wzdłuż Belki (max w przekroju)",
+                "xlabel": "Długość belki [mm]",
+                "ylabel": "Naprężenie [MPa]",
+                "series": series
+            }
+        
         # --- INFO O WYBOCZENIU (Jako metadane do wyświetlenia) ---
         # Aggregator może zwrócić dodatkowe pole "info", jeśli GUI to obsługuje,
         # lub możemy dodać to jako tytuł wykresu.
@@ -1,11 +1,11 @@
 import os
-import subprocess
 import math
 import csv
 import sys
 import shutil
 import json
 import time
+from solver_watchdog import SolverWatchdog
 
 try:
     import numpy as np
@@ -123,6 +123,7 @@ class FemEngine:
         self.support_ref_node = None
         self.load_ref_node = None
         self.node_to_elements = {}
+        self.last_run = None # SolverRunResult ostatniego przebiegu CCX
 
     def prepare_calculix_deck(self, inp_path, run_params):
         if not os.path.exists(inp_path): return None
@@ -297,7 +298,12 @@ class FemEngine:
         with open(run_inp_path, 'w') as f: f.write("\n".join(deck))
         return run_inp_path
 
-    def run_solver(self, inp_path, work_dir, num_threads=4, callback=None):
+    def run_solver(self, inp_path, work_dir, num_threads=4, callback=None,
+                   timeout_s=None, max_rss_mb=None, event_callback=None, watchdog=None):
+        """
+        Uruchamia CCX pod nadzorem (solver_watchdog): limit czasu, limit RAM,
+        zdarzenia postępu. Szczegóły przebiegu w self.last_run (SolverRunResult).
+        """
         ccx_cmd = self.ccx_path
         if not os.path.isabs(ccx_cmd) and not shutil.which(ccx_cmd):
              local = os.path.join(os.getcwd(), ccx_cmd + ".exe")
@@ -305,24 +311,15 @@ class FemEngine:
         job_name = os.path.splitext(os.path.basename(inp_path))[0]
         env = os.environ.copy(); env["OMP_NUM_THREADS"] = str(num_threads)
         
-        try:
-            cmd = [ccx_cmd, job_name]
-            process = subprocess.Popen(
-                cmd, cwd=work_dir, shell=(os.name=='nt'), env=env,
-                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1
-            )
-            while True:
-                line = process.stdout.readline()
-                if not line and process.poll() is not None: break
-                if line:
-                    l = line.strip()
-                    if not l: continue
-                    msg = f"CCX: {l}"
-                    if callback: callback(msg)
-            return (process.poll() == 0)
-        except Exception as e:
-            if callback: callback(f"ERROR: {e}")
-            return False
+        def on_line(l):
+            if callback: callback(f"CCX: {l}")
+
+        wd = watchdog or SolverWatchdog(timeout_s=timeout_s, max_rss_mb=max_rss_mb)
+        self.last_run = wd.run([ccx_cmd, job_name], cwd=work_dir, env=env, shell=(os.name=='nt'),
+                               line_callback=on_line, event_callback=event_callback)
+        if not self.last_run.ok and callback:
+            callback(f"ERROR: [{self.last_run.status}] {self.last_run.reason}")
+        return self.last_run.ok
 
     # -------------------------------------------------------------------------
     # NOWE METODY POMOCNICZE (STANDALONE)
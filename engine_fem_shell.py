@@ -1,31 +1,109 @@
 import os
-import subprocess
-import math
-import csv
-import sys
+import io
+import re
 import shutil
 import json
-import time
+
 import material_catalogue
+from solver_watchdog import SolverWatchdog
+
+PACZKA_WIERSZY = 50000 # Wiersze .dat zamieniane na tablicę naraz
+KROK_SENSOROW = 50.0 # [mm] Odstęp stacji linii sensorów wzdłuż X
+NSET_WSZYSTKIE = "NSET_ALL_SHELL"
+ELSET_WSZYSTKIE = "SHELL_ALL"
+ELSETY_POWLOK = ("SHELL_PLATE", "SHELL_WEBS", "SHELL_FLANGES")
+FIELD_FILE_NAME = "shell_field.npz" # Pole wyników w katalogu wyniku (obok results.json)
 
+# Bez numpy moduł (i zakładka GUI) się importuje - deck i parser zgłaszają brak
 try:
     import numpy as np
+    import node_store
     HAS_NUMPY = True
 except ImportError:
     HAS_NUMPY = False
 
+# Warstwa punktów całkowania powłoki rozwiniętej przez CCX do elementu 3D
+# (punkty: najpierw płaszczyzna, potem grubość; -1 = dół, 0 = środek, 1 = góra).
+# S3 -> C3D6 (1x2), S4 -> C3D8I (2x2x2), S4R -> C3D8R (1 punkt, środek),
+# S6 -> C3D15 (3x3), S8 -> C3D20 (3x3x3), S8R -> C3D20R (2x2x2).
+WARSTWY_IP = {
+    "S3": (-1, 1),
+    "S4": (-1,) * 4 + (1,) * 4,
+    "S4R": (0,),
+    "S6": (-1,) * 3 + (0,) * 3 + (1,) * 3,
+    "S8": (-1,) * 9 + (0,) * 9 + (1,) * 9,
+    "S8R": (-1,) * 4 + (1,) * 4,
+}
+TYPY_POWLOK = tuple(WARSTWY_IP) # Indeks = kod typu elementu (elem_type); -1 = nieznany
+
+def _tablica_warstw():
+    """(n_typów, max_ip) z kodami warstw; poza zakresem punktów - 9 (nieznana)."""
+    n_ip = max(len(w) for w in WARSTWY_IP.values())
+    tab = np.full((len(TYPY_POWLOK), n_ip), 9, dtype=np.int8)
+    for k, typ in enumerate(TYPY_POWLOK):
+        tab[k, :len(WARSTWY_IP[typ])] = WARSTWY_IP[typ]
+    return tab
+
+_TAB_WARSTW = _tablica_warstw() if HAS_NUMPY else None
+
+# CCX: trzycyfrowy wykładnik zapisywany bez litery E (1.234567-105)
+_WYKLADNIK_BEZ_E = re.compile(r"(?<=\d)([+-]\d{3})\b")
+
+def von_mises(s):
+    """Naprężenia zredukowane dla tablicy (N, 6): sxx, syy, szz, sxy, sxz, syz."""
+    sxx, syy, szz, sxy, sxz, syz = (s[:, i] for i in range(6))
+    return np.sqrt(0.5 * ((sxx - syy)**2 + (syy - szz)**2 + (szz - sxx)**2) + 3.0 * (sxy**2 + sxz**2 + syz**2))
+
+def _na_tablice(wiersze):
+    """Wiersze danych .dat (ta sama liczba kolumn) -> ndarray (N, k) jednym przejściem."""
+    n_kol = len(wiersze[0].split())
+    tekst = " ".join(wiersze)
+    for proba in range(2):
+        try:
+            wartosci = np.array(tekst.split(), dtype=np.float64)
+            if wartosci.size == n_kol * len(wiersze):
+                return wartosci.reshape(-1, n_kol)
+            break
+        except ValueError:
+            # Osobliwy wykładnik - regex tylko dla wierszy z liczbą bez litery E
+            n_flt = sum(1 for c in wiersze[0].split() if "." in c)
+            wiersze = [_WYKLADNIK_BEZ_E.sub(r"e\1", w) if w.count("E") + w.count("e") < n_flt else w
+                       for w in wiersze]
+            tekst = " ".join(wiersze)
+    # Wiersze o innej liczbie kolumn / nieliczbowe - pomijane pojedynczo
+    dobre = []
+    for w in wiersze:
+        czesci = _WYKLADNIK_BEZ_E.sub(r"e\1", w).split()
+        if len(czesci) != n_kol: continue
+        try: dobre.append([float(c) for c in czesci])
+        except ValueError: pass
+    return np.array(dobre, dtype=np.float64).reshape(-1, n_kol)
+
+def _lista(wartosci, cyfry=6):
+    """ndarray -> lista do JSON (NaN -> None)."""
+    return [None if not np.isfinite(v) else round(float(v), cyfry) for v in wartosci]
+
 class FemEngineShell:
     """
     Silnik FEM dedykowany dla modeli powłokowych (Shell).
     Wersja 5.3: Jawny zapis NSET dla spoin (naprawa błędu TIE/ELSET).
+    Wersja 5.4: Strumieniowy parser .dat - pełne pole przemieszczeń i naprężeń
+    (punkty całkowania, włókna górne/dolne) oraz linia sensorów wzdłuż X.
+    Włókna górne/dolne wg tabeli warstw punktów całkowania typu elementu (WARSTWY_IP).
     """
     def __init__(self, ccx_path="ccx"):
         self.ccx_path = ccx_path
         self.work_dir = ""
         self.groups = {}
-        self.nodes_map = {} 
+        self.nodes = None # NodeStore węzłów siatki
+        self.elem_ids = None # ID elementów powłokowych (rosnąco)
+        self.elem_x = None # X środka elementu (stacje linii sensorów)
+        self.elem_type = None # Kod typu elementu (indeks TYPY_POWLOK, -1 = nieznany)
+        self.sensor_step = KROK_SENSOROW
         self.ref_node_structure = None
         self.ref_node_load = None
+        self.last_run = None # SolverRunResult ostatniego przebiegu CCX
+        self.last_field = None # Tablice pola ostatniego parsowania
 
     def _load_metadata(self, base_path_no_ext):
         groups_path = f"{base_path_no_ext}_groups.json"
@@ -37,20 +115,74 @@ class FemEngineShell:
                 with open(groups_path, 'r') as f: self.groups = json.load(f)
             except Exception as e: print(f"[FEM-SHELL] Error loading groups: {e}")
         
-        self.nodes_map = {}
-        if os.path.exists(nodes_path):
-            try:
-                with open(nodes_path, 'r') as f:
-                    reader = csv.reader(f)
-                    next(reader, None)
-                    for row in reader:
-                        if row: 
-                            try: self.nodes_map[int(row[0])] = [float(row[1]), float(row[2]), float(row[3])]
-                            except: pass
-            except: pass
+        self.nodes = None
+        try: self.nodes = node_store.NodeStore.wczytaj(nodes_path)
+        except Exception as e: print(f"[FEM-SHELL] Error loading nodes: {e}")
+
+    def _element_x(self, mesh_content):
+        """
+        ID elementów powłokowych (*ELEMENT, TYPE=S...), X ich środka (stacje linii
+        sensorów) i kod typu (warstwy punktów całkowania). Blok = jedna tablica.
+        Bez węzłów X = NaN (typy nadal dostępne).
+        """
+        bloki, wiersze, typ = [], None, None
+        for line in io.StringIO(mesh_content):
+            if line.startswith("*"):
+                if wiersze: bloki.append((typ, wiersze))
+                l = line.upper().replace(" ", "")
+                wiersze = None
+                if l.startswith("*ELEMENT,") and "TYPE=S" in l:
+                    typ = l.split("TYPE=", 1)[1].split(",")[0].strip()
+                    wiersze = []
+            elif wiersze is not None and line.strip():
+                wiersze.append(line.replace(",", " "))
+        if wiersze: bloki.append((typ, wiersze))
+
+        ma_wezly = self.nodes is not None and len(self.nodes) > 0
+        ids, xs, typy = [], [], []
+        for typ, w in bloki:
+            try: tab = np.array(" ".join(w).split(), dtype=np.int64).reshape(len(w), -1)
+            except ValueError: continue # Wiersze kontynuacji (nierówne) - pomijamy blok
+            ids.append(tab[:, 0])
+            if ma_wezly:
+                idx = np.clip(np.searchsorted(self.nodes.ids, tab[:, 1:]), 0, len(self.nodes) - 1)
+                xs.append(self.nodes.xyz[idx, 0].mean(axis=1))
+            else:
+                xs.append(np.full(len(tab), np.nan))
+            kod = TYPY_POWLOK.index(typ) if typ in TYPY_POWLOK else -1
+            typy.append(np.full(len(tab), kod, dtype=np.int8))
+        if not ids:
+            return None, None, None
+        ids, xs, typy = np.concatenate(ids), np.concatenate(xs), np.concatenate(typy)
+        kolejnosc = np.argsort(ids, kind="stable")
+        return ids[kolejnosc], xs[kolejnosc], typy[kolejnosc]
+
+    def warstwy_ip(self, el, ip):
+        """
+        Warstwa (-1 dół, 0 środek, 1 góra, 9 nieznana) każdego punktu naprężeń
+        wg typu elementu (WARSTWY_IP). Zwraca (warstwy, [ostrzeżenia]).
+        """
+        warstwy = np.full(len(el), 9, dtype=np.int8)
+        if not len(el):
+            return warstwy, []
+        if self.elem_ids is None or self.elem_type is None or not len(self.elem_ids):
+            return warstwy, ["Brak typów elementów - naprężenia włókien górnych/dolnych pominięte"]
+        ie = np.clip(np.searchsorted(self.elem_ids, el), 0, len(self.elem_ids) - 1)
+        kod = np.where(self.elem_ids[ie] == el, self.elem_type[ie], -1)
+        ok = (kod >= 0) & (ip >= 1) & (ip <= _TAB_WARSTW.shape[1])
+        warstwy[ok] = _TAB_WARSTW[kod[ok], ip[ok] - 1]
+        ostrzezenia = []
+        n_nieznane = int(np.count_nonzero(warstwy == 9))
+        if n_nieznane:
+            ostrzezenia.append(f"{n_nieznane} punktów naprężeń bez warstwy (nieznany typ elementu "
+                               f"lub numer punktu) - pominięte we włóknach górnych/dolnych")
+        return warstwy, ostrzezenia
 
     def prepare_calculix_deck(self, inp_path, run_params):
         if not os.path.exists(inp_path): return None
+        if not HAS_NUMPY:
+            print("[FEM-SHELL] Brak numpy - przygotowanie decku Shell niemożliwe.")
+            return None
         
         self.work_dir = os.path.dirname(inp_path)
         base_name = os.path.splitext(os.path.basename(inp_path))[0]
@@ -59,6 +191,8 @@ class FemEngineShell:
         self._load_metadata(base_full_path)
         
         with open(inp_path, 'r') as f: mesh_content = f.read()
+        self.elem_ids, self.elem_x, self.elem_type = self._element_x(mesh_content)
+        self.sensor_step = float(run_params.get("sensor_step", KROK_SENSOROW))
 
         deck = []
         deck.append("** CALCULIX DECK FOR SHELL MODEL (TIE FIX)")
@@ -80,8 +214,16 @@ class FemEngineShell:
                 for i in range(0, len(nodes), 12):
                     deck.append(", ".join(map(str, nodes[i:i+12])))
 
+        # Zestawy dla pełnego pola wyników (przemieszczenia węzłów, naprężenia wszystkich powłok)
+        if self.nodes is not None and len(self.nodes):
+            deck.append(f"*NSET, NSET={NSET_WSZYSTKIE}")
+            for i in range(0, len(self.nodes), 12):
+                deck.append(", ".join(map(str, self.nodes.ids[i:i+12].tolist())))
+        deck.append(f"*ELSET, ELSET={ELSET_WSZYSTKIE}")
+        deck.append(", ".join(ELSETY_POWLOK))
+
         # --- PARAMETRY ---
-        max_id = max(self.nodes_map.keys()) if self.nodes_map else 100000
+        max_id = int(self.nodes.ids.max()) if self.nodes is not None and len(self.nodes) else 100000
         
         mat_name = run_params.get("Stop", "S355")
         mat_db = material_catalogue.baza_materialow()
@@ -184,7 +326,9 @@ class FemEngineShell:
         if abs(mz)>1e-9: deck.append(f"{tn}, 6, {mz}")
         
         deck.append(f"*NODE PRINT, NSET=N_REF_STRUCT\nU") 
-        deck.append("*EL PRINT, ELSET=SHELL_PLATE\nS")
+        if self.nodes is not None and len(self.nodes):
+            deck.append(f"*NODE PRINT, NSET={NSET_WSZYSTKIE}\nU")
+        deck.append(f"*EL PRINT, ELSET={ELSET_WSZYSTKIE}\nS")
         deck.append("*END STEP")
         
         # --- BUCKLE STEP ---
@@ -199,7 +343,8 @@ class FemEngineShell:
             return run_inp_path
         except: return None
 
-    def run_solver(self, inp_path, work_dir, num_threads=4, callback=None):
+    def run_solver(self, inp_path, work_dir, num_threads=4, callback=None,
+                   timeout_s=None, max_rss_mb=None, event_callback=None, watchdog=None):
         ccx = self.ccx_path
         if not shutil.which(ccx) and not os.path.exists(ccx):
             local = os.path.join(os.getcwd(), "ccx.exe")
@@ -208,88 +353,224 @@ class FemEngineShell:
         job = os.path.splitext(os.path.basename(inp_path))[0]
         env = os.environ.copy(); env["OMP_NUM_THREADS"] = str(num_threads)
         
-        try:
-            p = subprocess.Popen([ccx, job], cwd=work_dir, env=env, shell=(os.name=='nt'),
-                                 stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-            for line in p.stdout:
-                if callback: callback(f"CCX: {line.strip()}")
-            return (p.wait() == 0)
-        except Exception as e:
-            if callback: callback(f"Solver Error: {e}")
-            return False
+        def on_line(l):
+            if callback: callback(f"CCX: {l}")
 
-    def parse_dat_results(self, dat_path):
-        if not os.path.exists(dat_path): 
-            return {"converged": False, "MODEL_MAX_VM": 0.0}
-            
+        # Nadzór: limit czasu / RAM, czyste zabicie zawieszonego ccx
+        wd = watchdog or SolverWatchdog(timeout_s=timeout_s, max_rss_mb=max_rss_mb)
+        self.last_run = wd.run([ccx, job], cwd=work_dir, env=env, shell=(os.name=='nt'),
+                               line_callback=on_line, event_callback=event_callback)
+        if not self.last_run.ok and callback:
+            callback(f"Solver Error: [{self.last_run.status}] {self.last_run.reason}")
+        return self.last_run.ok
+
+    # -------------------------------------------------------------------------
+    # PARSER WYNIKÓW (strumieniowy, wektorowy)
+    # -------------------------------------------------------------------------
+
+    def _czytaj_bloki(self, dat_path):
+        """
+        Jedno przejście po .dat (bez readlines). Wiersze danych trafiają do bufora
+        bloku i są zamieniane na tablice paczkami (PACZKA_WIERSZY).
+        Zwraca ({("disp"|"stress", zestaw): ndarray}, [mnożniki wyboczenia]).
+        Blok = nagłówek CCX "... for set <NAZWA> and time ..."; kolejny blok tego
+        samego zestawu (następny przyrost) zastępuje poprzedni.
+        """
+        bloki, wyboczenie = {}, []
+        klucz, wiersze, paczki = None, [], []
+
+        def zamknij():
+            nonlocal wiersze, paczki
+            if wiersze: paczki.append(_na_tablice(wiersze))
+            if isinstance(klucz, tuple) and paczki:
+                bloki[klucz] = np.concatenate(paczki) if len(paczki) > 1 else paczki[0]
+            wiersze, paczki = [], []
+
+        with open(dat_path, 'r') as f:
+            for line in f:
+                s = line.lstrip()
+                if not s:
+                    continue
+                if s[0].isdigit():
+                    if klucz == "buckle":
+                        # "1   0.5140161E+01" (CCX) lub "1 buckling factor 5.14" - ostatnia liczba wiersza
+                        try: wyboczenie.append(float(_WYKLADNIK_BEZ_E.sub(r"e\1", s.split()[-1])))
+                        except ValueError: pass
+                    elif klucz is not None:
+                        wiersze.append(s)
+                        if len(wiersze) >= PACZKA_WIERSZY:
+                            paczki.append(_na_tablice(wiersze))
+                            wiersze = []
+                    continue
+
+                # Wiersz tekstowy: nagłówek bloku albo koniec bieżącego
+                l = s.lower()
+                if klucz == "buckle" and ("mode" in l or "factor" in l):
+                    continue
+                zamknij()
+                klucz = None
+                if "for set" in l and ("displacements" in l or "stresses" in l):
+                    zestaw = l.split("for set", 1)[1].split()[0].upper()
+                    klucz = ("disp" if "displacements" in l else "stress", zestaw)
+                elif "b u c k l i n g" in l or "buckling factor output" in l:
+                    klucz = "buckle"
+        zamknij()
+        return bloki, wyboczenie
+
+    def parse_dat_results(self, dat_path, save_field=True):
+        """
+        Wyniki modelu Shell z pliku .dat:
+        - DISPLACEMENTS_REF (węzeł referencyjny), BUCKLING_FACTORS,
+        - pełne pole: przemieszczenia węzłów i naprężenia w punktach całkowania
+          (self.last_field, zapis do <nazwa>_field.npz gdy save_field),
+        - MODEL_MAX_VM / _TOP / _BOTTOM (włókna górne / dolne powłoki),
+        - SENSOR_LINE: stacje wzdłuż X (średnie U przekroju, max VM włókien).
+        Brak naprężeń lub przemieszczeń = converged False (bez wartości zastępczych).
+        """
         res = {
-            "MODEL_MAX_VM": 0.0, 
-            "BUCKLING_FACTORS": [], 
+            "MODEL_MAX_VM": 0.0,
+            "BUCKLING_FACTORS": [],
             "DISPLACEMENTS_REF": {"Ux":0.0, "Uy":0.0, "Uz":0.0},
-            "converged": False
+            "converged": False,
+            "parse_warnings": []
         }
-        
-        step_found = False
+        self.last_field = None
+        if not HAS_NUMPY:
+            res["parse_warnings"].append("Brak numpy - parsowanie wyników Shell niedostępne")
+            return res
+        if not os.path.exists(dat_path):
+            res["parse_warnings"].append("Brak pliku .dat")
+            return res
+
         try:
-            with open(dat_path, 'r') as f:
-                lines = f.readlines()
-                
-            stress_section = False
-            mode = None
-            
-            for line in lines:
-                l = line.lower().strip()
-                
-                # Wykrywanie sekcji
-                if "step" in l and "static" in l: mode = "static"; step_found = True
-                if "step" in l and "buckle" in l: mode = "buckle"
-                
-                # Wyboczenie
-                if mode == "buckle" and "buckling factor" in l:
-                    try: res["BUCKLING_FACTORS"].append(float(l.split()[-1]))
-                    except: pass
-                
-                # Przemieszczenia węzła referencyjnego
-                if mode == "static" and self.ref_node_structure:
-                    parts = l.split()
-                    if len(parts) > 3 and parts[0] == str(self.ref_node_structure):
-                        try:
-                            res["DISPLACEMENTS_REF"]["Ux"] = float(parts[1])
-                            res["DISPLACEMENTS_REF"]["Uy"] = float(parts[2])
-                            res["DISPLACEMENTS_REF"]["Uz"] = float(parts[3])
-                        except: pass
-                
-                # Naprężenia
-                if mode == "static" and ("stresses" in l or "stress" in l) and ("el" in l or "print" in l):
-                    stress_section = True
-                    continue
-                if "end step" in l: stress_section = False
-                
-                # Parsowanie Von Mises (dla Shell)
-                if stress_section and l and l[0].isdigit():
-                    parts = l.split()
-                    # Oczekujemy co najmniej 8 kolumn (elem, ip, s11, s22, s33, s12, s13, s23)
-                    if len(parts) >= 8:
-                        try:
-                            # Pomijamy elem i ip
-                            s = [float(x) for x in parts[2:8]]
-                            # Uproszczony VM dla shell
-                            # s[0]=xx, s[1]=yy, s[2]=zz, s[3]=xy, s[4]=yz, s[5]=zx
-                            sxx, syy, szz = s[0], s[1], s[2]
-                            sxy, syz, szx = s[3], s[4], s[5]
-                            
-                            vm = math.sqrt(0.5 * ((sxx-syy)**2 + (syy-szz)**2 + (szz-sxx)**2 + 6*(sxy**2 + syz**2 + szx**2)))
-                            if vm > res["MODEL_MAX_VM"]: res["MODEL_MAX_VM"] = vm
-                        except: pass
-
-            # Warunki zbieżności
-            u_mag = abs(res["DISPLACEMENTS_REF"]["Uy"]) + abs(res["DISPLACEMENTS_REF"]["Uz"]) + abs(res["DISPLACEMENTS_REF"]["Ux"])
-            if u_mag > 1e-9: 
-                res["converged"] = True
-                # Placeholder, jeśli parser naprężeń zawiódł (ale przemieszczenia są ok)
-                if res["MODEL_MAX_VM"] == 0.0: res["MODEL_MAX_VM"] = 1.0 
-            else:
-                res["converged"] = False
+            bloki, res["BUCKLING_FACTORS"] = self._czytaj_bloki(dat_path)
+        except Exception as e:
+            res["parse_warnings"].append(f"Błąd odczytu .dat: {e}")
+            return res
+
+        disp = {z: t for (typ, z), t in bloki.items() if typ == "disp" and t.shape[1] >= 4}
+        stress = [t for (typ, _), t in bloki.items() if typ == "stress" and t.shape[1] >= 8]
+
+        # --- Przemieszczenia: węzeł referencyjny + pole węzłowe ---
+        ref_ok = False
+        if self.ref_node_structure:
+            for zestaw in ["N_REF_STRUCT"] + [z for z in disp if z != "N_REF_STRUCT"]:
+                t = disp.get(zestaw)
+                if t is None: continue
+                wiersz = t[t[:, 0] == self.ref_node_structure]
+                if len(wiersz):
+                    res["DISPLACEMENTS_REF"] = {"Ux": float(wiersz[0, 1]), "Uy": float(wiersz[0, 2]), "Uz": float(wiersz[0, 3])}
+                    ref_ok = True
+                    break
+        if not ref_ok:
+            res["parse_warnings"].append("Brak przemieszczeń węzła referencyjnego")
+
+        pole_u = max((t for z, t in disp.items() if z != "N_REF_STRUCT"), key=len, default=None)
+        node_ids = pole_u[:, 0].astype(np.int64) if pole_u is not None else np.empty(0, dtype=np.int64)
+        u = np.ascontiguousarray(pole_u[:, 1:4]) if pole_u is not None else np.empty((0, 3))
+
+        # --- Naprężenia: punkty całkowania, włókna górne / dolne ---
+        if stress:
+            s_tab = np.concatenate(stress) if len(stress) > 1 else stress[0]
+            el = s_tab[:, 0].astype(np.int64)
+            ip = s_tab[:, 1].astype(np.int64)
+            s = np.ascontiguousarray(s_tab[:, 2:8])
+        else:
+            el, ip, s = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty((0, 6))
+            res["parse_warnings"].append("Brak naprężeń w .dat")
+        vm = von_mises(s)
+
+        # Powłoka w CCX = rozwinięty element 3D: warstwa punktu całkowania
+        # z tabeli typu elementu (WARSTWY_IP); punkty środkowe - tylko w MODEL_MAX_VM
+        elementy, inv = np.unique(el, return_inverse=True)
+        warstwy, ostrzezenia = self.warstwy_ip(el, ip)
+        res["parse_warnings"] += ostrzezenia
+        gora, dol = warstwy == 1, warstwy == -1
+        vm_top = np.full(len(elementy), np.nan)
+        vm_bottom = np.full(len(elementy), np.nan)
+        if np.any(gora):
+            vm_top[np.unique(inv[gora])] = 0.0
+            np.maximum.at(vm_top, inv[gora], vm[gora])
+        if np.any(dol):
+            vm_bottom[np.unique(inv[dol])] = 0.0
+            np.maximum.at(vm_bottom, inv[dol], vm[dol])
 
-        except: pass
-        return res
\ No newline at end of file
+        if len(vm):
+            res["MODEL_MAX_VM"] = float(vm.max())
+            if np.any(gora): res["MODEL_MAX_VM_TOP"] = float(np.nanmax(vm_top))
+            if np.any(dol): res["MODEL_MAX_VM_BOTTOM"] = float(np.nanmax(vm_bottom))
+        if len(u):
+            res["MODEL_MAX_U"] = float(np.sqrt(np.einsum('ij,ij->i', u, u)).max())
+        res["FIELD_STATS"] = {"nodes": int(len(node_ids)), "elements": int(len(elementy)), "stress_points": int(len(vm))}
+
+        self.last_field = {
+            "node_ids": node_ids, "u": u,
+            "elem_ids": el, "ip": ip, "s": s, "vm": vm,
+            "elements": elementy, "vm_top": vm_top, "vm_bottom": vm_bottom,
+        }
+        linia = self.sensor_line(node_ids, u, elementy, vm_top, vm_bottom)
+        if linia:
+            res["SENSOR_LINE"] = linia
+
+        if save_field and (len(u) or len(vm)):
+            field_path = f"{os.path.splitext(dat_path)[0]}_field.npz"
+            try:
+                np.savez(field_path, **self.last_field) # Bez kompresji - szybki zapis i odczyt
+                res["FIELD_FILE"] = field_path
+            except Exception as e:
+                res["parse_warnings"].append(f"Zapis pola: {e}")
+
+        # Warunki zbieżności: rzeczywiste przemieszczenia i naprężenia
+        d = res["DISPLACEMENTS_REF"]
+        u_mag = abs(d["Ux"]) + abs(d["Uy"]) + abs(d["Uz"])
+        res["converged"] = u_mag > 1e-9 and res["MODEL_MAX_VM"] > 0.0
+        return res
+
+    def sensor_line(self, node_ids, u, elementy, vm_top, vm_bottom):
+        """
+        Linia sensorów wzdłuż osi X: stacje co self.sensor_step [mm].
+        U - średnia węzłów przekroju (węzeł przypisany do najbliższej stacji),
+        VM - maksimum elementów, których środek leży najbliżej stacji.
+        """
+        if self.nodes is None or len(self.nodes) == 0 or len(node_ids) == 0:
+            return None
+        krok = self.sensor_step if self.sensor_step >= 1.0 else KROK_SENSOROW
+
+        idx = np.clip(np.searchsorted(self.nodes.ids, node_ids), 0, len(self.nodes) - 1)
+        ok = self.nodes.ids[idx] == node_ids
+        if not np.any(ok):
+            return None
+        st_u = np.maximum(np.rint(self.nodes.xyz[idx[ok], 0] / krok).astype(np.int64), 0)
+
+        st_e = None
+        if self.elem_ids is not None and len(elementy):
+            ie = np.clip(np.searchsorted(self.elem_ids, elementy), 0, len(self.elem_ids) - 1)
+            ok_e = self.elem_ids[ie] == elementy
+            if np.any(ok_e):
+                st_e = np.maximum(np.rint(self.elem_x[ie[ok_e]] / krok).astype(np.int64), 0)
+
+        n_st = int(st_u.max()) + 1
+        if st_e is not None:
+            n_st = max(n_st, int(st_e.max()) + 1)
+
+        licznik = np.bincount(st_u, minlength=n_st)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            srednie = [np.bincount(st_u, weights=u[ok, j], minlength=n_st) / licznik for j in range(3)]
+
+        top = np.full(n_st, np.nan)
+        bottom = np.full(n_st, np.nan)
+        if st_e is not None:
+            # fmax: elementy bez punktów danej warstwy (NaN) nie zerują stacji
+            np.fmax.at(top, st_e, vm_top[ok_e])
+            np.fmax.at(bottom, st_e, vm_bottom[ok_e])
+
+        stacje = np.nonzero(licznik > 0)[0]
+        return {
+            "step": krok,
+            "X": _lista(stacje * krok, 3),
+            "Ux": _lista(srednie[0][stacje]),
+            "Uy": _lista(srednie[1][stacje]),
+            "Uz": _lista(srednie[2][stacje]),
+            "VM_TOP": _lista(top[stacje], 3),
+            "VM_BOTTOM": _lista(bottom[stacje], 3),
+        }
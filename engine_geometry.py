@@ -4,6 +4,8 @@ import os
 import json
 import csv
 import math
+import time
+import node_store
 
 class GeometryGenerator:
     def __init__(self, logger_callback=None):
@@ -23,6 +25,13 @@ class GeometryGenerator:
             gmsh.option.setNumber("Geometry.OCCAutoFix", 1)
         except: pass
 
+    def _mark(self, timings, stage):
+        """[NOWOŚĆ] Czas etapu (wall / CPU procesu) od poprzedniego znacznika - telemetria FemOptimizer."""
+        now = (time.perf_counter(), time.process_time())
+        prev = timings.pop("_t", now)
+        timings[stage] = {"wall_s": now[0] - prev[0], "cpu_s": now[1] - prev[1]}
+        timings["_t"] = now
+
     def _finalize_gmsh(self):
         # Nie zamykamy całkowicie gmsh.finalize(), bo w multiprocessing może to powodować problemy przy restarcie
         pass
@@ -182,6 +191,7 @@ class GeometryGenerator:
             self.log(f"Zaaplikowano {len(field_ids)} stref zagęszczania.")
 
     def generate_model(self, params):
+        timings = {"_t": (time.perf_counter(), time.process_time())}
         self._prepare_gmsh()
         try:
             sys_res = params.get('system_resources', {})
@@ -317,6 +327,8 @@ class GeometryGenerator:
             if ref_zones:
                 self._apply_refinement(ref_zones, lc_global, p_data, pl_data, L)
 
+            self._mark(timings, "geometry")
+
             # --- GENERACJA SIATKI ---
             self.log("Generowanie siatki...")
             gmsh.model.mesh.generate(3)
@@ -328,6 +340,10 @@ class GeometryGenerator:
                 self.log("Konwersja do elementów 2. rzędu...")
                 gmsh.model.mesh.setOrder(2)
             
+            _, elem_tags, _ = gmsh.model.mesh.getElements(dim=3)
+            n_elements = sum(len(t) for t in elem_tags)
+            self._mark(timings, "mesh")
+            
             # --- IDENTYFIKACJA WĘZŁÓW DO POST-PROCESSINGU ---
             self.log("Identyfikacja węzłów powierzchni styku...")
             eps = 1e-3
@@ -365,6 +381,7 @@ class GeometryGenerator:
             }
             
             self.log(f"Znaleziono węzły: Supp={len(supp_nodes)}, Load={len(load_nodes)}, Interface={len(int_nodes)}")
+            self._mark(timings, "groups")
             
             # Ścieżki plików
             nodes_csv = os.path.join(out_dir, f"{name}_nodes.csv")
@@ -385,6 +402,8 @@ class GeometryGenerator:
                         coords_all[3*i+1], 
                         coords_all[3*i+2]
                     ])
+            # [NOWOŚĆ] Kopia binarna (_nodes.npy) - szybki odczyt w GUI (node_store.py)
+            node_store.zapisz_wezly(nodes_csv, tags_all, coords_all)
             
             # Zapis JSON z grupami
             with open(groups_json, 'w') as f:
@@ -393,6 +412,8 @@ class GeometryGenerator:
             # Zapis .inp i .msh
             gmsh.write(path_inp)
             gmsh.write(path_msh)
+            self._mark(timings, "mesh_write")
+            timings.pop("_t", None)
             
             return {
                 "paths": {
@@ -400,7 +421,11 @@ class GeometryGenerator:
                     "nodes_csv": os.path.abspath(nodes_csv),
                     "groups_json": os.path.abspath(groups_json)
                 },
-                "stats": {"nodes": len(tags_all)}
+                "stats": {
+                    "nodes": len(tags_all), "elements": n_elements,
+                    "support_nodes": len(supp_nodes), "load_nodes": len(load_nodes), "interface_nodes": len(int_nodes)
+                },
+                "timings": timings
             }
             
         except Exception as e:
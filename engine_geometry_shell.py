@@ -5,6 +5,7 @@ import json
 import csv
 import math
 import traceback
+import node_store
 
 class GeometryGeneratorShell:
     def __init__(self, logger_callback=None):
@@ -173,7 +174,8 @@ class GeometryGeneratorShell:
             self._export_node_map(nodes_csv)
 
             return {
-                "paths": {"inp": os.path.abspath(path_inp), "nodes_csv": os.path.abspath(nodes_csv), "groups_json": os.path.abspath(groups_json)},
+                "paths": {"inp": os.path.abspath(path_inp), "msh": os.path.abspath(path_msh),
+                          "nodes_csv": os.path.abspath(nodes_csv), "groups_json": os.path.abspath(groups_json)},
                 "stats": {"nodes": gmsh.model.mesh.getNodes()[0].size}
             }
             
@@ -218,4 +220,5 @@ class GeometryGeneratorShell:
                 w.writerow(["NodeID", "X", "Y", "Z"])
                 for i in range(len(tags)):
                     w.writerow([int(tags[i]), coords[3*i], coords[3*i+1], coords[3*i+2]])
+            node_store.zapisz_wezly(path, tags, coords)
         except: pass
\ No newline at end of file
@@ -1,14 +1,219 @@
-import sympy as sp
 import numpy as np
 import json
 import csv
 import os
 
+import atomic_io
+
+# ==============================================================================
+# TEORIA WŁASOWA - CAŁKOWANIE W POSTACI ZAMKNIĘTEJ
+# ==============================================================================
+# Funkcje wycinkowe (omega) oraz momenty statyczne (Sz, Sy) na prostych odcinkach
+# przekroju są wielomianami w s stopnia <= 2, a całki z ich iloczynów - stopnia <= 4.
+# Wielomian = krotka współczynników (c0, c1, c2, ...) -> c0 + c1*s + c2*s^2 + ...
+# sympy jest potrzebny wyłącznie do weryfikacji (weryfikuj_wlasow_symbolicznie).
+
+def _p_add(*ps):
+    n = max(len(p) for p in ps)
+    return tuple(sum(p[i] for p in ps if i < len(p)) for i in range(n))
+
+def _p_mul(*ps):
+    """Iloczyn wielomianów (liczby traktowane jako wielomiany stałe)."""
+    out = (1.0,)
+    for p in ps:
+        if not isinstance(p, tuple): p = (float(p),)
+        res = [0.0] * (len(out) + len(p) - 1)
+        for i, a in enumerate(out):
+            for j, b in enumerate(p):
+                res[i + j] += a * b
+        out = tuple(res)
+    return out
+
+def _p_eval(p, s):
+    val = 0.0
+    for c in reversed(p): val = val * s + c
+    return val
+
+def _p_pierwotna(p):
+    """Funkcja pierwotna znikająca w zerze: F(s) = całka od 0 do s z p."""
+    return (0.0,) + tuple(c / (i + 1) for i, c in enumerate(p))
+
+def _p_calka(p, a, b):
+    F = _p_pierwotna(p)
+    return _p_eval(F, b) - _p_eval(F, a)
+
+S_POLY = (0.0, 1.0) # s
+
+def _wlasow_wielomiany(g):
+    """
+    Środek ścinania (delta_ys), wycinkowy moment bezwładności (Iw) i funkcje
+    Omega_ss / Sz / Sy w 4 strefach półprzekroju (tok obliczeń jak w analiza.ipynb).
+    """
+    bp, bc, hc, tp = g["bp"], g["bc"], g["hc"], g["tp"]
+    tfc, twc, yc, z_c, Iy = g["tfc"], g["twc"], g["yc"], g["z_c"], g["Iy"]
+    
+    dlugosc_strefy_1 = bp/2 - bc         
+    dlugosc_strefy_2 = bc                
+    dlugosc_strefy_3 = hc - tfc          
+    dlugosc_strefy_4 = bc - twc/2        
+    
+    ramie_pionowe_plaskownik = yc 
+    ramie_pionowe_zakladka = yc - tfc/2
+    ramie_poziome_srodnik = z_c 
+    ramie_pionowe_stopka_dol = (hc + tp) - yc - tfc/2 
+    t_zakladka = tp + tfc
+    
+    # Omega Sc
+    omega_1 = (0.0, ramie_pionowe_plaskownik)
+    Sw_1 = _p_calka(_p_mul(omega_1, S_POLY, tp), 0, dlugosc_strefy_1)
+    
+    omega_2 = (_p_eval(omega_1, dlugosc_strefy_1), ramie_pionowe_zakladka)
+    z_globalne_2 = (dlugosc_strefy_1, 1.0)
+    Sw_2 = _p_calka(_p_mul(omega_2, z_globalne_2, t_zakladka), 0, dlugosc_strefy_2)
+    
+    omega_3 = (_p_eval(omega_2, dlugosc_strefy_2), ramie_poziome_srodnik)
+    Sw_3 = _p_calka(_p_mul(omega_3, ramie_poziome_srodnik * twc), 0, dlugosc_strefy_3)
+    
+    omega_4 = (_p_eval(omega_3, dlugosc_strefy_3), ramie_pionowe_stopka_dol)
+    z_globalne_4 = (z_c, -1.0)
+    Sw_4 = _p_calka(_p_mul(omega_4, z_globalne_4, tfc), 0, dlugosc_strefy_4)
+    
+    # Wyznaczanie Ss
+    Sw_calkowite = 2 * (Sw_1 + Sw_2 + Sw_3 + Sw_4)
+    delta_ys = float(Sw_calkowite / Iy)
+    
+    # Omega Ss
+    omega_ss = {
+        1: _p_add(omega_1, (0.0, -delta_ys)),
+        2: _p_add(omega_2, _p_mul(-delta_ys, z_globalne_2)),
+        3: _p_add(omega_3, (-delta_ys * ramie_poziome_srodnik,)),
+        4: _p_add(omega_4, _p_mul(-delta_ys, z_globalne_4)),
+    }
+    
+    # Iw
+    grubosci = {1: tp, 2: t_zakladka, 3: twc, 4: tfc}
+    dlugosci = {1: dlugosc_strefy_1, 2: dlugosc_strefy_2, 3: dlugosc_strefy_3, 4: dlugosc_strefy_4}
+    Iw = float(2 * sum(_p_calka(_p_mul(omega_ss[k], omega_ss[k], grubosci[k]), 0, dlugosci[k]) for k in (1, 2, 3, 4)))
+    
+    # Momenty statyczne Sz, Sy (całki od początku strefy, narastająco)
+    y_zakl_loc = ((tp*0 + tfc*(tp/2+tfc/2))/(tp+tfc)) - yc
+    Sz = {1: _p_pierwotna((-yc * tp,))}
+    Sz[2] = _p_add((_p_eval(Sz[1], dlugosc_strefy_1),), _p_pierwotna((y_zakl_loc * t_zakladka,)))
+    Sz[3] = _p_add((_p_eval(Sz[2], dlugosc_strefy_2),), _p_pierwotna(_p_mul((-yc, 1.0), twc)))
+    Sz[4] = _p_add((_p_eval(Sz[3], dlugosc_strefy_3),), _p_pierwotna((((hc+tp-tfc/2)-yc) * tfc,)))
+    
+    Sy = {1: _p_pierwotna(_p_mul(S_POLY, tp))}
+    Sy[2] = _p_add((_p_eval(Sy[1], dlugosc_strefy_1),), _p_pierwotna(_p_mul(z_globalne_2, t_zakladka)))
+    Sy[3] = _p_add((_p_eval(Sy[2], dlugosc_strefy_2),), _p_pierwotna((z_c * twc,)))
+    Sy[4] = _p_add((_p_eval(Sy[3], dlugosc_strefy_3),), _p_pierwotna(_p_mul(z_globalne_4, tfc)))
+    
+    def wartosci(strefa, s):
+        return (_p_eval(omega_ss[strefa], s), _p_eval(Sz[strefa], s), _p_eval(Sy[strefa], s))
+    
+    return {"delta_ys": delta_ys, "Iw": Iw, "wartosci": wartosci,
+            "dlugosci": (dlugosc_strefy_1, dlugosc_strefy_2, dlugosc_strefy_3, dlugosc_strefy_4)}
+
+def _wlasow_sympy(g):
+    """Ten sam tok obliczeń w sympy (wersja referencyjna z analiza.ipynb). Import leniwy."""
+    import sympy as sp
+    
+    bp, bc, hc, tp = g["bp"], g["bc"], g["hc"], g["tp"]
+    tfc, twc, yc, z_c, Iy = g["tfc"], g["twc"], g["yc"], g["z_c"], g["Iy"]
+    s_var = sp.symbols('s_var', real=True)
+    
+    dlugosc_strefy_1 = bp/2 - bc         
+    dlugosc_strefy_2 = bc                
+    dlugosc_strefy_3 = hc - tfc          
+    dlugosc_strefy_4 = bc - twc/2        
+    
+    ramie_pionowe_plaskownik = yc 
+    ramie_pionowe_zakladka = yc - tfc/2
+    ramie_poziome_srodnik = z_c 
+    ramie_pionowe_stopka_dol = (hc + tp) - yc - tfc/2 
+    
+    omega_1 = ramie_pionowe_plaskownik * s_var
+    Sw_1 = sp.integrate(omega_1 * s_var * tp, (s_var, 0, dlugosc_strefy_1))
+    omega_koniec_1 = omega_1.subs(s_var, dlugosc_strefy_1)
+    
+    omega_2 = omega_koniec_1 + ramie_pionowe_zakladka * s_var 
+    t_zakladka = tp + tfc
+    z_globalne_2 = dlugosc_strefy_1 + s_var
+    Sw_2 = sp.integrate(omega_2 * z_globalne_2 * t_zakladka, (s_var, 0, dlugosc_strefy_2))
+    omega_naroznik_gora = omega_2.subs(s_var, dlugosc_strefy_2)
+    
+    omega_3 = omega_naroznik_gora + ramie_poziome_srodnik * s_var
+    Sw_3 = sp.integrate(omega_3 * ramie_poziome_srodnik * twc, (s_var, 0, dlugosc_strefy_3))
+    omega_naroznik_dol = omega_3.subs(s_var, dlugosc_strefy_3)
+    
+    omega_4 = omega_naroznik_dol + ramie_pionowe_stopka_dol * s_var
+    z_globalne_4 = z_c - s_var
+    Sw_4 = sp.integrate(omega_4 * z_globalne_4 * tfc, (s_var, 0, dlugosc_strefy_4))
+    
+    Sw_calkowite = 2 * (Sw_1 + Sw_2 + Sw_3 + Sw_4)
+    delta_ys = float(Sw_calkowite / Iy)
+    
+    omega_ss_1 = omega_1 - delta_ys * s_var
+    omega_ss_2 = omega_2 - delta_ys * (dlugosc_strefy_1 + s_var)
+    omega_ss_3 = omega_3 - delta_ys * ramie_poziome_srodnik
+    omega_ss_4 = omega_4 - delta_ys * (z_c - s_var)
+    
+    Iw_1 = sp.integrate(omega_ss_1**2 * tp, (s_var, 0, dlugosc_strefy_1))
+    Iw_2 = sp.integrate(omega_ss_2**2 * t_zakladka, (s_var, 0, dlugosc_strefy_2))
+    Iw_3 = sp.integrate(omega_ss_3**2 * twc, (s_var, 0, dlugosc_strefy_3))
+    Iw_4 = sp.integrate(omega_ss_4**2 * tfc, (s_var, 0, dlugosc_strefy_4))
+    Iw = float(2 * (Iw_1 + Iw_2 + Iw_3 + Iw_4))
+    
+    Sz_func_1 = sp.integrate(-yc * tp, (s_var, 0, s_var))
+    Sz_end_1 = Sz_func_1.subs(s_var, dlugosc_strefy_1)
+    y_zakl_loc = ((tp*0 + tfc*(tp/2+tfc/2))/(tp+tfc)) - yc
+    Sz_func_2 = Sz_end_1 + sp.integrate(y_zakl_loc * t_zakladka, (s_var, 0, s_var))
+    Sz_end_2 = Sz_func_2.subs(s_var, dlugosc_strefy_2)
+    Sz_func_3 = Sz_end_2 + sp.integrate((s_var - yc) * twc, (s_var, 0, s_var))
+    Sz_end_3 = Sz_func_3.subs(s_var, dlugosc_strefy_3)
+    Sz_func_4 = Sz_end_3 + sp.integrate(((hc+tp-tfc/2)-yc) * tfc, (s_var, 0, s_var))
+    
+    Sy_func_1 = sp.integrate(s_var * tp, (s_var, 0, s_var))
+    Sy_end_1 = Sy_func_1.subs(s_var, dlugosc_strefy_1)
+    Sy_func_2 = Sy_end_1 + sp.integrate((dlugosc_strefy_1 + s_var) * t_zakladka, (s_var, 0, s_var))
+    Sy_end_2 = Sy_func_2.subs(s_var, dlugosc_strefy_2)
+    Sy_func_3 = Sy_end_2 + sp.integrate(z_c * twc, (s_var, 0, s_var))
+    Sy_end_3 = Sy_func_3.subs(s_var, dlugosc_strefy_3)
+    Sy_func_4 = Sy_end_3 + sp.integrate((z_c - s_var) * tfc, (s_var, 0, s_var))
+    
+    funkcje = {1: (omega_ss_1, Sz_func_1, Sy_func_1), 2: (omega_ss_2, Sz_func_2, Sy_func_2),
+               3: (omega_ss_3, Sz_func_3, Sy_func_3), 4: (omega_ss_4, Sz_func_4, Sy_func_4)}
+    
+    def wartosci(strefa, s):
+        return tuple(float(sp.sympify(f).subs(s_var, s)) for f in funkcje[strefa])
+    
+    return {"delta_ys": delta_ys, "Iw": Iw, "wartosci": wartosci,
+            "dlugosci": (dlugosc_strefy_1, dlugosc_strefy_2, dlugosc_strefy_3, dlugosc_strefy_4)}
+
+def weryfikuj_wlasow_symbolicznie(geo_wlasow, wlasow, punkty, tolerancja=1e-9):
+    """
+    Porównanie wyników zamkniętych (wielomiany) z sympy.
+    punkty: lista (strefa, s). Zwraca {Max_Rel_Diff, Zgodnosc, Czas_s}.
+    """
+    import time
+    t0 = time.perf_counter()
+    ref = _wlasow_sympy(geo_wlasow)
+    pary = [(wlasow["delta_ys"], ref["delta_ys"]), (wlasow["Iw"], ref["Iw"])]
+    for strefa, s in punkty:
+        pary.extend(zip(wlasow["wartosci"](strefa, s), ref["wartosci"](strefa, s)))
+    
+    max_rel = 0.0
+    for a, b in pary:
+        skala = max(abs(a), abs(b), 1e-12)
+        max_rel = max(max_rel, abs(a - b) / skala)
+    return {"Max_Rel_Diff": max_rel, "Zgodnosc": max_rel <= tolerancja,
+            "Czas_s": time.perf_counter() - t0}
+
 # ==============================================================================
 # GŁÓWNY SILNIK OBLICZENIOWY (SOLVER ANALITYCZNY)
 # ==============================================================================
 
-def analizuj_przekroj_pelna_dokladnosc(upe_data, geo_data, load_data, safety_data, custom_probes_coords=None):
+def analizuj_przekroj_pelna_dokladnosc(upe_data, geo_data, load_data, safety_data, custom_probes_coords=None,
+                                       weryfikacja_symboliczna=False):
     """
     Wykonuje PEŁNĄ analizę wytrzymałościowo-statecznościową zgodnie z Teorią Własowa.
     Odwzorowuje matematykę zawartą w pliku analiza.ipynb bez uproszczeń.
@@ -16,6 +221,11 @@ def analizuj_przekroj_pelna_dokladnosc(upe_data, geo_data, load_data, safety_dat
     Poprawka v4.2:
     - Rozdzielenie UR na Stateczność (Buckling) i Wytrzymałość (Stress/SGN).
     - Ostateczne UR to max(UR_Stab, UR_Stress).
+    
+    Poprawka v4.3:
+    - Całki Własowa liczone w postaci zamkniętej (bez sympy na ścieżce obliczeń).
+    - weryfikacja_symboliczna=True: dodatkowy przebieg w sympy i porównanie
+      (wynik w kluczu "Weryfikacja").
     """
     
     # ==========================================================================
@@ -114,56 +324,18 @@ def analizuj_przekroj_pelna_dokladnosc(upe_data, geo_data, load_data, safety_dat
     klasa_przekroju = max(klasa_web, klasa_flange)
 
     # ==========================================================================
-    # 4. TEORIA WŁASOWA - CAŁKOWANIE SYMBOLICZNE
+    # 4-5. TEORIA WŁASOWA (Sw, Ss, Iw) I MOMENTY STATYCZNE (Sz, Sy)
     # ==========================================================================
-    s_var = sp.symbols('s_var', real=True)
-    
-    dlugosc_strefy_1 = bp/2 - bc         
-    dlugosc_strefy_2 = bc                
-    dlugosc_strefy_3 = hc - tfc          
-    dlugosc_strefy_4 = bc - twc/2        
-    
-    ramie_pionowe_plaskownik = yc 
-    ramie_pionowe_zakladka = yc - tfc/2
-    ramie_poziome_srodnik = z_c 
-    ramie_pionowe_stopka_dol = (hc + tp) - yc - tfc/2 
-    
-    # Omega Sc
-    omega_1 = ramie_pionowe_plaskownik * s_var
-    Sw_1 = sp.integrate(omega_1 * s_var * tp, (s_var, 0, dlugosc_strefy_1))
-    omega_koniec_1 = omega_1.subs(s_var, dlugosc_strefy_1)
-    
-    omega_2 = omega_koniec_1 + ramie_pionowe_zakladka * s_var 
-    t_zakladka = tp + tfc
-    z_globalne_2 = dlugosc_strefy_1 + s_var
-    Sw_2 = sp.integrate(omega_2 * z_globalne_2 * t_zakladka, (s_var, 0, dlugosc_strefy_2))
-    omega_naroznik_gora = omega_2.subs(s_var, dlugosc_strefy_2)
-    
-    omega_3 = omega_naroznik_gora + ramie_poziome_srodnik * s_var
-    Sw_3 = sp.integrate(omega_3 * ramie_poziome_srodnik * twc, (s_var, 0, dlugosc_strefy_3))
-    omega_naroznik_dol = omega_3.subs(s_var, dlugosc_strefy_3)
-    
-    omega_4 = omega_naroznik_dol + ramie_pionowe_stopka_dol * s_var
-    z_globalne_4 = z_c - s_var
-    Sw_4 = sp.integrate(omega_4 * z_globalne_4 * tfc, (s_var, 0, dlugosc_strefy_4))
-    
-    # Wyznaczanie Ss
-    Sw_calkowite = 2 * (Sw_1 + Sw_2 + Sw_3 + Sw_4)
-    delta_ys = float(Sw_calkowite / Iy)
+    # Całkowanie w postaci zamkniętej (wielomiany w s) - bez sympy.
+    # Opcjonalna weryfikacja tym samym tokiem obliczeń w sympy (import leniwy).
+    geo_wlasow = {"bp": bp, "bc": bc, "hc": hc, "tp": tp, "tfc": tfc, "twc": twc,
+                  "yc": yc, "z_c": z_c, "Iy": Iy}
+    wlasow = _wlasow_wielomiany(geo_wlasow)
+    delta_ys = wlasow["delta_ys"]
+    Iw = wlasow["Iw"]
     ys_val = yc - delta_ys 
-    
-    # Omega Ss
-    omega_ss_1 = omega_1 - delta_ys * s_var
-    omega_ss_2 = omega_2 - delta_ys * (dlugosc_strefy_1 + s_var)
-    omega_ss_3 = omega_3 - delta_ys * ramie_poziome_srodnik
-    omega_ss_4 = omega_4 - delta_ys * (z_c - s_var)
-    
-    # Iw
-    Iw_1 = sp.integrate(omega_ss_1**2 * tp, (s_var, 0, dlugosc_strefy_1))
-    Iw_2 = sp.integrate(omega_ss_2**2 * t_zakladka, (s_var, 0, dlugosc_strefy_2))
-    Iw_3 = sp.integrate(omega_ss_3**2 * twc, (s_var, 0, dlugosc_strefy_3))
-    Iw_4 = sp.integrate(omega_ss_4**2 * tfc, (s_var, 0, dlugosc_strefy_4))
-    Iw = float(2 * (Iw_1 + Iw_2 + Iw_3 + Iw_4))
+    dlugosc_strefy_1, dlugosc_strefy_2, dlugosc_strefy_3, dlugosc_strefy_4 = wlasow["dlugosci"]
+    wartosci_punktu = wlasow["wartosci"] # (strefa, s) -> (omega_ss, Sz, Sy)
     
     # Ip, io, It
     Ip = Iy + Izc + Acal * delta_ys**2
@@ -173,32 +345,6 @@ def analizuj_przekroj_pelna_dokladnosc(upe_data, geo_data, load_data, safety_dat
     cf_flat = bc - twc - rc
     It = (1/3) * (bp * tp**3) + 2 * ((1/3) * (cw_flat * twc**3 + 2 * cf_flat * tfc**3))
 
-    # ==========================================================================
-    # 5. MOMENTY STATYCZNE (Sz, Sy)
-    # ==========================================================================
-    Sz_func_1 = sp.integrate(-yc * tp, (s_var, 0, s_var))
-    Sz_end_1 = Sz_func_1.subs(s_var, dlugosc_strefy_1)
-    
-    y_zakl_loc = ((tp*0 + tfc*(tp/2+tfc/2))/(tp+tfc)) - yc
-    Sz_func_2 = Sz_end_1 + sp.integrate(y_zakl_loc * t_zakladka, (s_var, 0, s_var))
-    Sz_end_2 = Sz_func_2.subs(s_var, dlugosc_strefy_2)
-    
-    Sz_func_3 = Sz_end_2 + sp.integrate((s_var - yc) * twc, (s_var, 0, s_var))
-    Sz_end_3 = Sz_func_3.subs(s_var, dlugosc_strefy_3)
-    
-    Sz_func_4 = Sz_end_3 + sp.integrate(((hc+tp-tfc/2)-yc) * tfc, (s_var, 0, s_var))
-    
-    Sy_func_1 = sp.integrate(s_var * tp, (s_var, 0, s_var))
-    Sy_end_1 = Sy_func_1.subs(s_var, dlugosc_strefy_1)
-    
-    Sy_func_2 = Sy_end_1 + sp.integrate((dlugosc_strefy_1 + s_var) * t_zakladka, (s_var, 0, s_var))
-    Sy_end_2 = Sy_func_2.subs(s_var, dlugosc_strefy_2)
-    
-    Sy_func_3 = Sy_end_2 + sp.integrate(z_c * twc, (s_var, 0, s_var))
-    Sy_end_3 = Sy_func_3.subs(s_var, dlugosc_strefy_3)
-    
-    Sy_func_4 = Sy_end_3 + sp.integrate((z_c - s_var) * tfc, (s_var, 0, s_var))
-
     # ==========================================================================
     # 6. SIŁY WEWNĘTRZNE I BIMOMENT
     # ==========================================================================
@@ -287,15 +433,15 @@ def analizuj_przekroj_pelna_dokladnosc(upe_data, geo_data, load_data, safety_dat
     # 10. ANALIZA SZCZEGÓŁOWA PUNKTÓW (P1..P6 + CUSTOM)
     # ==========================================================================
     
-    # Lista standardowa (z definicją funkcji Omega)
-    # Format: (Opis, Y_glob, Z_glob, Grubosc, Func_Omega, Func_Sz, Func_Sy, S_val)
+    # Lista standardowa (funkcje Omega / Sz / Sy ze strefy przekroju)
+    # Format: (Opis, Y_glob, Z_glob, Grubosc, Strefa, S_val)
     punkty_def = [
-        ("P1 (Środek Płaskownika)", 0, 0, tp, omega_ss_1, Sz_func_1, Sy_func_1, 0),
-        ("P2 (Koniec Nakładki)", 0, dlugosc_strefy_1, tp, omega_ss_1, Sz_func_1, Sy_func_1, dlugosc_strefy_1),
-        ("P3 (Górne Naroże)", 0, z_c, twc, omega_ss_2, Sz_func_2, Sy_func_2, dlugosc_strefy_2),
-        ("P4 (Środek Środnika)", yc, z_c, twc, omega_ss_3, Sz_func_3, Sy_func_3, yc),
-        ("P5 (Dolne Naroże)", hc+tp-tfc, z_c, tfc, omega_ss_3, Sz_func_3, Sy_func_3, dlugosc_strefy_3),
-        ("P6 (Koniec Dolnej Półki)", hc+tp-tfc, z_c-z_f, tfc, omega_ss_4, Sz_func_4, Sy_func_4, dlugosc_strefy_4)
+        ("P1 (Środek Płaskownika)", 0, 0, tp, 1, 0),
+        ("P2 (Koniec Nakładki)", 0, dlugosc_strefy_1, tp, 1, dlugosc_strefy_1),
+        ("P3 (Górne Naroże)", 0, z_c, twc, 2, dlugosc_strefy_2),
+        ("P4 (Środek Środnika)", yc, z_c, twc, 3, yc),
+        ("P5 (Dolne Naroże)", hc+tp-tfc, z_c, tfc, 3, dlugosc_strefy_3),
+        ("P6 (Koniec Dolnej Półki)", hc+tp-tfc, z_c-z_f, tfc, 4, dlugosc_strefy_4)
     ]
     
     lista_wynikow = []
@@ -303,19 +449,17 @@ def analizuj_przekroj_pelna_dokladnosc(upe_data, geo_data, load_data, safety_dat
     punkt_krytyczny = ""
     
     # Nośność Mw dla punktu najbardziej oddalonego (P6)
-    omega_P6 = float(abs(omega_ss_4.subs(s_var, dlugosc_strefy_4)))
+    omega_P6 = abs(wartosci_punktu(4, dlugosc_strefy_4)[0])
     if omega_P6 > 1e-6:
         Mw_Rd_stab_P6 = (Iw / omega_P6) * Mw_Rd_base
     else:
         Mw_Rd_stab_P6 = Mw_Rd_base
 
     # Pętla po punktach standardowych
-    for opis, y_g, z_g, t_sc, func_om, func_Sz, func_Sy, s_val in punkty_def:
+    for opis, y_g, z_g, t_sc, strefa, s_val in punkty_def:
         y_loc = y_g - yc
         z_loc = z_g
-        omega_val = float(func_om.subs(s_var, s_val))
-        Sz_val = float(func_Sz.subs(s_var, s_val))
-        Sy_val = float(func_Sy.subs(s_var, s_val))
+        omega_val, Sz_val, Sy_val = wartosci_punktu(strefa, s_val)
         
         sig_N = F_N / Acal
         sig_Mz = (Mgz / Izc) * y_loc
@@ -385,7 +529,7 @@ def analizuj_przekroj_pelna_dokladnosc(upe_data, geo_data, load_data, safety_dat
     # Zatem wytężenie całkowite to MAKSIMUM z obu wytężeń.
     UR_final = max(UR_stab, UR_stress)
 
-    return {
+    wyniki = {
         "Wskazniki": {
             "UR": float(UR_final),         # Główny wskaźnik dla Optymalizatora
             "UR_Stab": float(UR_stab),     # Wskaźnik stateczności (do raportu)
@@ -429,6 +573,11 @@ def analizuj_przekroj_pelna_dokladnosc(upe_data, geo_data, load_data, safety_dat
         "Detale_Punktow": lista_wynikow
     }
 
+    if weryfikacja_symboliczna:
+        wyniki["Weryfikacja"] = weryfikuj_wlasow_symbolicznie(geo_wlasow, wlasow,
+                                                             [(p[4], p[5]) for p in punkty_def])
+    return wyniki
+
 # ==========================================================================
 # NARZĘDZIA POMOCNICZE
 # ==========================================================================
@@ -571,7 +720,7 @@ class ZbieraczWynikow:
         naglowki = list(self.lista_wierszy[0].keys())
         
         try:
-            with open(nazwa_pliku, 'w', newline='', encoding='utf-8') as f:
+            with atomic_io.atomic_open(nazwa_pliku, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.DictWriter(f, fieldnames=naglowki)
                 writer.writeheader()
                 writer.writerows(self.lista_wierszy)
@@ -4,15 +4,53 @@ import shutil
 import multiprocessing
 import traceback
 import math
+import time
 import engine_geometry
 import engine_fem
+import telemetry
+import profiling
+import atomic_io
+from pipeline import CandidatePipeline, Stage
+from mesh_convergence import ConvergenceController
+from mesh_warmstart import MeshWarmStartTable
+from solver_watchdog import SolverWatchdog
 
 class FemOptimizer:
-    def __init__(self, router_instance):
+    def __init__(self, router_instance, mesh_pool=None):
         self.router = router_instance
         ccx = self.router.get_ccx_path()
         self.fem_engine = engine_fem.FemEngine(ccx_path=ccx)
         self.stop_requested = False
+        # [NOWOŚĆ] Opcjonalna pula procesów Gmsh (mesh_pool.MeshWorkerPool).
+        # Brak puli = siatkowanie w bieżącym procesie (jak dotychczas).
+        self.mesh_pool = mesh_pool
+        self._pipeline = None
+        self._watchdogs = set() # Aktywne nadzory CCX (do przerwania na żądanie)
+        self._telemetry = None
+
+    @property
+    def telemetry(self):
+        """[NOWOŚĆ] Ślad etapów kandydatów (02_MES_Roboczy/_telemetry.jsonl projektu)."""
+        if self._telemetry is None:
+            self._telemetry = telemetry.TelemetryRecorder(self.router.get_path("MES_WORK", telemetry.NAZWA_PLIKU))
+        return self._telemetry
+
+    @staticmethod
+    def settings_for_candidate(candidate_data, fem_settings, log=None):
+        """Ustawienia kandydata z korektą siatki startowej do najcieńszej ścianki."""
+        thicknesses = []
+        for k in ('Input_UPE_twc', 'Input_UPE_tfc', 'Input_Geo_tp'):
+            if k in candidate_data: thicknesses.append(float(candidate_data[k]))
+        
+        local_settings = fem_settings.copy()
+        
+        if thicknesses:
+            min_t = min(thicknesses)
+            user_mesh = float(local_settings.get('mesh_start_size', 15.0))
+            if user_mesh > min_t:
+                if log: log(f"   [AUTO-CHECK] Korekta siatki: {min_t} mm")
+                local_settings['mesh_start_size'] = min_t
+        return local_settings
 
     def _parse_gui_float(self, value_str):
         """Bezpiecznie konwertuje string z GUI na float, obsługując puste wartości."""
@@ -23,29 +61,48 @@ class FemOptimizer:
         except (ValueError, TypeError):
             return 0.0
 
-    def run_single_candidate(self, candidate_data, fem_settings, signal_callback=None, interaction_callback=None):
-        """
-        Uruchamia proces optymalizacji (Mesh -> Solve -> Check -> MeshRefine) dla jednego profilu.
-        
-        Dodano interaction_callback: funkcja wywoływana, gdy przekroczony zostanie limit równań.
-        Powinna zwracać: "STOP" lub "ITERATIVE".
-        """
-        # Wrapper do logowania - wysyła sygnał do GUI lub drukuje w konsoli
-        def log(msg): 
-            if signal_callback: signal_callback(msg)
-            else: print(msg)
-
-        # Identyfikacja profilu (Nazwa + Grubość płaskownika)
+    @staticmethod
+    def candidate_id(candidate_data):
+        """Identyfikator kandydata (Nazwa + Grubość i szerokość płaskownika)."""
         prof = candidate_data.get("Nazwa_Profilu", "Unknown")
         tp = float(candidate_data.get("Input_Geo_tp", 10))
         bp = float(candidate_data.get("Input_Geo_bp", 0))
-        cid = f"{prof}_tp{int(tp)}_bp{int(bp)}"
-        
-        max_iter = int(fem_settings.get("max_iterations", 3))
-        tol = float(fem_settings.get("tolerance", 0.02))
-        mesh_fact = float(fem_settings.get("refinement_factor", 0.7))
-        
-        # --- NOWA LOGIKA ROZMIARU SIATKI ---
+        return f"{prof}_tp{int(tp)}_bp{int(bp)}"
+
+    def import_existing(self, candidate_data, log=None):
+        """
+        Wynik kandydata z 03_Final/<cid> (wznowienie batcha: GUI i CLI).
+        Kompletność wg manifestu (zapisywany jako ostatni) - przerwany zapis = None (liczenie od nowa).
+        Folder bez manifestu (starsze projekty): wystarczy poprawny results.json.
+        Zwraca wiersz wyniku (converged = "IMPORTED") lub None.
+        """
+        log = log or (lambda msg: None)
+        cid = self.candidate_id(candidate_data)
+        final_dest = self.router.get_path("FINAL", "", subdir=cid)
+        result_file_path = os.path.join(final_dest, "results.json")
+        if not os.path.exists(result_file_path):
+            return None
+        complete, reason = atomic_io.check_manifest(final_dest)
+        if complete is False:
+            log(f"   [WARN] Wynik {cid} niekompletny ({reason}). Przeliczam ponownie.")
+            return None
+        try:
+            with open(result_file_path, 'r') as f:
+                existing_res = json.load(f)
+        except Exception as e:
+            log(f"   [WARN] Znaleziono wynik, ale nie można go odczytać: {e}. Przeliczam ponownie.")
+            return None
+        return {
+            'id': cid,
+            'profile_name': candidate_data.get('Nazwa_Profilu', 'Unknown'),
+            'iterations': existing_res.get('iterations', 'N/A'),
+            'converged': "IMPORTED",
+            'final_stress': existing_res.get('MODEL_MAX_VM', 0.0),
+            'mesh_path': existing_res.get('mesh_path', None)
+        }
+
+    def _initial_mesh_size(self, candidate_data, fem_settings, log):
+        """Startowy rozmiar siatki [mm] (tryb bezwzględny lub względny do najcieńszej ścianki)."""
         mesh_mode = fem_settings.get("mesh_mode", "absolute")
         start_val = float(fem_settings.get("mesh_start_size", 15.0))
         
@@ -67,36 +124,422 @@ class FemOptimizer:
             
             log(f"[AUTO-MESH] Tryb Względny: Najcieńsza ścianka = {min_t:.2f} mm")
             log(f"[AUTO-MESH] Gęstość zadana = {density} el/gr -> Startowy rozmiar siatki = {curr_mesh:.2f} mm")
-        else:
-            # Tryb klasyczny (Bezwzględny)
-            curr_mesh = start_val
-        
-        # Pobranie limitu równań z ustawień (domyślnie 2 miliony)
-        eq_limit = int(fem_settings.get("eq_limit", 2000000))
+            return curr_mesh
+        # Tryb klasyczny (Bezwzględny)
+        return start_val
 
-        # Flaga wymuszenia solvera iteracyjnego
-        force_iterative = False
-        
-        # Parametry v3.0 (Strefy i Sondy)
-        fem_loads_settings = fem_settings.get("fem_loads", {})
-        ref_zones = fem_settings.get("refinement_zones", [])
-        cust_probes = fem_settings.get("custom_probes", {})
+    def _warm_start_table(self, fem_settings, log):
+        """Tabela warm-start projektu (tylko gdy włączona w ustawieniach)."""
+        if not fem_settings.get("warm_start", False): return None
+        try: return MeshWarmStartTable(self.router, analysis="solid", logger_callback=log)
+        except Exception as e:
+            log(f"  ! Warm-start niedostępny: {e}")
+            return None
+
+    def _apply_warm_start(self, table, candidate_data, fem_settings, curr_mesh, log):
+        """Zastępuje startowy rozmiar siatki przewidywaniem z tabeli (jeśli jest)."""
+        if table is None: return curr_mesh, False
+        pred = table.predict(candidate_data, int(fem_settings.get("mesh_order", 1)))
+        if not pred: return curr_mesh, False
+        pred = max(1.0, pred)
+        log(f"[WARM-START] Przewidywana siatka z poprzednich kandydatów: {pred:.2f} mm (zamiast {curr_mesh:.2f} mm)")
+        return pred, True
 
-        # [NOWOŚĆ] Dynamiczne wyznaczanie Y_ref dla tego kandydata
+    def _resolve_y_ref(self, candidate_data, fem_loads_settings):
+        """[NOWOŚĆ] Dynamiczne wyznaczanie Y_ref dla tego kandydata."""
         yc_ref_mode = fem_loads_settings.get("yc_ref_mode", 1)
         yc_ref_manual_val_str = fem_loads_settings.get("yc_ref_manual_value", "0.0")
         if yc_ref_mode == 0: # Manual
-            y_ref = self._parse_gui_float(yc_ref_manual_val_str)
+            return self._parse_gui_float(yc_ref_manual_val_str)
         elif yc_ref_mode == 1: # Ramię (z analityki)
-            y_ref = float(candidate_data.get("Input_Load_F_promien", 0.0))
+            return float(candidate_data.get("Input_Load_F_promien", 0.0))
         elif yc_ref_mode == 2: # Środek ciężkości (z analityki)
-            y_ref = float(candidate_data.get("Res_Geo_Yc", 0.0))
-        else: # Fallback
-            y_ref = float(candidate_data.get("Input_Load_F_promien", 0.0))
+            return float(candidate_data.get("Res_Geo_Yc", 0.0))
+        # Fallback
+        return float(candidate_data.get("Input_Load_F_promien", 0.0))
+
+    def _prepare_work_dir(self, cid, iter_name, candidate_data, log):
+        """Tworzy folder iteracji w MES_WORK i zapisuje w nim dane analityczne."""
+        work_dir = self.router.get_path("MES_WORK", iter_name, subdir=cid)
+
+        # Folder z poprzedniego przebiegu: pliki mogą być dowiązane w 03_Final -
+        # zapis w miejscu zmieniłby zarchiwizowany wynik, więc usuwamy stare pliki
+        if os.path.isdir(work_dir):
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        # --- [FIX] Upewnij się, że folder istnieje PRZED zapisem JSON ---
+        if not os.path.exists(work_dir):
+            try: os.makedirs(work_dir, exist_ok=True)
+            except: pass
+
+        # === [NOWOŚĆ] Zapis danych analitycznych do folderu roboczego ===
+        try:
+            atomic_io.write_json(os.path.join(work_dir, "analytical.json"), candidate_data)
+        except Exception as e:
+            log(f"  ! Ostrzeżenie: Nie udało się zapisać analytical.json: {e}")
+        return work_dir
+
+    def build_geometry_params(self, candidate_data, fem_settings, work_dir, model_name, mesh_size):
+        """Słownik parametrów dla GeometryGenerator.generate_model (także dla puli procesów)."""
+        return {
+            "output_dir": work_dir,
+            "model_name": model_name,
+            "length": float(candidate_data.get("Input_Load_L", 1500)),
+            "profile_data": {
+                "hc": float(candidate_data.get("Input_UPE_hc", 200)),
+                "bc": float(candidate_data.get("Input_UPE_bc", 80)),
+                "twc": float(candidate_data.get("Input_UPE_twc", 6)),
+                "tfc": float(candidate_data.get("Input_UPE_tfc", 11)),
+                "rc": float(candidate_data.get("Input_UPE_rc", 10))
+            },
+            "plate_data": {
+                "tp": float(candidate_data.get("Input_Geo_tp", 10)), 
+                "bp": float(candidate_data.get("Input_Geo_bp", 300))
+            },
+            "mesh_size": {
+                "global": mesh_size, 
+                "fillet": max(1.0, mesh_size * 0.4), 
+                "order": int(fem_settings.get("mesh_order", 1))
+            },
+            "mesh_quality": {"algorithm_3d": 1},
+            "system_resources": {"num_threads": int(fem_settings.get("cores_mesh", 4))},
+            "refinement_zones": fem_settings.get("refinement_zones", [])
+        }
+
+    def _generate_mesh(self, g_params, log, cid=None, iteration=None):
+        """Generuje geometrię i siatkę (w puli procesów, jeśli jest dostępna)."""
+        t0 = time.perf_counter()
+        try:
+            if self.mesh_pool is not None:
+                meta = self.mesh_pool.generate(g_params, kind="solid", log_callback=log)
+            else:
+                gen = engine_geometry.GeometryGenerator(logger_callback=log)
+                meta = gen.generate_model(g_params)
+        except Exception as e:
+            log(f"  ! Wyjątek w generatorze geometrii: {e}")
+            meta = None
+        self._mesh_telemetry(cid, iteration, meta, time.perf_counter() - t0)
+        return meta
 
-        # Zasoby (Rdzenie)
-        c_mesh = int(fem_settings.get("cores_mesh", 4))
-        c_solv = int(fem_settings.get("cores_solver", 4))
+    def _mesh_telemetry(self, cid, iteration, meta, wall_s):
+        """Zdarzenia geometry / mesh / groups / mesh_write z czasów zmierzonych w generatorze."""
+        tel = self.telemetry
+        stats = (meta or {}).get("stats", {})
+        timings = (meta or {}).get("timings")
+        if not timings:
+            # Brak meta (błąd) lub generator bez pomiaru etapów - jedno zdarzenie
+            tel.zdarzenie("mesh", cid, wall_s, iter=iteration, ok=bool(meta), nodes=stats.get("nodes"))
+            return
+        paths = meta.get("paths", {})
+        extra = {
+            "mesh": {"nodes": stats.get("nodes"), "elements": stats.get("elements"),
+                     "equations_est": (stats.get("nodes") or 0) * 3},
+            "groups": {k: stats.get(k) for k in ("support_nodes", "load_nodes", "interface_nodes")},
+            "mesh_write": {"files": telemetry.rozmiary_plikow([
+                paths.get("inp"), paths.get("nodes_csv"), paths.get("groups_json"),
+                os.path.splitext(paths.get("inp", ""))[0] + ".msh"])},
+        }
+        for stage, t in timings.items():
+            tel.zdarzenie(stage, cid, t["wall_s"], t.get("cpu_s"), iter=iteration,
+                          worker_pid=stats.get("worker_pid"), **extra.get(stage, {}))
+
+    def build_run_params(self, candidate_data, fem_settings, g_params, y_ref, solver_type, log):
+        """Obciążenia, materiał i opcje decku CCX dla danego kandydata."""
+        fem_loads_settings = fem_settings.get("fem_loads", {})
+
+        # --- [NOWOŚĆ] Przetwarzanie obciążeń z GUI ---
+        loads_ctx = {
+            "L": float(candidate_data.get("Input_Load_L", 1500)),
+            "Yc": float(candidate_data.get("Res_Geo_Yc", 0.0)),
+            "Ys": float(candidate_data.get("Res_Geo_Ys", 0.0)),
+            "math": math,
+            "Y_ref": y_ref # Używamy dynamicznie wyliczonej wartości
+        }
+
+        # --- [POPRAWKA] Logika pobierania sił z uwzględnieniem checkboxów "Z analityki" ---
+        fx_settings = fem_loads_settings.get("fx", {})
+        if fx_settings.get("use_ana", True):
+            fx_val = -float(candidate_data.get("Input_Load_Fx", 0.0))
+        else:
+            fx_val = self._parse_gui_float(fx_settings.get("value", "0.0"))
+        loads_ctx["Fx"] = fx_val
+
+        fy_settings = fem_loads_settings.get("fy", {})
+        if fy_settings.get("use_ana", True):
+            fy_val = float(candidate_data.get("Res_Force_Fy_Ed", 0.0))
+        else:
+            fy_val = self._parse_gui_float(fy_settings.get("value", "0.0"))
+        loads_ctx["Fy"] = fy_val
+
+        fz_settings = fem_loads_settings.get("fz", {})
+        if fz_settings.get("use_ana", True):
+            fz_val = float(candidate_data.get("Res_Force_Fz_Ed", 0.0))
+        else:
+            fz_val = self._parse_gui_float(fz_settings.get("value", "0.0"))
+        loads_ctx["Fz"] = fz_val
+
+        # Momenty (eval)
+        def eval_expr(expr, context):
+            """Bezpiecznie ewaluuje wyrażenie matematyczne."""
+            if not expr or not str(expr).strip():
+                return 0.0
+            try:
+                return float(eval(str(expr), {"__builtins__": None}, context))
+            except Exception as e:
+                log(f"  ! Błąd ewaluacji wyrażenia '{expr}': {e}")
+                return 0.0
+
+        mx_val = eval_expr(fem_loads_settings.get("mx_expr"), loads_ctx)
+        my_val = eval_expr(fem_loads_settings.get("my_expr"), loads_ctx)
+        mz_val = eval_expr(fem_loads_settings.get("mz_expr"), loads_ctx)
+
+        log(f"   [FIZYKA] Obciążenia FEM: Y_ref={y_ref:.2f}, Fx={fx_val:.1f}, Fy={fy_val:.1f}, Fz={fz_val:.1f}")
+        log(f"   [FIZYKA] Momenty FEM: Mx={mx_val:.1f}, My={my_val:.1f}, Mz={mz_val:.1f}")
+
+        try:
+            e_mod = float(candidate_data["Input_Load_E"])
+            g_mod = float(candidate_data["Input_Load_G"])
+        except KeyError as e:
+            raise ValueError(f"Brak kluczowych danych materiałowych w kandydacie: {e}")
+
+        if g_mod > 1.0 and e_mod > 1.0:
+            nu_val = (e_mod / (2.0 * g_mod)) - 1.0
+            if not (0.0 < nu_val < 0.5):
+                raise ValueError(f"Wyliczony wsp. Poissona ({nu_val:.3f}) jest nieprawidłowy.")
+        else:
+            raise ValueError(f"Wartości E ({e_mod}) lub G ({g_mod}) są nieprawidłowe.")
+
+        return {
+            "E": e_mod,
+            "nu": nu_val,
+            "Fx": fx_val,
+            "Fy": fy_val,
+            "Fz": fz_val,
+            "Mx": mx_val,
+            "My": my_val,
+            "Mz": mz_val,
+            "Length": g_params["length"],
+            "Y_ref_node": y_ref,
+            "profile_data": g_params["profile_data"],
+            "plate_data": g_params["plate_data"],
+            "custom_probes": fem_settings.get("custom_probes", {}),
+            "step": float(fem_settings.get("step", 50.0)),
+            "solver_type": solver_type
+        }
+
+    def _new_watchdog(self, fem_settings):
+        """Nadzór CCX: limit czasu [min] i RAM [GB] z ustawień (0 = brak limitu)."""
+        timeout_s = float(fem_settings.get("solver_timeout_min", 0) or 0) * 60.0
+        max_rss_mb = float(fem_settings.get("solver_max_ram_gb", 0) or 0) * 1024.0
+        wd = SolverWatchdog(timeout_s=timeout_s or None, max_rss_mb=max_rss_mb or None)
+        self._watchdogs.add(wd)
+        if self.stop_requested: wd.request_stop()
+        return wd
+
+    def _run_solver_guarded(self, engine, run_inp, work_dir, fem_settings, log, cid=None, iteration=None, solver_type=None):
+        """run_solver pod nadzorem + zdarzenie telemetrii 'solve' (równania, RSS i CPU CCX)."""
+        with self.telemetry.etap("solve", cid, iter=iteration, solver=solver_type) as ev:
+            cpu0 = telemetry.cpu_potomnych_s()
+            ok = self._run_solver_watched(engine, run_inp, work_dir, fem_settings, log)
+            cpu1 = telemetry.cpu_potomnych_s()
+            ev["ok"] = bool(ok)
+            if cpu0 is not None:
+                # Procesy potomne całego programu - przybliżenie, gdy solvery pracują równolegle
+                ev["cpu_solver_s"] = round(cpu1 - cpu0, 2)
+            run = getattr(engine, "last_run", None)
+            if run is not None:
+                ev.update({"status": run.status, "equations": run.equations,
+                           "solver_elapsed_s": round(run.elapsed_s, 2), "solver_peak_rss_mb": round(run.peak_rss_mb, 1)})
+            base = os.path.splitext(run_inp)[0]
+            ev["files"] = telemetry.rozmiary_plikow([base + ".dat", base + ".frd"])
+        return ok
+
+    def _run_solver_watched(self, engine, run_inp, work_dir, fem_settings, log):
+        """run_solver pod nadzorem + zdarzenia postępu do panelu statusu."""
+        wd = self._new_watchdog(fem_settings)
+        last_ram = [0.0]
+
+        def on_event(ev):
+            typ = ev["type"]
+            if typ == "memory" and abs(ev["rss_mb"] - last_ram[0]) > 50.0:
+                last_ram[0] = ev["rss_mb"]
+                log(f"||| [RAM: {ev['rss_mb']/1024.0:.2f} GB (max {ev['peak_mb']/1024.0:.2f} GB)]")
+            elif typ == "equations":
+                log(f"||| [Układ Równań: {ev['equations']:,}]".replace(',', ' '))
+
+        try:
+            return engine.run_solver(
+                run_inp, work_dir,
+                num_threads=int(fem_settings.get("cores_solver", 4)),
+                callback=log, event_callback=on_event, watchdog=wd
+            )
+        finally:
+            self._watchdogs.discard(wd)
+
+    def _write_failed_record(self, cid, work_dir, engine, stage, reason, log):
+        """Zapis rekordu nieudanego kandydata (failed.json w folderze iteracji)."""
+        record = {"id": cid, "stage": stage, "reason": reason}
+        run = getattr(engine, "last_run", None) if engine is not None else None
+        if run is not None:
+            record["solver"] = run.as_dict()
+            record["reason"] = run.reason or reason
+        try:
+            atomic_io.write_json(os.path.join(work_dir, "failed.json"), record)
+        except Exception as e:
+            log(f"  ! Nie udało się zapisać failed.json: {e}")
+        return record
+
+    def _log_result_summary(self, res, log):
+        vm = res.get("MODEL_MAX_VM", 0.0)
+        buckling = res.get("BUCKLING_FACTORS", [])
+        
+        log(f"  Max VM: {vm:.2f} MPa")
+        if buckling:
+            log(f"  Buckling Factors: {buckling}")
+        
+        if "INTERFACE_MAX_SHEAR" in res:
+            tau_max = res["INTERFACE_MAX_SHEAR"]
+            log(f"  Max Shear Interface: {tau_max:.2f} MPa")
+
+    def _archive_final(self, cid, final_path, log):
+        """
+        Archiwizuje wynik zbieżnej iteracji w 03_Final/<cid>.
+        [NOWOŚĆ] Zamiast copytree: tylko artefakty potrzebne dalej (routing.ARCHIVE_PATTERNS)
+        jako dowiązania twarde (kopia, gdy dowiązanie niemożliwe), podmiana folderu przez rename.
+        Pozostałe pliki iteracji zostają w 02_MES_Roboczy.
+        """
+        with self.telemetry.etap("archive", cid) as ev:
+            final_dest = os.path.join(self.router.get_path("FINAL", ""), cid)
+            ev["ok"] = False
+            if final_path and os.path.exists(final_path):
+                try:
+                    final_dest, stats = self.router.archive_directory(final_path, cid)
+                    log(f"  > Wyniki zarchiwizowane w: {final_dest} "
+                        f"(dowiązania: {stats['link']}, kopie: {stats['copy']})")
+                    ev["ok"] = True
+                    ev.update(stats)
+                    ev["files"] = telemetry.rozmiary_plikow([final_dest])
+                except Exception as e:
+                    log(f"  ! Błąd archiwizacji do FINAL: {e}")
+            elif os.path.isdir(final_dest):
+                # Brak nowego wyniku - nie zostawiamy wyniku z poprzedniego przebiegu
+                shutil.rmtree(final_dest, ignore_errors=True)
+        return final_dest
+
+    def _apply_retention(self, cid, final_path, fem_settings, log):
+        """
+        [NOWOŚĆ] Retencja folderów iteracji kandydata (ProjectRouting.apply_retention).
+        fem_settings["retention"]: {"keep_last", "slim", "compress", "compress_min_mb"}.
+        """
+        policy = fem_settings.get("retention") or {}
+        if not policy:
+            return
+        self.router.set_retention(**policy)
+        with self.telemetry.etap("retention", cid) as ev:
+            work_root = os.path.join(self.router.get_path("MES_WORK", ""), cid)
+            out = self.router.apply_retention(work_root, keep_dirs=[final_path])
+            ev.update(out)
+        if out["freed_bytes"] > 0:
+            log(f"  > Retencja: odchudzono {out['slimmed']}, usunięto {out['removed']} iteracji "
+                f"(zwolniono {out['freed_bytes'] / 2**20:.1f} MB)")
+
+    def retention_report(self, log):
+        """Koniec batcha: czeka na kompresję w tle i loguje podsumowanie retencji."""
+        self.router.wait_compression()
+        report = self.router.retention_report()
+        if report:
+            log(f"\n>>> {report}")
+        self.router.reset_retention_stats()
+
+    def _parse_results(self, engine, dat_file, cid, iteration):
+        """parse_dat_results + zdarzenie telemetrii 'parse'."""
+        with self.telemetry.etap("parse", cid, iter=iteration) as ev:
+            ev["files"] = telemetry.rozmiary_plikow([dat_file])
+            res = engine.parse_dat_results(dat_file)
+            ev["nodes"] = len(res.get("FULL_NODAL_RESULTS", {}))
+        return res
+
+    def _write_results_json(self, res, work_dir, cid, iteration, log):
+        """Zapis results.json + zdarzenie telemetrii 'json'."""
+        path = os.path.join(work_dir, "results.json")
+        with self.telemetry.etap("json", cid, iter=iteration) as ev:
+            try:
+                atomic_io.write_json(path, res)
+                ev["files"] = telemetry.rozmiary_plikow([path])
+            except Exception as e:
+                ev["ok"] = False
+                ev["error"] = str(e)
+                log(f"  ! Błąd zapisu JSON wyników roboczych: {e}")
+
+    def _deck(self, engine, inp_file, run_p, cid, iteration):
+        """prepare_calculix_deck + zdarzenie telemetrii 'deck'."""
+        with self.telemetry.etap("deck", cid, iter=iteration) as ev:
+            run_inp = engine.prepare_calculix_deck(inp_file, run_p)
+            ev["ok"] = bool(run_inp)
+            if run_inp: ev["files"] = telemetry.rozmiary_plikow([run_inp])
+        return run_inp
+
+    def run_single_candidate(self, candidate_data, fem_settings, signal_callback=None, interaction_callback=None):
+        """
+        Uruchamia proces optymalizacji (Mesh -> Solve -> Check -> MeshRefine) dla jednego profilu.
+        
+        Dodano interaction_callback: funkcja wywoływana, gdy przekroczony zostanie limit równań.
+        Powinna zwracać: "STOP" lub "ITERATIVE".
+        fem_settings["profile"]: "cpu" / "mem" / "cpu+mem" - profil kandydata w 99_Temp (profiling.py).
+        """
+        log = signal_callback or print
+        with profiling.profiluj(self.candidate_id(candidate_data), fem_settings.get("profile"), self.router, log):
+            return self._run_single_candidate(candidate_data, fem_settings, signal_callback, interaction_callback)
+
+    @staticmethod
+    def _limit_decision(interaction_callback, est_equations, last_vm, log):
+        """
+        Decyzja po przekroczeniu limitu równań - wspólna dla trybu sekwencyjnego i potokowego.
+        Zwraca "STOP", "ITERATIVE" lub "DIRECT" (brak callbacku / decyzja nieznana).
+        """
+        if not interaction_callback:
+            return "DIRECT"
+        # Wywołujemy callback GUI i czekamy na odpowiedź
+        decision = interaction_callback(est_equations, last_vm)
+        if decision == "STOP":
+            return "STOP"
+        if decision == "ITERATIVE":
+            log("  ! Decyzja użytkownika: Zmiana na SOLVER ITERACYJNY i kontynuacja.")
+            return "ITERATIVE"
+        log("  ! Decyzja nieznana, kontynuuję ryzyzykownie (Direct)...")
+        return "DIRECT"
+
+    def _run_single_candidate(self, candidate_data, fem_settings, signal_callback=None, interaction_callback=None):
+        # Wrapper do logowania - wysyła sygnał do GUI lub drukuje w konsoli
+        def log(msg): 
+            if signal_callback: signal_callback(msg)
+            else: print(msg)
+
+        # Identyfikacja profilu (Nazwa + Grubość płaskownika)
+        cid = self.candidate_id(candidate_data)
+        
+        max_iter = int(fem_settings.get("max_iterations", 3))
+        tol = float(fem_settings.get("tolerance", 0.02))
+        mesh_fact = float(fem_settings.get("refinement_factor", 0.7))
+        
+        # --- NOWA LOGIKA ROZMIARU SIATKI ---
+        curr_mesh = self._initial_mesh_size(candidate_data, fem_settings, log)
+
+        # [NOWOŚĆ] Warm-start: start od rozmiaru, przy którym zbiegały się podobne profile.
+        # Dalej wystarcza zwykle jeden krok weryfikacyjny (delta < tol).
+        warm_table = self._warm_start_table(fem_settings, log)
+        curr_mesh, warm_started = self._apply_warm_start(warm_table, candidate_data, fem_settings, curr_mesh, log)
+        accurate_mesh = None
+        prev_run_mesh = curr_mesh
+        failure = None
+        
+        # Pobranie limitu równań z ustawień (domyślnie 2 miliony)
+        eq_limit = int(fem_settings.get("eq_limit", 2000000))
+
+        # Flaga wymuszenia solvera iteracyjnego
+        force_iterative = False
+        
+        y_ref = self._resolve_y_ref(candidate_data, fem_settings.get("fem_loads", {}))
 
         # --- LOGIKA STATUSU ZBIEŻNOŚCI ---
         is_batch = (max_iter == 1)
@@ -108,6 +551,16 @@ class FemOptimizer:
         final_path = ""
         final_res = {}
 
+        # [NOWOŚĆ] Sterownik zbieżności (Richardson) - przewiduje kolejną siatkę
+        # i kończy wcześniej, gdy ekstrapolowany błąd mieści się w tolerancji.
+        use_richardson = fem_settings.get("convergence_mode", "richardson") == "richardson"
+        conv = ConvergenceController(
+            tol, refinement_factor=mesh_fact,
+            assumed_order=2.0 if int(fem_settings.get("mesh_order", 1)) == 2 else 1.0,
+            min_size=1.0
+        )
+        est = None
+
         # --- GŁÓWNA PĘTLA OPTYMALIZACJI SIATKI ---
         for i in range(1, max_iter + 1):
             if self.stop_requested: 
@@ -117,20 +570,7 @@ class FemOptimizer:
             mesh_size_of_last_run = curr_mesh
             
             iter_name = f"Iter_{i}_Mesh{curr_mesh:.1f}"
-            work_dir = self.router.get_path("MES_WORK", iter_name, subdir=cid)
-            
-            # --- [FIX] Upewnij się, że folder istnieje PRZED zapisem JSON ---
-            if not os.path.exists(work_dir):
-                try: os.makedirs(work_dir, exist_ok=True)
-                except: pass
-
-            # === [NOWOŚĆ] Zapis danych analitycznych do folderu roboczego ===
-            try:
-                with open(os.path.join(work_dir, "analytical.json"), 'w') as f:
-                    json.dump(candidate_data, f, indent=4)
-            except Exception as e:
-                log(f"  ! Ostrzeżenie: Nie udało się zapisać analytical.json: {e}")
-            # ================================================================
+            work_dir = self._prepare_work_dir(cid, iter_name, candidate_data, log)
 
             # [STATUS LIVE] Natychmiastowa informacja o starcie iteracji
             log(f"> Iteracja {i} (Siatka {curr_mesh:.1f}mm)... ||| [Status: Start Iteracji {i} (Siatka {curr_mesh:.1f}mm)]")
@@ -138,38 +578,10 @@ class FemOptimizer:
             # --- 1. GEOMETRIA ---
             log(f"Generowanie geometrii... ||| [Status: Generowanie Siatki (Gmsh)...]")
             
-            g_params = {
-                "output_dir": work_dir,
-                "model_name": f"Model_I{i}",
-                "length": float(candidate_data.get("Input_Load_L", 1500)),
-                "profile_data": {
-                    "hc": float(candidate_data.get("Input_UPE_hc", 200)),
-                    "bc": float(candidate_data.get("Input_UPE_bc", 80)),
-                    "twc": float(candidate_data.get("Input_UPE_twc", 6)),
-                    "tfc": float(candidate_data.get("Input_UPE_tfc", 11)),
-                    "rc": float(candidate_data.get("Input_UPE_rc", 10))
-                },
-                "plate_data": {
-                    "tp": tp, 
-                    "bp": float(candidate_data.get("Input_Geo_bp", 300))
-                },
-                "mesh_size": {
-                    "global": curr_mesh, 
-                    "fillet": max(1.0, curr_mesh * 0.4), 
-                    "order": int(fem_settings.get("mesh_order", 1))
-                },
-                "mesh_quality": {"algorithm_3d": 1},
-                "system_resources": {"num_threads": c_mesh},
-                "refinement_zones": ref_zones
-            }
+            g_params = self.build_geometry_params(candidate_data, fem_settings, work_dir, f"Model_I{i}", curr_mesh)
             
             # Generowanie modelu
-            try:
-                gen = engine_geometry.GeometryGenerator(logger_callback=log)
-                meta = gen.generate_model(g_params)
-            except Exception as e:
-                log(f"  ! Wyjątek w generatorze geometrii: {e}")
-                meta = None
+            meta = self._generate_mesh(g_params, log, cid, i)
             
             if not meta:
                 log("  ! Błąd generowania geometrii/siatki. Przerywam profil.")
@@ -187,111 +599,24 @@ class FemOptimizer:
             if est_equations > eq_limit and not force_iterative:
                 log(f"  ! LIMIT: Model ma ~{est_equations/1e6:.1f}M równań (Limit: {eq_limit/1e6:.1f}M).")
                 
-                if interaction_callback:
-                    # Wywołujemy callback GUI i czekamy na odpowiedź
-                    decision = interaction_callback(est_equations, last_vm)
-                    
-                    if decision == "STOP":
-                        log("  ! Decyzja użytkownika: STOP. Zatrzymuję na poprzednim wyniku.")
-                        # Przepisujemy poprzedni wynik jako finalny (jeśli istnieje)
-                        if i > 1:
-                            converged = False # Wymuszone zatrzymanie
-                            final_res['note'] = "User stopped at limit"
-                        break
-                        
-                    elif decision == "ITERATIVE":
-                        log("  ! Decyzja użytkownika: Zmiana na SOLVER ITERACYJNY i kontynuacja.")
-                        force_iterative = True
-                    else:
-                        log("  ! Decyzja nieznana, kontynuuję ryzyzykownie (Direct)...")
+                decision = self._limit_decision(interaction_callback, est_equations, last_vm, log)
+                if decision == "STOP":
+                    log("  ! Decyzja użytkownika: STOP. Zatrzymuję na poprzednim wyniku.")
+                    # Przepisujemy poprzedni wynik jako finalny (jeśli istnieje)
+                    if i > 1:
+                        converged = False # Wymuszone zatrzymanie
+                        final_res['note'] = "User stopped at limit"
+                    break
+                force_iterative = decision == "ITERATIVE"
 
             # Wybór solvera do tego przebiegu
             current_solver_type = "ITERATIVE" if force_iterative else "DIRECT"
             
             # --- 2. FEM SOLVER (FIZYKA & MATERIAŁ) ---
-            
-            # --- [NOWOŚĆ] Przetwarzanie obciążeń z GUI ---
-            loads_ctx = {
-                "L": float(candidate_data.get("Input_Load_L", 1500)),
-                "Yc": float(candidate_data.get("Res_Geo_Yc", 0.0)),
-                "Ys": float(candidate_data.get("Res_Geo_Ys", 0.0)),
-                "math": math,
-                "Y_ref": y_ref # Używamy dynamicznie wyliczonej wartości
-            }
-
-            # --- [POPRAWKA] Logika pobierania sił z uwzględnieniem checkboxów "Z analityki" ---
-            fx_settings = fem_loads_settings.get("fx", {})
-            if fx_settings.get("use_ana", True):
-                fx_val = -float(candidate_data.get("Input_Load_Fx", 0.0))
-            else:
-                fx_val = self._parse_gui_float(fx_settings.get("value", "0.0"))
-            loads_ctx["Fx"] = fx_val
-
-            fy_settings = fem_loads_settings.get("fy", {})
-            if fy_settings.get("use_ana", True):
-                fy_val = float(candidate_data.get("Res_Force_Fy_Ed", 0.0))
-            else:
-                fy_val = self._parse_gui_float(fy_settings.get("value", "0.0"))
-            loads_ctx["Fy"] = fy_val
-
-            fz_settings = fem_loads_settings.get("fz", {})
-            if fz_settings.get("use_ana", True):
-                fz_val = float(candidate_data.get("Res_Force_Fz_Ed", 0.0))
-            else:
-                fz_val = self._parse_gui_float(fz_settings.get("value", "0.0"))
-            loads_ctx["Fz"] = fz_val
-
-            # Momenty (eval)
-            def eval_expr(expr, context):
-                """Bezpiecznie ewaluuje wyrażenie matematyczne."""
-                if not expr or not str(expr).strip():
-                    return 0.0
-                try:
-                    return float(eval(str(expr), {"__builtins__": None}, context))
-                except Exception as e:
-                    log(f"  ! Błąd ewaluacji wyrażenia '{expr}': {e}")
-                    return 0.0
-
-            mx_val = eval_expr(fem_loads_settings.get("mx_expr"), loads_ctx)
-            my_val = eval_expr(fem_loads_settings.get("my_expr"), loads_ctx)
-            mz_val = eval_expr(fem_loads_settings.get("mz_expr"), loads_ctx)
-
-            log(f"   [FIZYKA] Obciążenia FEM: Y_ref={y_ref:.2f}, Fx={fx_val:.1f}, Fy={fy_val:.1f}, Fz={fz_val:.1f}")
-            log(f"   [FIZYKA] Momenty FEM: Mx={mx_val:.1f}, My={my_val:.1f}, Mz={mz_val:.1f}")
-
-            try:
-                e_mod = float(candidate_data["Input_Load_E"])
-                g_mod = float(candidate_data["Input_Load_G"])
-            except KeyError as e:
-                raise ValueError(f"Brak kluczowych danych materiałowych w kandydacie: {e}")
-
-            if g_mod > 1.0 and e_mod > 1.0:
-                nu_val = (e_mod / (2.0 * g_mod)) - 1.0
-                if not (0.0 < nu_val < 0.5):
-                    raise ValueError(f"Wyliczony wsp. Poissona ({nu_val:.3f}) jest nieprawidłowy.")
-            else:
-                raise ValueError(f"Wartości E ({e_mod}) lub G ({g_mod}) są nieprawidłowe.")
-
-            run_p = {
-                "E": e_mod,
-                "nu": nu_val,
-                "Fx": fx_val,
-                "Fy": fy_val,
-                "Fz": fz_val,
-                "Mx": mx_val,
-                "My": my_val,
-                "Mz": mz_val,
-                "Length": g_params["length"],
-                "Y_ref_node": y_ref,
-                "profile_data": g_params["profile_data"],
-                "plate_data": g_params["plate_data"],
-                "custom_probes": cust_probes,
-                "step": float(fem_settings.get("step", 50.0)),
-                "solver_type": current_solver_type
-            }
+            run_p = self.build_run_params(candidate_data, fem_settings, g_params, y_ref, current_solver_type, log)
             
             inp_file = meta['paths']['inp']
-            run_inp = self.fem_engine.prepare_calculix_deck(inp_file, run_p)
+            run_inp = self._deck(self.fem_engine, inp_file, run_p, cid, i)
             
             if not run_inp:
                 log("  ! Błąd przygotowania decku CCX.")
@@ -299,47 +624,41 @@ class FemOptimizer:
             
             log(f"  > Uruchamianie Solvera ({current_solver_type})... ||| [Status: Start Solvera ({current_solver_type})...]")
             
-            # Uruchomienie Solvera
-            solver_success = self.fem_engine.run_solver(
-                run_inp, 
-                work_dir, 
-                num_threads=c_solv, 
-                callback=log
-            )
+            # Uruchomienie Solvera (pod nadzorem: limit czasu / RAM)
+            solver_success = self._run_solver_guarded(self.fem_engine, run_inp, work_dir, fem_settings, log,
+                                                      cid, i, current_solver_type)
             
             if not solver_success:
                 log("  ! Błąd wykonania solvera. ||| [Status: Błąd Solvera]")
+                failure = self._write_failed_record(cid, work_dir, self.fem_engine, "solve", "Błąd solvera", log)
                 break
             
             log("  > Przetwarzanie wyników... ||| [Status: Analiza wyników (.dat)]")
             
             # --- 3. WYNIKI I ZBIEŻNOŚĆ ---
             dat_file = run_inp.replace(".inp", ".dat")
-            res = self.fem_engine.parse_dat_results(dat_file)
+            res = self._parse_results(self.fem_engine, dat_file, cid, i)
             
             vm = res.get("MODEL_MAX_VM", 0.0)
-            buckling = res.get("BUCKLING_FACTORS", [])
-            
-            log(f"  Max VM: {vm:.2f} MPa")
-            if buckling:
-                log(f"  Buckling Factors: {buckling}")
-            
-            if "INTERFACE_MAX_SHEAR" in res:
-                tau_max = res["INTERFACE_MAX_SHEAR"]
-                log(f"  Max Shear Interface: {tau_max:.2f} MPa")
+            self._log_result_summary(res, log)
 
             # --- ZAPIS WYNIKÓW ---
             res["id"] = cid
             res["mesh_path"] = os.path.join(work_dir, f"Model_I{i}.msh")
             res['converged'] = converged 
             
-            try:
-                with open(os.path.join(work_dir, "results.json"), 'w') as f:
-                    json.dump(res, f, indent=4)
-            except Exception as e:
-                log(f"  ! Błąd zapisu JSON wyników roboczych: {e}")
+            self._write_results_json(res, work_dir, cid, i, log)
 
             # Sprawdzenie zbieżności (Tylko jeśli NIE jesteśmy w trybie Batch)
+            if not is_batch:
+                conv.add(curr_mesh, vm)
+                est = conv.estimate() if use_richardson else None
+                if est:
+                    log(f"  [RICHARDSON] {conv.describe(est)}")
+                    res["EXTRAPOLATED_VM"] = est["value"]
+                    res["EXTRAPOLATION_ERROR"] = est["error"]
+                    res["CONVERGENCE_ORDER"] = est["order"]
+
             if not is_batch and i > 1:
                 if last_vm > 1e-6:
                     delta = abs(vm - last_vm) / last_vm
@@ -348,15 +667,20 @@ class FemOptimizer:
                     
                 log(f"  Delta: {delta*100:.2f}% (Tol: {tol*100}%)")
                 
-                if delta < tol:
+                extrap_ok = use_richardson and conv.is_converged(est)
+                if delta < tol or extrap_ok:
                     converged = True
                     res['converged'] = True
-                    try:
-                        with open(os.path.join(work_dir, "results.json"), 'w') as f:
-                            json.dump(res, f, indent=4)
-                    except: pass
+                    try: atomic_io.write_json(os.path.join(work_dir, "results.json"), res)
+                    except Exception as e: log(f"  ! Błąd zapisu results.json: {e}")
                     final_res = res
-                    log("  >>> ZBIEŻNOŚĆ OSIĄGNIĘTA.")
+                    if extrap_ok and delta >= tol:
+                        log("  >>> ZBIEŻNOŚĆ OSIĄGNIĘTA (błąd ekstrapolowany w tolerancji).")
+                        accurate_mesh = curr_mesh
+                    else:
+                        log("  >>> ZBIEŻNOŚĆ OSIĄGNIĘTA.")
+                        # Poprzednia (grubsza) siatka mieściła się już w tolerancji
+                        accurate_mesh = prev_run_mesh
                     final_path = work_dir 
                     last_vm = vm
                     break
@@ -364,28 +688,207 @@ class FemOptimizer:
             last_vm = vm
             final_res = res
             final_path = work_dir 
+            prev_run_mesh = curr_mesh
             
-            curr_mesh *= mesh_fact
+            prev_mesh = curr_mesh
+            if use_richardson and not is_batch:
+                curr_mesh = conv.next_size(est)
+                if est and curr_mesh < prev_mesh * mesh_fact * 0.999:
+                    log(f"  [RICHARDSON] Przewidywana siatka: {curr_mesh:.2f} mm (zamiast {prev_mesh * mesh_fact:.2f} mm)")
+            else:
+                curr_mesh *= mesh_fact
             if curr_mesh < 1.0: curr_mesh = 1.0
+            if not is_batch and i < max_iter and curr_mesh >= prev_mesh * 0.999:
+                log("  ! Osiągnięto limit minimalnej wielkości elementu.")
+                break
 
         # --- FINALIZACJA KANDYDATA ---
-        final_dest = self.router.get_path("FINAL", "", subdir=cid)
-        
-        if os.path.exists(final_dest): 
-            try: shutil.rmtree(final_dest)
-            except: pass
-        
-        if final_path and os.path.exists(final_path):
-            try: 
-                shutil.copytree(final_path, final_dest)
-                log(f"  > Wyniki zarchiwizowane w: {final_dest}")
-            except Exception as e: 
-                log(f"  ! Błąd kopiowania do FINAL: {e}")
+        self._archive_final(cid, final_path, log)
+        self._apply_retention(cid, final_path, fem_settings, log)
+
+        if warm_table is not None and converged is True and accurate_mesh:
+            warm_table.record(candidate_data, int(fem_settings.get("mesh_order", 1)), accurate_mesh, iterations=i)
         
         final_res["id"] = cid
         final_res["converged"] = converged
         final_res["iterations"] = i 
         final_res["final_stress"] = last_vm
         final_res["final_mesh_size"] = mesh_size_of_last_run
+        final_res["warm_start"] = warm_started
+        final_res["telemetry"] = self.telemetry.czasy_kandydata(cid)
+        if failure:
+            # Rekord nieudanego kandydata - batch idzie dalej
+            final_res["failed"] = True
+            final_res["failure"] = {k: failure.get(k) for k in ("stage", "reason")}
+            if "solver" in failure:
+                final_res["failure"]["status"] = failure["solver"]["status"]
+        if est:
+            final_res["extrapolated_stress"] = est["value"]
+            final_res["extrapolation_error"] = est["error"]
+            final_res["convergence_order"] = est["order"]
+        
+        return final_res
+
+    # ==========================================================================
+    # [NOWOŚĆ] BATCH POTOKOWY (Siatka N+1 równolegle z solverem N)
+    # ==========================================================================
+    def run_batch_pipelined(self, candidates, fem_settings, signal_callback=None,
+                            interaction_callback=None, on_result=None, on_start=None,
+                            candidate_settings=None):
+        """
+        Batch jednoprzebiegowy (max_iterations == 1) w potoku:
+        mesh (pula Gmsh) -> solve (CCX) -> parse (.dat) -> archive (03_Final).
         
-        return final_res
\ No newline at end of file
+        candidate_settings: (opcjonalnie) lista ustawień per kandydat (np. korekta siatki).
+        on_result(index, final_res): wołane po zarchiwizowaniu kandydata.
+        on_start(cid): wołane na starcie siatkowania kandydata.
+        Zwraca (lista final_res w kolejności wejściowej, statystyki etapów).
+        """
+        def base_log(msg):
+            if signal_callback: signal_callback(msg)
+            else: print(msg)
+
+        eq_limit = int(fem_settings.get("eq_limit", 2000000))
+        n_mesh = self.mesh_pool.max_workers if self.mesh_pool is not None else 1
+        n_solv = max(1, int(fem_settings.get("solver_slots", 1)))
+        warm_table = self._warm_start_table(fem_settings, base_log)
+
+        def stage_mesh(job):
+            cand = job["cand"]
+            cid = job["cid"]
+            log = job["log"]
+            sets = job["settings"]
+            if on_start: on_start(cid)
+            curr_mesh = self._initial_mesh_size(cand, sets, log)
+            curr_mesh, _ = self._apply_warm_start(warm_table, cand, sets, curr_mesh, log)
+            job["mesh_size"] = curr_mesh
+            work_dir = self._prepare_work_dir(cid, f"Iter_1_Mesh{curr_mesh:.1f}", cand, log)
+            job["work_dir"] = work_dir
+            log("Generowanie geometrii... ||| [Status: Generowanie Siatki (Gmsh)...]")
+            g_params = self.build_geometry_params(cand, sets, work_dir, "Model_I1", curr_mesh)
+            meta = self._generate_mesh(g_params, log, cid, 1)
+            if not meta:
+                raise RuntimeError("Błąd generowania geometrii/siatki.")
+            job["g_params"] = g_params
+            job["meta"] = meta
+            return job
+
+        def stage_solve(job):
+            cand = job["cand"]
+            log = job["log"]
+            node_count = job["meta"].get('stats', {}).get('nodes', 0)
+            est_equations = node_count * 3
+            log(f"||| [Węzły Siatki: {node_count:,}]".replace(',', ' '))
+            log(f"||| [Układ Równań: ~{est_equations / 1e6:.2f} M]")
+
+            solver_type = "DIRECT"
+            if est_equations > eq_limit:
+                log(f"  ! LIMIT: Model ma ~{est_equations/1e6:.1f}M równań (Limit: {eq_limit/1e6:.1f}M).")
+                decision = self._limit_decision(interaction_callback, est_equations, 0.0, log)
+                if decision == "STOP":
+                    raise RuntimeError("Przekroczony limit równań (STOP).")
+                solver_type = decision
+
+            sets = job["settings"]
+            y_ref = self._resolve_y_ref(cand, sets.get("fem_loads", {}))
+            run_p = self.build_run_params(cand, sets, job["g_params"], y_ref, solver_type, log)
+
+            # Osobny silnik na zadanie: deck i parser dzielą stan (mapa węzłów, sondy)
+            engine = engine_fem.FemEngine(ccx_path=self.router.get_ccx_path())
+            run_inp = self._deck(engine, job["meta"]['paths']['inp'], run_p, job["cid"], 1)
+            if not run_inp:
+                raise RuntimeError("Błąd przygotowania decku CCX.")
+
+            log(f"  > Uruchamianie Solvera ({solver_type})... ||| [Status: Start Solvera ({solver_type})...]")
+            if not self._run_solver_guarded(engine, run_inp, job["work_dir"], sets, log, job["cid"], 1, solver_type):
+                rec = self._write_failed_record(job["cid"], job["work_dir"], engine, "solve", "Błąd solvera", log)
+                job["failure"] = rec
+                raise RuntimeError(f"Błąd wykonania solvera: {rec['reason']}")
+            job["engine"] = engine
+            job["run_inp"] = run_inp
+            return job
+
+        def stage_parse(job):
+            log = job["log"]
+            log("  > Przetwarzanie wyników... ||| [Status: Analiza wyników (.dat)]")
+            res = self._parse_results(job["engine"], job["run_inp"].replace(".inp", ".dat"), job["cid"], 1)
+            job["engine"] = None # Zwolnienie mapy węzłów przed kolejnymi etapami
+            self._log_result_summary(res, log)
+            res["id"] = job["cid"]
+            res["mesh_path"] = os.path.join(job["work_dir"], "Model_I1.msh")
+            res['converged'] = "NOT_DEFINED"
+            self._write_results_json(res, job["work_dir"], job["cid"], 1, log)
+            job["res"] = res
+            return job
+
+        def stage_archive(job):
+            self._archive_final(job["cid"], job["work_dir"], job["log"])
+            self._apply_retention(job["cid"], job["work_dir"], job["settings"], job["log"])
+            return job
+
+        jobs = []
+        for k, cand in enumerate(candidates):
+            cid = self.candidate_id(cand)
+            jobs.append({
+                "cand": cand, "cid": cid,
+                "settings": candidate_settings[k] if candidate_settings else fem_settings,
+                # Logi z wielu kandydatów przeplatają się - prefiks z identyfikatorem
+                "log": (lambda c: (lambda m: base_log(f"[{c}] {m}")))(cid)
+            })
+
+        # [NOWOŚĆ] Profil batcha: każde wywołanie etapu (w swoim wątku) profilowane osobno i scalane
+        prof = profiling.RunProfiler("FEM_BATCH", fem_settings.get("profile"), self.router, log=base_log)
+
+        def profiled(fn):
+            if not prof.aktywny: return fn
+            def run(job):
+                with prof.sekcja():
+                    return fn(job)
+            return run
+
+        pipe = CandidatePipeline([
+            Stage("mesh", profiled(stage_mesh), workers=n_mesh),
+            Stage("solve", profiled(stage_solve), workers=n_solv),
+            Stage("parse", profiled(stage_parse), workers=1),
+            Stage("archive", profiled(stage_archive), workers=1),
+        ], queue_size=int(fem_settings.get("pipeline_queue", 2)), logger_callback=base_log)
+        self._pipeline = pipe
+        prof.start()
+
+        def finish(item):
+            job = item.payload
+            if item.error is None and not item.skipped:
+                final_res = job["res"]
+            else:
+                final_res = {"error": item.error or "Przerwano", "failed_stage": item.failed_stage}
+                if item.error is not None:
+                    final_res["failed"] = True
+                    rec = job.get("failure") or {"stage": item.failed_stage, "reason": item.error}
+                    final_res["failure"] = {"stage": rec.get("stage"), "reason": rec.get("reason")}
+                    if "solver" in rec: final_res["failure"]["status"] = rec["solver"]["status"]
+            final_res["id"] = job["cid"]
+            final_res["converged"] = "NOT_DEFINED" if item.error is None and not item.skipped else False
+            final_res["iterations"] = 1
+            final_res["final_stress"] = final_res.get("MODEL_MAX_VM", 0.0)
+            final_res["final_mesh_size"] = job.get("mesh_size", 0.0)
+            final_res["stage_times"] = {k: round(v, 3) for k, v in item.timings.items()}
+            final_res["telemetry"] = self.telemetry.czasy_kandydata(job["cid"])
+            item.payload = final_res
+            if on_result: on_result(item.index, final_res)
+
+        try:
+            items = pipe.run(jobs, on_item_done=finish)
+        finally:
+            prof.stop()
+        pipe.log_summary()
+        self._pipeline = None
+        return [it.payload for it in items], pipe.summary()
+
+    def request_stop(self):
+        """Zatrzymanie pętli iteracji oraz potoku (jeśli aktywny)."""
+        self.stop_requested = True
+        pipe = getattr(self, "_pipeline", None)
+        if pipe is not None:
+            pipe.request_stop()
+        for wd in list(self._watchdogs):
+            wd.request_stop()
@@ -1,128 +1,486 @@
 import os
-import json
 import time
 import copy
 import math
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Importy silników Shell
 from engine_geometry_shell import GeometryGeneratorShell
-from engine_fem_shell import FemEngineShell
+from engine_fem_shell import FemEngineShell, FIELD_FILE_NAME
+from pipeline import CandidatePipeline, Stage
+from mesh_convergence import ConvergenceController
+from mesh_warmstart import MeshWarmStartTable, calibration_key, min_wall_thickness
+from solver_watchdog import SolverWatchdog
+from mesh_pool import MeshWorkerPool
+from routing import link_or_copy
+import atomic_io
+
+RUNS_SUBDIR = "SHELL_RUNS" # Katalogi przebiegów w 02_MES_Roboczy
+
+def translate_candidate(c):
+    """Wiersz wyników analitycznych -> dane wejściowe modelu Shell."""
+    e_mod = c.get("Input_Load_E")
+    g_mod = c.get("Input_Load_G")
+    nu = 0.3
+    if e_mod and g_mod and g_mod > 0:
+        nu = (e_mod / (2.0 * g_mod)) - 1.0
+    
+    translated = {
+        "Name": f"{c.get('Nazwa_Profilu', 'Unk')}_tp{int(c.get('Input_Geo_tp', 0))}",
+        "Geom_h_c": c.get("Input_UPE_hc"), "Geom_b_c": c.get("Input_UPE_bc"),
+        "Geom_t_w": c.get("Input_UPE_twc"), "Geom_t_f": c.get("Input_UPE_tfc"),
+        "Geom_r_c": c.get("Input_UPE_rc", 0.0), "Geom_t_p": c.get("Input_Geo_tp"),
+        "Geom_b_p": c.get("Input_Geo_bp"), "Input_Length": c.get("Input_Load_L"),
+        "Mat_Name": c.get("Stop"), "Mat_E": e_mod, "Mat_nu": nu,
+    }
+    translated.update(c) # Przekaż resztę danych dla pliku analitycznego
+    return translated
 
 class FemOptimizerShell:
     """
     Optymalizator Shell.
     Zarządza badaniem zbieżności i uruchamianiem serii obliczeń.
+    [NOWOŚĆ] Przebiegi równoległe: każdy we własnym katalogu roboczym
+    (02_MES_Roboczy/SHELL_RUNS/<nazwa>_<etap>_xxxx), Gmsh w puli procesów,
+    CCX jako osobne procesy z podziałem rdzeni. Wyniki: 03_Final/<nazwa>.
     """
-    def __init__(self, router_instance, logger_callback=None):
+    def __init__(self, router_instance, logger_callback=None, mesh_pool=None):
         self.router = router_instance
         self.work_dir = router_instance.base_output_dir
         self.logger = logger_callback
         self.geo_engine = GeometryGeneratorShell(logger_callback)
-        
+
         # Pobieramy ścieżkę do CCX z routera
         ccx_path = router_instance.get_ccx_path()
-        self.fem_engine = FemEngineShell(ccx_path=ccx_path) 
+        self.fem_engine = FemEngineShell(ccx_path=ccx_path)
+
+        # [NOWOŚĆ] Opcjonalna pula procesów Gmsh + potok produkcyjny
+        self.mesh_pool = mesh_pool
+        self.stop_requested = False
+        self._pipeline = None
+        self._watchdogs = set()
+        self.solver_limits = {}  # solver_timeout_min / solver_max_ram_gb (z mesh_settings)
+        self.parallel_runs = 1
+        self.threads_per_run = 4
+        self._gmsh_lock = threading.Lock() # Gmsh w procesie (bez puli) - jeden model naraz
+        self._calib_executors = [] # Przebiegi spekulacyjne kalibracji (domykane po batchu)
+        self._calib_threads = [] # Wątki kalibracji grup (jeden na klasę)
+        self._calib_solves = 0 # Liczba przebiegów kalibracji w batchu
+        self._calib_wasted = 0 # W tym spekulacyjne, których wynik nie został użyty
+        self._calib_lock = threading.Lock()
+
+    def request_stop(self):
+        self.stop_requested = True
+        if self._pipeline is not None:
+            self._pipeline.request_stop()
+        for wd in list(self._watchdogs):
+            wd.request_stop()
+
+    def _run_solver_guarded(self, engine, run_inp, abort=None):
+        """
+        CCX pod nadzorem (limit czasu [min] / RAM [GB], 0 = brak limitu).
+        abort: threading.Event przebiegu spekulacyjnego - _abort_run przerywa solver.
+        """
+        timeout_s = float(self.solver_limits.get("solver_timeout_min", 0) or 0) * 60.0
+        max_rss_mb = float(self.solver_limits.get("solver_max_ram_gb", 0) or 0) * 1024.0
+        wd = SolverWatchdog(timeout_s=timeout_s or None, max_rss_mb=max_rss_mb or None)
+        self._watchdogs.add(wd)
+        if abort is not None:
+            abort.watchdog = wd
+            if abort.is_set(): wd.request_stop()
+        if self.stop_requested: wd.request_stop()
+        try:
+            ok = engine.run_solver(run_inp, os.path.dirname(run_inp), num_threads=self.threads_per_run, watchdog=wd)
+        finally:
+            self._watchdogs.discard(wd)
+        if not ok and engine.last_run is not None:
+            self.log(f"Solver: [{engine.last_run.status}] {engine.last_run.reason}")
+        return ok
 
     def log(self, msg):
         if self.logger: self.logger(f"[OPT-SHELL] {msg}")
         else: print(f"[OPT-SHELL] {msg}")
 
-    def find_optimal_mesh_settings(self, candidate, load_conditions, constraints):
+    def _parallel_settings(self, settings):
+        """Liczba równoległych przebiegów i wątki CCX na przebieg (razem <= liczba rdzeni)."""
+        cpu = os.cpu_count() or 1
+        n = int((settings or {}).get("parallel_runs", 0) or 0)
+        if n <= 0:
+            n = max(1, cpu // 2)
+        return n, max(1, cpu // n)
+
+    def _new_run_dir(self, name, tag):
+        """Unikalny katalog roboczy przebiegu - równoległe przebiegi nie dzielą plików."""
+        base = self.router.get_path("MES_WORK", "", subdir=RUNS_SUBDIR)
+        return tempfile.mkdtemp(prefix=f"{name}_{tag}_", dir=base)
+
+    def _calibration_run(self, candidate, load_conditions, lc, abort=None):
+        if self.stop_requested or (abort is not None and abort.is_set()): return None
+        with self._calib_lock: self._calib_solves += 1
+        name = candidate.get("Name", "Unknown")
+        params = self._prepare_run_params(candidate, load_conditions, lc)
+        params["output_dir"] = self._new_run_dir(name, f"cal{lc:.2f}")
+        params["model_name"] = name
+        return self._run_single_sim(params, abort=abort)
+
+    @staticmethod
+    def _abort_run(abort):
+        """Przerywa przebieg spekulacyjny: przed startem - pominięty, w trakcie - stop solvera."""
+        abort.set()
+        wd = getattr(abort, "watchdog", None)
+        if wd is not None: wd.request_stop()
+
+    def find_optimal_mesh_settings(self, candidate, load_conditions, constraints, warm_table=None, n_ahead=None):
+        """
+        Kalibracja siatki na jednym kandydacie.
+        warm_table: wspólna tabela projektu (równoległe kalibracje grup), n_ahead: przebiegi w locie.
+        """
         self.log(f"--- START KALIBRACJI SIATKI: {candidate.get('Name', 'Unknown')} ---")
-        
+
         start_lc = float(constraints.get("mesh_start", 20.0))
         mesh_factor = float(constraints.get("mesh_factor", 0.7))
         max_iter = int(constraints.get("max_iter", 5))
         target_tol = float(constraints.get("conv_tol", 0.01))
         min_lc_limit = 1.0
 
+        # [NOWOŚĆ] Warm-start: przewidywany rozmiar z wcześniej skalibrowanych profili
+        if constraints.get("warm_start", False):
+            try:
+                if warm_table is None:
+                    warm_table = MeshWarmStartTable(self.router, analysis="shell", logger_callback=self.log)
+                pred = warm_table.predict(candidate, 2)
+                if pred:
+                    self.log(f"[WARM-START] Start kalibracji od {pred:.2f} mm (zamiast {start_lc:.2f} mm)")
+                    start_lc = max(min_lc_limit, pred)
+            except Exception as e:
+                self.log(f"Warm-start niedostępny: {e}")
+                warm_table = None
+
         current_lc = start_lc
         prev_vm = None
         optimal_lc = current_lc
         is_converged = False
-        
+        est = None
+
+        # [NOWOŚĆ] Richardson: przewidywanie kolejnej siatki + wczesne zatrzymanie
+        use_richardson = constraints.get("convergence_mode", "richardson") == "richardson"
+        conv = ConvergenceController(target_tol, refinement_factor=mesh_factor,
+                                     assumed_order=2.0, min_size=min_lc_limit)
+
         self.log(f"Parametry: Start={start_lc}mm, Factor={mesh_factor}, MaxIter={max_iter}, Tol={target_tol*100}%")
 
-        for step in range(1, max_iter + 1):
-            run_params = self._prepare_run_params(candidate, load_conditions, current_lc)
-            run_params["output_dir"] = os.path.join(self.work_dir, "_convergence_temp")
-            
-            res = self._run_single_sim(run_params)
-            
-            if not res or not res.get("converged"):
-                self.log(f"  Krok {step}: Błąd obliczeń dla siatki {current_lc:.2f}mm. Próba zagęszczenia.")
-                current_lc *= mesh_factor
-                continue
-            
-            curr_vm = res.get("MODEL_MAX_VM", 0.0)
-            self.log(f"  Krok {step}: Mesh={current_lc:.2f}mm -> Max VM={curr_vm:.2f} MPa")
-            
-            if prev_vm is not None:
-                diff = abs(curr_vm - prev_vm) / max(prev_vm, 1e-6)
-                self.log(f"     -> Delta: {diff*100:.2f}% (Cel: <{target_tol*100:.2f}%)")
-                
-                if diff < target_tol:
-                    self.log("     -> ZBIEŻNOŚĆ OSIĄGNIĘTA.")
-                    optimal_lc = current_lc
-                    is_converged = True
+        # [NOWOŚĆ] Tryb klasyczny: kolejne poziomy (lc * factor^k) liczone spekulacyjnie w tle.
+        # Richardson wybiera następną siatkę z ekstrapolacji (nieznaną z góry) - bez spekulacji.
+        # Przebiegi niewykorzystane są przerywane i liczone jako stracone (_calib_wasted).
+        n_ahead = 1 if use_richardson else max(1, n_ahead or self.parallel_runs)
+        executor = ThreadPoolExecutor(max_workers=n_ahead, thread_name_prefix="shell-calib")
+        self._calib_executors.append(executor)
+        runs = {} # round(lc, 6) -> (Future, Event przerwania)
+        started, used = set(), set()
+
+        def job(key, lc, abort):
+            if abort.is_set(): return None
+            started.add(key)
+            return self._calibration_run(candidate, load_conditions, lc, abort)
+
+        def submit(lc):
+            key = round(lc, 6)
+            if key not in runs:
+                abort = threading.Event()
+                runs[key] = (executor.submit(job, key, lc, abort), abort)
+            return runs[key][0]
+
+        def discard(keys):
+            for key in keys:
+                fut, abort = runs[key]
+                fut.cancel()
+                self._abort_run(abort)
+
+        try:
+            for step in range(1, max_iter + 1):
+                if self.stop_requested: break
+                discard([k for k in runs if k > round(current_lc, 6) and k not in used])
+                used.add(round(current_lc, 6))
+                fut = submit(current_lc)
+                lc_ahead = current_lc
+                for _ in range(min(n_ahead - 1, max_iter - step)):
+                    lc_ahead *= mesh_factor
+                    if lc_ahead < min_lc_limit: break
+                    submit(lc_ahead)
+
+                res = fut.result()
+
+                if not res or not res.get("converged"):
+                    self.log(f"  Krok {step}: Błąd obliczeń dla siatki {current_lc:.2f}mm. Próba zagęszczenia.")
+                    for w in (res or {}).get("parse_warnings", []):
+                        self.log(f"     -> {w}")
+                    current_lc *= mesh_factor
+                    continue
+
+                curr_vm = res.get("MODEL_MAX_VM", 0.0)
+                self.log(f"  Krok {step}: Mesh={current_lc:.2f}mm -> Max VM={curr_vm:.2f} MPa")
+
+                conv.add(current_lc, curr_vm)
+                est = conv.estimate() if use_richardson else None
+                if est:
+                    self.log(f"     -> [RICHARDSON] {conv.describe(est)}")
+
+                if prev_vm is not None:
+                    diff = abs(curr_vm - prev_vm) / max(prev_vm, 1e-6)
+                    self.log(f"     -> Delta: {diff*100:.2f}% (Cel: <{target_tol*100:.2f}%)")
+
+                    if diff < target_tol or (use_richardson and conv.is_converged(est)):
+                        self.log("     -> ZBIEŻNOŚĆ OSIĄGNIĘTA.")
+                        if warm_table is not None:
+                            # Do tabeli trafia najgrubsza siatka mieszcząca się w tolerancji
+                            accurate_lc = optimal_lc if diff < target_tol else current_lc
+                            warm_table.record(candidate, 2, accurate_lc, iterations=step)
+                        optimal_lc = current_lc
+                        is_converged = True
+                        break
+
+                prev_vm = curr_vm
+                optimal_lc = current_lc
+                prev_lc = current_lc
+                current_lc = conv.next_size(est) if use_richardson else current_lc * mesh_factor
+
+                if current_lc < min_lc_limit or current_lc >= prev_lc * 0.999:
+                    self.log("     -> Osiągnięto limit minimalnej wielkości elementu.")
                     break
-            
-            prev_vm = curr_vm
-            optimal_lc = current_lc
-            current_lc *= mesh_factor
-            
-            if current_lc < min_lc_limit:
-                self.log("     -> Osiągnięto limit minimalnej wielkości elementu.")
-                break
-        
+        finally:
+            # Niewykorzystane poziomy spekulacyjne: anulowane / przerwane (nie konkurują z produkcją)
+            discard([k for k in runs if k not in used])
+            executor.shutdown(wait=False, cancel_futures=True)
+            wasted = len(started - used)
+            if wasted:
+                with self._calib_lock: self._calib_wasted += wasted
+                self.log(f"  Spekulacja: {wasted} przebieg(ów) niewykorzystanych (przerwane).")
+
         if not is_converged:
             self.log(f"(!) Nie osiągnięto pełnej zbieżności w {max_iter} krokach. Użyto ostatniej siatki.")
 
-        return {
-            "global": optimal_lc, 
-            "order": 2, 
+        out = {
+            "global": optimal_lc,
+            "order": 2,
             "converged_status": is_converged
         }
+        # Wynik kalibracji na wybranej siatce = wynik produkcyjny pierwszego kandydata
+        best = runs.get(round(optimal_lc, 6), (None,))[0]
+        if best is not None and best.done() and not best.cancelled() and best.exception() is None:
+            if best.result() and best.result().get("converged"):
+                out["result"] = best.result()
+        if est:
+            out["extrapolated_vm"] = est["value"]
+            out["extrapolation_error"] = est["error"]
+            out["convergence_order"] = est["order"]
+        return out
+
+    def run_batch(self, candidates, load_conditions, mesh_settings=None, on_result=None):
+        """
+        Kalibracja siatki + produkcja. on_result(index, name) wołane po każdym kandydacie.
+        mesh_settings["parallel_runs"]: liczba równoległych przebiegów (0 = połowa rdzeni).
+        """
+        mesh_settings = mesh_settings or {}
+        self.stop_requested = False
+        self.solver_limits = {k: mesh_settings.get(k, 0) for k in ("solver_timeout_min", "solver_max_ram_gb")}
+        self.parallel_runs, self.threads_per_run = self._parallel_settings(mesh_settings)
+        self.log(f"Przebiegi równoległe: {self.parallel_runs} (CCX: {self.threads_per_run} wątk. na przebieg)")
 
-    def run_batch(self, candidates, load_conditions, mesh_settings=None):
+        # Własna pula Gmsh, gdy nie podano (równoległe siatkowanie wymaga osobnych procesów)
+        own_pool = None
+        if self.mesh_pool is None and self.parallel_runs > 1:
+            own_pool = self.mesh_pool = MeshWorkerPool(max_workers=self.parallel_runs, threads_per_worker=1,
+                                                       logger_callback=self.log)
+        try:
+            return self._run_batch(candidates, load_conditions, mesh_settings, on_result)
+        finally:
+            # Spekulacyjne przebiegi kalibracji w toku muszą skończyć się przed zamknięciem puli
+            while self._calib_threads:
+                self._calib_threads.pop().join()
+            while self._calib_executors:
+                self._calib_executors.pop().shutdown(wait=True, cancel_futures=True)
+            if own_pool is not None:
+                own_pool.shutdown(wait=True)
+                self.mesh_pool = None
+
+    def _run_batch(self, candidates, load_conditions, mesh_settings, on_result):
         final_results = {}
-        convergence_reached = False
-        
-        if not mesh_settings or not mesh_settings.get("fixed", False):
-            if candidates:
-                opt_params = self.find_optimal_mesh_settings(candidates[0], load_conditions, mesh_settings or {})
-                mesh_config = {"global": opt_params["global"], "order": opt_params["order"]}
-                convergence_reached = opt_params["converged_status"]
-                self.log(f"Wybrano siatkę z kalibracji: {mesh_config['global']:.2f} mm")
-            else:
-                mesh_config = {"global": 10.0, "order": 2}
+        fixed = bool(mesh_settings.get("fixed", False))
+
+        # --- KALIBRACJA: osobno dla każdej klasy (rodzina + grubość ścianki), w tle ---
+        groups = self._calibration_groups(candidates, fixed or not mesh_settings.get("per_family", True))
+        self._calib_solves = 0
+        self._calib_wasted = 0
+        warm_table = None
+        if not fixed:
+            try: warm_table = MeshWarmStartTable(self.router, analysis="shell", logger_callback=self.log)
+            except Exception as e: self.log(f"Tabela siatek projektu niedostępna: {e}")
+
+        if fixed or not candidates:
+            for g in groups:
+                g["cfg"] = {"global": float(mesh_settings.get("global", 10.0)), "order": int(mesh_settings.get("order", 2)),
+                            "converged_status": fixed, "source": "fixed"}
+                g["ready"].set()
         else:
-            mesh_config = {
-                "global": float(mesh_settings.get("global", 10.0)),
-                "order": int(mesh_settings.get("order", 2))
-            }
-            convergence_reached = True
-
-        for i, cand in enumerate(candidates):
-            name = cand.get("Name", f"Shell_{i}")
-            self.log(f"Przetwarzanie [{i+1}/{len(candidates)}]: {name}")
-            
-            params = self._prepare_run_params(cand, load_conditions, mesh_config["global"])
-            params["output_dir"] = os.path.join(self.work_dir, name)
-            params["model_name"] = name
-            
-            res = self._run_single_sim(params)
-            
-            if res:
-                res["convergence_status"] = "YES" if (res["converged"] and convergence_reached) else "NO"
-                res["mesh_used"] = mesh_config["global"]
-                self._save_results(params["output_dir"], res, cand)
-                final_results[name] = res
+            # Budżet przebiegów spekulacyjnych dzielony między równoległe kalibracje
+            n_ahead = max(1, self.parallel_runs // len(groups))
+            self.log(f"Kalibracja: {len(groups)} klas(y) dla {len(candidates)} kandydatów: "
+                     + ", ".join(f"{g['key']} ({len(g['members'])})" for g in groups))
+            for g in groups:
+                th = threading.Thread(target=self._calibrate_group,
+                                      args=(g, candidates, load_conditions, mesh_settings, warm_table, n_ahead),
+                                      name=f"shell-calibration-{g['key']}", daemon=True)
+                self._calib_threads.append(th)
+                th.start()
+
+        group_of = {i: g for g in groups for i in g["members"]}
+
+        def wait_for_mesh(group):
+            while not group["ready"].wait(0.5):
+                if self.stop_requested:
+                    raise RuntimeError("Przerwano przed końcem kalibracji.")
+            return group["cfg"]
+
+        # --- PRODUKCJA: potok mesh -> solve -> parse -> save ---
+        def stage_mesh(job):
+            group = group_of[job["index"]]
+            cfg = wait_for_mesh(group)
+            lc = self._member_mesh_size(job["cand"], cfg)
+            job["mesh_used"] = lc
+            job["converged_status"] = cfg["converged_status"]
+            job["params"] = self._prepare_run_params(job["cand"], load_conditions, lc)
+            job["params"]["model_name"] = job["name"]
+            if job["index"] == group["rep"] and cfg.get("result"):
+                # Ta sama siatka i dane co ostatni przebieg kalibracji - bez ponownego liczenia
+                job["res"] = dict(cfg["result"])
+                self.log(f"[{job['name']}] Wynik przejęty z kalibracji ({lc:.2f} mm).")
             else:
-                self.log(f"Błąd obliczeń dla {name}")
-                
+                job["params"]["output_dir"] = self._new_run_dir(job["name"], "run")
+                self.log(f"Przetwarzanie [{job['index']+1}/{len(candidates)}]: {job['name']} (siatka {lc:.2f} mm, {group['key']})")
+                job["geo"] = self._generate_geometry(job["params"])
+                if not job["geo"]:
+                    raise RuntimeError("Błąd generowania geometrii.")
+            return job
+
+        def stage_solve(job):
+            if "res" in job: return job
+            # Osobny silnik na zadanie (węzły referencyjne to stan silnika)
+            engine = FemEngineShell(ccx_path=self.router.get_ccx_path())
+            run_inp = engine.prepare_calculix_deck(job["geo"]["paths"]["inp"], job["params"])
+            if not run_inp:
+                raise RuntimeError("Błąd przygotowania decku CCX.")
+            if not self._run_solver_guarded(engine, run_inp):
+                reason = engine.last_run.reason if engine.last_run is not None else ""
+                raise RuntimeError(f"Błąd wykonania solvera. {reason}".strip())
+            job["engine"] = engine
+            job["run_inp"] = run_inp
+            return job
+
+        def stage_parse(job):
+            if "res" in job: return job
+            job["res"] = job["engine"].parse_dat_results(job["run_inp"].replace(".inp", ".dat"))
+            job["res"]["MESH_FILE"] = self._mesh_file(job["geo"])
+            job["engine"] = None
+            return job
+
+        def stage_save(job):
+            res = job["res"]
+            res["convergence_status"] = "YES" if (res["converged"] and job["converged_status"]) else "NO"
+            res["mesh_used"] = job["mesh_used"]
+            res["mesh_group"] = group_of[job["index"]]["key"]
+            res["mesh_source"] = group_of[job["index"]]["cfg"].get("source", "calibration")
+            self._save_results(job["name"], res, job["cand"])
+            return job
+
+        jobs = [{"index": i, "name": cand.get("Name", f"Shell_{i}"), "cand": cand} for i, cand in enumerate(candidates)]
+
+        n = self.parallel_runs
+        pipe = CandidatePipeline([
+            Stage("mesh", stage_mesh, workers=n),
+            Stage("solve", stage_solve, workers=n),
+            Stage("parse", stage_parse, workers=n),
+            Stage("save", stage_save, workers=1),
+        ], queue_size=max(2, n), logger_callback=self.log)
+        self._pipeline = pipe
+
+        def finish(item):
+            job = item.payload
+            if item.error is None and not item.skipped:
+                final_results[job["name"]] = job["res"]
+            elif item.error is not None:
+                self.log(f"Błąd obliczeń dla {job['name']}: {item.error}")
+            if on_result: on_result(item.index, job["name"])
+
+        items = pipe.run(jobs, on_item_done=finish)
+        pipe.log_summary()
+        self._pipeline = None
+        if not fixed:
+            n_cache = sum(1 for g in groups if g["cfg"].get("source") == "cache")
+            self.log(f"Kalibracja: {len(groups)} klas(y), {n_cache} z tabeli projektu, "
+                     f"{self._calib_solves} przebieg(ów) kalibracyjnych "
+                     f"(w tym {self._calib_wasted} spekulacyjnych niewykorzystanych).")
+
+        # Kolejność wyników = kolejność kandydatów (niezależnie od kolejności ukończenia)
+        ordered = {}
+        for item in items:
+            name = item.payload["name"]
+            if name in final_results: ordered[name] = final_results[name]
+        final_results = ordered
+
         return final_results
 
+    def _calibration_groups(self, candidates, single):
+        """
+        Grupy kalibracji: klucz (rodzina|klasa grubości), indeksy kandydatów, reprezentant.
+        Reprezentant = najcieńsza ścianka w grupie (najbardziej wymagająca siatka).
+        single=True: jedna grupa, reprezentant candidates[0] (tryb dawny / siatka stała).
+        """
+        if single:
+            keyed = {"ALL": list(range(len(candidates)))}
+        else:
+            keyed = {}
+            for i, cand in enumerate(candidates):
+                keyed.setdefault(calibration_key(cand), []).append(i)
+        groups = []
+        for key, members in keyed.items():
+            rep = members[0] if single else min(members, key=lambda i: (min_wall_thickness(candidates[i]) or float("inf"), i))
+            groups.append({"key": key, "members": members, "rep": rep, "cfg": {}, "ready": threading.Event()})
+        return groups
+
+    def _calibrate_group(self, group, candidates, load_conditions, mesh_settings, warm_table, n_ahead):
+        """Wątek kalibracji grupy: tabela projektu (ta sama klasa) albo pełna kalibracja reprezentanta."""
+        rep = candidates[group["rep"]]
+        cfg = None
+        try:
+            cached = warm_table.cached(rep, 2) if (warm_table is not None and mesh_settings.get("warm_start", False)) else None
+            if cached:
+                cfg = {"global": max(1.0, cached), "order": 2, "converged_status": True, "source": "cache"}
+                self.log(f"[{group['key']}] Siatka z tabeli projektu: {cfg['global']:.2f} mm (bez kalibracji).")
+            else:
+                cfg = self.find_optimal_mesh_settings(rep, load_conditions, mesh_settings,
+                                                      warm_table=warm_table, n_ahead=n_ahead)
+                cfg["source"] = "calibration"
+                self.log(f"[{group['key']}] Wybrano siatkę z kalibracji: {cfg['global']:.2f} mm")
+        except Exception as e:
+            self.log(f"[{group['key']}] Błąd kalibracji: {e}")
+            cfg = {"global": float(mesh_settings.get("mesh_start", 10.0)), "order": 2,
+                   "converged_status": False, "source": "default"}
+        finally:
+            t_rep = min_wall_thickness(rep)
+            cfg["density"] = t_rep / cfg["global"] if t_rep and cfg["global"] > 0 else None
+            group["cfg"] = cfg
+            group["ready"].set()
+
+    def _member_mesh_size(self, cand, cfg):
+        """Siatka kandydata z gęstości względnej grupy (min_t / h) - grubsze ścianki, grubsza siatka."""
+        t = min_wall_thickness(cand)
+        if cfg.get("source") == "fixed" or not t or not cfg.get("density"):
+            return cfg["global"]
+        return max(1.0, t / cfg["density"])
+
     def _prepare_run_params(self, cand, loads, lc):
         y_centroid_global = float(cand.get("Res_Geo_Yc", 0.0))
         y_load_level = float(loads.get("Y_load_level", cand.get("Input_Load_F_promien", 0.0)))
@@ -151,28 +509,75 @@ class FemOptimizerShell:
             "Mx": float(loads.get("Mx", 0)),
             "My": float(loads.get("My", 0)),
             "Mz": float(loads.get("Mz", 0)),
-            "system_resources": {"num_threads": 4}
+            "system_resources": {"num_threads": self.threads_per_run}
         }
 
-    def _run_single_sim(self, params):
-        geo_res = self.geo_engine.generate_model(params)
+    def _generate_geometry(self, params):
+        """Siatka w puli procesów Gmsh (jeśli jest) lub w bieżącym procesie."""
+        if self.mesh_pool is not None:
+            return self.mesh_pool.generate(params, kind="shell", log_callback=self.log)
+        with self._gmsh_lock:
+            return self.geo_engine.generate_model(params)
+
+    def _run_single_sim(self, params, abort=None):
+        geo_res = self._generate_geometry(params)
         if not geo_res: return None
         
+        # Osobny silnik na przebieg (przebiegi kalibracji działają równolegle)
+        engine = FemEngineShell(ccx_path=self.router.get_ccx_path())
         inp_path = geo_res["paths"]["inp"]
-        run_inp = self.fem_engine.prepare_calculix_deck(inp_path, params)
+        run_inp = engine.prepare_calculix_deck(inp_path, params)
         if not run_inp: return None
         
-        wd = os.path.dirname(run_inp)
-        ok = self.fem_engine.run_solver(run_inp, wd)
-        if not ok: return None
+        if abort is not None and abort.is_set(): return None
+        if not self._run_solver_guarded(engine, run_inp, abort): return None
         
         dat_path = run_inp.replace(".inp", ".dat")
-        return self.fem_engine.parse_dat_results(dat_path)
+        res = engine.parse_dat_results(dat_path)
+        res["MESH_FILE"] = self._mesh_file(geo_res)
+        return res
 
-    def _save_results(self, folder, fem_res, cand_data):
-        if not os.path.exists(folder): os.makedirs(folder)
+    @staticmethod
+    def _mesh_file(geo_res):
+        """Plik .msh przebiegu (widok 3D); starsze wyniki generatora - obok .inp."""
+        paths = geo_res.get("paths", {})
+        msh = paths.get("msh") or (os.path.splitext(paths["inp"])[0] + ".msh" if paths.get("inp") else None)
+        return msh if msh and os.path.exists(msh) else None
+
+    def _save_results(self, name, fem_res, cand_data):
+        """
+        Wynik kandydata do 03_Final/<name> przez router.archive_directory: pliki składane
+        w folderze tymczasowym (99_Temp), potem staging + manifest + podmiana przez rename -
+        czytelnik ani przerwanie zapisu nie zostawiają w 03_Final połowy wyniku.
+        """
+        folder = tempfile.mkdtemp(prefix=f".{name}_src_", dir=self.router.get_path("TEMP", ""))
+        try:
+            return self._archive_results(folder, name, fem_res, cand_data)
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    def _archive_results(self, folder, name, fem_res, cand_data):
         fem_res["analysis_type"] = "shell"
-        with open(os.path.join(folder, "results.json"), 'w') as f:
-            json.dump(fem_res, f, indent=4)
-        with open(os.path.join(folder, "analytical.json"), 'w') as f:
-            json.dump(cand_data, f, indent=4)
\ No newline at end of file
+        run_dir = None # Katalog przebiegu (źródło w manifeście)
+        # Pole wyników (.npz) i siatka (.msh, widok 3D Tab7) z katalogu przebiegu
+        # obok results.json (dowiązanie twarde, kopia zapasowo) - w JSON tylko nazwy plików
+        for key, target in (("FIELD_FILE", FIELD_FILE_NAME), ("MESH_FILE", None)):
+            src = fem_res.get(key)
+            if not src or not os.path.isabs(src):
+                continue
+            target = target or os.path.basename(src)
+            run_dir = run_dir or os.path.dirname(src)
+            try:
+                link_or_copy(src, os.path.join(folder, target))
+                fem_res[key] = target
+            except Exception as e:
+                self.log(f"(!) Nie skopiowano {os.path.basename(src)}: {e}")
+                fem_res.pop(key, None)
+        if not any(f.endswith(".msh") for f in os.listdir(folder)):
+            self.log(f"(!) Brak siatki .msh dla {name} - widok 3D wyniku będzie pusty.")
+            fem_res.setdefault("parse_warnings", []).append("Brak pliku .msh w folderze wyniku")
+        atomic_io.write_json(os.path.join(folder, "results.json"), fem_res)
+        atomic_io.write_json(os.path.join(folder, "analytical.json"), cand_data)
+        # Manifest (w archive_directory) na końcu = folder kompletny (wznowienie / import)
+        dest, _ = self.router.archive_directory(folder, name, source=run_dir)
+        return dest
\ No newline at end of file
@@ -0,0 +1,125 @@
+# ==============================================================================
+#  MESH CONVERGENCE CONTROLLER v1.0
+# ==============================================================================
+# Sterownik zbieżności siatki oparty o ekstrapolację Richardsona.
+# Model błędu (potęgowy):  f(h) = f_inf + C * h^p
+#   f     - obserwowana wielkość (Max VM)
+#   h     - rozmiar elementu [mm]
+#   f_inf - wartość zbieżna (ekstrapolowana)
+#   p     - obserwowany rząd zbieżności
+#
+# 1 punkt  -> brak estymaty, klasyczny krok (h * refinement_factor).
+# 2 punkty -> estymata z ZAŁOŻONYM rzędem p (1 dla elementów liniowych, 2 dla kwadratowych).
+# 3+ punkty -> p wyznaczane z trzech ostatnich siatek (bisekcja, dowolne proporcje h).
+#
+# Kolejny rozmiar siatki jest PRZEWIDYWANY tak, aby błąd |C| h^p spadł poniżej
+# tolerancji (z zapasem), zamiast zmniejszać siatkę o stały współczynnik.
+# ==============================================================================
+
+P_MIN, P_MAX = 0.3, 6.0
+
+def _ratio(h1, h2, h3, p):
+    """(h1^p - h2^p) / (h2^p - h3^p) - liczone na h znormalizowanych przez h3."""
+    a, b = (h1 / h3) ** p, (h2 / h3) ** p
+    den = b - 1.0
+    if abs(den) < 1e-15: return float("inf")
+    return (a - b) / den
+
+def solve_order(h1, f1, h2, f2, h3, f3):
+    """
+    Rząd zbieżności p z trzech siatek (h1 > h2 > h3).
+    Zwraca None, gdy ciąg nie jest monotoniczny (poza zakresem asymptotycznym).
+    """
+    d12, d23 = f1 - f2, f2 - f3
+    if abs(d23) < 1e-15 or d12 * d23 <= 0.0:
+        return None
+    target = d12 / d23
+    lo, hi = P_MIN, P_MAX
+    r_lo, r_hi = _ratio(h1, h2, h3, lo), _ratio(h1, h2, h3, hi)
+    if target <= r_lo: return lo
+    if target >= r_hi: return hi
+    for _ in range(80):
+        mid = 0.5 * (lo + hi)
+        if _ratio(h1, h2, h3, mid) < target: lo = mid
+        else: hi = mid
+    return 0.5 * (lo + hi)
+
+class ConvergenceController:
+    def __init__(self, tolerance, refinement_factor=0.7, assumed_order=1.0,
+                 min_size=1.0, max_jump=0.35, safety=0.8):
+        """
+        tolerance: dopuszczalny błąd względny (np. 0.02)
+        refinement_factor: krok klasyczny; przewidywana siatka nigdy nie jest od niego grubsza
+        assumed_order: rząd zakładany przy 2 punktach
+        max_jump: najmniejszy dopuszczalny stosunek h_next / h_last (ogranicza skok liczby węzłów ~ 1/h^3)
+        safety: zapas bezpieczeństwa na tolerancji przy przewidywaniu
+        """
+        self.tol = float(tolerance)
+        self.factor = float(refinement_factor)
+        self.assumed_order = float(assumed_order)
+        self.min_size = float(min_size)
+        self.max_jump = float(max_jump)
+        self.safety = float(safety)
+        self.history = []  # [(h, f)]
+
+    def add(self, h, value):
+        self.history.append((float(h), float(value)))
+
+    def estimate(self):
+        """
+        Estymata wartości zbieżnej.
+        Zwraca dict {value, order, error, method} lub None (za mało danych).
+        error = |f_last - f_inf| / |f_inf| (estymowany błąd względny ostatniej siatki)
+        """
+        pts = [pt for pt in self.history if pt[0] > 0]
+        if len(pts) < 2:
+            return None
+
+        method = "assumed_order"
+        p = self.assumed_order
+        if len(pts) >= 3:
+            (h1, f1), (h2, f2), (h3, f3) = pts[-3:]
+            p_obs = solve_order(h1, f1, h2, f2, h3, f3) if (h1 > h2 > h3) else None
+            if p_obs is not None:
+                p, method = p_obs, "richardson"
+            else:
+                method = "assumed_order_nonmonotonic"
+
+        (ha, fa), (hb, fb) = pts[-2:]
+        if ha <= hb or abs(fb) < 1e-12:
+            return None
+        denom = (ha / hb) ** p - 1.0
+        if abs(denom) < 1e-12:
+            return None
+        f_inf = fb + (fb - fa) / denom
+        if abs(f_inf) < 1e-12:
+            return None
+
+        err = abs(fb - f_inf) / abs(f_inf)
+        return {"value": f_inf, "order": p, "error": err, "method": method}
+
+    def is_converged(self, estimate=None):
+        est = estimate if estimate is not None else self.estimate()
+        return bool(est) and est["error"] <= self.tol
+
+    def next_size(self, estimate=None):
+        """Przewidywany rozmiar siatki spełniający tolerancję (z ograniczeniami)."""
+        h_last = self.history[-1][0] if self.history else 0.0
+        classic = h_last * self.factor
+        est = estimate if estimate is not None else self.estimate()
+
+        h_next = classic
+        if est and est["error"] > 0.0 and est["order"] > 0.0:
+            # err(h) = err_last * (h / h_last)^p  ->  err(h*) = safety * tol
+            h_pred = h_last * (self.safety * self.tol / est["error"]) ** (1.0 / est["order"])
+            h_next = min(classic, h_pred)
+            h_next = max(h_next, h_last * self.max_jump)
+
+        return max(self.min_size, h_next)
+
+    def describe(self, est):
+        """Krótki opis estymaty do logu."""
+        if not est:
+            return "brak estymaty (za mało siatek)"
+        return (f"VM_inf={est['value']:.2f} MPa, p={est['order']:.2f}, "
+                f"błąd={est['error']*100:.2f}% ({est['method']})")
@@ -0,0 +1,218 @@
+import os
+import sys
+import time
+import atexit
+import threading
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# ==============================================================================
+#  MESH WORKER POOL v1.0
+# ==============================================================================
+# Pula procesów siatkujących (Gmsh) izolowanych od GUI.
+# Odpowiada za:
+# 1. Uruchamianie N procesów roboczych, każdy z WŁASNĄ instancją Gmsh
+#    (Gmsh to globalny singleton - w jednym procesie nie da się siatkować równolegle).
+# 2. Przyjmowanie słowników parametrów geometrii (te same co generate_model).
+# 3. Zwracanie ścieżek plików i statystyk siatki (+ log z procesu roboczego).
+#
+# Procesy startują metodą 'spawn' (czysty interpreter, brak dziedziczenia stanu
+# Gmsh/Qt po rodzicu). Gmsh jest inicjalizowany RAZ na proces i zamykany przy
+# jego wyjściu - generatory wołają tylko gmsh.clear() między zadaniami.
+#
+# Pula jest współdzielona przez wątki (batch Shell, potok FEM): błąd jednego
+# zadania zwraca None tylko dla niego. Odtworzenie puli (pod blokadą) wyłącznie
+# po BrokenProcessPool - zadania, które padły razem z pulą, są ponawiane raz
+# w osobnym procesie (winne zadanie nie uszkodzi ponownie wspólnej puli).
+# ==============================================================================
+
+# Rodzaje generatorów: klucz -> (moduł, klasa)
+GENERATORS = {
+    "solid": ("engine_geometry", "GeometryGenerator"),
+    "shell": ("engine_geometry_shell", "GeometryGeneratorShell"),
+}
+
+def _init_worker(module_dir):
+    """Inicjalizacja procesu roboczego: ścieżki importu + własna instancja Gmsh."""
+    if module_dir and module_dir not in sys.path:
+        sys.path.insert(0, module_dir)
+    try:
+        import gmsh
+        if not gmsh.isInitialized():
+            # interruptible=False: sygnały zostają przy procesie, nie przy Gmsh
+            try: gmsh.initialize(interruptible=False)
+            except TypeError: gmsh.initialize()
+        atexit.register(_shutdown_gmsh)
+    except Exception:
+        # Brak gmsh zgłosi się dopiero przy pierwszym zadaniu (czytelny błąd w logu)
+        pass
+
+def _shutdown_gmsh():
+    try:
+        import gmsh
+        if gmsh.isInitialized(): gmsh.finalize()
+    except: pass
+
+def _mesh_job(kind, params):
+    """
+    Zadanie wykonywane w procesie roboczym.
+    Zwraca słownik: meta (wynik generate_model lub None), log, czas, pid.
+    """
+    log_lines = []
+    t0 = time.perf_counter()
+    meta = None
+    try:
+        mod_name, cls_name = GENERATORS[kind]
+        module = __import__(mod_name)
+        gen = getattr(module, cls_name)(logger_callback=log_lines.append)
+        meta = gen.generate_model(params)
+    except Exception as e:
+        log_lines.append(f"[MESH-POOL] Wyjątek w procesie {os.getpid()}: {e}")
+        log_lines.append(traceback.format_exc())
+        meta = None
+
+    return {
+        "meta": meta,
+        "log": log_lines,
+        "elapsed": time.perf_counter() - t0,
+        "pid": os.getpid(),
+        "model_name": params.get("model_name", "")
+    }
+
+class MeshWorkerPool:
+    def __init__(self, max_workers=None, threads_per_worker=None, logger_callback=None):
+        """
+        max_workers: liczba procesów Gmsh (domyślnie: rdzenie / 4, min. 1)
+        threads_per_worker: nadpisuje 'system_resources.num_threads' w zadaniach,
+                            żeby N procesów x wątki Gmsh nie przekroczyło liczby rdzeni.
+        """
+        cpu = os.cpu_count() or 1
+        if not max_workers:
+            max_workers = max(1, cpu // 4)
+        self.max_workers = int(max_workers)
+        self.threads_per_worker = threads_per_worker
+        self.logger = logger_callback
+        self._executor = None
+        self._lock = threading.Lock() # start / submit / shutdown z wielu wątków
+        self._module_dir = os.path.dirname(os.path.abspath(__file__))
+
+    def log(self, message):
+        msg = f"[MESH-POOL] {message}"
+        if self.logger: self.logger(msg)
+        else: print(msg)
+
+    # --- CYKL ŻYCIA ---
+    def start(self):
+        with self._lock:
+            self._start_locked()
+        return self
+
+    def _new_executor(self, max_workers):
+        ctx = multiprocessing.get_context("spawn")
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(self._module_dir,)
+        )
+
+    def _start_locked(self):
+        if self._executor is None:
+            self._executor = self._new_executor(self.max_workers)
+            self.log(f"Uruchomiono {self.max_workers} proces(y) siatkujące.")
+        return self._executor
+
+    def shutdown(self, wait=True, cancel_pending=False):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            try: executor.shutdown(wait=wait, cancel_futures=cancel_pending)
+            except TypeError: executor.shutdown(wait=wait)
+
+    def _reset_broken(self, broken):
+        """Odtwarza pulę po awarii procesu - tylko jeśli inny wątek jeszcze tego nie zrobił."""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
+        self.log("Pula procesów uszkodzona (proces padł w Gmsh/OCC) - odtwarzanie.")
+        broken.shutdown(wait=False)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown(wait=True, cancel_pending=exc_type is not None)
+        return False
+
+    # --- ZADANIA ---
+    def _prepare_params(self, params):
+        p = dict(params)
+        if self.threads_per_worker:
+            res = dict(p.get("system_resources", {}))
+            res["num_threads"] = int(self.threads_per_worker)
+            p["system_resources"] = res
+        return p
+
+    def _submit(self, params, kind):
+        """Zleca zadanie pod blokadą. Zwraca (pula, Future) - pula do rozpoznania awarii."""
+        if kind not in GENERATORS:
+            raise ValueError(f"[MESH-POOL] Nieznany typ generatora: {kind}")
+        with self._lock:
+            executor = self._start_locked()
+            try:
+                return executor, executor.submit(_mesh_job, kind, self._prepare_params(params))
+            except BrokenProcessPool:
+                # Pula padła przed zleceniem - nowa pula (stara zamykana w tle)
+                self._executor = None
+                executor.shutdown(wait=False)
+                executor = self._start_locked()
+                return executor, executor.submit(_mesh_job, kind, self._prepare_params(params))
+
+    def submit(self, params, kind="solid"):
+        """Asynchronicznie zleca siatkowanie. Zwraca Future z wynikiem _mesh_job."""
+        return self._submit(params, kind)[1]
+
+    def generate(self, params, kind="solid", log_callback=None):
+        """
+        Wersja blokująca - zamiennik GeometryGenerator.generate_model().
+        Przekazuje log procesu roboczego do log_callback i zwraca meta (lub None).
+        """
+        try:
+            executor, fut = self._submit(params, kind)
+            out = fut.result()
+        except BrokenProcessPool as e:
+            # Padł proces puli - wszystkie zadania w locie dostają ten błąd, nie tylko winne
+            self.log(f"Błąd procesu siatkującego: {e}")
+            self._reset_broken(executor)
+            out = self._run_isolated(params, kind)
+            if out is None: return None
+        except Exception as e:
+            self.log(f"Błąd zadania siatkowania: {e}")
+            return None
+        return self.unpack(out, log_callback)
+
+    def _run_isolated(self, params, kind):
+        """Ponowienie zadania w jednorazowym procesie (poza wspólną pulą). None = padło ponownie."""
+        self.log(f"Ponawiam siatkowanie w osobnym procesie: {params.get('model_name', '')}")
+        executor = self._new_executor(1)
+        try:
+            return executor.submit(_mesh_job, kind, self._prepare_params(params)).result()
+        except Exception as e:
+            self.log(f"Ponowienie nieudane ({params.get('model_name', '')}): {e}")
+            return None
+        finally:
+            executor.shutdown(wait=False)
+
+    def unpack(self, out, log_callback=None):
+        """Przekazuje log z procesu roboczego i zwraca meta wzbogacone o czas siatkowania."""
+        cb = log_callback or self.logger or print
+        for line in out.get("log", []):
+            cb(line)
+        meta = out.get("meta")
+        if meta:
+            meta.setdefault("stats", {})["mesh_time_s"] = out.get("elapsed", 0.0)
+            meta["stats"]["worker_pid"] = out.get("pid")
+        return meta
@@ -0,0 +1,165 @@
+import os
+import re
+import json
+import math
+import threading
+import datetime
+
+import atomic_io
+
+# ==============================================================================
+#  MESH WARM-START TABLE v1.0
+# ==============================================================================
+# Tabela "rozgrzewkowa" rozmiarów siatki zapisywana w projekcie.
+# Klucz:   (rodzina profilu, najcieńsza ścianka, rząd elementów) [+ typ analizy]
+# Wartość: zbieżny rozmiar siatki zapisany jako GĘSTOŚĆ względna
+#          (min_t / h = elementy na grubość ścianki).
+#
+# Podobne profile (ta sama rodzina, zbliżona grubość) zbiegają się przy
+# podobnej gęstości względnej -> nowy kandydat startuje od przewidzianego
+# rozmiaru i wykonuje tylko jeden krok weryfikacyjny zamiast pełnej serii.
+#
+# Klasa kalibracji (Shell): rodzina + klasa grubości (przedziały geometryczne
+# min_t, iloraz SIZE_CLASS_RATIO). Wpis z tej samej klasy zastępuje kalibrację.
+#
+# Plik współdzielą instancje z różnych wątków i procesów (FEM bryłowy, Shell,
+# równoległe zadania CLI): zapis = odczyt z dysku + scalenie wpisu + zapis
+# atomowy pod blokadą plikową; odczyt odświeża tabelę po zmianie pliku.
+# ==============================================================================
+
+FILE_NAME = "mesh_warmstart.json"
+SIZE_CLASS_RATIO = 1.5 # Iloraz granic klas grubości (np. 4-6, 6-9, 9-13.5 mm)
+
+def profile_family(candidate):
+    """Rodzina profilu: 'Typ' z katalogu (UPE/UPN/ALU) lub prefiks nazwy."""
+    typ = candidate.get("Input_UPE_Typ") or candidate.get("Typ")
+    if typ: return str(typ).upper()
+    name = str(candidate.get("Nazwa_Profilu", candidate.get("Name", "")))
+    m = re.match(r"[A-Za-z]+", name)
+    return m.group(0).upper() if m else "UNKNOWN"
+
+def min_wall_thickness(candidate):
+    """Najcieńsza ścianka kandydata (środnik, stopka, płaskownik) [mm]."""
+    vals = []
+    for k in ("Input_UPE_twc", "Input_UPE_tfc", "Input_Geo_tp", "Geom_t_w", "Geom_t_f", "Geom_t_p"):
+        try:
+            v = float(candidate[k])
+            if v > 0: vals.append(v)
+        except (KeyError, TypeError, ValueError):
+            pass
+    return min(vals) if vals else None
+
+def size_class(t_min):
+    """Klasa grubości ścianki (przedziały geometryczne) lub None."""
+    if not t_min or t_min <= 0: return None
+    return int(math.floor(math.log(t_min) / math.log(SIZE_CLASS_RATIO) + 1e-9))
+
+def calibration_key(candidate):
+    """Klucz grupy kalibracji: rodzina profilu + klasa najcieńszej ścianki (np. 'UPE|t5')."""
+    cls = size_class(min_wall_thickness(candidate))
+    return f"{profile_family(candidate)}|t{cls if cls is not None else '?'}"
+
+class MeshWarmStartTable:
+    def __init__(self, router_instance, analysis="solid", logger_callback=None):
+        self.router = router_instance
+        self.analysis = analysis
+        self.logger = logger_callback
+        self.path = router_instance.get_path("MES_WORK", FILE_NAME)
+        self._lock = threading.Lock()
+        self._mtime = None
+        self.data = self._load()
+
+    def log(self, message):
+        msg = f"[WARM-START] {message}"
+        if self.logger: self.logger(msg)
+        else: print(msg)
+
+    def _file_mtime(self):
+        try: return os.stat(self.path).st_mtime_ns
+        except OSError: return None
+
+    def _load(self):
+        self._mtime = self._file_mtime()
+        if self._mtime is not None:
+            try:
+                with open(self.path, 'r') as f: return json.load(f)
+            except Exception as e:
+                print(f"[WARM-START] Nie można odczytać tabeli ({e}) - start od zera.")
+        return {"version": 1, "entries": {}}
+
+    def _refresh(self):
+        """Ponowny odczyt, gdy plik zmienił inny proces / inna instancja (wołać pod self._lock)."""
+        if self._file_mtime() != self._mtime:
+            self.data = self._load()
+
+    def _entries(self, key):
+        with self._lock:
+            self._refresh()
+            return list(self.data["entries"].get(key, []))
+
+    def _key(self, family, order):
+        return f"{self.analysis}|{family}|o{int(order)}"
+
+    def record(self, candidate, order, mesh_size, iterations=None):
+        """Zapisuje zbieżny rozmiar siatki kandydata (jako gęstość względną)."""
+        t = min_wall_thickness(candidate)
+        if not t or not mesh_size or mesh_size <= 0: return
+        family = profile_family(candidate)
+        entry = {
+            "t_min": round(t, 3),
+            "density": t / float(mesh_size),
+            "mesh_size": float(mesh_size),
+            "profile": candidate.get("Nazwa_Profilu", candidate.get("Name", "")),
+            "iterations": iterations,
+            "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+        }
+        with self._lock:
+            try:
+                with atomic_io.file_lock(self.path):
+                    # Stan z dysku (wpisy innych instancji / procesów) + nowy wpis
+                    self.data = self._load()
+                    lst = self.data["entries"].setdefault(self._key(family, order), [])
+                    # Jedna pozycja na grubość: nowszy wynik zastępuje starszy
+                    lst[:] = [e for e in lst if abs(e["t_min"] - entry["t_min"]) > 1e-6]
+                    lst.append(entry)
+                    lst.sort(key=lambda e: e["t_min"])
+                    atomic_io.write_json(self.path, self.data, indent=2)
+                    self._mtime = self._file_mtime()
+            except Exception as e: self.log(f"Błąd zapisu tabeli: {e}")
+
+    def cached(self, candidate, order):
+        """
+        Rozmiar siatki [mm] z wpisu TEJ SAMEJ klasy grubości (wynik wcześniejszej
+        kalibracji w projekcie - bez ponownych obliczeń) lub None.
+        """
+        t = min_wall_thickness(candidate)
+        cls = size_class(t)
+        if cls is None: return None
+        lst = self._entries(self._key(profile_family(candidate), order))
+        same = [e for e in lst if size_class(e["t_min"]) == cls and e.get("density", 0) > 0]
+        if not same: return None
+        e = min(same, key=lambda e: abs(e["t_min"] - t))
+        return t / e["density"]
+
+    def predict(self, candidate, order):
+        """
+        Przewidywany rozmiar siatki [mm] lub None (brak danych dla rodziny/rzędu).
+        Gęstość interpolowana liniowo po grubości, poza zakresem - najbliższa.
+        """
+        t = min_wall_thickness(candidate)
+        if not t: return None
+        lst = self._entries(self._key(profile_family(candidate), order))
+        if not lst: return None
+
+        lower = [e for e in lst if e["t_min"] <= t]
+        upper = [e for e in lst if e["t_min"] >= t]
+        if lower and upper:
+            a, b = lower[-1], upper[0]
+            if b["t_min"] - a["t_min"] < 1e-9:
+                dens = a["density"]
+            else:
+                w = (t - a["t_min"]) / (b["t_min"] - a["t_min"])
+                dens = a["density"] + w * (b["density"] - a["density"])
+        else:
+            dens = (lower[-1] if lower else upper[0])["density"]
+        return t / dens if dens > 0 else None
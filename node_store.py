@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+
+# ==============================================================================
+#  NODE STORE v1.0
+# ==============================================================================
+# Binarny magazyn węzłów siatki (obok <nazwa>_nodes.csv).
+# Odpowiada za:
+# 1. Zapis węzłów z Gmsh do <nazwa>_nodes.npy (id + współrzędne, jedna tablica).
+# 2. Odczyt przez memory-map (.npy) z zapasowym, wektorowym odczytem CSV
+#    dla starszych katalogów roboczych.
+# 3. Mapowanie ID -> indeks bez słownika: searchsorted na posortowanych ID.
+#
+# CSV pozostaje bez zmian (NodeMapper, Shell, zewnętrzne skrypty).
+# ==============================================================================
+
+DTYPE_WEZLA = np.dtype([("id", np.int64), ("xyz", np.float64, (3,))])
+
+def sciezka_npy(sciezka_nodes_csv):
+    """<nazwa>_nodes.csv -> <nazwa>_nodes.npy"""
+    return os.path.splitext(sciezka_nodes_csv)[0] + ".npy"
+
+def zapisz_wezly(sciezka_nodes_csv, tags, coords):
+    """Zapis węzłów (tags i płaskie coords jak z gmsh.model.mesh.getNodes())."""
+    tags = np.asarray(tags, dtype=np.int64)
+    dane = np.empty(len(tags), dtype=DTYPE_WEZLA)
+    dane["id"] = tags
+    dane["xyz"] = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+    dane.sort(order="id")
+    sciezka = sciezka_npy(sciezka_nodes_csv)
+    np.save(sciezka, dane)
+    return sciezka
+
+class NodeStore:
+    def __init__(self, ids, xyz):
+        # ID rosnąco (warunek searchsorted)
+        if len(ids) > 1 and np.any(ids[1:] < ids[:-1]):
+            kolejnosc = np.argsort(ids, kind="stable")
+            ids, xyz = ids[kolejnosc], xyz[kolejnosc]
+        self.ids = ids
+        self.xyz = xyz
+
+    @classmethod
+    def wczytaj(cls, sciezka_nodes_csv):
+        """Z .npy (memory-map) lub - dla starszych wyników - z CSV. None, gdy brak plików."""
+        npy = sciezka_npy(sciezka_nodes_csv)
+        if os.path.exists(npy):
+            dane = np.load(npy, mmap_mode="r")
+            return cls(dane["id"], dane["xyz"])
+        if os.path.exists(sciezka_nodes_csv):
+            dane = np.loadtxt(sciezka_nodes_csv, delimiter=",", skiprows=1, ndmin=2)
+            return cls(dane[:, 0].astype(np.int64), np.ascontiguousarray(dane[:, 1:4]))
+        return None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def indeksy(self, node_ids):
+        """Indeksy w magazynie dla podanych ID (ID nieistniejące są pomijane)."""
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        if len(self.ids) == 0 or len(node_ids) == 0:
+            return np.empty(0, dtype=np.int64)
+        idx = np.searchsorted(self.ids, node_ids)
+        idx = np.clip(idx, 0, len(self.ids) - 1)
+        return idx[self.ids[idx] == node_ids]
+
+    def punkty(self, node_ids):
+        """Współrzędne węzłów jako ciągła tablica (N, 3) float64."""
+        return np.ascontiguousarray(self.xyz[self.indeksy(node_ids)], dtype=np.float64)
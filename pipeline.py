@@ -0,0 +1,189 @@
+import time
+import queue
+import threading
+import traceback
+
+# ==============================================================================
+#  CANDIDATE PIPELINE v1.0
+# ==============================================================================
+# Potokowe przetwarzanie kandydatów FEM: Siatka -> Solver -> Wyniki -> Archiwum.
+# Odpowiada za:
+# 1. Uruchomienie każdego etapu w osobnych wątkach (N wątków na etap).
+# 2. Ograniczone kolejki między etapami (back-pressure): szybki etap czeka,
+#    zamiast produkować dziesiątki siatek na zapas -> pamięć i dysk pod kontrolą.
+# 3. Pomiar czasu każdego etapu (praca / czekanie na dane / blokada wyjścia).
+# 4. Zwrot wyników w KOLEJNOŚCI wejściowej (deterministycznie).
+#
+# Ciężkie obliczenia i tak dzieją się poza GIL: Gmsh w puli procesów
+# (mesh_pool), CalculiX jako proces zewnętrzny. Wątki tylko je koordynują.
+# ==============================================================================
+
+class Stage:
+    """Definicja etapu: nazwa, funkcja(job) -> job, liczba wątków."""
+    def __init__(self, name, func, workers=1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+
+class PipelineItem:
+    """Koperta zadania płynącego przez potok."""
+    def __init__(self, index, payload):
+        self.index = index
+        self.payload = payload
+        self.error = None          # Tekst błędu (zadanie pomijane w kolejnych etapach)
+        self.failed_stage = None
+        self.skipped = False       # Przerwane na żądanie użytkownika
+        self.timings = {}          # {etap: sekundy pracy}
+
+class StageStats:
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.count = 0
+        self.errors = 0
+        self.busy_s = 0.0          # Czas pracy (suma po wątkach)
+        self.wait_in_s = 0.0       # Czas czekania na dane z poprzedniego etapu
+        self.blocked_out_s = 0.0   # Czas blokady na pełnej kolejce (back-pressure)
+        self.max_s = 0.0
+        self.lock = threading.Lock()
+
+    def as_dict(self):
+        avg = self.busy_s / self.count if self.count else 0.0
+        return {
+            "stage": self.name, "workers": self.workers, "count": self.count,
+            "errors": self.errors, "busy_s": round(self.busy_s, 3),
+            "avg_s": round(avg, 3), "max_s": round(self.max_s, 3),
+            "wait_in_s": round(self.wait_in_s, 3),
+            "blocked_out_s": round(self.blocked_out_s, 3)
+        }
+
+_SENTINEL = object()
+
+class CandidatePipeline:
+    def __init__(self, stages, queue_size=2, logger_callback=None):
+        """
+        stages: lista Stage w kolejności przepływu.
+        queue_size: pojemność kolejki PRZED każdym etapem (back-pressure).
+        """
+        if not stages:
+            raise ValueError("[PIPELINE] Brak zdefiniowanych etapów.")
+        self.stages = stages
+        self.queue_size = max(1, int(queue_size))
+        self.logger = logger_callback
+        self.stop_event = threading.Event()
+        self.stats = [StageStats(s.name, s.workers) for s in stages]
+        self.wall_time_s = 0.0
+
+    def log(self, message):
+        msg = f"[PIPELINE] {message}"
+        if self.logger: self.logger(msg)
+        else: print(msg)
+
+    def request_stop(self):
+        """Zadania w toku kończą bieżący etap, kolejne są pomijane."""
+        self.stop_event.set()
+
+    def _put(self, q, item, stats):
+        t0 = time.perf_counter()
+        q.put(item)
+        dt = time.perf_counter() - t0
+        if stats is not None:
+            with stats.lock: stats.blocked_out_s += dt
+
+    def _stage_loop(self, k, q_in, q_out, finished_counter, on_item_done):
+        stage = self.stages[k]
+        stats = self.stats[k]
+        while True:
+            t_wait = time.perf_counter()
+            item = q_in.get()
+            with stats.lock: stats.wait_in_s += time.perf_counter() - t_wait
+            if item is _SENTINEL:
+                break
+
+            if item.error is None and not item.skipped:
+                if self.stop_event.is_set():
+                    item.skipped = True
+                else:
+                    t0 = time.perf_counter()
+                    try:
+                        item.payload = stage.func(item.payload)
+                    except Exception as e:
+                        item.error = f"{e}"
+                        item.failed_stage = stage.name
+                        self.log(f"Błąd etapu '{stage.name}' (zadanie {item.index}): {e}")
+                        self.log(traceback.format_exc())
+                    dt = time.perf_counter() - t0
+                    item.timings[stage.name] = dt
+                    with stats.lock:
+                        stats.count += 1
+                        stats.busy_s += dt
+                        stats.max_s = max(stats.max_s, dt)
+                        if item.error is not None: stats.errors += 1
+
+            if q_out is not None:
+                self._put(q_out, item, stats)
+            else:
+                on_item_done(item)
+
+        # Ostatni wątek etapu zamyka kolejkę następnego etapu
+        with finished_counter["lock"]:
+            finished_counter["n"] += 1
+            last = finished_counter["n"] == stage.workers
+        if last and q_out is not None:
+            for _ in range(self.stages[k + 1].workers):
+                q_out.put(_SENTINEL)
+
+    def run(self, payloads, on_item_done=None):
+        """
+        Przepuszcza payloady przez wszystkie etapy. Blokuje do końca.
+        on_item_done(item): wołane z wątku ostatniego etapu (np. aktualizacja GUI).
+        Zwraca listę PipelineItem w kolejności wejściowej.
+        """
+        t_start = time.perf_counter()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results = [None] * len(payloads)
+        res_lock = threading.Lock()
+
+        def collect(item):
+            with res_lock: results[item.index] = item
+            if on_item_done:
+                try: on_item_done(item)
+                except Exception as e: self.log(f"Błąd callbacku wyniku: {e}")
+
+        threads = []
+        for k, stage in enumerate(self.stages):
+            q_out = queues[k + 1] if k + 1 < len(self.stages) else None
+            counter = {"n": 0, "lock": threading.Lock()}
+            for w in range(stage.workers):
+                t = threading.Thread(
+                    target=self._stage_loop,
+                    args=(k, queues[k], q_out, counter, collect),
+                    name=f"pipe-{stage.name}-{w}", daemon=True
+                )
+                t.start()
+                threads.append(t)
+
+        # Zasilanie potoku (blokuje się na pełnej kolejce = back-pressure od wejścia)
+        for idx, p in enumerate(payloads):
+            queues[0].put(PipelineItem(idx, p))
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_SENTINEL)
+
+        for t in threads:
+            t.join()
+
+        self.wall_time_s = time.perf_counter() - t_start
+        return results
+
+    def summary(self):
+        """Statystyki etapów jako lista słowników (do logu / raportu)."""
+        return [s.as_dict() for s in self.stats]
+
+    def log_summary(self):
+        self.log(f"Czas całkowity: {self.wall_time_s:.1f} s")
+        for s in self.summary():
+            self.log(
+                f"  {s['stage']:<8} x{s['workers']}: n={s['count']}, praca={s['busy_s']:.1f}s "
+                f"(śr. {s['avg_s']:.1f}s, max {s['max_s']:.1f}s), czekanie={s['wait_in_s']:.1f}s, "
+                f"blokada={s['blocked_out_s']:.1f}s, błędy={s['errors']}"
+            )
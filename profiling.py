@@ -0,0 +1,173 @@
+import os
+import time
+import pstats
+import cProfile
+import datetime
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+# ==============================================================================
+#  PROFILING v1.0
+# ==============================================================================
+# Profilowanie przebiegu włączane opcją (bez zmian w kodzie).
+# Odpowiada za:
+# 1. cProfile (tryb "cpu") - profil każdej sekcji (wątku), scalany do jednego
+#    pliku .pstats (snakeviz / python -m pstats).
+# 2. tracemalloc (tryb "mem") - migawka na końcu: top-N miejsc alokacji (.txt)
+#    oraz szczyt pamięci Pythona.
+# 3. Krótkie podsumowanie "gorących" funkcji w logu.
+#
+# Pliki trafiają do 99_Temp projektu (ProjectRouting.get_path("TEMP", ...)).
+# Tryb: "" (wyłączone), "cpu", "mem", "cpu+mem" (także True = "cpu").
+# cProfile mierzy wątek, w którym działa sekcja - potok FEM profiluje każde
+# wywołanie etapu osobno i scala wyniki.
+# ==============================================================================
+
+TOP_N = 10
+GLEBOKOSC_STOSU = 10 # Ramek stosu zapamiętywanych przez tracemalloc
+
+def normalizuj_tryb(tryb):
+    """Wartość z GUI / pliku zadania -> zbiór {"cpu", "mem"} (pusty = wyłączone)."""
+    if tryb is True:
+        return {"cpu"}
+    if not tryb:
+        return set()
+    czesci = {c.strip().lower() for c in str(tryb).replace(",", "+").split("+")}
+    if czesci & {"both", "all", "oba"}:
+        return {"cpu", "mem"}
+    return czesci & {"cpu", "mem"}
+
+class RunProfiler:
+    def __init__(self, nazwa, tryb, router_instance=None, log=print, top_n=TOP_N):
+        self.nazwa = nazwa
+        self.tryby = normalizuj_tryb(tryb)
+        self.router = router_instance
+        self.log = log
+        self.top_n = top_n
+        self._lock = threading.Lock()
+        self._stats = None
+        self._mem_started = False
+        self._t0 = None
+        self.pliki = []
+
+    @property
+    def aktywny(self):
+        return bool(self.tryby)
+
+    def _sciezka(self, sufiks):
+        ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        nazwa = f"PROFILE_{self.nazwa}_{ts}{sufiks}"
+        if self.router is not None:
+            return self.router.get_path("TEMP", nazwa)
+        return os.path.abspath(nazwa)
+
+    def start(self):
+        self._t0 = time.perf_counter()
+        if "mem" in self.tryby and not tracemalloc.is_tracing():
+            tracemalloc.start(GLEBOKOSC_STOSU)
+            self._mem_started = True
+        if self.aktywny:
+            self.log(f"[PROFIL] Start ({'+'.join(sorted(self.tryby))}): {self.nazwa}")
+        return self
+
+    @contextmanager
+    def sekcja(self):
+        """Profil CPU bieżącego wątku (scalany z pozostałymi sekcjami)."""
+        if "cpu" not in self.tryby:
+            yield
+            return
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            with self._lock:
+                if self._stats is None:
+                    self._stats = pstats.Stats(prof)
+                else:
+                    self._stats.add(prof)
+
+    def stop(self):
+        """Zapis plików i podsumowanie w logu. Zwraca listę zapisanych ścieżek."""
+        if not self.aktywny:
+            return []
+        czas = time.perf_counter() - (self._t0 or time.perf_counter())
+        self.log(f"[PROFIL] Koniec: {self.nazwa} ({czas:.1f} s)")
+        if self._stats is not None:
+            self._zapisz_cpu()
+        if self._mem_started:
+            self._zapisz_mem()
+        return self.pliki
+
+    def _zapisz_cpu(self):
+        sciezka = self._sciezka(".pstats")
+        try:
+            self._stats.dump_stats(sciezka)
+            self.pliki.append(sciezka)
+            self.log(f"[PROFIL] CPU: {sciezka}")
+        except Exception as e:
+            self.log(f"[PROFIL] (!) Zapis .pstats: {e}")
+        for linia in podsumowanie_cpu(self._stats, self.top_n):
+            self.log(linia)
+
+    def _zapisz_mem(self):
+        try:
+            migawka = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            biezaca, szczyt = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            self._mem_started = False
+        top = migawka.statistics("lineno")[:self.top_n]
+        linie = [f"Pamięć Pythona: bieżąca {biezaca / 2**20:.1f} MB, szczyt {szczyt / 2**20:.1f} MB",
+                 f"Top {len(top)} miejsc alokacji (stan na koniec przebiegu):"]
+        linie += [f"  {s.size / 2**20:8.2f} MB  {s.count:9d} bloków  {s.traceback}" for s in top]
+        sciezka = self._sciezka("_mem.txt")
+        try:
+            with open(sciezka, 'w', encoding='utf-8') as f:
+                f.write("\n".join(linie) + "\n\n")
+                # Pełne stosy największych alokacji
+                for s in migawka.statistics("traceback")[:5]:
+                    f.write(f"{s.size / 2**20:.2f} MB, {s.count} bloków:\n")
+                    f.write("\n".join(f"    {l}" for l in s.traceback.format()) + "\n\n")
+            self.pliki.append(sciezka)
+            self.log(f"[PROFIL] Pamięć: {sciezka}")
+        except Exception as e:
+            self.log(f"[PROFIL] (!) Zapis migawki pamięci: {e}")
+        for linia in linie[:2 + min(5, len(top))]:
+            self.log(f"[PROFIL] {linia}")
+
+    def __enter__(self):
+        self.start()
+        self._sekcja = self.sekcja()
+        self._sekcja.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._sekcja.__exit__(exc_type, exc, tb)
+        self.stop()
+        return False
+
+def podsumowanie_cpu(stats, top_n=TOP_N):
+    """Najbardziej kosztowne funkcje (czas własny) jako krótkie linie logu."""
+    st = stats.stats
+    suma = sum(v[2] for v in st.values()) or 1.0
+    top = sorted(st.items(), key=lambda kv: kv[1][2], reverse=True)[:top_n]
+    linie = [f"[PROFIL] Najdroższe funkcje (czas własny, razem {suma:.2f} s):"]
+    for (plik, linia, funkcja), (_, ncalls, tt, ct, _) in top:
+        linie.append(f"[PROFIL]   {tt:8.3f} s {tt / suma * 100:5.1f}%  (kum. {ct:8.3f} s, {ncalls:>9} wyw.)  "
+                     f"{os.path.basename(plik)}:{linia}({funkcja})")
+    return linie
+
+@contextmanager
+def profiluj(nazwa, tryb, router_instance=None, log=print):
+    """Skrót: profil całego bloku (jeden wątek). Przy wyłączonym trybie - bez narzutu."""
+    if not normalizuj_tryb(tryb):
+        yield None
+        return
+    with RunProfiler(nazwa, tryb, router_instance, log) as prof:
+        yield prof
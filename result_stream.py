@@ -0,0 +1,163 @@
+import os
+import csv
+import json
+import time
+
+import atomic_io
+
+# ==============================================================================
+#  RESULT STREAM WRITER v1.0
+# ==============================================================================
+# Strumieniowy zapis wierszy wyników optymalizatora.
+# Odpowiada za:
+# 1. Dopisywanie każdego wiersza od razu do CSV i JSON Lines (.jsonl) -
+#    przerwany przebieg zostawia na dysku wszystko, co zdążył policzyć.
+# 2. Okresowe opróżnianie buforów (co N wierszy lub co T sekund).
+# 3. Zbudowanie na końcu pliku .json (tablica) z odczytu strumienia .jsonl -
+#    bajtowo identycznego z json.dump(lista, indent=4, ensure_ascii=False).
+#
+# W pamięci trzymany jest tylko bieżący wiersz (stałe zużycie RAM przy 100k+ wierszy).
+# Kolejność kolumn CSV ustalana jest na podstawie PIERWSZEGO wiersza.
+# offsets()/resume() - współpraca z punktami kontrolnymi (run_checkpoint.py).
+# ==============================================================================
+
+def json_default(obj):
+    """Typy numpy -> typy Pythona (jak numpy_helper w eksporcie)."""
+    return obj.item() if hasattr(obj, 'item') else obj
+
+class StreamingResultWriter:
+    def __init__(self, sciezka_baza, uporzadkuj_kolumny=None, flush_co=100, flush_s=5.0):
+        """
+        sciezka_baza: ścieżka bez rozszerzenia (dopisywane .csv / .jsonl / .json)
+        uporzadkuj_kolumny: funkcja(lista_kluczy) -> lista_kluczy (kolejność CSV)
+        """
+        self.sciezka_baza = sciezka_baza
+        self.sciezka_csv = f"{sciezka_baza}.csv"
+        self.sciezka_jsonl = f"{sciezka_baza}.jsonl"
+        self.sciezka_json = f"{sciezka_baza}.json"
+        self.uporzadkuj_kolumny = uporzadkuj_kolumny
+        self.flush_co = max(1, int(flush_co))
+        self.flush_s = float(flush_s)
+
+        self.kolumny = None
+        self.liczba_wierszy = 0
+        self._f_csv = None
+        self._f_jsonl = None
+        self._csv = None
+        self._od_flush = 0
+        self._t_flush = time.perf_counter()
+        self._ostrz_kolumny = False
+
+    # --- ZAPIS ---
+    def _otworz(self, wiersz):
+        klucze = list(wiersz.keys())
+        self.kolumny = self.uporzadkuj_kolumny(klucze) if self.uporzadkuj_kolumny else klucze
+        self._f_csv = open(self.sciezka_csv, 'w', newline='', encoding='utf-8')
+        self._csv = csv.DictWriter(self._f_csv, fieldnames=self.kolumny, extrasaction='ignore')
+        self._csv.writeheader()
+        self._f_jsonl = open(self.sciezka_jsonl, 'w', encoding='utf-8')
+
+    def write_row(self, wiersz):
+        if self._f_csv is None:
+            self._otworz(wiersz)
+        elif not self._ostrz_kolumny and any(k not in self.kolumny for k in wiersz):
+            # Nowe klucze trafiają do JSON/JSONL, ale nie do CSV (nagłówek już zapisany)
+            self._ostrz_kolumny = True
+            print(f"[STREAM] (!) Wiersz {self.liczba_wierszy + 1} ma kolumny spoza nagłówka CSV - pominięte w CSV.")
+        self._csv.writerow(wiersz)
+        self._f_jsonl.write(json.dumps(wiersz, default=json_default, ensure_ascii=False))
+        self._f_jsonl.write("\n")
+        self.liczba_wierszy += 1
+        self._od_flush += 1
+        if self._od_flush >= self.flush_co or (time.perf_counter() - self._t_flush) >= self.flush_s:
+            self.flush()
+
+    def offsets(self):
+        """Rozmiary plików CSV / JSONL po opróżnieniu buforów (punkt kontrolny)."""
+        self.flush()
+        out = {}
+        for klucz, f in (("csv", self._f_csv), ("jsonl", self._f_jsonl)):
+            out[klucz] = os.fstat(f.fileno()).st_size if f is not None else 0
+        return out
+
+    def resume(self, offsety, kolumny, liczba_wierszy):
+        """
+        Wznowienie po przerwaniu: pliki przycinane do offsetów z punktu kontrolnego
+        (wiersze niedokończonej jednostki znikają) i otwierane do dopisywania.
+        Zwraca False, gdy pliki nie pasują do punktu kontrolnego.
+        """
+        if liczba_wierszy == 0 or not kolumny:
+            return True # Nic nie zapisano - zwykły start
+        for sciezka, klucz in ((self.sciezka_csv, "csv"), (self.sciezka_jsonl, "jsonl")):
+            if not os.path.exists(sciezka) or os.path.getsize(sciezka) < offsety[klucz]:
+                return False
+        for sciezka, klucz in ((self.sciezka_csv, "csv"), (self.sciezka_jsonl, "jsonl")):
+            os.truncate(sciezka, offsety[klucz])
+        self.kolumny = list(kolumny)
+        self._f_csv = open(self.sciezka_csv, 'a', newline='', encoding='utf-8')
+        self._csv = csv.DictWriter(self._f_csv, fieldnames=self.kolumny, extrasaction='ignore')
+        self._f_jsonl = open(self.sciezka_jsonl, 'a', encoding='utf-8')
+        self.liczba_wierszy = int(liczba_wierszy)
+        return True
+
+    def flush(self):
+        for f in (self._f_csv, self._f_jsonl):
+            if f is not None:
+                f.flush()
+        self._od_flush = 0
+        self._t_flush = time.perf_counter()
+
+    # --- ODCZYT STRUMIENIA ---
+    def iter_rows(self):
+        """Wiersze z pliku .jsonl (po kolei, bez ładowania całości)."""
+        if not os.path.exists(self.sciezka_jsonl):
+            return
+        self.flush()
+        with open(self.sciezka_jsonl, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _zapisz_json(self):
+        """Tablica JSON z odczytu strumienia (format = json.dump(..., indent=4))."""
+        with atomic_io.atomic_open(self.sciezka_json, 'w', encoding='utf-8') as out:
+            out.write("[")
+            pierwszy = True
+            for wiersz in self.iter_rows():
+                out.write("\n    " if pierwszy else ",\n    ")
+                blok = json.dumps(wiersz, default=json_default, indent=4, ensure_ascii=False)
+                out.write(blok.replace("\n", "\n    "))
+                pierwszy = False
+            out.write("]" if pierwszy else "\n]")
+
+    # --- ZAMKNIĘCIE ---
+    def close(self, finalizuj=True):
+        """
+        Zamyka pliki strumienia. finalizuj=True buduje dodatkowo .json.
+        Zwraca True, jeśli zapisano choć jeden wiersz.
+        """
+        for f in (self._f_csv, self._f_jsonl):
+            if f is not None:
+                f.flush()
+                f.close()
+        self._f_csv = self._f_jsonl = self._csv = None
+
+        if self.liczba_wierszy == 0:
+            print("(!) Brak danych do zapisu.")
+            return False
+        print(f"[OK] Zapisano CSV: {self.sciezka_csv}")
+        if finalizuj:
+            try:
+                self._zapisz_json()
+                print(f"[OK] Zapisano JSON: {self.sciezka_json}")
+            except Exception as e:
+                print(f"[BŁĄD] Zapis JSON: {e}")
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Przy wyjątku zostają CSV/JSONL (bez budowania .json)
+        self.close(finalizuj=exc_type is None)
+        return False
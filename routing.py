@@ -1,7 +1,22 @@
 import os
 import sys
+import gzip
+import json
+import time
+import fnmatch
 import datetime
 import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import atomic_io
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
 
 # ==============================================================================
 #  ROUTING MANAGER v1.0
@@ -11,8 +26,72 @@ import shutil
 # 1. Tworzenie struktury folderów dla Projektu.
 # 2. Wskazywanie ścieżek do zapisu (Analityka, Geometria, MES).
 # 3. Lokalizowanie zewnętrznych narzędzi (CCX).
+# 4. Archiwizacja wyników do 03_Final (dowiązania twarde / kopia zapasowo).
+# 5. Retencja folderów iteracji w 02_MES_Roboczy (ostatnie N, starsze
+#    odchudzone do skalarów + sond) i kompresja dużych plików tekstowych
+#    w tle (zstd, gdy dostępny, inaczej gzip).
 # ==============================================================================
 
+# Artefakty potrzebne dalej (agregator, widok 3D, import istniejących wyników).
+# Reszta folderu iteracji (.inp, .dat, .sta, ...) zostaje w 02_MES_Roboczy.
+ARCHIVE_PATTERNS = ("results.json", "analytical.json", "failed.json", "*.msh", "*.frd", "*.npz")
+
+# Polityka retencji (domyślnie wyłączona - wszystko zostaje, jak dotychczas)
+DEFAULT_RETENTION = {
+    "keep_last": 0,       # Pełne foldery iteracji kandydata (0 = wszystkie); iteracja finalna zawsze pełna
+    "slim": True,         # Starsze iteracje: tylko JSON bez pola węzłowego (False = usunięcie folderu)
+    "compress": "",       # "", "gzip", "zstd", "auto" - kompresja dużych plików w zachowanych iteracjach
+    "compress_min_mb": 5.0,
+}
+SLIM_KEEP_FILES = ("results.json", "analytical.json", "failed.json")
+SLIM_DROP_KEYS = ("FULL_NODAL_RESULTS",) # Pole węzłowe - reszta results.json to skalary i sondy
+COMPRESS_EXT = (".dat", ".frd", ".inp", ".sta", ".cvg", ".out", ".msh")
+
+def _rozmiar_katalogu(path):
+    suma = 0
+    for root, _, files in os.walk(path):
+        for fn in files:
+            try: suma += os.path.getsize(os.path.join(root, fn))
+            except OSError: pass
+    return suma
+
+def compress_file(path, method="gzip"):
+    """
+    Kompresja pliku obok (path.gz / path.zst) i usunięcie oryginału.
+    Zwraca (rozmiar przed, rozmiar po).
+    """
+    if method == "zstd" and not HAS_ZSTD:
+        method = "gzip"
+    dst = path + (".zst" if method == "zstd" else ".gz")
+    tmp = dst + ".part"
+    przed = os.path.getsize(path)
+    with open(path, 'rb') as f_in:
+        if method == "zstd":
+            with open(tmp, 'wb') as f_out:
+                zstandard.ZstdCompressor(level=3).copy_stream(f_in, f_out)
+        else:
+            with gzip.open(tmp, 'wb', compresslevel=6) as f_out:
+                shutil.copyfileobj(f_in, f_out, 1 << 20)
+    shutil.copystat(path, tmp)
+    os.replace(tmp, dst)
+    os.remove(path)
+    return przed, os.path.getsize(dst)
+
+def link_or_copy(src, dst):
+    """
+    Twarde dowiązanie (bez kopiowania danych) lub kopia, gdy niemożliwe
+    (inny dysk, FAT, brak uprawnień). Zwraca "link" / "copy".
+    Uwaga: plik dowiązany dzieli treść ze źródłem - źródła nie nadpisujemy w miejscu.
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return "link"
+    except (OSError, AttributeError, NotImplementedError):
+        shutil.copy2(src, dst)
+        return "copy"
+
 class ProjectRouting:
     def __init__(self, base_output_dir="WYNIKI"):
         # --- ZMIANA DLA EXE ---
@@ -40,6 +119,14 @@ class ProjectRouting:
         # Ścieżka do CalculiX
         self.ccx_path = os.path.join(self.root_dir, "solver_bin", "ccx.exe")
 
+        # [NOWOŚĆ] Retencja / kompresja 02_MES_Roboczy
+        self.retention = dict(DEFAULT_RETENTION)
+        self._retention_lock = threading.Lock()
+        self._compress_pool = None
+        self._compress_jobs = []
+        self._compress_pending = {} # Ścieżka pliku -> Future (kompresja w toku / w kolejce)
+        self.reset_retention_stats()
+
     def set_project(self, project_name=None):
         """Ustawia aktywny projekt i tworzy jego strukturę folderów."""
         if not project_name:
@@ -87,6 +174,203 @@ class ProjectRouting:
         
         return os.path.join(base_folder, filename)
 
+    def archive_directory(self, src_dir, name, patterns=ARCHIVE_PATTERNS, source=None):
+        """
+        Archiwizuje wybrane pliki folderu roboczego do 03_Final/<name>.
+        Pliki trafiają najpierw do ukrytego folderu tymczasowego w 03_Final
+        (dowiązania / kopie) razem z manifestem (atomic_io), który na końcu
+        zastępuje cel przez rename - czytelnik nigdy nie widzi połowy wyniku,
+        a stary wynik znika dopiero po udanej podmianie.
+        source: folder przebiegu zapisany w manifeście (domyślnie src_dir).
+        Zwraca (ścieżka docelowa, {"link": n, "copy": n, "bytes": n}).
+        """
+        final_root = self.get_path("FINAL", "")
+        dest = os.path.join(final_root, name)
+        staging = tempfile.mkdtemp(prefix=f".{name}_staging_", dir=final_root)
+        stats = {"link": 0, "copy": 0, "bytes": 0}
+        try:
+            for fn in sorted(os.listdir(src_dir)):
+                src = os.path.join(src_dir, fn)
+                if not os.path.isfile(src) or not any(fnmatch.fnmatch(fn, p) for p in patterns):
+                    continue
+                stats[link_or_copy(src, os.path.join(staging, fn))] += 1
+                stats["bytes"] += os.path.getsize(src)
+            atomic_io.write_manifest(staging, extra={"source": source or src_dir})
+
+            old = None
+            if os.path.exists(dest):
+                old = tempfile.mkdtemp(prefix=f".{name}_old_", dir=final_root)
+                os.rmdir(old)
+                os.rename(dest, old)
+            try:
+                os.rename(staging, dest)
+            except OSError:
+                if old: os.rename(old, dest) # Przywrócenie poprzedniego wyniku
+                raise
+            atomic_io.fsync_dir(final_root)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        if old:
+            shutil.rmtree(old, ignore_errors=True)
+        return dest, stats
+
+    # ==========================================================================
+    # [NOWOŚĆ] RETENCJA I KOMPRESJA FOLDERÓW ROBOCZYCH
+    # ==========================================================================
+
+    def set_retention(self, keep_last=None, slim=None, compress=None, compress_min_mb=None):
+        """Ustawia politykę retencji (None = bez zmiany). Zwraca bieżącą politykę."""
+        for k, v in (("keep_last", keep_last), ("slim", slim), ("compress", compress), ("compress_min_mb", compress_min_mb)):
+            if v is not None:
+                self.retention[k] = v
+        self.retention["keep_last"] = max(0, int(self.retention["keep_last"]))
+        self.retention["compress"] = str(self.retention["compress"] or "").lower()
+        return dict(self.retention)
+
+    def reset_retention_stats(self):
+        with self._retention_lock:
+            self.retention_stats = {"removed": 0, "slimmed": 0, "freed_bytes": 0, "compressed": 0,
+                                    "bytes_before": 0, "bytes_after": 0, "time_s": 0.0}
+
+    def _stat_add(self, **delta):
+        with self._retention_lock:
+            for k, v in delta.items():
+                self.retention_stats[k] += v
+
+    def apply_retention(self, work_root, keep_dirs=()):
+        """
+        Retencja folderów iteracji w work_root (np. 02_MES_Roboczy/<cid>).
+        keep_dirs: foldery zawsze pełne (iteracja finalna). Pozostałe - ostatnie
+        keep_last wg czasu modyfikacji pełne, starsze odchudzone / usunięte.
+        Kompresja zachowanych folderów trafia do wątku w tle.
+        Zwraca {"removed", "slimmed", "freed_bytes"} dla tego wywołania.
+        """
+        pol = self.retention
+        out = {"removed": 0, "slimmed": 0, "freed_bytes": 0}
+        if not work_root or not os.path.isdir(work_root):
+            return out
+        t0 = time.perf_counter()
+        keep = {os.path.normpath(d) for d in keep_dirs if d}
+        dirs = [os.path.join(work_root, d) for d in os.listdir(work_root)]
+        dirs = sorted((d for d in dirs if os.path.isdir(d)), key=os.path.getmtime, reverse=True)
+
+        pelne = [d for d in dirs if os.path.normpath(d) in keep]
+        reszta = [d for d in dirs if os.path.normpath(d) not in keep]
+        if pol["keep_last"] > 0:
+            ile = max(0, pol["keep_last"] - len(pelne))
+            pelne += reszta[:ile]
+            stare = reszta[ile:]
+        else:
+            pelne += reszta
+            stare = []
+
+        for d in stare:
+            # Kompresja w tle z poprzedniego wywołania może jeszcze czytać pliki folderu
+            self._wait_compression_dir(d)
+            przed = _rozmiar_katalogu(d)
+            if pol["slim"]:
+                self._slim_dir(d)
+                out["slimmed"] += 1
+            else:
+                shutil.rmtree(d, ignore_errors=True)
+                out["removed"] += 1
+            out["freed_bytes"] += przed - (_rozmiar_katalogu(d) if os.path.isdir(d) else 0)
+
+        self._stat_add(time_s=time.perf_counter() - t0, **out)
+        if pol["compress"]:
+            for d in pelne:
+                self._schedule_compression(d)
+        return out
+
+    def _slim_dir(self, d):
+        """Zostawia tylko SLIM_KEEP_FILES; z results.json usuwa pole węzłowe."""
+        for fn in os.listdir(d):
+            path = os.path.join(d, fn)
+            if fn in SLIM_KEEP_FILES and os.path.isfile(path):
+                continue
+            if os.path.isdir(path): shutil.rmtree(path, ignore_errors=True)
+            else:
+                try: os.remove(path)
+                except OSError: pass
+        res_path = os.path.join(d, "results.json")
+        if not os.path.exists(res_path):
+            return
+        try:
+            with open(res_path, 'r') as f: res = json.load(f)
+            if not any(k in res for k in SLIM_DROP_KEYS):
+                return
+            for k in SLIM_DROP_KEYS: res.pop(k, None)
+            res["retention"] = "slim"
+            atomic_io.write_json(res_path, res) # Nowy plik - dowiązania (03_Final) zostają nietknięte
+        except Exception as e:
+            print(f"[ROUTING] Retencja: nie odchudzono {res_path}: {e}")
+
+    def _schedule_compression(self, d):
+        method = self.retention["compress"]
+        if method == "auto":
+            method = "zstd" if HAS_ZSTD else "gzip"
+        prog = float(self.retention["compress_min_mb"]) * 1024 * 1024
+        pliki = []
+        for fn in os.listdir(d):
+            path = os.path.join(d, fn)
+            if not fn.lower().endswith(COMPRESS_EXT) or not os.path.isfile(path):
+                continue
+            st = os.stat(path)
+            # Dowiązane do 03_Final: kompresja nic by nie zwolniła
+            if st.st_size >= prog and st.st_nlink == 1:
+                pliki.append(path)
+        if not pliki:
+            return
+        with self._retention_lock:
+            if self._compress_pool is None:
+                self._compress_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mes-compress")
+            for p in pliki:
+                if p in self._compress_pending: continue # Już w kolejce (ponowna retencja folderu)
+                fut = self._compress_pool.submit(self._compress_job, p, method)
+                self._compress_pending[p] = fut
+                self._compress_jobs.append(fut)
+
+    def _wait_compression_dir(self, d):
+        """Czeka na kompresję plików folderu d (przed odchudzeniem / usunięciem)."""
+        d = os.path.normpath(d)
+        with self._retention_lock:
+            jobs = [f for p, f in self._compress_pending.items() if os.path.dirname(os.path.normpath(p)) == d]
+        for j in jobs:
+            j.result()
+
+    def _compress_job(self, path, method):
+        t0 = time.perf_counter()
+        try:
+            wynik = compress_file(path, method)
+        except Exception as e:
+            print(f"[ROUTING] Kompresja {os.path.basename(path)}: {e}")
+            return
+        finally:
+            with self._retention_lock:
+                self._compress_pending.pop(path, None)
+        przed, po = wynik
+        self._stat_add(compressed=1, bytes_before=przed, bytes_after=po,
+                           freed_bytes=przed - po, time_s=time.perf_counter() - t0)
+
+    def wait_compression(self):
+        """Czeka na zakończenie kompresji w tle (koniec batcha)."""
+        with self._retention_lock:
+            jobs, self._compress_jobs = self._compress_jobs, []
+        for j in jobs:
+            j.result()
+
+    def retention_report(self):
+        """Podsumowanie retencji i kompresji (tekst do logu) lub "" gdy nic nie zrobiono."""
+        with self._retention_lock:
+            s = dict(self.retention_stats)
+        if not (s["removed"] or s["slimmed"] or s["compressed"]):
+            return ""
+        mb = 1024 * 1024
+        return (f"Retencja 02_MES_Roboczy: usunięto {s['removed']}, odchudzono {s['slimmed']} folderów iteracji, "
+                f"skompresowano {s['compressed']} plików ({s['bytes_before']/mb:.1f} MB -> {s['bytes_after']/mb:.1f} MB). "
+                f"Zwolniono {s['freed_bytes']/mb:.1f} MB w {s['time_s']:.1f} s.")
+
     def get_ccx_path(self):
         """Zwraca ścieżkę do pliku wykonywalnego CalculiX."""
         if not os.path.exists(self.ccx_path):
@@ -0,0 +1,72 @@
+import os
+import json
+import time
+import hashlib
+import datetime
+
+import atomic_io
+
+# ==============================================================================
+#  RUN CHECKPOINT v1.0
+# ==============================================================================
+# Punkty kontrolne długiej optymalizacji analitycznej (solver_1_standard).
+# Odpowiada za:
+# 1. Zapis stanu pętli (materiał, indeks profilu, indeks_optimum_poprzedni,
+#    licznik wzrostu masy, masa referencyjna) oraz stanu strumienia wyników
+#    (liczba wierszy, offsety CSV/JSONL, kolumny).
+# 2. Odczyt stanu przy wznowieniu - ukończone jednostki (materiał, profil)
+#    są pomijane, niedokończona jest liczona od nowa.
+# 3. Ochronę przed wznowieniem z inną konfiguracją (skrót RunConfig).
+#
+# Stan zapisywany jest na POCZĄTKU jednostki (profil i = jeszcze nie policzony),
+# atomowo (atomic_io: plik tymczasowy + fsync + os.replace), nie częściej niż co 'interwal_s'.
+# Po poprawnym zakończeniu przebiegu plik jest usuwany.
+# ==============================================================================
+
+WERSJA = 1
+
+def skrot_konfiguracji(cfg):
+    """Skrót RunConfig - wznowienie dozwolone tylko dla identycznej konfiguracji."""
+    dane = json.dumps(cfg.to_dict(), sort_keys=True, default=str)
+    return hashlib.sha1(dane.encode("utf-8")).hexdigest()
+
+class OptimizationCheckpoint:
+    def __init__(self, sciezka_baza, cfg, interwal_s=2.0):
+        self.sciezka = f"{sciezka_baza}.checkpoint.json"
+        self.skrot = skrot_konfiguracji(cfg)
+        self.interwal_s = float(interwal_s)
+        self._t_zapisu = 0.0
+
+    def wczytaj(self):
+        """Stan z poprzedniego przebiegu lub None (brak / inna konfiguracja / uszkodzony plik)."""
+        if not os.path.exists(self.sciezka):
+            return None
+        try:
+            with open(self.sciezka, 'r', encoding='utf-8') as f:
+                stan = json.load(f)
+        except Exception as e:
+            print(f"[CHECKPOINT] (!) Nie można odczytać punktu kontrolnego: {e}")
+            return None
+        if stan.get("wersja") != WERSJA or stan.get("config_hash") != self.skrot:
+            print("[CHECKPOINT] (!) Punkt kontrolny dotyczy innej konfiguracji - start od początku.")
+            return None
+        return stan
+
+    def zapisz(self, stan, wymus=False):
+        """Zapis stanu (throttling: co interwal_s, chyba że wymus=True)."""
+        teraz = time.perf_counter()
+        if not wymus and (teraz - self._t_zapisu) < self.interwal_s:
+            return False
+        dane = dict(stan)
+        dane["wersja"] = WERSJA
+        dane["config_hash"] = self.skrot
+        dane["zapisano"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        atomic_io.write_json(self.sciezka, dane, indent=2, encoding='utf-8', ensure_ascii=False)
+        self._t_zapisu = teraz
+        return True
+
+    def usun(self):
+        try:
+            if os.path.exists(self.sciezka): os.remove(self.sciezka)
+        except OSError:
+            pass
@@ -0,0 +1,105 @@
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+
+# ==============================================================================
+#  RUN CONFIG v1.0
+# ==============================================================================
+# Niezmienna konfiguracja jednego przebiegu optymalizacji analitycznej.
+# Odpowiada za:
+# 1. Przekazywanie parametrów do solverów jako argument (zamiast zapisu
+#    config_solver.py na dysk i importlib.reload).
+# 2. Niezależność równoległych badań - każdy proces/wątek ma własny obiekt.
+# 3. Zgodność wstecz: config_solver.py pozostaje źródłem wartości domyślnych
+#    (RunConfig.from_module), nazwy pól są identyczne jak w pliku.
+#
+# Słowniki są zamrażane (MappingProxyType), listy zamieniane na krotki.
+# Obiekt jest "picklowalny" (przekazanie do ProcessPoolExecutor).
+# ==============================================================================
+
+def _freeze(value):
+    if isinstance(value, dict) or isinstance(value, MappingProxyType):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _thaw(value):
+    if isinstance(value, (dict, MappingProxyType)):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+@dataclass(frozen=True)
+class RunConfig:
+    # --- OBCIĄŻENIA I BEZPIECZEŃSTWO ---
+    LOAD_PARAMS: MappingProxyType = field(default_factory=lambda: {
+        "Fx": 24000.0, "F_promien": 450.0, "L": 300, "w_Ty": 0.2, "w_Tz": 0.2})
+    SAFETY_PARAMS: MappingProxyType = field(default_factory=lambda: {
+        "gamma_M0": 2.0, "gamma_M1": 2.0, "alfa_imp": 0.49})
+    # --- ZAKRES POSZUKIWAŃ ---
+    LISTA_MATERIALOW: tuple = ("S355",)
+    MIN_SZEROKOSC_OTWARCIA: float = 70.0
+    MAX_GRUBOSC_PLASKOWNIKA: float = 25.0
+    # --- PLIKI / RAPORT ---
+    NAZWA_BADANIA: str = ""
+    WSPOLNY_KATALOG: bool = False
+    POKAZUJ_KROKI_POSREDNIE: bool = False
+    EKSPORT_KOLUMNOWY: bool = False # Dodatkowy plik .parquet / .npz (columnar_export.py)
+    # --- PARAMETRY ALGORYTMU (solver_1_standard) ---
+    START_SEARCH_OFFSET: int = 2
+    MAX_N_WZROSTOW_WAGI: int = 2
+    ILE_KROKOW_W_GORE: int = 2
+    KROK_POSZERZANIA: float = 10.0
+    LIMIT_POSZERZANIA: float = 2.0
+    # Parametry dodatkowe innych algorytmów (OPTIMIZER_REGISTRY) - dostępne jako atrybuty
+    EXTRA: MappingProxyType = field(default_factory=dict)
+
+    def __post_init__(self):
+        for f in fields(self):
+            object.__setattr__(self, f.name, _freeze(getattr(self, f.name)))
+
+    def __getattr__(self, name):
+        # Wywoływane tylko dla brakujących atrybutów -> parametry z EXTRA
+        extra = self.__dict__.get("EXTRA", {})
+        if name in extra:
+            return extra[name]
+        raise AttributeError(f"RunConfig: brak parametru {name}")
+
+    def __reduce__(self):
+        return (RunConfig.from_dict, (self.to_dict(),))
+
+    @classmethod
+    def field_names(cls):
+        return [f.name for f in fields(cls) if f.name != "EXTRA"]
+
+    @classmethod
+    def from_dict(cls, data):
+        """Konfiguracja ze słownika (nieznane klucze WIELKIMI literami -> EXTRA)."""
+        known = set(cls.field_names())
+        kwargs, extra = {}, dict(data.get("EXTRA", {}))
+        for k, v in data.items():
+            if k == "EXTRA": continue
+            if k in known: kwargs[k] = v
+            elif k.isupper(): extra[k] = v
+            else: raise ValueError(f"RunConfig: nieprawidłowy klucz '{k}'")
+        return cls(EXTRA=extra, **kwargs)
+
+    @classmethod
+    def from_module(cls, module=None):
+        """Konfiguracja z modułu (domyślnie config_solver.py - źródło wartości domyślnych)."""
+        if module is None:
+            import config_solver as module
+        return cls.from_dict({k: getattr(module, k) for k in dir(module) if k.isupper()})
+
+    def with_overrides(self, **changes):
+        """Nowy obiekt z podmienionymi wartościami (oryginał bez zmian)."""
+        data = self.to_dict()
+        data.update(changes)
+        return RunConfig.from_dict(data)
+
+    def to_dict(self):
+        """Zwykły słownik (dict/list) - do JSON, raportów i pickle."""
+        out = {name: _thaw(getattr(self, name)) for name in self.field_names()}
+        out.update(_thaw(self.EXTRA))
+        return out
@@ -0,0 +1,310 @@
+import os
+import re
+import time
+import queue
+import signal
+import threading
+import subprocess
+
+# ==============================================================================
+#  SOLVER WATCHDOG v1.0
+# ==============================================================================
+# Nadzór nad procesem CalculiX (ccx).
+# Odpowiada za:
+# 1. Limit czasu (wall-clock) - zawieszony / rozbieżny solver nie blokuje batcha.
+# 2. Limit pamięci (szczytowe RSS z /proc, opcjonalnie psutil) - przerwanie
+#    zanim solver bezpośredni zacznie swapować.
+# 3. Zamianę linii wyjścia CCX na ustrukturyzowane zdarzenia postępu.
+# 4. Czyste zabicie procesu (cała grupa procesów: TERM -> czas łaski -> KILL).
+#
+# Odczyt stdout odbywa się w osobnym wątku, więc pętla nadzoru działa także
+# wtedy, gdy solver przez długi czas nic nie wypisuje.
+# ==============================================================================
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+STATUS_OK = "OK"
+STATUS_ERROR = "ERROR"       # Niezerowy kod wyjścia
+STATUS_TIMEOUT = "TIMEOUT"
+STATUS_MEMORY = "MEMORY"
+STATUS_STOPPED = "STOPPED"   # Przerwane na żądanie
+STATUS_LAUNCH = "LAUNCH"     # Nie udało się uruchomić procesu
+
+# Wzorce postępu CCX: (regex, funkcja -> słownik zdarzenia)
+_PATTERNS = [
+    (re.compile(r"^\s*STEP\s+(\d+)", re.I), lambda m: {"type": "step", "step": int(m.group(1))}),
+    (re.compile(r"increment\s+(\d+)\s+attempt\s+(\d+)", re.I),
+     lambda m: {"type": "increment", "increment": int(m.group(1)), "attempt": int(m.group(2))}),
+    (re.compile(r"iteration\s+(\d+)", re.I), lambda m: {"type": "iteration", "iteration": int(m.group(1))}),
+    (re.compile(r"equation system has\s+(\d+)\s+equations", re.I),
+     lambda m: {"type": "equations", "equations": int(m.group(1))}),
+    (re.compile(r"using up to\s+(\d+)\s+cpu", re.I), lambda m: {"type": "threads", "threads": int(m.group(1))}),
+    (re.compile(r"(determining the structure|calculating stiffness|factoring the system|solving the system|"
+                r"calculating the eigenvalues|buckling factor|storing the results|calculating the stresses)", re.I),
+     lambda m: {"type": "phase", "phase": m.group(1).lower()}),
+    (re.compile(r"\*error", re.I), lambda m: {"type": "error"}),
+    (re.compile(r"\*warning", re.I), lambda m: {"type": "warning"}),
+    (re.compile(r"job finished", re.I), lambda m: {"type": "finished"}),
+]
+
+def parse_progress_line(line, state=None):
+    """
+    Zamienia linię wyjścia CCX na zdarzenie (dict) lub None.
+    state: słownik stanu parsera (np. 'number of equations' jest w osobnej linii niż liczba).
+    """
+    l = line.strip()
+    if not l: return None
+    if state is not None:
+        if state.pop("expect_equations", False) and l.isdigit():
+            return {"type": "equations", "equations": int(l)}
+        if l.lower() == "number of equations":
+            state["expect_equations"] = True
+            return None
+    for rx, build in _PATTERNS:
+        m = rx.search(l)
+        if m:
+            ev = build(m)
+            if ev["type"] in ("error", "warning"): ev["text"] = l
+            return ev
+    return None
+
+# --- PAMIĘĆ ---
+def _children_map():
+    """Mapa ppid -> [pid] z /proc (Linux)."""
+    out = {}
+    try:
+        for name in os.listdir("/proc"):
+            if not name.isdigit(): continue
+            try:
+                with open(f"/proc/{name}/stat", 'r') as f:
+                    data = f.read()
+                ppid = int(data[data.rfind(")") + 2:].split()[1])
+                out.setdefault(ppid, []).append(int(name))
+            except (OSError, ValueError, IndexError):
+                pass
+    except OSError:
+        pass
+    return out
+
+def _rss_kb_proc(pid):
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+def process_tree_rss_mb(pid):
+    """RSS procesu i jego potomków [MB] (None, gdy pomiar niedostępny)."""
+    if os.path.isdir("/proc"):
+        children = _children_map()
+        total, stack = 0, [pid]
+        while stack:
+            p = stack.pop()
+            total += _rss_kb_proc(p)
+            stack.extend(children.get(p, []))
+        return total / 1024.0
+    if HAS_PSUTIL:
+        try:
+            proc = psutil.Process(pid)
+            total = proc.memory_info().rss
+            for ch in proc.children(recursive=True):
+                try: total += ch.memory_info().rss
+                except Exception: pass
+            return total / (1024.0 * 1024.0)
+        except Exception:
+            return None
+    return None
+
+def physical_memory_mb():
+    """Całkowita pamięć fizyczna [MB] (None, gdy nieznana)."""
+    try:
+        with open("/proc/meminfo", 'r') as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) / 1024.0
+    except (OSError, ValueError):
+        pass
+    if HAS_PSUTIL:
+        try: return psutil.virtual_memory().total / (1024.0 * 1024.0)
+        except Exception: pass
+    return None
+
+class SolverRunResult:
+    def __init__(self):
+        self.status = STATUS_OK
+        self.returncode = None
+        self.elapsed_s = 0.0
+        self.peak_rss_mb = 0.0
+        self.equations = None
+        self.reason = ""
+        self.last_lines = []   # Ogon wyjścia CCX (diagnostyka)
+        self.events = []       # Zdarzenia postępu (bez 'iteration'/'increment' - te tylko liczone)
+        self.counters = {}
+
+    @property
+    def ok(self):
+        return self.status == STATUS_OK
+
+    def as_dict(self):
+        return {
+            "status": self.status, "returncode": self.returncode,
+            "elapsed_s": round(self.elapsed_s, 2), "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "equations": self.equations, "reason": self.reason,
+            "counters": self.counters, "events": self.events[-50:],
+            "last_lines": self.last_lines
+        }
+
+class SolverWatchdog:
+    def __init__(self, timeout_s=None, max_rss_mb=None, poll_s=0.5, grace_s=5.0, rss_interval_s=1.0):
+        """
+        timeout_s: limit czasu [s] (None/0 = brak)
+        max_rss_mb: limit pamięci drzewa procesów [MB] (None/0 = brak)
+        """
+        self.timeout_s = float(timeout_s) if timeout_s else None
+        self.max_rss_mb = float(max_rss_mb) if max_rss_mb else None
+        self.poll_s = poll_s
+        self.grace_s = grace_s
+        self.rss_interval_s = rss_interval_s
+        self.stop_event = threading.Event()
+        self._proc = None
+
+    def request_stop(self):
+        self.stop_event.set()
+
+    @staticmethod
+    def _reader(stream, q):
+        try:
+            for line in iter(stream.readline, ''):
+                q.put(line)
+        except Exception:
+            pass
+        finally:
+            q.put(None)
+
+    def _kill(self, proc):
+        """TERM dla całej grupy procesów, po czasie łaski KILL."""
+        if proc.poll() is not None: return
+        try:
+            if os.name == 'nt':
+                # shell=True -> zabijamy całe drzewo (cmd.exe + ccx.exe)
+                subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            else:
+                os.killpg(os.getpgid(proc.pid), signal.SIGTERM)
+        except Exception:
+            try: proc.terminate()
+            except Exception: pass
+        try:
+            proc.wait(timeout=self.grace_s)
+        except subprocess.TimeoutExpired:
+            try:
+                if os.name != 'nt': os.killpg(os.getpgid(proc.pid), signal.SIGKILL)
+                else: proc.kill()
+            except Exception:
+                try: proc.kill()
+                except Exception: pass
+            try: proc.wait(timeout=self.grace_s)
+            except Exception: pass
+
+    def run(self, cmd, cwd, env=None, shell=False, line_callback=None, event_callback=None):
+        """Uruchamia proces pod nadzorem. Zwraca SolverRunResult."""
+        result = SolverRunResult()
+        t0 = time.perf_counter()
+        popen_kw = {}
+        if os.name != 'nt':
+            popen_kw["start_new_session"] = True  # własna grupa procesów -> killpg
+        try:
+            proc = subprocess.Popen(
+                cmd, cwd=cwd, env=env, shell=shell,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1,
+                errors="replace", **popen_kw
+            )
+        except Exception as e:
+            result.status = STATUS_LAUNCH
+            result.reason = f"Nie udało się uruchomić solvera: {e}"
+            return result
+        self._proc = proc
+
+        q = queue.Queue()
+        reader = threading.Thread(target=self._reader, args=(proc.stdout, q), daemon=True)
+        reader.start()
+
+        parse_state = {}
+        stream_done = False
+        last_rss = 0.0
+        last_check = 0.0
+        kill_status = None
+
+        def emit(ev):
+            ev["t"] = round(time.perf_counter() - t0, 2)
+            typ = ev["type"]
+            result.counters[typ] = result.counters.get(typ, 0) + 1
+            if typ == "equations": result.equations = ev["equations"]
+            if typ not in ("iteration", "increment", "memory"):
+                result.events.append(ev)
+            if event_callback:
+                try: event_callback(ev)
+                except Exception: pass
+
+        while True:
+            try:
+                line = q.get(timeout=self.poll_s)
+                if line is None:
+                    stream_done = True
+                else:
+                    l = line.rstrip()
+                    if l:
+                        result.last_lines.append(l)
+                        if len(result.last_lines) > 30: result.last_lines.pop(0)
+                        if line_callback: line_callback(l)
+                        ev = parse_progress_line(l, parse_state)
+                        if ev: emit(ev)
+                    # Przy zalewie linii limity sprawdzamy nie częściej niż co poll_s
+                    if time.perf_counter() - last_check < self.poll_s: continue
+            except queue.Empty:
+                pass
+
+            now = time.perf_counter()
+            last_check = now
+            if now - last_rss >= self.rss_interval_s:
+                last_rss = now
+                rss = process_tree_rss_mb(proc.pid)
+                if rss is not None:
+                    result.peak_rss_mb = max(result.peak_rss_mb, rss)
+                    emit({"type": "memory", "rss_mb": round(rss, 1), "peak_mb": round(result.peak_rss_mb, 1)})
+                    if self.max_rss_mb and rss > self.max_rss_mb:
+                        kill_status = STATUS_MEMORY
+                        result.reason = f"Przekroczony limit pamięci: {rss:.0f} MB > {self.max_rss_mb:.0f} MB"
+
+            if kill_status is None and self.timeout_s and (now - t0) > self.timeout_s:
+                kill_status = STATUS_TIMEOUT
+                result.reason = f"Przekroczony limit czasu: {self.timeout_s:.0f} s"
+            if kill_status is None and self.stop_event.is_set():
+                kill_status = STATUS_STOPPED
+                result.reason = "Przerwano na żądanie użytkownika"
+
+            if kill_status is not None:
+                self._kill(proc)
+                result.status = kill_status
+                break
+
+            if stream_done and proc.poll() is not None:
+                break
+
+        try: result.returncode = proc.wait(timeout=self.grace_s)
+        except Exception: result.returncode = proc.poll()
+        if result.status == STATUS_OK and result.returncode != 0:
+            result.status = STATUS_ERROR
+            result.reason = f"Solver zakończył się kodem {result.returncode}"
+        if result.status == STATUS_OK and result.counters.get("error"):
+            result.reason = "CCX zgłosił *ERROR (kod wyjścia 0)"
+        result.elapsed_s = time.perf_counter() - t0
+        self._proc = None
+        return result
@@ -1,16 +1,18 @@
 import sys
 import os
-import json
-import csv
 import importlib
 
 # Dodaj katalog rodzica do ścieżki, żeby widzieć moduły główne (routing, engine_solver itp.)
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import routing
+import profiling
 import engine_solver
 import config_solver
 import material_catalogue
+from run_config import RunConfig
+from result_stream import StreamingResultWriter
+from run_checkpoint import OptimizationCheckpoint
 
 # ==============================================================================
 # NARZĘDZIA POMOCNICZE (Eksport)
@@ -78,46 +80,7 @@ def formatuj_wartosc_config(v):
         return s
     return str(v)
 
-def zapisz_wszystkie_formaty(lista_wynikow, sciezka_baza):
-    """
-    Eksportuje zebrane dane do trzech formatów: CSV, JSON, HTML.
-    sciezka_baza: pełna ścieżka do pliku bez rozszerzenia (z routingu).
-    """
-    if not lista_wynikow:
-        print("(!) Brak danych do zapisu.")
-        return
-
-    # Ustalenie kolejności kolumn
-    wszystkie_klucze = list(lista_wynikow[0].keys())
-    klucze_posortowane = sortuj_klucze_wg_priorytetu(wszystkie_klucze)
-
-    # --- 1. ZAPIS CSV ---
-    sciezka_csv = f"{sciezka_baza}.csv"
-    try:
-        with open(sciezka_csv, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=klucze_posortowane)
-            writer.writeheader()
-            writer.writerows(lista_wynikow)
-        print(f"[OK] Zapisano CSV: {sciezka_csv}")
-    except Exception as e:
-        print(f"[BŁĄD] Zapis CSV: {e}")
-
-    # --- 2. ZAPIS JSON ---
-    sciezka_json = f"{sciezka_baza}.json"
-    try:
-        def numpy_helper(obj):
-            return obj.item() if hasattr(obj, 'item') else obj
-            
-        with open(sciezka_json, 'w', encoding='utf-8') as f:
-            json.dump(lista_wynikow, f, default=numpy_helper, indent=4, ensure_ascii=False)
-        print(f"[OK] Zapisano JSON: {sciezka_json}")
-    except Exception as e:
-        print(f"[BŁĄD] Zapis JSON: {e}")
-
-    # --- 3. ZAPIS HTML ---
-    sciezka_html = f"{sciezka_baza}.html"
-    try:
-        html = """
+HTML_NAGLOWEK = """
         <html>
         <head>
             <meta charset="UTF-8">
@@ -142,17 +105,11 @@ def zapisz_wszystkie_formaty(lista_wynikow, sciezka_baza):
             <div style="font-size:11px; color:#777; margin-bottom:15px;">Wygenerowano automatycznie</div>
             
             <div class="config-box">
-                <h3>Parametry Konfiguracji (config_solver.py)</h3>
+                <h3>Parametry Konfiguracji</h3>
                 <table class="config-table">
         """
-        
-        # Wypis Configu
-        for attr_name in dir(config_solver):
-            if attr_name.isupper():
-                val = getattr(config_solver, attr_name)
-                html += f"<tr><td class='label'>{attr_name}:</td><td>{formatuj_wartosc_config(val)}</td></tr>"
-                
-        html += """
+
+HTML_SRODEK = """
                 </table>
             </div>
             
@@ -160,47 +117,101 @@ def zapisz_wszystkie_formaty(lista_wynikow, sciezka_baza):
             <table class="results-table">
                 <thead><tr>
         """
+
+def _html_wiersz(row, klucze):
+    czesci = ["<tr>"]
+    for k in klucze:
+        val = row.get(k, "")
+        val_str = f"{val:.4f}" if isinstance(val, float) else str(val)
+        if k == "Status_Wymogow":
+            klasa_css = "status-ok" if val == "SPEŁNIA" else "status-fail"
+            czesci.append(f"<td class='{klasa_css}'>{val_str}</td>")
+        else:
+            czesci.append(f"<td>{val_str}</td>")
+    czesci.append("</tr>")
+    return "".join(czesci)
+
+def zapisz_html(wiersze, klucze_posortowane, sciezka_html, cfg):
+    """
+    Raport HTML renderowany strumieniowo: wiersze (iterator) zapisywane kolejno,
+    każdy składany przez join - bez sklejania całego dokumentu w pamięci.
+    """
+    with open(sciezka_html, 'w', encoding='utf-8') as f:
+        f.write(HTML_NAGLOWEK)
+        # Wypis Configu
+        f.write("".join(f"<tr><td class='label'>{attr_name}:</td><td>{formatuj_wartosc_config(val)}</td></tr>"
+                        for attr_name, val in sorted(cfg.to_dict().items())))
+        f.write(HTML_SRODEK)
         
         # Nagłówki
+        naglowki = []
         for k in klucze_posortowane:
             opis = k
             if hasattr(engine_solver, 'OPISY_PARAMETROW') and k in engine_solver.OPISY_PARAMETROW:
                 nazwa, jedn = engine_solver.OPISY_PARAMETROW[k]
                 opis = f"{nazwa}<br><span style='font-size:0.85em; opacity:0.8'>{jedn}</span>"
-            html += f"<th>{opis}</th>"
-        html += "</tr></thead><tbody>"
+            naglowki.append(f"<th>{opis}</th>")
+        f.write("".join(naglowki))
+        f.write("</tr></thead><tbody>")
         
         # Wiersze
-        for row in lista_wynikow:
-            html += "<tr>"
-            for k in klucze_posortowane:
-                val = row.get(k, "")
-                if isinstance(val, float):
-                    val_str = f"{val:.4f}"
-                else:
-                    val_str = str(val)
-                
-                if k == "Status_Wymogow":
-                    klasa_css = "status-ok" if val == "SPEŁNIA" else "status-fail"
-                    html += f"<td class='{klasa_css}'>{val_str}</td>"
-                else:
-                    html += f"<td>{val_str}</td>"
-            html += "</tr>"
+        for row in wiersze:
+            f.write(_html_wiersz(row, klucze_posortowane))
             
-        html += "</tbody></table></body></html>"
-        
-        with open(sciezka_html, 'w', encoding='utf-8') as f:
-            f.write(html)
+        f.write("</tbody></table></body></html>")
+
+def otworz_strumien_wynikow(sciezka_baza):
+    """Strumieniowy zapis CSV + JSONL (kolumny w kolejności priorytetów)."""
+    return StreamingResultWriter(sciezka_baza, uporzadkuj_kolumny=sortuj_klucze_wg_priorytetu)
+
+def zakoncz_strumien_wynikow(strumien, config=None):
+    """Zamyka strumień, buduje JSON (z .jsonl), raport HTML i opcjonalnie plik kolumnowy."""
+    cfg = config if config is not None else RunConfig.from_module(config_solver)
+    if not strumien.close():
+        return
+    sciezka_html = f"{strumien.sciezka_baza}.html"
+    try:
+        zapisz_html(strumien.iter_rows(), strumien.kolumny, sciezka_html, cfg)
         print(f"[OK] Zapisano HTML: {sciezka_html}")
     except Exception as e:
         print(f"[BŁĄD] Zapis HTML: {e}")
+    
+    # [NOWOŚĆ] Parquet (pyarrow) / NPZ - szybkie wczytanie wybranych kolumn w Tab3
+    if cfg.EKSPORT_KOLUMNOWY:
+        try:
+            import columnar_export
+            sciezka_kol = columnar_export.eksportuj_kolumnowo(strumien.sciezka_baza, strumien.kolumny)
+            if sciezka_kol: print(f"[OK] Zapisano plik kolumnowy: {sciezka_kol}")
+        except Exception as e:
+            print(f"[BŁĄD] Zapis kolumnowy: {e}")
+
+def zapisz_wszystkie_formaty(lista_wynikow, sciezka_baza, config=None):
+    """
+    Eksportuje zebrane dane do formatów: CSV, JSON (+ JSONL), HTML.
+    sciezka_baza: pełna ścieżka do pliku bez rozszerzenia (z routingu).
+    config: RunConfig opisany w raporcie HTML (domyślnie config_solver.py).
+    """
+    strumien = otworz_strumien_wynikow(sciezka_baza)
+    try:
+        for wiersz in lista_wynikow:
+            strumien.write_row(wiersz)
+    except Exception as e:
+        print(f"[BŁĄD] Zapis CSV: {e}")
+    zakoncz_strumien_wynikow(strumien, config)
 
 
 # ==============================================================================
 # GŁÓWNA PĘTLA OPTYMALIZACYJNA
 # ==============================================================================
 
-def glowna_petla_optymalizacyjna(router_instance=None):
+def glowna_petla_optymalizacyjna(router_instance=None, przeladuj_config=True, config=None, wznow=False, profil=None):
+    """
+    config: RunConfig przebiegu (GUI / cli.py). Brak = wartości z config_solver.py.
+    przeladuj_config: (tylko gdy config=None) True = świeży odczyt config_solver.py z dysku,
+                      False = wartości już ustawione w module.
+    wznow: True = kontynuacja przerwanego badania z punktu kontrolnego (ta sama nazwa i konfiguracja).
+    profil: "cpu" / "mem" / "cpu+mem" - profilowanie pętli (pliki w 99_Temp, profiling.py).
+    """
     print("=== START OPTYMALIZATORA KONSTRUKCJI SŁUPA ===")
     
     # Inicjalizacja Routera jeśli brak (dla uruchomienia standalone)
@@ -209,13 +220,88 @@ def glowna_petla_optymalizacyjna(router_instance=None):
         if not router_instance.project_path:
             router_instance.set_project() # Ustawia domyślny timestamp
 
-    # Wymuszenie przeładowania konfiguracji (dla GUI)
-    importlib.reload(config_solver)
+    # Konfiguracja jako argument; config_solver.py to tylko źródło domyślne
+    if config is None:
+        if przeladuj_config:
+            importlib.reload(config_solver)
+        config = RunConfig.from_module(config_solver)
+    cfg = config
+
+    if cfg.NAZWA_BADANIA:
+        nazwa_symulacji = cfg.NAZWA_BADANIA
+    else:
+        param_str = f"Fx{int(cfg.LOAD_PARAMS['Fx'])}_L{int(cfg.LOAD_PARAMS['L'])}"
+        nazwa_symulacji = f"Symulacja_{param_str}"
+    
+    # Używamy routera do określenia ścieżki zapisu w folderze "00_Analityka"
+    # Pobieramy ścieżkę BAZOWĄ (bez rozszerzenia - strumień dodaje .csv/.jsonl/.json/.html)
+    sciezka_baza = router_instance.get_path("ANALYTICAL", nazwa_symulacji)
+    
+    # [NOWOŚĆ] Wiersze zapisywane na bieżąco (CSV + JSONL) - przerwanie nie kasuje wyników
+    strumien = otworz_strumien_wynikow(sciezka_baza)
+    
+    # [NOWOŚĆ] Punkt kontrolny - wznowienie pomija ukończone materiały/profile
+    punkt_kontrolny = OptimizationCheckpoint(sciezka_baza, cfg)
+    stan = punkt_kontrolny.wczytaj() if wznow else None
+    if stan is not None:
+        if strumien.resume(stan["offsety"], stan["kolumny"], stan["wiersze"]):
+            print(f"[CHECKPOINT] Wznowienie: materiał {stan['material']}, profil nr {stan['profil_idx']} "
+                  f"({stan['wiersze']} wierszy z poprzedniego przebiegu).")
+        else:
+            print("[CHECKPOINT] (!) Pliki wyników nie pasują do punktu kontrolnego - start od początku.")
+            stan = None
+    elif wznow:
+        print("[CHECKPOINT] Brak punktu kontrolnego - start od początku.")
+    
+    try:
+        with profiling.profiluj(nazwa_symulacji, profil, router_instance):
+            _petla_materialow(cfg, strumien, punkt_kontrolny, stan)
+    except BaseException:
+        strumien.close(finalizuj=False)
+        print(f"(!) Przerwano. Zapisane dotąd wiersze: {strumien.sciezka_csv}")
+        print(f"    Punkt kontrolny: {punkt_kontrolny.sciezka}")
+        raise
+    
+    print(f"\n=== KONIEC OBLICZEŃ. Zapisywanie do: {sciezka_baza}.* ===")
+    
+    zakoncz_strumien_wynikow(strumien, cfg)
+    punkt_kontrolny.usun()
+    
+    # Zwracamy pełną ścieżkę do CSV, aby GUI mogło ją wczytać
+    return f"{sciezka_baza}.csv"
+
+def _stan_petli(strumien, material_idx, material, profil_idx, profil,
+                masa_referencyjna_poprzedniego, licznik_wzrostu_masy, indeks_optimum_poprzedni):
+    """Stan pętli na POCZĄTKU jednostki (materiał, profil) - do punktu kontrolnego."""
+    return {
+        "material_idx": material_idx, "material": material,
+        "profil_idx": profil_idx, "profil": profil,
+        "masa_referencyjna_poprzedniego": masa_referencyjna_poprzedniego,
+        "licznik_wzrostu_masy": licznik_wzrostu_masy,
+        "indeks_optimum_poprzedni": indeks_optimum_poprzedni,
+        "wiersze": strumien.liczba_wierszy,
+        "offsety": strumien.offsets(),
+        "kolumny": strumien.kolumny,
+    }
 
-    zbieracz = engine_solver.ZbieraczWynikow()
+def _petla_materialow(cfg, strumien, punkt_kontrolny=None, stan=None):
+    """
+    Przeszukiwanie (materiał -> profil -> grubość -> otwarcie); wiersze trafiają do strumienia.
+    punkt_kontrolny: OptimizationCheckpoint (zapis stanu) lub None.
+    stan: stan wczytany z punktu kontrolnego (wznowienie) lub None.
+    """
+    def zapisz_stan(wymus, *args):
+        if punkt_kontrolny is not None:
+            punkt_kontrolny.zapisz(_stan_petli(strumien, *args), wymus=wymus)
     
     # 1. PĘTLA PO MATERIAŁACH
-    for material_nazwa in config_solver.LISTA_MATERIALOW:
+    for material_idx, material_nazwa in enumerate(cfg.LISTA_MATERIALOW):
+        if stan is not None and material_idx < stan["material_idx"]:
+            continue # Materiał ukończony w poprzednim przebiegu
+        wznawiany = stan is not None and material_idx == stan["material_idx"]
+        if not wznawiany:
+            zapisz_stan(True, material_idx, material_nazwa, 0, None, None, 0, None)
+        
         print(f"\n>>> ANALIZA DLA MATERIAŁU: {material_nazwa}")
         
         mat_db = material_catalogue.baza_materialow()
@@ -224,7 +310,7 @@ def glowna_petla_optymalizacyjna(router_instance=None):
             continue
         mat_data = mat_db[material_nazwa]
         
-        load_full = config_solver.LOAD_PARAMS.copy()
+        load_full = cfg.LOAD_PARAMS.copy()
         load_full.update(mat_data)
         
         baza_prof = material_catalogue.baza_upe()
@@ -254,18 +340,29 @@ def glowna_petla_optymalizacyjna(router_instance=None):
         # Zmienna do zapamiętania optimum z poprzedniego profilu (indeks w liście tp)
         indeks_optimum_poprzedni = None
         
+        profil_start = 0
+        if wznawiany:
+            masa_referencyjna_poprzedniego = stan["masa_referencyjna_poprzedniego"]
+            licznik_wzrostu_masy = stan["licznik_wzrostu_masy"]
+            indeks_optimum_poprzedni = stan["indeks_optimum_poprzedni"]
+            profil_start = stan["profil_idx"]
+        
         # --- PĘTLA PO CEOWNIKACH (ROSNĄCO) ---
         for i, prof_nazwa in enumerate(dostepne_profile):
+            if i < profil_start:
+                continue # Profil ukończony w poprzednim przebiegu
+            zapisz_stan(False, material_idx, material_nazwa, i, prof_nazwa,
+                        masa_referencyjna_poprzedniego, licznik_wzrostu_masy, indeks_optimum_poprzedni)
             upe_data = baza_prof[prof_nazwa]
             hc = upe_data['hc']
             
             # --- KROK 1: INTELIGENTNE USTALENIE STARTU ---
             # Ustalamy górny limit grubości (sufit) dla przeszukiwania w dół
-            global_max_gp = config_solver.MAX_GRUBOSC_PLASKOWNIKA
+            global_max_gp = cfg.MAX_GRUBOSC_PLASKOWNIKA
             
             if indeks_optimum_poprzedni is not None:
                 # Startujemy X oczek wyżej niż optimum poprzedniego profilu
-                start_index = indeks_optimum_poprzedni + config_solver.START_SEARCH_OFFSET
+                start_index = indeks_optimum_poprzedni + cfg.START_SEARCH_OFFSET
                 if start_index >= len(lista_tp): 
                     start_index = len(lista_tp) - 1
                 start_tp_value = lista_tp[start_index]
@@ -286,12 +383,12 @@ def glowna_petla_optymalizacyjna(router_instance=None):
             
             # Iterujemy od najgrubszego w dół
             for tp_test in lista_tp_filtrowana:
-                b_otw = config_solver.MIN_SZEROKOSC_OTWARCIA
+                b_otw = cfg.MIN_SZEROKOSC_OTWARCIA
                 bp = b_otw + 2 * hc
                 geo_data = {"bp": bp, "tp": tp_test}
                 
                 # Wywołanie silnika - zwróci UR jako max(Stab, Stress)
-                res = engine_solver.analizuj_przekroj_pelna_dokladnosc(upe_data, geo_data, load_full, config_solver.SAFETY_PARAMS)
+                res = engine_solver.analizuj_przekroj_pelna_dokladnosc(upe_data, geo_data, load_full, cfg.SAFETY_PARAMS)
                 
                 # Walidacja: Sprawdzamy UR (które teraz zawiera oba warunki) oraz Klasę Przekroju
                 if res['Wskazniki']['UR'] <= 1.0 and res['Wskazniki']['Klasa_Przekroju'] <= 3:
@@ -319,13 +416,13 @@ def glowna_petla_optymalizacyjna(router_instance=None):
             
             # Zakres raportowania: od indeksu min w górę o zadaną liczbę kroków
             start_idx = indeks_tp_min_w_pelnej_liscie
-            end_idx = start_idx + config_solver.ILE_KROKOW_W_GORE + 1 # +1 bo range jest wyłączny, a chcemy włącznie
+            end_idx = start_idx + cfg.ILE_KROKOW_W_GORE + 1 # +1 bo range jest wyłączny, a chcemy włącznie
             
             # Pobieramy grubości z pełnej, posortowanej listy
             kandydaci_w_gore = lista_tp[start_idx : end_idx]
             
             # Ostateczne filtrowanie (opcjonalne, ale trzyma nas w ryzach configu)
-            grubosci_do_analizy = [t for t in kandydaci_w_gore if t <= config_solver.MAX_GRUBOSC_PLASKOWNIKA]
+            grubosci_do_analizy = [t for t in kandydaci_w_gore if t <= cfg.MAX_GRUBOSC_PLASKOWNIKA]
 
             # Rejestracja masy minimalnej dla tego profilu (dla tp_min) do stopu globalnego
             waga_referencyjna = 0.0
@@ -333,18 +430,18 @@ def glowna_petla_optymalizacyjna(router_instance=None):
             for i_grubosc, tp_current in enumerate(grubosci_do_analizy):
                 
                 # === A) WYNIK DLA MINIMALNEGO OTWARCIA ===
-                b_otw_min = config_solver.MIN_SZEROKOSC_OTWARCIA
+                b_otw_min = cfg.MIN_SZEROKOSC_OTWARCIA
                 bp_min = b_otw_min + 2 * hc
                 geo_min = {"bp": bp_min, "tp": tp_current}
                 
-                res_min = engine_solver.analizuj_przekroj_pelna_dokladnosc(upe_data, geo_min, load_full, config_solver.SAFETY_PARAMS)
+                res_min = engine_solver.analizuj_przekroj_pelna_dokladnosc(upe_data, geo_min, load_full, cfg.SAFETY_PARAMS)
                 waga_min = engine_solver.oblicz_mase_metra(upe_data, geo_min, load_full)
                 
                 # Zapisujemy wagę najlżejszego wariantu (tp_min)
                 if i_grubosc == 0:
                     waga_referencyjna = waga_min
 
-                dane_min = engine_solver.splaszcz_wyniki_do_wiersza(upe_data, geo_min, load_full, config_solver.SAFETY_PARAMS, res_min)
+                dane_min = engine_solver.splaszcz_wyniki_do_wiersza(upe_data, geo_min, load_full, cfg.SAFETY_PARAMS, res_min)
                 dane_min["Stop"] = material_nazwa
                 dane_min["Nazwa_Profilu"] = prof_nazwa
                 dane_min["Input_Geo_b_otw"] = b_otw_min
@@ -354,37 +451,37 @@ def glowna_petla_optymalizacyjna(router_instance=None):
                 # Dodatki obliczeniowe
                 dane_min["Calc_Fy"] = load_full['Fx'] * load_full['w_Ty']
                 dane_min["Calc_Fz"] = load_full['Fx'] * load_full['w_Tz']
-                nb_rd = (dane_min.get("Res_Stab_Chi_N", 0) * dane_min.get("Res_Geo_Acal", 0) * load_full['Re']) / config_solver.SAFETY_PARAMS['gamma_M1']
+                nb_rd = (dane_min.get("Res_Stab_Chi_N", 0) * dane_min.get("Res_Geo_Acal", 0) * load_full['Re']) / cfg.SAFETY_PARAMS['gamma_M1']
                 dane_min["Calc_Nb_Rd"] = nb_rd
                 dane_min["Status_Wymogow"] = "SPEŁNIA"
                 
-                zbieracz.lista_wierszy.append(dane_min)
+                strumien.write_row(dane_min)
                 
                 # === B) SZUKANIE MAKSYMALNEGO OTWARCIA (POSZERZANIE) ===
-                limit_otw = config_solver.LIMIT_POSZERZANIA * config_solver.MIN_SZEROKOSC_OTWARCIA
-                current_b_otw = config_solver.MIN_SZEROKOSC_OTWARCIA + config_solver.KROK_POSZERZANIA
+                limit_otw = cfg.LIMIT_POSZERZANIA * cfg.MIN_SZEROKOSC_OTWARCIA
+                current_b_otw = cfg.MIN_SZEROKOSC_OTWARCIA + cfg.KROK_POSZERZANIA
                 
-                max_b_otw_found = config_solver.MIN_SZEROKOSC_OTWARCIA
+                max_b_otw_found = cfg.MIN_SZEROKOSC_OTWARCIA
                 ostatni_poprawny_wynik = res_min # Startujemy od wyniku dla min
                 
                 while current_b_otw <= limit_otw:
                     bp_test = current_b_otw + 2 * hc
                     geo_test = {"bp": bp_test, "tp": tp_current}
                     
-                    res_test = engine_solver.analizuj_przekroj_pelna_dokladnosc(upe_data, geo_test, load_full, config_solver.SAFETY_PARAMS)
+                    res_test = engine_solver.analizuj_przekroj_pelna_dokladnosc(upe_data, geo_test, load_full, cfg.SAFETY_PARAMS)
                     
                     # Tu również sprawdzamy UR (max)
                     if res_test['Wskazniki']['UR'] <= 1.0 and res_test['Wskazniki']['Klasa_Przekroju'] <= 3:
                         max_b_otw_found = current_b_otw
                         ostatni_poprawny_wynik = res_test
-                        current_b_otw += config_solver.KROK_POSZERZANIA
+                        current_b_otw += cfg.KROK_POSZERZANIA
                     else:
                         break
                 
                 # Raportujemy wynik MAX, ale TYLKO JEŚLI udało się poszerzyć względem MIN
-                if max_b_otw_found > config_solver.MIN_SZEROKOSC_OTWARCIA:
+                if max_b_otw_found > cfg.MIN_SZEROKOSC_OTWARCIA:
                     waga_max = engine_solver.oblicz_mase_metra(upe_data, {"bp": max_b_otw_found + 2*hc, "tp": tp_current}, load_full)
-                    dane_max = engine_solver.splaszcz_wyniki_do_wiersza(upe_data, {"bp": max_b_otw_found + 2*hc, "tp": tp_current}, load_full, config_solver.SAFETY_PARAMS, ostatni_poprawny_wynik)
+                    dane_max = engine_solver.splaszcz_wyniki_do_wiersza(upe_data, {"bp": max_b_otw_found + 2*hc, "tp": tp_current}, load_full, cfg.SAFETY_PARAMS, ostatni_poprawny_wynik)
                     
                     dane_max["Stop"] = material_nazwa
                     dane_max["Nazwa_Profilu"] = prof_nazwa
@@ -394,13 +491,13 @@ def glowna_petla_optymalizacyjna(router_instance=None):
                     
                     dane_max["Calc_Fy"] = load_full['Fx'] * load_full['w_Ty']
                     dane_max["Calc_Fz"] = load_full['Fx'] * load_full['w_Tz']
-                    nb_rd = (dane_max.get("Res_Stab_Chi_N", 0) * dane_max.get("Res_Geo_Acal", 0) * load_full['Re']) / config_solver.SAFETY_PARAMS['gamma_M1']
+                    nb_rd = (dane_max.get("Res_Stab_Chi_N", 0) * dane_max.get("Res_Geo_Acal", 0) * load_full['Re']) / cfg.SAFETY_PARAMS['gamma_M1']
                     dane_max["Calc_Nb_Rd"] = nb_rd
                     dane_max["Status_Wymogow"] = "SPEŁNIA"
                     
-                    zbieracz.lista_wierszy.append(dane_max)
+                    strumien.write_row(dane_max)
                     
-                    if config_solver.POKAZUJ_KROKI_POSREDNIE:
+                    if cfg.POKAZUJ_KROKI_POSREDNIE:
                         print(f"   -> tp={tp_current}: Max Otwarcie {max_b_otw_found}mm")
 
             # --- SPRAWDZENIE GLOBALNEGO STOPU (Na podstawie masy wariantu min) ---
@@ -412,28 +509,9 @@ def glowna_petla_optymalizacyjna(router_instance=None):
             
             masa_referencyjna_poprzedniego = waga_referencyjna
             
-            if licznik_wzrostu_masy >= config_solver.MAX_N_WZROSTOW_WAGI:
-                print(f"[INFO] Przerwano symulację: Masa minimalna rośnie przez {config_solver.MAX_N_WZROSTOW_WAGI} kolejne profile.")
+            if licznik_wzrostu_masy >= cfg.MAX_N_WZROSTOW_WAGI:
+                print(f"[INFO] Przerwano symulację: Masa minimalna rośnie przez {cfg.MAX_N_WZROSTOW_WAGI} kolejne profile.")
                 break
 
-    # --- KONIEC I EKSPORT PRZEZ ROUTING ---
-    
-    if config_solver.NAZWA_BADANIA:
-        nazwa_symulacji = config_solver.NAZWA_BADANIA
-    else:
-        param_str = f"Fx{int(config_solver.LOAD_PARAMS['Fx'])}_L{int(config_solver.LOAD_PARAMS['L'])}"
-        nazwa_symulacji = f"Symulacja_{param_str}"
-    
-    # Używamy routera do określenia ścieżki zapisu w folderze "00_Analityka"
-    # Pobieramy ścieżkę BAZOWĄ (bez rozszerzenia, bo zapisz_wszystkie_formaty dodaje .csv/.html)
-    sciezka_baza = router_instance.get_path("ANALYTICAL", nazwa_symulacji)
-    
-    print(f"\n=== KONIEC OBLICZEŃ. Zapisywanie do: {sciezka_baza}.* ===")
-    
-    zapisz_wszystkie_formaty(zbieracz.lista_wierszy, sciezka_baza)
-    
-    # Zwracamy pełną ścieżkę do CSV, aby GUI mogło ją wczytać
-    return f"{sciezka_baza}.csv"
-
 if __name__ == "__main__":
     glowna_petla_optymalizacyjna()
\ No newline at end of file
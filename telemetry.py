@@ -0,0 +1,193 @@
+import os
+import sys
+import json
+import time
+import datetime
+import threading
+from contextlib import contextmanager
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError: # Windows
+    HAS_RESOURCE = False
+
+# ==============================================================================
+#  TELEMETRY v1.0
+# ==============================================================================
+# Ustrukturyzowana telemetria etapów obliczeń FEM (jeden wiersz JSON na etap).
+# Odpowiada za:
+# 1. Pomiar etapu: czas rzeczywisty, czas CPU (wątku), RSS bieżące i szczytowe
+#    procesu oraz dowolne liczniki (węzły, elementy, równania, rozmiary plików).
+# 2. Zapis zdarzeń do pliku .jsonl projektu (02_MES_Roboczy/_telemetry.jsonl),
+#    bezpieczny dla wielu wątków (potok batcha).
+# 3. Podsumowanie per etap (raport batcha, log).
+#
+# Etapy FemOptimizer: geometry, mesh, groups, mesh_write (z meta generatora -
+# mierzone tam, gdzie działa Gmsh, także w puli procesów), deck, solve, parse,
+# json, archive, retention.
+# Komunikaty "||| [Status: ...]" dla GUI pozostają bez zmian.
+# ==============================================================================
+
+NAZWA_PLIKU = "_telemetry.jsonl"
+
+def rss_mb():
+    """Bieżące RSS procesu [MB] (None, gdy niedostępne)."""
+    if HAS_PSUTIL:
+        try: return psutil.Process().memory_info().rss / (1024 * 1024)
+        except Exception: pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except Exception:
+        return None
+
+def rss_szczyt_mb():
+    """Szczytowe RSS procesu od startu [MB] (None, gdy niedostępne)."""
+    if HAS_RESOURCE:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    if HAS_PSUTIL:
+        try: return getattr(psutil.Process().memory_info(), "peak_wset", 0) / (1024 * 1024) or None
+        except Exception: pass
+    return None
+
+def cpu_potomnych_s():
+    """Czas CPU zakończonych procesów potomnych (ccx) [s]."""
+    if not HAS_RESOURCE:
+        return None
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return ru.ru_utime + ru.ru_stime
+
+def rozmiary_plikow(sciezki):
+    """{nazwa_pliku: bajty} dla istniejących plików (katalog = suma zawartości)."""
+    out = {}
+    for p in sciezki:
+        if not p or not os.path.exists(p):
+            continue
+        if os.path.isdir(p):
+            rozmiar = 0
+            for root, _, files in os.walk(p):
+                for fn in files:
+                    try: rozmiar += os.path.getsize(os.path.join(root, fn))
+                    except OSError: pass
+        else:
+            rozmiar = os.path.getsize(p)
+        out[os.path.basename(os.path.normpath(p))] = rozmiar
+    return out
+
+class TelemetryRecorder:
+    def __init__(self, sciezka, aktywny=True):
+        """sciezka: plik .jsonl (dopisywany). aktywny=False: pomiary bez zapisu na dysk."""
+        self.sciezka = sciezka
+        self.aktywny = aktywny
+        self._lock = threading.Lock()
+        self.zdarzenia = [] # Zdarzenia bieżącej sesji (podsumowanie)
+
+    def zapisz(self, zdarzenie):
+        with self._lock:
+            self.zdarzenia.append(zdarzenie)
+            if not self.aktywny or not self.sciezka:
+                return
+            try:
+                with open(self.sciezka, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(zdarzenie, ensure_ascii=False, default=str) + "\n")
+            except Exception as e:
+                print(f"[TELEMETRY] (!) Zapis zdarzenia: {e}")
+
+    @contextmanager
+    def etap(self, nazwa, cid=None, **dane):
+        """
+        Pomiar etapu. Zwraca słownik zdarzenia - wywołujący dopisuje liczniki
+        (np. ev["nodes"] = ...). Wyjątek oznacza etap jako nieudany i jest przekazywany dalej.
+        """
+        ev = {"stage": nazwa, "cid": cid}
+        ev.update(dane)
+        t0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            yield ev
+        except BaseException as e:
+            ev["ok"] = False
+            ev["error"] = str(e) or type(e).__name__
+            raise
+        finally:
+            ev.setdefault("ok", True)
+            ev["wall_s"] = round(time.perf_counter() - t0, 4)
+            ev["cpu_s"] = round(time.thread_time() - c0, 4)
+            self._uzupelnij(ev)
+            self.zapisz(ev)
+
+    def zdarzenie(self, nazwa, cid=None, wall_s=0.0, cpu_s=None, **dane):
+        """Etap zmierzony gdzie indziej (np. w procesie puli Gmsh)."""
+        ev = {"stage": nazwa, "cid": cid, "ok": True, "wall_s": round(float(wall_s), 4),
+              "cpu_s": None if cpu_s is None else round(float(cpu_s), 4)}
+        ev.update(dane)
+        self._uzupelnij(ev, rss=False)
+        self.zapisz(ev)
+        return ev
+
+    def _uzupelnij(self, ev, rss=True):
+        ev["t"] = datetime.datetime.now().isoformat(timespec="milliseconds")
+        if rss:
+            ev.setdefault("rss_mb", _zaokr(rss_mb()))
+            ev.setdefault("rss_peak_mb", _zaokr(rss_szczyt_mb()))
+
+    def czasy_kandydata(self, cid):
+        """{etap: suma wall_s} dla kandydata (bieżąca sesja)."""
+        with self._lock:
+            zdarzenia = [e for e in self.zdarzenia if e.get("cid") == cid]
+        out = {}
+        for e in zdarzenia:
+            out[e["stage"]] = round(out.get(e["stage"], 0.0) + e.get("wall_s", 0.0), 3)
+        return out
+
+def _zaokr(v, n=1):
+    return None if v is None else round(v, n)
+
+def wczytaj(sciezka):
+    """Zdarzenia z pliku .jsonl (pomija uszkodzone wiersze - np. przerwany zapis)."""
+    out = []
+    if not os.path.exists(sciezka):
+        return out
+    with open(sciezka, 'r', encoding='utf-8') as f:
+        for line in f:
+            try: out.append(json.loads(line))
+            except ValueError: pass
+    return out
+
+def podsumuj(zdarzenia):
+    """Statystyki per etap: liczba, suma / średnia / max czasu, CPU, udział w całości, błędy."""
+    etapy = {}
+    for e in zdarzenia:
+        s = etapy.setdefault(e["stage"], {"stage": e["stage"], "count": 0, "wall_s": 0.0, "cpu_s": 0.0,
+                                          "max_s": 0.0, "errors": 0, "rss_peak_mb": 0.0})
+        s["count"] += 1
+        s["wall_s"] += e.get("wall_s") or 0.0
+        s["cpu_s"] += e.get("cpu_s") or 0.0
+        s["max_s"] = max(s["max_s"], e.get("wall_s") or 0.0)
+        s["rss_peak_mb"] = max(s["rss_peak_mb"], e.get("rss_peak_mb") or 0.0, e.get("solver_peak_rss_mb") or 0.0)
+        if not e.get("ok", True): s["errors"] += 1
+    suma = sum(s["wall_s"] for s in etapy.values()) or 1.0
+    for s in etapy.values():
+        s["avg_s"] = s["wall_s"] / s["count"]
+        s["share"] = s["wall_s"] / suma
+    return sorted(etapy.values(), key=lambda s: -s["wall_s"])
+
+def log_podsumowanie(zdarzenia, log=print):
+    for s in podsumuj(zdarzenia):
+        log(f"  {s['stage']:<10} n={s['count']:<4} czas={s['wall_s']:8.1f}s ({s['share']*100:4.1f}%)  "
+            f"śr. {s['avg_s']:.2f}s, max {s['max_s']:.2f}s, CPU {s['cpu_s']:.1f}s, "
+            f"RSS max {s['rss_peak_mb']:.0f} MB, błędy={s['errors']}")
+
+if __name__ == "__main__":
+    # Podsumowanie istniejącego śladu: python telemetry.py <projekt>/02_MES_Roboczy/_telemetry.jsonl
+    if len(sys.argv) < 2:
+        print("Użycie: python telemetry.py <_telemetry.jsonl>")
+        sys.exit(2)
+    log_podsumowanie(wczytaj(sys.argv[1]))
@@ -0,0 +1,44 @@
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import atomic_io
+
+def test_atomic_open_wyjatek_zostawia_cel(tmp_path):
+    path = tmp_path / "results.json"
+    atomic_io.write_json(str(path), {"v": 1})
+    with pytest.raises(RuntimeError):
+        with atomic_io.atomic_open(str(path)) as f:
+            f.write('{"v": 2')
+            raise RuntimeError("przerwanie")
+    assert json.loads(path.read_text()) == {"v": 1}
+    assert os.listdir(tmp_path) == ["results.json"] # Bez plików tymczasowych
+
+def test_check_manifest(tmp_path):
+    folder = str(tmp_path)
+    assert atomic_io.check_manifest(folder)[0] is None # Folder sprzed manifestów
+    atomic_io.write_json(os.path.join(folder, "results.json"), {"v": 1})
+    atomic_io.write_json(os.path.join(folder, "analytical.json"), {})
+    manifest = atomic_io.write_manifest(folder)
+    assert set(manifest["files"]) == {"results.json", "analytical.json"}
+    assert atomic_io.check_manifest(folder) == (True, "")
+
+    with open(os.path.join(folder, "results.json"), "a") as f: f.write(" ")
+    ok, powod = atomic_io.check_manifest(folder)
+    assert ok is False and "rozmiar" in powod
+    os.remove(os.path.join(folder, "results.json"))
+    assert atomic_io.check_manifest(folder)[0] is False
+
+def test_check_manifest_wymagane_pliki_i_uszkodzenie(tmp_path):
+    folder = str(tmp_path)
+    atomic_io.write_json(os.path.join(folder, "results.json"), {})
+    atomic_io.write_manifest(folder)
+    ok, powod = atomic_io.check_manifest(folder)
+    assert ok is False and "analytical.json" in powod
+    assert atomic_io.check_manifest(folder, required=("results.json",)) == (True, "")
+    with open(os.path.join(folder, atomic_io.MANIFEST_NAME), "w") as f: f.write("{")
+    assert atomic_io.check_manifest(folder)[0] is False
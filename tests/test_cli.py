@@ -0,0 +1,55 @@
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cli
+
+def _zadanie(tmp_path, job):
+    path = tmp_path / "zadanie.json"
+    path.write_text(json.dumps(job))
+    return str(path)
+
+@pytest.fixture
+def przechwyt(monkeypatch):
+    """run_job zastąpione zapisem zadania i listy etapów (bez liczenia)."""
+    wywolania = []
+    def run_job(job, stages=None, project=None, log=None):
+        wywolania.append((job, cli.job_stages(job, stages)))
+        return {"ok": True}
+    monkeypatch.setattr(cli, "run_job", run_job)
+    return wywolania
+
+def test_job_stages_z_sekcji_i_kolejnosc():
+    assert cli.job_stages({"shell": {}, "fem": {}}) == ["fem", "shell"]
+    assert cli.job_stages({"stages": ["fem", "analytical"], "shell": {}}) == ["analytical", "fem"]
+    assert cli.job_stages({"analytical": {}, "fem": {}}, "fem") == ["fem"]
+    with pytest.raises(cli.JobError):
+        cli.job_stages({}, "fem,mes")
+
+def test_resume_nie_dodaje_analityki_do_zadania_fem(tmp_path, przechwyt):
+    assert cli.main([_zadanie(tmp_path, {"fem": {"candidates": "c.csv"}}), "--resume"]) == 0
+    job, etapy = przechwyt[0]
+    assert etapy == ["fem"]
+    assert "analytical" not in job
+
+def test_resume_i_profil_dla_analityki(tmp_path, przechwyt):
+    path = _zadanie(tmp_path, {"analytical": {}, "fem": {}})
+    assert cli.main([path, "--resume", "--profile", "cpu"]) == 0
+    job, etapy = przechwyt[0]
+    assert etapy == ["analytical", "fem"]
+    assert job["analytical"] == {"resume": True, "profile": "cpu"}
+    assert job["fem"]["settings"]["profile"] == "cpu"
+
+def test_profil_pomija_etapy_spoza_stages(tmp_path, przechwyt):
+    path = _zadanie(tmp_path, {"analytical": {}, "fem": {}})
+    assert cli.main([path, "--stages", "fem", "--resume", "--profile", "mem"]) == 0
+    job, etapy = przechwyt[0]
+    assert etapy == ["fem"]
+    assert job["analytical"] == {}
+
+def test_blad_zadania_kod_2(tmp_path):
+    assert cli.main([str(tmp_path / "brak.json")]) == 2
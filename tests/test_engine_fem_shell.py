@@ -0,0 +1,61 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine_fem_shell import FemEngineShell
+
+# Element 1: S6 (C3D15, 3 punkty x 3 warstwy), element 2: S8R (C3D20R, 2x2x2),
+# element 3: typ spoza tabeli warstw
+SIATKA = """*NODE
+1, 0, 0, 0
+*ELEMENT, TYPE=S6, ELSET=SHELL_PLATE
+1, 1, 2, 3, 4, 5, 6
+*ELEMENT, TYPE=S8R, ELSET=SHELL_WEBS
+2, 1, 2, 3, 4, 5, 6, 7, 8
+*ELEMENT, TYPE=S9X, ELSET=SHELL_FLANGES
+3, 1, 2, 3
+"""
+
+def _wiersz_s(el, ip, sxx):
+    return f"{el:10d}{ip:4d} {sxx:13.6E} {0.0:13.6E} {0.0:13.6E} {0.0:13.6E} {0.0:13.6E} {0.0:13.6E}"
+
+def _zapisz_dat(path, napr):
+    linie = ["", " displacements (vx,vy,vz) for set NSET_ALL_SHELL and time  0.1000000E+01", "",
+             f"{1:10d} {0.0:13.6E} {-1.5:13.6E} {0.0:13.6E}", "",
+             " stresses (elem, integ.pnt.,sxx,syy,szz,sxy,sxz,syz) for set SHELL_ALL and time  0.1000000E+01", ""]
+    linie += [_wiersz_s(el, ip, v) for el, ip, v in napr]
+    with open(path, 'w') as f:
+        f.write("\n".join(linie) + "\n")
+
+def _silnik():
+    eng = FemEngineShell()
+    eng.elem_ids, eng.elem_x, eng.elem_type = eng._element_x(SIATKA)
+    eng.ref_node_structure = 1
+    return eng
+
+def test_s6_warstwy_bez_punktow_srodkowych(tmp_path):
+    # S6: punkty 1-3 dół (10), 4-6 środek (100 - maksimum modelu), 7-9 góra (20)
+    napr = [(1, ip, 10.0 if ip <= 3 else (100.0 if ip <= 6 else 20.0)) for ip in range(1, 10)]
+    dat = tmp_path / "m.dat"
+    _zapisz_dat(dat, napr)
+    res = _silnik().parse_dat_results(str(dat), save_field=False)
+    assert res["MODEL_MAX_VM"] == 100.0
+    assert res["MODEL_MAX_VM_TOP"] == 20.0
+    assert res["MODEL_MAX_VM_BOTTOM"] == 10.0
+    assert res["converged"]
+
+def test_s8r_i_nieznany_typ(tmp_path):
+    napr = [(2, ip, 30.0 if ip <= 4 else 40.0) for ip in range(1, 9)]
+    napr += [(3, ip, 500.0) for ip in range(1, 3)]
+    dat = tmp_path / "m.dat"
+    _zapisz_dat(dat, napr)
+    eng = _silnik()
+    res = eng.parse_dat_results(str(dat), save_field=False)
+    assert res["MODEL_MAX_VM_TOP"] == 40.0
+    assert res["MODEL_MAX_VM_BOTTOM"] == 30.0
+    assert res["MODEL_MAX_VM"] == 500.0 # Nieznany typ - tylko maksimum modelu
+    assert any("bez warstwy" in w for w in res["parse_warnings"])
+    assert np.isnan(eng.last_field["vm_top"][1])
@@ -0,0 +1,62 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mesh_convergence import ConvergenceController, solve_order
+
+def _model(h, f_inf=100.0, c=5.0, p=2.0):
+    return f_inf + c * h ** p
+
+def test_solve_order_dowolne_proporcje():
+    h = (8.0, 5.0, 2.0)
+    assert solve_order(h[0], _model(h[0]), h[1], _model(h[1]), h[2], _model(h[2])) == pytest.approx(2.0, rel=1e-6)
+    assert solve_order(4.0, _model(4.0, p=1.3), 3.0, _model(3.0, p=1.3), 1.5, _model(1.5, p=1.3)) == pytest.approx(1.3, rel=1e-6)
+
+def test_solve_order_ciag_niemonotoniczny():
+    assert solve_order(4.0, 110.0, 2.0, 105.0, 1.0, 107.0) is None
+
+def test_estymata_richardson_trzy_siatki():
+    conv = ConvergenceController(tolerance=0.01)
+    for h in (4.0, 2.0, 1.0): conv.add(h, _model(h))
+    est = conv.estimate()
+    assert est["method"] == "richardson"
+    assert est["order"] == pytest.approx(2.0, rel=1e-6)
+    assert est["value"] == pytest.approx(100.0, rel=1e-9)
+    assert est["error"] == pytest.approx(5.0 / 100.0, rel=1e-6)
+    assert not conv.is_converged(est)
+
+def test_estymata_dwie_siatki_rzad_zalozony():
+    conv = ConvergenceController(tolerance=0.01, assumed_order=2.0)
+    assert conv.estimate() is None
+    conv.add(4.0, _model(4.0))
+    assert conv.estimate() is None
+    conv.add(2.0, _model(2.0))
+    est = conv.estimate()
+    assert est["method"] == "assumed_order"
+    assert est["value"] == pytest.approx(100.0)
+
+def test_zbieznosc_ponizej_tolerancji():
+    conv = ConvergenceController(tolerance=0.05)
+    for h in (4.0, 2.0, 1.0): conv.add(h, _model(h, c=1.0))
+    assert conv.is_converged()
+
+def test_next_size_ograniczenia():
+    conv = ConvergenceController(tolerance=0.01, refinement_factor=0.7, max_jump=0.35, min_size=0.5)
+    conv.add(10.0, 200.0)
+    assert conv.next_size() == pytest.approx(7.0) # Brak estymaty - krok klasyczny
+    conv.history = []
+    for h in (4.0, 2.0, 1.0): conv.add(h, _model(h))
+    # Przewidywane h = 1 * (0.8 * 0.01 / 0.05)^(1/2) = 0.4 -> ograniczone skokiem (0.35) i min_size
+    assert conv.next_size() == pytest.approx(0.5)
+    conv.min_size = 0.1
+    assert conv.next_size() == pytest.approx(0.4, rel=1e-6)
+    conv.safety = 1e-6
+    assert conv.next_size() == pytest.approx(0.35) # max_jump
+
+def test_next_size_nie_grubszy_niz_klasyczny():
+    conv = ConvergenceController(tolerance=0.2, refinement_factor=0.7, min_size=0.1)
+    for h in (4.0, 2.0, 1.0): conv.add(h, _model(h))
+    assert conv.next_size() == pytest.approx(0.7)
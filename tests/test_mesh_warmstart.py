@@ -0,0 +1,79 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import atomic_io
+import routing
+from mesh_warmstart import MeshWarmStartTable, calibration_key, size_class
+
+@pytest.fixture
+def router(tmp_path):
+    r = routing.ProjectRouting(base_output_dir=str(tmp_path / "WYNIKI"))
+    r.set_project("P")
+    return r
+
+def _kand(nazwa, t):
+    return {"Nazwa_Profilu": nazwa, "Input_UPE_Typ": "UPE", "Input_UPE_twc": t, "Input_UPE_tfc": t + 3, "Input_Geo_tp": 20}
+
+def test_klucz_kalibracji_klasy_grubosci():
+    assert size_class(4.5) == size_class(5.0)
+    assert size_class(4.5) != size_class(9.0)
+    assert calibration_key(_kand("UPE100", 4.5)) == f"UPE|t{size_class(4.5)}"
+    assert calibration_key({"Nazwa_Profilu": "X"}) == "X|t?"
+
+def test_predict_interpolacja_gestosci(router):
+    tab = MeshWarmStartTable(router)
+    assert tab.predict(_kand("UPE100", 5.0), 2) is None
+    tab.record(_kand("UPE100", 4.0), 2, 2.0) # gęstość 2
+    tab.record(_kand("UPE300", 8.0), 2, 2.0) # gęstość 4
+    assert tab.predict(_kand("UPE200", 6.0), 2) == pytest.approx(6.0 / 3.0)
+    assert tab.predict(_kand("UPE80", 2.0), 2) == pytest.approx(1.0) # Poza zakresem - najbliższa
+    assert tab.predict(_kand("UPE200", 6.0), 1) is None # Inny rząd elementów
+
+def test_cached_tylko_ta_sama_klasa(router):
+    tab = MeshWarmStartTable(router, analysis="shell")
+    tab.record(_kand("UPE100", 4.5), 2, 1.5)
+    assert tab.cached(_kand("UPE120", 5.0), 2) == pytest.approx(5.0 / 3.0)
+    assert tab.cached(_kand("UPE300", 9.5), 2) is None
+
+def test_nowszy_wpis_zastepuje_grubosc(router):
+    tab = MeshWarmStartTable(router)
+    tab.record(_kand("UPE100", 4.0), 2, 2.0)
+    tab.record(_kand("UPE100", 4.0), 2, 1.0)
+    assert tab.predict(_kand("UPE100", 4.0), 2) == pytest.approx(1.0)
+    assert len(tab.data["entries"]["solid|UPE|o2"]) == 1
+
+def test_instancje_scalaja_wpisy(router):
+    a, b = MeshWarmStartTable(router), MeshWarmStartTable(router)
+    a.record(_kand("UPE100", 4.0), 2, 2.0)
+    b.record(_kand("UPE300", 8.0), 2, 2.0) # b nie nadpisuje wpisu a
+    c = MeshWarmStartTable(router)
+    assert len(c.data["entries"]["solid|UPE|o2"]) == 2
+    assert a.predict(_kand("UPE300", 8.0), 2) == pytest.approx(2.0) # a odświeża tabelę z dysku
+
+def test_rownolegly_zapis_wielu_instancji(router):
+    tabele = [MeshWarmStartTable(router) for _ in range(4)]
+    def zapisz(k, tab):
+        for i in range(15):
+            tab.record(_kand(f"P{k}_{i}", 1.0 + k * 4.0 + i * 0.2), 2, 1.0)
+    watki = [threading.Thread(target=zapisz, args=(k, t)) for k, t in enumerate(tabele)]
+    for w in watki: w.start()
+    for w in watki: w.join()
+    assert len(MeshWarmStartTable(router).data["entries"]["solid|UPE|o2"]) == 60
+
+def test_file_lock_timeout(tmp_path):
+    path = str(tmp_path / "tabela.json")
+    with atomic_io.file_lock(path):
+        wynik = []
+        def drugi():
+            try:
+                with atomic_io.file_lock(path, timeout_s=0.2): wynik.append("ok")
+            except TimeoutError: wynik.append("timeout")
+        w = threading.Thread(target=drugi)
+        w.start(); w.join()
+    assert wynik == ["timeout"]
+    with atomic_io.file_lock(path, timeout_s=0.2): pass # Zwolniona po wyjściu z bloku
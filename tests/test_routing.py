@@ -0,0 +1,107 @@
+import os
+import sys
+import json
+import time
+import gzip
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import atomic_io
+import routing
+
+@pytest.fixture
+def router(tmp_path):
+    r = routing.ProjectRouting(base_output_dir=str(tmp_path / "WYNIKI"))
+    r.set_project("P")
+    return r
+
+def _iteracja(root, nazwa, mtime, duzy=0):
+    d = os.path.join(root, nazwa)
+    os.makedirs(d)
+    atomic_io.write_json(os.path.join(d, "results.json"), {"MODEL_MAX_VM": 1.0, "FULL_NODAL_RESULTS": [1, 2]})
+    with open(os.path.join(d, "Model.dat"), "w") as f:
+        f.write("x" * duzy if duzy else "dat")
+    os.utime(d, (mtime, mtime))
+    return d
+
+def test_archive_directory_podmienia_wynik_z_manifestem(router, tmp_path):
+    src = tmp_path / "iter"
+    src.mkdir()
+    (src / "results.json").write_text('{"v": 1}')
+    (src / "Model.dat").write_text("dat")
+    dest, stats = router.archive_directory(str(src), "UPE200")
+    assert sorted(os.listdir(dest)) == ["manifest.json", "results.json"] # .dat zostaje w MES_WORK
+    assert stats["link"] + stats["copy"] == 1
+    assert atomic_io.check_manifest(dest, required=("results.json",)) == (True, "")
+
+    (src / "results.json").unlink()
+    (src / "results.json").write_text('{"v": 2}')
+    router.archive_directory(str(src), "UPE200")
+    assert json.loads(open(os.path.join(dest, "results.json")).read()) == {"v": 2}
+    # Brak pozostałości staging / old w 03_Final
+    assert os.listdir(router.get_path("FINAL", "")) == ["UPE200"]
+
+def test_archive_directory_blad_zostawia_stary_wynik(router, tmp_path, monkeypatch):
+    src = tmp_path / "iter"
+    src.mkdir()
+    (src / "results.json").write_text('{"v": 1}')
+    dest, _ = router.archive_directory(str(src), "UPE200")
+
+    def zepsuty_manifest(folder, extra=None):
+        raise OSError("dysk pełny")
+    monkeypatch.setattr(atomic_io, "write_manifest", zepsuty_manifest)
+    (src / "results.json").unlink()
+    (src / "results.json").write_text('{"v": 2}')
+    with pytest.raises(OSError):
+        router.archive_directory(str(src), "UPE200")
+    assert json.loads(open(os.path.join(dest, "results.json")).read()) == {"v": 1}
+    assert os.listdir(router.get_path("FINAL", "")) == ["UPE200"]
+
+def test_retencja_keep_last_odchudza_starsze(router, tmp_path):
+    root = str(tmp_path / "cid")
+    t = time.time()
+    dirs = [_iteracja(root, f"Iter_{i}", t - 100 + i) for i in range(1, 5)]
+    router.set_retention(keep_last=2, slim=True)
+    out = router.apply_retention(root, keep_dirs=[dirs[0]]) # Iteracja finalna zawsze pełna
+    assert out["slimmed"] == 2
+    assert os.path.exists(os.path.join(dirs[0], "Model.dat"))
+    assert os.path.exists(os.path.join(dirs[3], "Model.dat"))
+    for d in dirs[1:3]:
+        assert os.listdir(d) == ["results.json"]
+        res = json.load(open(os.path.join(d, "results.json")))
+        assert "FULL_NODAL_RESULTS" not in res and res["retention"] == "slim"
+
+def test_retencja_bez_slim_usuwa(router, tmp_path):
+    root = str(tmp_path / "cid")
+    t = time.time()
+    dirs = [_iteracja(root, f"Iter_{i}", t - 100 + i) for i in range(1, 4)]
+    router.set_retention(keep_last=1, slim=False)
+    assert router.apply_retention(root)["removed"] == 2
+    assert [os.path.isdir(d) for d in dirs] == [False, False, True]
+
+def test_odchudzanie_czeka_na_kompresje(router, tmp_path, monkeypatch):
+    root = str(tmp_path / "cid")
+    t = time.time()
+    stary = _iteracja(root, "Iter_1", t - 10, duzy=2048)
+    prawdziwa = routing.compress_file
+    def wolna(path, method="gzip"):
+        time.sleep(0.3)
+        return prawdziwa(path, method)
+    monkeypatch.setattr(routing, "compress_file", wolna)
+    router.set_retention(keep_last=1, slim=True, compress="gzip", compress_min_mb=0.001)
+    router.apply_retention(root) # Iter_1 pełna - kompresja w tle
+
+    _iteracja(root, "Iter_2", t)
+    router.apply_retention(root) # Iter_1 odchudzana w trakcie kompresji
+    router.wait_compression()
+    assert os.listdir(stary) == ["results.json"]
+    assert router.retention_stats["compressed"] == 1
+
+def test_compress_file_gzip(tmp_path):
+    path = tmp_path / "Model.dat"
+    path.write_text("abc" * 1000)
+    przed, po = routing.compress_file(str(path), "gzip")
+    assert not path.exists() and przed == 3000 and po < przed
+    assert gzip.open(str(path) + ".gz").read() == b"abc" * 1000
@@ -0,0 +1,79 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from run_config import RunConfig
+from run_checkpoint import OptimizationCheckpoint
+from result_stream import StreamingResultWriter
+
+def _wiersz(i):
+    return {"Profil": f"UPE{i}", "Masa": float(i), "Material": "S355"}
+
+def test_checkpoint_odrzuca_inna_konfiguracje(tmp_path):
+    baza = str(tmp_path / "wyniki")
+    cfg = RunConfig.from_module()
+    cp = OptimizationCheckpoint(baza, cfg)
+    assert cp.wczytaj() is None
+    assert cp.zapisz({"material": "S355", "indeks_profilu": 3}, wymus=True)
+    assert cp.wczytaj()["indeks_profilu"] == 3
+    inna = cfg.with_overrides(MAX_GRUBOSC_PLASKOWNIKA=cfg.MAX_GRUBOSC_PLASKOWNIKA + 1)
+    assert OptimizationCheckpoint(baza, inna).wczytaj() is None
+    cp.usun()
+    assert not os.path.exists(cp.sciezka)
+
+def test_checkpoint_throttling(tmp_path):
+    cp = OptimizationCheckpoint(str(tmp_path / "wyniki"), RunConfig.from_module(), interwal_s=60.0)
+    assert cp.zapisz({"indeks_profilu": 1})
+    assert not cp.zapisz({"indeks_profilu": 2}) # W interwale - bez zapisu
+    assert cp.wczytaj()["indeks_profilu"] == 1
+    assert cp.zapisz({"indeks_profilu": 2}, wymus=True)
+    assert cp.wczytaj()["indeks_profilu"] == 2
+
+def test_checkpoint_uszkodzony_plik(tmp_path):
+    cp = OptimizationCheckpoint(str(tmp_path / "wyniki"), RunConfig.from_module())
+    with open(cp.sciezka, "w") as f: f.write("{niedokończony")
+    assert cp.wczytaj() is None
+
+def test_wznowienie_przycina_niedokonczona_jednostke(tmp_path):
+    baza = str(tmp_path / "wyniki")
+    cp = OptimizationCheckpoint(baza, RunConfig.from_module())
+    w = StreamingResultWriter(baza)
+    for i in range(3): w.write_row(_wiersz(i))
+    # Początek jednostki 2: stan strumienia w punkcie kontrolnym
+    cp.zapisz({"offsety": w.offsets(), "kolumny": w.kolumny, "wiersze": w.liczba_wierszy}, wymus=True)
+    for i in range(3, 5): w.write_row(_wiersz(i)) # Przerwane w trakcie jednostki
+    w.flush()
+    w._f_csv.close(); w._f_jsonl.close() # Awaria - bez close() i .json
+
+    stan = cp.wczytaj()
+    w2 = StreamingResultWriter(baza)
+    assert w2.resume(stan["offsety"], stan["kolumny"], stan["wiersze"])
+    for i in range(3, 6): w2.write_row(_wiersz(i))
+    assert w2.close()
+
+    oczekiwane = [_wiersz(i) for i in range(6)]
+    assert list(w2.iter_rows()) == oczekiwane
+    with open(baza + ".json", encoding="utf-8") as f:
+        assert json.load(f) == oczekiwane
+    with open(baza + ".csv", encoding="utf-8") as f:
+        linie = f.read().splitlines()
+    assert linie[0] == "Profil,Masa,Material" and len(linie) == 7
+
+def test_wznowienie_odrzuca_krotszy_plik(tmp_path):
+    baza = str(tmp_path / "wyniki")
+    w = StreamingResultWriter(baza)
+    w.write_row(_wiersz(0))
+    offsety, kolumny = w.offsets(), w.kolumny
+    w.close(finalizuj=False)
+    os.truncate(baza + ".jsonl", 0)
+    assert not StreamingResultWriter(baza).resume(offsety, kolumny, 1)
+
+def test_json_jak_json_dump(tmp_path):
+    baza = str(tmp_path / "wyniki")
+    wiersze = [{"a": 1, "b": "ż"}, {"a": 2.5, "b": None}]
+    with StreamingResultWriter(baza) as w:
+        for r in wiersze: w.write_row(r)
+    with open(baza + ".json", encoding="utf-8") as f:
+        assert f.read() == json.dumps(wiersze, indent=4, ensure_ascii=False)
@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import solver_watchdog as sw
+
+def _skrypt(kod):
+    return [sys.executable, "-c", kod]
+
+def _watchdog(**kw):
+    kw.setdefault("poll_s", 0.05)
+    kw.setdefault("grace_s", 2.0)
+    kw.setdefault("rss_interval_s", 0.05)
+    return sw.SolverWatchdog(**kw)
+
+def test_parse_progress_line_rownania_w_osobnej_linii():
+    stan = {}
+    assert sw.parse_progress_line(" STEP 1", stan) == {"type": "step", "step": 1}
+    assert sw.parse_progress_line(" number of equations", stan) is None
+    assert sw.parse_progress_line(" 123456", stan) == {"type": "equations", "equations": 123456}
+    assert sw.parse_progress_line(" 42", stan) is None # Liczba bez nagłówka - ignorowana
+    ev = sw.parse_progress_line(" *ERROR in input: brak węzła")
+    assert ev["type"] == "error" and "brak węzła" in ev["text"]
+
+def test_przebieg_ok_ze_zdarzeniami(tmp_path):
+    kod = "print(' STEP 1'); print(' number of equations'); print(' 999'); print(' Job finished')"
+    zdarzenia = []
+    res = _watchdog().run(_skrypt(kod), str(tmp_path), event_callback=zdarzenia.append)
+    assert res.ok and res.returncode == 0
+    assert res.equations == 999
+    assert [e["type"] for e in res.events if e["type"] != "memory"] == ["step", "equations", "finished"]
+    assert any(e["type"] == "finished" for e in zdarzenia)
+
+def test_limit_czasu(tmp_path):
+    t0 = time.perf_counter()
+    res = _watchdog(timeout_s=0.5).run(_skrypt("import time; time.sleep(30)"), str(tmp_path))
+    assert res.status == sw.STATUS_TIMEOUT
+    assert time.perf_counter() - t0 < 10
+
+def test_limit_pamieci(tmp_path):
+    if sw.process_tree_rss_mb(os.getpid()) is None:
+        pytest.skip("Brak pomiaru RSS na tej platformie")
+    kod = "import time; b = bytearray(300 * 1024 * 1024); print('ok', flush=True); time.sleep(30)"
+    res = _watchdog(max_rss_mb=100).run(_skrypt(kod), str(tmp_path))
+    assert res.status == sw.STATUS_MEMORY
+    assert res.peak_rss_mb > 100
+
+def test_przerwanie_na_zadanie(tmp_path):
+    wd = _watchdog()
+    threading.Timer(0.3, wd.request_stop).start()
+    res = wd.run(_skrypt("import time; time.sleep(30)"), str(tmp_path))
+    assert res.status == sw.STATUS_STOPPED
+
+def test_kod_bledu_i_brak_programu(tmp_path):
+    res = _watchdog().run(_skrypt("import sys; sys.exit(3)"), str(tmp_path))
+    assert res.status == sw.STATUS_ERROR and res.returncode == 3
+    res = _watchdog().run([str(tmp_path / "brak_ccx")], str(tmp_path))
+    assert res.status == sw.STATUS_LAUNCH
+
+def test_error_ccx_przy_kodzie_zero(tmp_path):
+    res = _watchdog().run(_skrypt("print(' *ERROR reading *STEP')"), str(tmp_path))
+    assert res.ok and "ERROR" in res.reason
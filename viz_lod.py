@@ -0,0 +1,122 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import pyvista as pv
+    HAS_PYVISTA = True
+except ImportError:
+    HAS_PYVISTA = False
+
+# ==============================================================================
+#  VIZ LOD v1.0
+# ==============================================================================
+# Poziomy szczegółowości (LOD) widoków 3D siatek FEM (Tab4, Tab5).
+# Odpowiada za:
+# 1. Wyciągnięcie powierzchni zewnętrznej siatki bryłowej (bez węzłów
+#    wewnętrznych czworościanów) z przeniesieniem wyników węzłowych
+#    (FULL_NODAL_RESULTS) na jej punkty.
+# 2. Decymację powierzchni do zadanego budżetu trójkątów (interakcja).
+# 3. Pełną rozdzielczość tylko na żądanie (osobny obiekt, ten sam cache).
+# 4. Cache per wynik: pamięć (kilka ostatnich) + dysk (.vtp obok wyniku),
+#    klucz = ścieżka, rozmiar i czas modyfikacji plików źródłowych.
+# ==============================================================================
+
+BUDZET_TROJKATOW = 150000 # Domyślny budżet widoku interaktywnego
+CACHE_PAMIEC = 4 # Liczba wyników trzymanych w pamięci
+KATALOG_CACHE = "_lod_cache"
+
+POLE_VM = "Stress VM [MPa]"
+POLE_U = "U [mm]"
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock() # przygotuj_lod wołane także z wątków ładujących (Tab5)
+
+def _klucz(sciezki, budzet):
+    h = hashlib.sha1()
+    for p in sciezki:
+        if p and os.path.exists(p):
+            st = os.stat(p)
+            h.update(f"{os.path.abspath(p)}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8"))
+    h.update(str(budzet).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+def tablica_wynikow(res_map):
+    """FULL_NODAL_RESULTS {nid: [x, y, z, vm, u, uy, uz]} -> ndarray (N, 7)."""
+    if not res_map:
+        return None
+    arr = np.array(list(res_map.values()), dtype=np.float64)
+    return arr if arr.ndim == 2 and arr.shape[1] >= 4 else None
+
+def dopasuj_punkty(punkty, punkty_wynikow, dokladnosc=6):
+    """
+    Indeks wiersza wyników dla każdego punktu siatki (-1 = brak) - dopasowanie
+    po współrzędnych (te same węzły Gmsh), bez pętli Pythona.
+    """
+    a = np.round(np.asarray(punkty, dtype=np.float64), dokladnosc)
+    b = np.round(np.asarray(punkty_wynikow, dtype=np.float64), dokladnosc)
+    _, inv = np.unique(np.concatenate([b, a]), axis=0, return_inverse=True)
+    inv = inv.ravel()
+    lookup = np.full(inv.max() + 1, -1, dtype=np.int64)
+    lookup[inv[:len(b)]] = np.arange(len(b))
+    return lookup[inv[len(b):]]
+
+def powierzchnia_z_wynikami(mesh, wyniki=None):
+    """Powierzchnia zewnętrzna (trójkąty) z polami VM / U przeniesionymi z węzłów."""
+    mesh = mesh.copy(deep=False)
+    if wyniki is not None:
+        idx = dopasuj_punkty(mesh.points, wyniki[:, 0:3])
+        ok = idx >= 0
+        for kol, pole in ((3, POLE_VM), (4, POLE_U)):
+            if wyniki.shape[1] > kol:
+                wartosci = np.full(mesh.n_points, np.nan)
+                wartosci[ok] = wyniki[idx[ok], kol]
+                mesh.point_data[pole] = wartosci
+    return mesh.extract_surface().triangulate().clean()
+
+def decymuj(powierzchnia, budzet=BUDZET_TROJKATOW):
+    """Decymacja do budżetu trójkątów (DecimatePro - zachowuje pola punktowe)."""
+    n = powierzchnia.n_cells
+    if n <= budzet or n == 0:
+        return powierzchnia
+    redukcja = min(0.98, 1.0 - budzet / n)
+    return powierzchnia.decimate_pro(redukcja, preserve_topology=True)
+
+def przygotuj_lod(msh_path, res_map=None, res_path=None, budzet=BUDZET_TROJKATOW, katalog_cache=None):
+    """
+    Zwraca {"lod": PolyData, "full": PolyData, "n_full": int, "n_lod": int}.
+    res_path: plik wyników (tylko do klucza cache). katalog_cache: domyślnie obok .msh.
+    Bezpieczne w wątku roboczym (bez renderowania).
+    """
+    klucz = _klucz([msh_path, res_path], budzet if res_map is None else (budzet, len(res_map)))
+    with _cache_lock:
+        if klucz in _cache:
+            _cache.move_to_end(klucz)
+            return _cache[klucz]
+
+    if katalog_cache is None:
+        katalog_cache = os.path.join(os.path.dirname(msh_path), KATALOG_CACHE)
+    stem = os.path.splitext(os.path.basename(msh_path))[0]
+    p_full = os.path.join(katalog_cache, f"{stem}_{klucz}_full.vtp")
+    p_lod = os.path.join(katalog_cache, f"{stem}_{klucz}_lod.vtp")
+
+    if os.path.exists(p_full) and os.path.exists(p_lod):
+        full, lod = pv.read(p_full), pv.read(p_lod)
+    else:
+        full = powierzchnia_z_wynikami(pv.read(msh_path), tablica_wynikow(res_map))
+        lod = decymuj(full, budzet)
+        try:
+            os.makedirs(katalog_cache, exist_ok=True)
+            full.save(p_full); lod.save(p_lod)
+        except Exception as e:
+            print(f"[LOD] (!) Nie zapisano cache: {e}")
+
+    wynik = {"lod": lod, "full": full, "n_full": full.n_cells, "n_lod": lod.n_cells}
+    with _cache_lock:
+        _cache[klucz] = wynik
+        while len(_cache) > CACHE_PAMIEC:
+            _cache.popitem(last=False)
+    return wynik